@@ -0,0 +1,48 @@
+"""add_webhook_intake
+
+Revision ID: 3f1c9a7d2b10
+Revises: bc4a75ae2176
+Create Date: 2026-10-16 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b10'
+down_revision: Union[str, None] = 'bc4a75ae2176'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'webhook_intake',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ordering_key', sa.String(), nullable=False),
+        sa.Column('idempotency_key', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'processing', 'done', 'failed', name='webhook_intake_status_enum'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('result', sa.String(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_intake_status_received', 'webhook_intake', ['status', 'received_at'], unique=False)
+    op.create_index('ix_webhook_intake_user_idempotency', 'webhook_intake', ['user_id', 'idempotency_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_intake_user_idempotency', table_name='webhook_intake')
+    op.drop_index('ix_webhook_intake_status_received', table_name='webhook_intake')
+    op.drop_table('webhook_intake')
+    sa.Enum(name='webhook_intake_status_enum').drop(op.get_bind(), checkfirst=True)
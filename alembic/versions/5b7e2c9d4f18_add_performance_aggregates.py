@@ -0,0 +1,56 @@
+"""add_performance_aggregates
+
+Revision ID: 5b7e2c9d4f18
+Revises: 8d2e4b6f1a93
+Create Date: 2026-10-16 13:42:08.114236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d4f18'
+down_revision: Union[str, None] = '8d2e4b6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'performance_summaries',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table(
+        'performance_daily',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('trades', sa.Integer(), nullable=False),
+        sa.Column('wins', sa.Integer(), nullable=False),
+        sa.Column('losses', sa.Integer(), nullable=False),
+        sa.Column('realized_pnl_usd', sa.Numeric(precision=20, scale=10), nullable=False),
+        sa.Column('closing_equity_usd', sa.Numeric(precision=20, scale=10), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    # Existing closed groups are folded in on the user's next dashboard read
+    # (or up front with scripts/rebuild_performance_aggregates.py)
+    op.add_column('position_groups', sa.Column('analytics_applied', sa.Boolean(), server_default='false', nullable=False))
+    op.create_index(
+        'ix_position_groups_analytics_pending', 'position_groups', ['user_id', 'closed_at'], unique=False,
+        postgresql_where=sa.text("status = 'closed' AND NOT analytics_applied")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_position_groups_analytics_pending', table_name='position_groups')
+    op.drop_column('position_groups', 'analytics_applied')
+    op.drop_table('performance_daily')
+    op.drop_table('performance_summaries')
@@ -0,0 +1,31 @@
+"""add_position_ledger
+
+Revision ID: 8d2e4b6f1a93
+Revises: 3f1c9a7d2b10
+Create Date: 2026-10-16 11:04:19.337512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6f1a93'
+down_revision: Union[str, None] = '3f1c9a7d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing groups have no ledger yet; it is rebuilt from their orders on the next stats update
+    op.add_column('position_groups', sa.Column('ledger_state', sa.JSON(), nullable=True))
+    op.add_column('dca_orders', sa.Column('ledger_applied', sa.Boolean(), server_default='false', nullable=False))
+    op.add_column('dca_orders', sa.Column('ledger_tp_applied', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('dca_orders', 'ledger_tp_applied')
+    op.drop_column('dca_orders', 'ledger_applied')
+    op.drop_column('position_groups', 'ledger_state')
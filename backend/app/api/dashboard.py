@@ -8,8 +8,10 @@ from app.models.user import User
 from app.repositories.position_group import PositionGroupRepository
 from app.services.exchange_config_service import ExchangeConfigService
 from app.core.cache import get_cache
+from app.services.market_data import get_symbol_tickers
 from app.schemas.dashboard import DashboardOutput
 from app.rate_limiter import limiter
+from app.services.exchange_abstraction.request_scheduler import read_priority
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,6 +24,7 @@ router = APIRouter()
 
 @router.get("/account-summary", response_model=DashboardOutput)
 @limiter.limit("120/minute")
+@read_priority
 async def get_account_summary(
     request: Request,
     current_user: User = Depends(get_current_active_user)
@@ -82,21 +85,12 @@ async def get_account_summary(
             exchange_free_usdt = float(free_balances.get("USDT", total_balances.get("USDT", Decimal(0))))
             total_free_usdt += exchange_free_usdt
 
-            # Try to get cached tickers first
-            cached_tickers = await cache.get_tickers(exchange_name)
-            if cached_tickers:
-                logger.debug(f"Using cached tickers for {exchange_name}")
-                all_tickers = cached_tickers
-            else:
-                # Fetch ALL tickers once
-                all_tickers = {}
-                try:
-                    all_tickers = await connector.get_all_tickers()
-                    logger.info(f"Fetched {len(all_tickers)} tickers from {exchange_name}")
-                    # Cache tickers (1 min TTL)
-                    await cache.set_tickers(exchange_name, all_tickers)
-                except Exception as e:
-                    logger.warning(f"Could not fetch all tickers from {exchange_name}: {e}. Falling back to individual fetches.")
+            # Read only the tickers of the held assets from the shared ticker cache
+            priced_symbols = [
+                f"{asset}/USDT" for asset, amount in total_balances.items()
+                if asset not in ("USDT", exchange_name) and float(amount or 0) > 0
+            ]
+            all_tickers = await get_symbol_tickers(cache, exchange_name, priced_symbols, connector)
 
             # Helper to get price from cache or fetch individually
             async def get_price(symbol):
@@ -152,6 +146,7 @@ async def get_account_summary(
 
 @router.get("/pnl")
 @limiter.limit("120/minute")
+@read_priority
 async def get_pnl(
     request: Request,
     current_user: User = Depends(get_current_active_user),
@@ -198,19 +193,10 @@ async def get_pnl(
                     logger.warning(f"get_pnl: Could not create connector for {exchange_name}: {e}")
                     continue
 
-                # Try to get cached tickers first
-                all_tickers = await cache.get_tickers(exchange_name)
-                if not all_tickers:
-                    try:
-                        all_tickers = await connector.get_all_tickers()
-                        logger.info(f"get_pnl: Fetched {len(all_tickers)} tickers from {exchange_name}")
-                        # Cache tickers (1 min TTL)
-                        await cache.set_tickers(exchange_name, all_tickers)
-                    except Exception as e:
-                        logger.warning(f"get_pnl: Could not fetch all tickers from {exchange_name}: {e}. Falling back to individual fetches.")
-                        all_tickers = {}
-                else:
-                    logger.debug(f"get_pnl: Using cached tickers for {exchange_name}")
+                # Read only the tickers of these groups from the shared ticker cache
+                all_tickers = await get_symbol_tickers(
+                    cache, exchange_name, [group.symbol for group in groups], connector
+                )
 
                 async def get_price(symbol):
                     if symbol in all_tickers:
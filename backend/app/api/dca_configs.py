@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db_session as get_db
+from app.core.cache import get_cache
 from app.api.dependencies.users import get_current_user
 from app.models.user import User
 from app.models.dca_configuration import DCAConfiguration
@@ -19,6 +20,12 @@ from app.schemas.grid_config import (
 router = APIRouter()
 
 
+async def invalidate_cached_configs(user: User):
+    """Drop the configs the signal router cached for this user, on every worker."""
+    cache = await get_cache()
+    await cache.invalidate_user_dca_configs(str(user.id))
+
+
 def normalize_pair(pair: str) -> str:
     """Normalize pair format: BTCUSDT -> BTC/USDT"""
     if '/' in pair:
@@ -94,6 +101,7 @@ async def create_dca_config(
     created = await repo.create(new_config)
     await db.commit()
     await db.refresh(created)
+    await invalidate_cached_configs(current_user)
     return created.to_dict()
 
 @router.put("/{config_id}", response_model=DCAConfigurationSchema)
@@ -139,6 +147,7 @@ async def update_dca_config(
 
     await db.commit()
     await db.refresh(config)
+    await invalidate_cached_configs(current_user)
     return config.to_dict()
 
 @router.delete("/{config_id}")
@@ -160,4 +169,5 @@ async def delete_dca_config(
 
     await repo.delete(config)
     await db.commit()
+    await invalidate_cached_configs(current_user)
     return {"message": "Configuration deleted"}
@@ -43,11 +43,13 @@ async def check_token_blacklist(jti: str) -> bool:
         return False
 
 
-async def get_current_user(
-    request: Request,
-    header_token: Optional[str] = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db_session)
-) -> User:
+async def get_user_from_token(token: Optional[str], db: AsyncSession) -> User:
+    """
+    Resolve the user a JWT was issued to.
+
+    Shared by the HTTP dependency below and the WebSocket endpoint, which
+    cannot use Depends-based header parsing.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -60,9 +62,6 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Try header token first, then cookie
-    token = header_token or get_token_from_cookie(request)
-
     if not token:
         raise credentials_exception
 
@@ -91,6 +90,16 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    request: Request,
+    header_token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session)
+) -> User:
+    # Try header token first, then cookie
+    token = header_token or get_token_from_cookie(request)
+    return await get_user_from_token(token, db)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -210,6 +210,56 @@ async def circuit_breakers_health_check():
         }
 
 
+@router.get("/request-schedulers")
+async def request_schedulers_health_check():
+    """
+    Get the exchange request budgets of this worker.
+
+    Reports used weight, queued and shed calls, and any pause imposed by the exchange.
+    """
+    try:
+        from app.services.exchange_abstraction.request_scheduler import get_all_scheduler_metrics
+
+        metrics = get_all_scheduler_metrics()
+        throttled = any(m.get("paused_seconds", 0) > 0 for m in metrics.values())
+
+        return {
+            "status": "degraded" if throttled else "healthy",
+            "schedulers": metrics
+        }
+    except Exception as e:
+        logger.error(f"Request scheduler health check failed: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+@router.get("/cache")
+async def cache_health_check():
+    """
+    Get the in-process cache of this worker.
+
+    Reports entries, evictions and per-namespace hit rate and Redis read latency,
+    and the age and size of the compiled precision tables.
+    """
+    try:
+        from app.services.exchange_abstraction.precision_index import get_precision_index
+
+        cache = await get_cache()
+        return {
+            "status": "ok",
+            "local_cache": cache.get_local_cache_metrics(),
+            "precision_index": get_precision_index().get_metrics()
+        }
+    except Exception as e:
+        logger.error(f"Cache health check failed: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
 @router.get("/redis")
 async def redis_health_check():
     """Check Redis connection status."""
@@ -258,6 +308,8 @@ async def services_health_check():
 
         # Expected services
         expected_services = ["order_fill_monitor", "queue_manager", "risk_engine"]
+        # Reported when running, but not required for overall health
+        optional_services = ["order_fill_stream", "webhook_intake", "telegram_dispatcher"]
 
         overall_healthy = True
 
@@ -288,6 +340,17 @@ async def services_health_check():
                     "metrics": {}
                 }
 
+        for service_name in optional_services:
+            if service_name in services_health:
+                service_data = services_health[service_name]
+                seconds_since_heartbeat = current_time - service_data.get("last_heartbeat", 0)
+                result["services"][service_name] = {
+                    "status": service_data.get("status", "unknown"),
+                    "healthy": seconds_since_heartbeat < 300,
+                    "last_heartbeat_seconds_ago": round(seconds_since_heartbeat, 1),
+                    "metrics": service_data.get("metrics", {})
+                }
+
         result["status"] = "ok" if overall_healthy else "degraded"
 
         return result
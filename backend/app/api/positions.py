@@ -18,7 +18,9 @@ from app.models.user import User # New import
 from app.exceptions import APIError # New import
 from app.services.exchange_config_service import ExchangeConfigService, ExchangeConfigError
 from app.rate_limiter import limiter
+from app.services.exchange_abstraction.request_scheduler import read_priority
 from app.core.cache import get_cache
+from app.services.market_data import get_symbol_tickers
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -132,6 +134,7 @@ async def _calculate_position_pnl(
 
 @router.get("/active", response_model=List[PositionGroupSchema])
 @limiter.limit("120/minute")
+@read_priority
 async def get_current_user_active_positions(
     request: Request,
     current_user: User = Depends(get_current_active_user),
@@ -142,9 +145,17 @@ async def get_current_user_active_positions(
     Calculates unrealized PnL with current market prices.
 
     Performance optimizations:
-    - Batch fetches all tickers once per exchange
+    - Reads the tickers of the listed symbols once per exchange
     - Calculates PnL for all positions in parallel using asyncio.gather
     """
+    return await load_active_positions(db, current_user)
+
+
+async def load_active_positions(db: AsyncSession, current_user: User) -> List[PositionGroupSchema]:
+    """
+    Active position groups of a user with unrealized PnL at current prices.
+    Also builds the positions snapshots pushed over the realtime WebSocket.
+    """
     repo = PositionGroupRepository(db)
     positions = await repo.get_active_position_groups_for_user(current_user.id)
 
@@ -171,16 +182,10 @@ async def get_current_user_active_positions(
         try:
             connector = ExchangeConfigService.get_connector(current_user, exchange_name)
 
-            # Try to get cached tickers first
-            all_tickers = await cache.get_tickers(exchange_name)
-            if not all_tickers:
-                try:
-                    all_tickers = await connector.get_all_tickers()
-                    logger.debug(f"Fetched {len(all_tickers)} tickers from {exchange_name}")
-                    await cache.set_tickers(exchange_name, all_tickers)
-                except Exception as e:
-                    logger.warning(f"Could not fetch tickers from {exchange_name}: {e}")
-                    all_tickers = {}
+            # Read only the tickers of these positions from the shared ticker cache
+            all_tickers = await get_symbol_tickers(
+                cache, exchange_name, [pos.symbol for pos in exchange_positions], connector
+            )
 
             # Calculate PnL for all positions in parallel
             await asyncio.gather(*[
@@ -230,6 +235,7 @@ async def get_current_user_position_history(
 
 @router.get("/{user_id}", response_model=List[PositionGroupSchema])
 @limiter.limit("30/minute")
+@read_priority
 async def get_all_positions(
     request: Request,
     user_id: uuid.UUID,
@@ -241,7 +247,7 @@ async def get_all_positions(
     Calculates unrealized PnL with current market prices.
 
     Performance optimizations:
-    - Batch fetches all tickers once per exchange
+    - Reads the tickers of the listed symbols once per exchange
     - Calculates PnL for all positions in parallel using asyncio.gather
     """
     if current_user.id != user_id and not current_user.is_superuser:
@@ -272,15 +278,10 @@ async def get_all_positions(
         try:
             connector = ExchangeConfigService.get_connector(current_user, exchange_name)
 
-            # Try to get cached tickers first
-            all_tickers = await cache.get_tickers(exchange_name)
-            if not all_tickers:
-                try:
-                    all_tickers = await connector.get_all_tickers()
-                    await cache.set_tickers(exchange_name, all_tickers)
-                except Exception as e:
-                    logger.warning(f"Could not fetch tickers from {exchange_name}: {e}")
-                    all_tickers = {}
+            # Read only the tickers of these positions from the shared ticker cache
+            all_tickers = await get_symbol_tickers(
+                cache, exchange_name, [pos.symbol for pos in exchange_positions], connector
+            )
 
             # Calculate PnL for all positions in parallel
             await asyncio.gather(*[
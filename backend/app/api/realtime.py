@@ -0,0 +1,119 @@
+import logging
+import secrets
+import uuid
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from app.api.dependencies.users import get_current_active_user, get_token_from_cookie, get_user_from_token
+from app.api.positions import load_active_positions
+from app.core.cache import CacheService, get_cache
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.user import User
+from app.repositories.user import UserRepository
+from app.schemas.queued_signal import QueuedSignalSchema
+from app.services.exchange_abstraction.request_scheduler import request_priority, RequestPriority
+from app.services.queue_manager import QueueManagerService
+from app.services.realtime_updates import SnapshotLoader, TOPIC_POSITIONS, TOPIC_QUEUE, get_realtime_hub
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def make_snapshot_loader(queue_manager_service: QueueManagerService) -> SnapshotLoader:
+    """Builds the snapshots pushed over the socket from the same code as the REST endpoints."""
+    async def load_snapshot(user_id: str, topic: str) -> List[Any]:
+        if topic == TOPIC_QUEUE:
+            signals = await queue_manager_service.get_all_queued_signals(user_id=uuid.UUID(user_id))
+            return [QueuedSignalSchema.model_validate(signal).model_dump(mode="json") for signal in signals]
+
+        if topic == TOPIC_POSITIONS:
+            async with AsyncSessionLocal() as db:
+                user = await UserRepository(db).get_by_id(user_id)
+                if user is None:
+                    return []
+                with request_priority(RequestPriority.READ):
+                    positions = await load_active_positions(db, user)
+                return [position.model_dump(mode="json") for position in positions]
+
+        raise ValueError(f"Unknown realtime topic {topic}")
+
+    return load_snapshot
+
+
+def is_allowed_origin(origin: Optional[str]) -> bool:
+    """
+    Browsers always send Origin on WebSocket handshakes but do not apply CORS
+    to them, so a cross-site page could open the socket with the user's cookie.
+    Clients that send no Origin are not browsers and must authenticate anyway.
+    """
+    return origin is None or origin in settings.CORS_ORIGINS
+
+
+@router.post("/ticket")
+async def create_ticket(current_user: User = Depends(get_current_active_user)):
+    """
+    A single-use ticket for opening the socket without the auth cookie (e.g.
+    from a client on another origin), so no JWT has to go into the URL.
+    """
+    ticket = secrets.token_urlsafe(32)
+    cache = await get_cache()
+    if not await cache.set_ws_ticket(ticket, str(current_user.id)):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Tickets are unavailable")
+    return {"ticket": ticket, "expires_in": CacheService.TTL_WS_TICKET}
+
+
+async def authenticate_socket(websocket: WebSocket) -> Optional[User]:
+    """The user of the auth cookie or of a `ticket` query parameter, if valid."""
+    token = get_token_from_cookie(websocket)
+    ticket = websocket.query_params.get("ticket")
+    async with AsyncSessionLocal() as db:
+        if token:
+            try:
+                return await get_user_from_token(token, db)
+            except HTTPException:
+                return None
+        if ticket:
+            cache = await get_cache()
+            user_id = await cache.consume_ws_ticket(ticket)
+            if user_id:
+                return await UserRepository(db).get_by_id(user_id)
+    return None
+
+
+@router.websocket("/ws")
+async def realtime_updates(websocket: WebSocket):
+    """
+    Pushes position_groups_update and queued_signals_update messages for the
+    authenticated user. Browsers cannot set headers on WebSockets, so the user
+    comes from the auth cookie or a ticket from POST /ticket.
+    """
+    hub = get_realtime_hub()
+    if hub is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    if not is_allowed_origin(websocket.headers.get("origin")):
+        logger.warning(f"Rejected realtime socket from origin {websocket.headers.get('origin')}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    user = await authenticate_socket(websocket)
+    if user is None or not user.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        await hub.connect(user.id, websocket)
+        # Updates are server-push only; reading just detects the client going away
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Realtime socket of user {user.id} failed: {e}")
+    finally:
+        hub.disconnect(user.id, websocket)
@@ -9,10 +9,18 @@ from app.repositories.user import UserRepository
 from app.schemas.user import UserUpdate, UserRead
 from app.services.exchange_abstraction.factory import get_supported_exchanges
 from app.core.security import EncryptionService
+from app.core.cache import get_cache
 from app.rate_limiter import limiter
 
 router = APIRouter()
 
+
+async def invalidate_cached_account_data(user: User):
+    """Balances and dashboards depend on the keys and risk settings; drop them on every worker."""
+    cache = await get_cache()
+    await cache.invalidate_user_balances(str(user.id))
+    await cache.invalidate_user_dashboard(str(user.id))
+
 @router.get("/exchanges", response_model=List[str])
 @limiter.limit("30/minute")
 async def get_exchanges(
@@ -99,6 +107,7 @@ async def update_settings(
     # Use the repository to save the updated instance
     updated_user = await user_repo.update(current_user)
     await db.commit()
+    await invalidate_cached_account_data(current_user)
     return updated_user
 
 @router.delete("/keys/{exchange}", response_model=UserRead)
@@ -125,5 +134,6 @@ async def delete_exchange_key(
         
         await user_repo.update(current_user)
         await db.commit()
+        await invalidate_cached_account_data(current_user)
     
     return current_user
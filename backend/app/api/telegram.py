@@ -132,7 +132,7 @@ async def send_test_message(
         "✅ If you see this message, your configuration is working correctly!"
     )
 
-    broadcaster = TelegramBroadcaster(config)
+    broadcaster = TelegramBroadcaster(config, deliver_inline=True)
     try:
         message_id = await broadcaster._send_message(test_message)
     except Exception as e:
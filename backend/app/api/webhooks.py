@@ -10,6 +10,7 @@ from app.db.database import get_db_session
 from app.models.user import User
 from app.schemas.webhook_payloads import WebhookPayload
 from app.services.signal_router import SignalRouterService
+from app.services.webhook_intake import get_webhook_intake
 from app.core.cache import get_cache
 
 logger = logging.getLogger(__name__)
@@ -30,8 +31,10 @@ async def tradingview_webhook(
     Receives a webhook from TradingView, validates it, and routes it.
     The user is authenticated via the SignatureValidator dependency.
 
-    Uses distributed locking to prevent race conditions when multiple
-    webhooks arrive simultaneously for the same symbol/timeframe.
+    When the webhook intake service is configured, the payload is persisted and
+    acknowledged immediately; router workers on the leader process it in order per
+    user/symbol/timeframe. Otherwise the signal is routed inline under a distributed
+    lock to prevent races between webhooks for the same symbol/timeframe.
     """
     # The payload is parsed and validated within the SignatureValidator
     payload = await request.json()
@@ -55,6 +58,21 @@ async def tradingview_webhook(
             detail="Signal rejected: Spot trading does not support short positions. Use execution_intent.type='exit' to close a long position."
         )
 
+    intake_service = get_webhook_intake()
+    if intake_service is not None:
+        intake, is_duplicate = await intake_service.submit(db, user, webhook_payload, payload)
+        if is_duplicate:
+            return {
+                "status": "duplicate",
+                "message": "Signal was already received and will not be processed again.",
+                "intake_id": str(intake.id) if intake else None
+            }
+        return {
+            "status": "accepted",
+            "message": "Signal received and queued for processing.",
+            "intake_id": str(intake.id)
+        }
+
     # Create a lock key based on user + symbol + timeframe + side
     # This prevents race conditions for the same position
     # For SPOT trading: All positions are "long" (we buy to enter, sell to exit)
@@ -8,11 +8,16 @@ Provides caching for:
 import json
 import logging
 import os
-from typing import Any, Optional
+import time
+import uuid
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
 from decimal import Decimal
 
 import redis.asyncio as redis
 
+from app.core.local_cache import LocalCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +42,11 @@ def decimal_decoder(dct):
     return dct
 
 
+def normalize_symbol(symbol: str) -> str:
+    """BTC/USDT, BTC/USDT:USDT and BTCUSDT are all stored as BTCUSDT."""
+    return symbol.split(":")[0].replace("/", "").upper()
+
+
 class CacheService:
     """
     Redis-based cache service for the trading engine.
@@ -51,17 +61,38 @@ class CacheService:
     TTL_DASHBOARD = 60  # 1 minute
     TTL_DCA_CONFIG = 300  # 5 minutes
     TTL_USER = 300  # 5 minutes
+    TTL_WS_TICKET = 30  # 30 seconds - only bridges the request for a ticket and the socket handshake
 
     # Key prefixes
     PREFIX_PRECISION = "precision"
+    PREFIX_PRECISION_INDEX = "precision_index"
     PREFIX_BALANCE = "balance"
     PREFIX_TICKERS = "tickers"
+    PREFIX_TICKER_TABLE = "ticker_table"
     PREFIX_DASHBOARD = "dashboard"
     PREFIX_TOKEN_BLACKLIST = "token_blacklist"
+    PREFIX_WS_TICKET = "ws_ticket"
     PREFIX_DISTRIBUTED_LOCK = "lock"
     PREFIX_SERVICE_HEALTH = "service_health"
     PREFIX_DCA_CONFIG = "dca_config"
     PREFIX_USER = "user"
+    PREFIX_SHARD_MEMBER = "shard_member"
+    PREFIX_CHANNEL = "channel"
+    PREFIX_EXECUTION_POOL = "execution_pool"
+    PREFIX_DEADLINES = "deadlines"
+
+    # Namespaces also kept decoded in the in-process L1 cache, with their local TTL
+    LOCAL_TTLS = {
+        PREFIX_PRECISION: 600,
+        PREFIX_DCA_CONFIG: 60,
+        PREFIX_BALANCE: 10,
+        PREFIX_TICKERS: 1,
+    }
+    CHANNEL_INVALIDATION = "cache_invalidation"
+    # Precision index hash field holding when the markets were loaded
+    PRECISION_INDEX_LOADED_AT = "__loaded_at__"
+    # Ticker table hash field holding when the tickers were fetched
+    TICKER_TABLE_UPDATED_AT = "__updated_at__"
 
     # Reconnection settings
     RECONNECT_INTERVAL = 30  # seconds between reconnection attempts
@@ -76,6 +107,10 @@ class CacheService:
         self._last_reconnect_attempt = 0
         self._consecutive_failures = 0
         self._reconnect_lock = None  # Will be initialized as asyncio.Lock
+        self._local = LocalCache()
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._invalidation_listeners: List[Callable[[str, str], None]] = []
 
     async def _get_reconnect_lock(self):
         """Get or create the reconnect lock."""
@@ -216,6 +251,109 @@ class CacheService:
         """Create a cache key from prefix and parts."""
         return f"{prefix}:{':'.join(str(p) for p in parts)}"
 
+    @staticmethod
+    def _encode(value: Any) -> str:
+        return json.dumps(value, cls=DecimalEncoder)
+
+    @staticmethod
+    def _decode(value: str) -> Any:
+        return json.loads(value, object_hook=decimal_decoder)
+
+    # ==================== Local (L1) Tier ====================
+
+    async def _get_tiered(self, namespace: str, key: str) -> Optional[Any]:
+        """Read through the in-process cache, falling back to Redis."""
+        found, value = self._local.get(namespace, key)
+        if found:
+            return value
+
+        version = self._local.version(namespace)
+        started = time.perf_counter()
+        value = await self.get(key)
+        self._local.stats(namespace).record_redis(value is not None, (time.perf_counter() - started) * 1000)
+        if value is not None:
+            self._local.set(namespace, key, value, self.LOCAL_TTLS[namespace], version)
+        return value
+
+    async def _set_tiered(self, namespace: str, key: str, value: Any, ttl: int) -> bool:
+        # Keep what a Redis reader would decode, not the caller's (mutable, Decimal) object
+        self._local.set(namespace, key, self._decode(self._encode(value)), self.LOCAL_TTLS[namespace])
+        return await self.set(key, value, ttl)
+
+    def add_invalidation_listener(self, listener: Callable[[str, str], None]):
+        """Call listener(namespace, key_prefix) for every local or pushed L1 invalidation."""
+        if listener not in self._invalidation_listeners:
+            self._invalidation_listeners.append(listener)
+
+    def _drop_local(self, namespace: str, key_prefix: str):
+        self._local.invalidate(namespace, key_prefix)
+        for listener in self._invalidation_listeners:
+            try:
+                listener(namespace, key_prefix)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed for {namespace}: {e}")
+
+    async def _invalidate_local(self, namespace: str, key_prefix: str):
+        """Drop entries here and tell the other workers to do the same."""
+        self._drop_local(namespace, key_prefix)
+        await self.publish(self.CHANNEL_INVALIDATION, {
+            "origin": self._instance_id,
+            "namespace": namespace,
+            "prefix": key_prefix,
+        })
+
+    def handle_invalidation(self, message: dict):
+        if message.get("origin") == self._instance_id:
+            return
+        namespace = message.get("namespace")
+        if namespace in self.LOCAL_TTLS:
+            self._drop_local(namespace, message.get("prefix") or "")
+
+    async def start_invalidation_listener(self):
+        """Apply L1 invalidations published by other workers."""
+        if self._invalidation_task is None:
+            self._invalidation_task = asyncio.create_task(self._invalidation_loop())
+
+    async def stop_invalidation_listener(self):
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+
+    async def _invalidation_loop(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = await self.subscribe(self.CHANNEL_INVALIDATION)
+                if pubsub is None:
+                    await asyncio.sleep(self.RECONNECT_INTERVAL)
+                    continue
+                # Invalidations sent while unsubscribed were missed
+                self._local.clear()
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not message or message.get("type") != "message":
+                        continue
+                    self.handle_invalidation(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def get_local_cache_metrics(self) -> dict:
+        return self._local.get_metrics()
+
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache. Attempts reconnection if disconnected."""
         # Try to ensure connection (will attempt reconnect with backoff)
@@ -227,7 +365,7 @@ class CacheService:
         try:
             value = await self._redis.get(key)
             if value:
-                return json.loads(value, object_hook=decimal_decoder)
+                return self._decode(value)
             return None
         except Exception as e:
             logger.warning(f"Cache get failed for {key}: {e}")
@@ -244,7 +382,7 @@ class CacheService:
             return False
 
         try:
-            serialized = json.dumps(value, cls=DecimalEncoder)
+            serialized = self._encode(value)
             await self._redis.setex(key, ttl, serialized)
             return True
         except Exception as e:
@@ -296,12 +434,12 @@ class CacheService:
     async def get_precision_rules(self, exchange: str) -> Optional[dict]:
         """Get cached precision rules for an exchange."""
         key = self._make_key(self.PREFIX_PRECISION, exchange.lower())
-        return await self.get(key)
+        return await self._get_tiered(self.PREFIX_PRECISION, key)
 
     async def set_precision_rules(self, exchange: str, rules: dict) -> bool:
         """Cache precision rules for an exchange (2 days TTL)."""
         key = self._make_key(self.PREFIX_PRECISION, exchange.lower())
-        return await self.set(key, rules, self.TTL_PRECISION_RULES)
+        return await self._set_tiered(self.PREFIX_PRECISION, key, rules, self.TTL_PRECISION_RULES)
 
     async def invalidate_precision_rules(self, exchange: str) -> bool:
         """
@@ -309,46 +447,206 @@ class CacheService:
         Call this when a precision-related order error occurs.
         """
         key = self._make_key(self.PREFIX_PRECISION, exchange.lower())
-        return await self.delete(key)
+        deleted = await self.delete(key)
+        await self.delete(self._make_key(self.PREFIX_PRECISION_INDEX, exchange.lower()))
+        await self._invalidate_local(self.PREFIX_PRECISION, key)
+        return deleted
 
     async def get_symbol_precision(self, exchange: str, symbol: str) -> Optional[dict]:
         """
-        Get precision rules for a specific symbol.
-        Returns None if symbol not found in cache.
+        Get the indexed precision rule of one symbol, without reading the rest
+        of the exchange. Returns None if the symbol is not indexed.
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        key = self._make_key(self.PREFIX_PRECISION_INDEX, exchange.lower())
+        try:
+            value = await self._redis.hget(key, normalize_symbol(symbol))
+            return self._decode(value) if value else None
+        except Exception as e:
+            logger.warning(f"Cache get symbol precision failed for {key}: {e}")
+            self._connected = False
+            return None
+
+    async def get_precision_index(self, exchange: str) -> Optional[dict]:
+        """
+        Get the whole precision index of an exchange.
+        Returns {"loaded_at": epoch seconds, "rules": {symbol: rule}} or None.
         """
-        rules = await self.get_precision_rules(exchange)
-        if rules:
-            return rules.get(symbol)
-        return None
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        key = self._make_key(self.PREFIX_PRECISION_INDEX, exchange.lower())
+        try:
+            fields = await self._redis.hgetall(key)
+            loaded_at = fields.pop(self.PRECISION_INDEX_LOADED_AT, None)
+            if not fields or loaded_at is None:
+                return None
+            return {
+                "loaded_at": float(loaded_at),
+                "rules": {symbol: self._decode(rule) for symbol, rule in fields.items()},
+            }
+        except Exception as e:
+            logger.warning(f"Cache get precision index failed for {key}: {e}")
+            self._connected = False
+            return None
+
+    async def set_precision_index(self, exchange: str, rules: dict, loaded_at: Optional[float] = None) -> bool:
+        """Replace the precision index of an exchange, one hash field per symbol (2 days TTL)."""
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        key = self._make_key(self.PREFIX_PRECISION_INDEX, exchange.lower())
+        mapping = {symbol: self._encode(rule) for symbol, rule in rules.items()}
+        mapping[self.PRECISION_INDEX_LOADED_AT] = str(loaded_at if loaded_at is not None else time.time())
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.TTL_PRECISION_RULES)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache set precision index failed for {key}: {e}")
+            self._connected = False
+            return False
 
     # ==================== Balance ====================
 
     async def get_balance(self, user_id: str, exchange: str) -> Optional[dict]:
         """Get cached balance for a user on an exchange."""
         key = self._make_key(self.PREFIX_BALANCE, user_id, exchange.lower())
-        return await self.get(key)
+        return await self._get_tiered(self.PREFIX_BALANCE, key)
 
     async def set_balance(self, user_id: str, exchange: str, balance: dict) -> bool:
         """Cache balance for a user on an exchange (5min TTL)."""
         key = self._make_key(self.PREFIX_BALANCE, user_id, exchange.lower())
-        return await self.set(key, balance, self.TTL_BALANCE)
+        return await self._set_tiered(self.PREFIX_BALANCE, key, balance, self.TTL_BALANCE)
 
     async def invalidate_user_balances(self, user_id: str) -> int:
         """Invalidate all cached balances for a user."""
         pattern = self._make_key(self.PREFIX_BALANCE, user_id, "*")
-        return await self.delete_pattern(pattern)
+        deleted = await self.delete_pattern(pattern)
+        await self._invalidate_local(self.PREFIX_BALANCE, pattern[:-1])
+        return deleted
 
     # ==================== Tickers ====================
 
-    async def get_tickers(self, exchange: str) -> Optional[dict]:
-        """Get cached tickers for an exchange."""
-        key = self._make_key(self.PREFIX_TICKERS, exchange.lower())
-        return await self.get(key)
+    @staticmethod
+    def _encode_ticker(ticker: Any) -> Optional[str]:
+        """Compact [last, bid, ask, timestamp] form of a ccxt ticker (or a bare price)."""
+        if not isinstance(ticker, dict):
+            ticker = {"last": ticker}
+        if ticker.get("last") is None:
+            return None
+        return json.dumps([ticker.get("last"), ticker.get("bid"), ticker.get("ask"), ticker.get("timestamp")], cls=DecimalEncoder)
+
+    @staticmethod
+    def _decode_ticker(value: str) -> dict:
+        last, bid, ask, timestamp = json.loads(value)
+        return {"last": last, "bid": bid, "ask": ask, "timestamp": timestamp}
+
+    async def get_tickers(self, exchange: str, symbols: Optional[List[str]] = None) -> Optional[dict]:
+        """
+        Get cached tickers for an exchange, as {symbol: {"last", "bid", "ask", "timestamp"}}.
+
+        With `symbols`, only those symbols are read (keyed as requested; symbols
+        the exchange does not quote are omitted). Without, the whole table is
+        returned keyed by normalized symbol. Returns None when the table is not cached.
+        """
+        key = self._make_key(self.PREFIX_TICKER_TABLE, exchange.lower())
+        if symbols is None:
+            return await self._get_ticker_table(key)
+
+        tickers = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            found, ticker = self._local.get(self.PREFIX_TICKERS, f"{key}:{normalize_symbol(symbol)}")
+            if found:
+                tickers[symbol] = ticker
+            else:
+                missing.append(symbol)
+        if not missing:
+            return tickers
+
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        version = self._local.version(self.PREFIX_TICKERS)
+        fields = [normalize_symbol(symbol) for symbol in missing]
+        started = time.perf_counter()
+        try:
+            values = await self._redis.hmget(key, fields + [self.TICKER_TABLE_UPDATED_AT])
+        except Exception as e:
+            logger.warning(f"Cache get tickers failed for {key}: {e}")
+            self._connected = False
+            return None
+        stats = self._local.stats(self.PREFIX_TICKERS)
+        stats.record_redis(values[-1] is not None, (time.perf_counter() - started) * 1000)
+        if values[-1] is None:
+            return None
+
+        ttl = self.LOCAL_TTLS[self.PREFIX_TICKERS]
+        for symbol, field, value in zip(missing, fields, values):
+            if value is not None:
+                tickers[symbol] = self._decode_ticker(value)
+                self._local.set(self.PREFIX_TICKERS, f"{key}:{field}", tickers[symbol], ttl, version)
+        return tickers
+
+    async def _get_ticker_table(self, key: str) -> Optional[dict]:
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        try:
+            fields = await self._redis.hgetall(key)
+        except Exception as e:
+            logger.warning(f"Cache get tickers failed for {key}: {e}")
+            self._connected = False
+            return None
+        if fields.pop(self.TICKER_TABLE_UPDATED_AT, None) is None:
+            return None
+        return {symbol: self._decode_ticker(value) for symbol, value in fields.items()}
 
     async def set_tickers(self, exchange: str, tickers: dict) -> bool:
-        """Cache tickers for an exchange (1min TTL)."""
-        key = self._make_key(self.PREFIX_TICKERS, exchange.lower())
-        return await self.set(key, tickers, self.TTL_TICKERS)
+        """
+        Replace the cached get_all_tickers() payload of an exchange (5s TTL), one compact
+        hash field per normalized symbol so readers can fetch just the symbols they price.
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        key = self._make_key(self.PREFIX_TICKER_TABLE, exchange.lower())
+        mapping = {}
+        for symbol, ticker in tickers.items():
+            encoded = self._encode_ticker(ticker)
+            if encoded is not None:
+                mapping[normalize_symbol(symbol)] = encoded
+        mapping[self.TICKER_TABLE_UPDATED_AT] = str(time.time())
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                # Delisted symbols must not outlive the payload they were dropped from
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.TTL_TICKERS)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache set tickers failed for {key}: {e}")
+            self._connected = False
+            return False
 
     # ==================== Dashboard ====================
 
@@ -378,7 +676,7 @@ class CacheService:
     ) -> Optional[dict]:
         """Get cached DCA configuration."""
         key = self._make_key(self.PREFIX_DCA_CONFIG, user_id, exchange, pair, timeframe)
-        return await self.get(key)
+        return await self._get_tiered(self.PREFIX_DCA_CONFIG, key)
 
     async def set_dca_config(
         self,
@@ -390,12 +688,14 @@ class CacheService:
     ) -> bool:
         """Cache DCA configuration (5min TTL)."""
         key = self._make_key(self.PREFIX_DCA_CONFIG, user_id, exchange, pair, timeframe)
-        return await self.set(key, config, self.TTL_DCA_CONFIG)
+        return await self._set_tiered(self.PREFIX_DCA_CONFIG, key, config, self.TTL_DCA_CONFIG)
 
     async def invalidate_user_dca_configs(self, user_id: str) -> int:
         """Invalidate all cached DCA configs for a user."""
         pattern = self._make_key(self.PREFIX_DCA_CONFIG, user_id, "*")
-        return await self.delete_pattern(pattern)
+        deleted = await self.delete_pattern(pattern)
+        await self._invalidate_local(self.PREFIX_DCA_CONFIG, pattern[:-1])
+        return deleted
 
     # ==================== Token Blacklist ====================
 
@@ -431,6 +731,33 @@ class CacheService:
             logger.warning(f"Token blacklist check failed for {jti}: {e}")
             return False
 
+    # ==================== WebSocket Tickets ====================
+
+    async def set_ws_ticket(self, ticket: str, user_id: str) -> bool:
+        """Store a single-use WebSocket ticket for a user (30s TTL)."""
+        if not self._connected:
+            return False
+
+        try:
+            key = self._make_key(self.PREFIX_WS_TICKET, ticket)
+            await self._redis.setex(key, self.TTL_WS_TICKET, user_id)
+            return True
+        except Exception as e:
+            logger.warning(f"Storing WebSocket ticket failed: {e}")
+            return False
+
+    async def consume_ws_ticket(self, ticket: str) -> Optional[str]:
+        """The user ID of a WebSocket ticket, which is removed so it cannot be used twice."""
+        if not self._connected:
+            return None
+
+        try:
+            key = self._make_key(self.PREFIX_WS_TICKET, ticket)
+            return await self._redis.getdel(key)
+        except Exception as e:
+            logger.warning(f"Consuming WebSocket ticket failed: {e}")
+            return None
+
     # ==================== Distributed Locking ====================
 
     async def acquire_lock(
@@ -502,6 +829,350 @@ class CacheService:
             self._connected = False
             return False
 
+    async def extend_lock(self, resource: str, lock_id: str, ttl_seconds: int = 30) -> bool:
+        """
+        Reset the expiry of a lock this holder already owns.
+
+        Returns:
+            True if the lock is still held by lock_id, False otherwise
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return True  # Same fallback as acquire_lock
+
+        try:
+            key = self._make_key(self.PREFIX_DISTRIBUTED_LOCK, resource)
+            lua_script = """
+            if redis.call("get", KEYS[1]) == ARGV[1] then
+                return redis.call("expire", KEYS[1], ARGV[2])
+            else
+                return 0
+            end
+            """
+            result = await self._redis.eval(lua_script, 1, key, lock_id, ttl_seconds)
+            return result == 1
+        except Exception as e:
+            logger.warning(f"Lock extension failed for {resource}: {e}")
+            self._connected = False
+            return True
+
+    # ==================== Worker Membership ====================
+
+    async def register_shard_member(self, worker_id: str, ttl_seconds: int = 30) -> bool:
+        """Announce (or keep announcing) a worker taking part in background sharding."""
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            import time
+            key = self._make_key(self.PREFIX_SHARD_MEMBER, worker_id)
+            await self._redis.setex(key, ttl_seconds, str(time.time()))
+            return True
+        except Exception as e:
+            logger.warning(f"Shard membership update failed for {worker_id}: {e}")
+            self._connected = False
+            return False
+
+    async def remove_shard_member(self, worker_id: str) -> bool:
+        """Leave the membership so the remaining workers rebalance immediately."""
+        if not self._connected:
+            return False
+
+        try:
+            await self._redis.delete(self._make_key(self.PREFIX_SHARD_MEMBER, worker_id))
+            return True
+        except Exception as e:
+            logger.warning(f"Shard membership removal failed for {worker_id}: {e}")
+            return False
+
+    async def get_shard_members(self) -> Optional[List[str]]:
+        """
+        Worker IDs with a live membership key.
+
+        Returns:
+            Sorted worker IDs, or None if Redis is unavailable
+        """
+        if not self._connected:
+            return None
+
+        try:
+            pattern = self._make_key(self.PREFIX_SHARD_MEMBER, "*")
+            members = [key.split(":")[-1] async for key in self._redis.scan_iter(match=pattern)]
+            return sorted(members)
+        except Exception as e:
+            logger.warning(f"Get shard members failed: {e}")
+            return None
+
+    # ==================== Pub/Sub ====================
+
+    async def publish(self, channel: str, message: dict) -> bool:
+        """
+        Publish a message to every worker subscribed to a channel.
+
+        Returns:
+            True if handed to Redis, False if Redis is unavailable
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            key = self._make_key(self.PREFIX_CHANNEL, channel)
+            await self._redis.publish(key, json.dumps(message, cls=DecimalEncoder))
+            return True
+        except Exception as e:
+            logger.warning(f"Publish failed for channel {channel}: {e}")
+            self._connected = False
+            return False
+
+    async def subscribe(self, channel: str) -> Optional[Any]:
+        """
+        Subscribe to a channel.
+
+        Returns:
+            A redis PubSub object (the caller closes it), or None if Redis is unavailable
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        try:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(self._make_key(self.PREFIX_CHANNEL, channel))
+            return pubsub
+        except Exception as e:
+            logger.warning(f"Subscribe failed for channel {channel}: {e}")
+            self._connected = False
+            return None
+
+    # ==================== Execution Pool ====================
+
+    # Occupancy is the reconciled count of live groups plus unexpired leases
+    # handed out to admissions that have not created their group yet.
+    _POOL_ACQUIRE_SCRIPT = """
+    redis.call("zremrangebyscore", KEYS[2], "-inf", ARGV[1])
+    local occupied = redis.call("hget", KEYS[1], "occupied")
+    if not occupied then
+        return {-1, 0}
+    end
+    local used = tonumber(occupied) + redis.call("zcard", KEYS[2])
+    if used >= tonumber(ARGV[3]) then
+        return {0, used}
+    end
+    redis.call("zadd", KEYS[2], ARGV[1] + ARGV[4], ARGV[2])
+    redis.call("expire", KEYS[2], ARGV[4])
+    return {1, used + 1}
+    """
+
+    _POOL_RELEASE_SCRIPT = """
+    local removed = redis.call("zrem", KEYS[2], ARGV[1])
+    if ARGV[2] == "1" and redis.call("hexists", KEYS[1], "occupied") == 1 then
+        redis.call("hincrby", KEYS[1], "occupied", 1)
+        redis.call("hincrby", KEYS[1], "version", 1)
+    end
+    return removed
+    """
+
+    _POOL_SET_OCCUPIED_SCRIPT = """
+    local version = redis.call("hget", KEYS[1], "version") or "0"
+    if version ~= ARGV[2] then
+        return 0
+    end
+    redis.call("hset", KEYS[1], "occupied", ARGV[1], "version", version)
+    return 1
+    """
+
+    def _pool_keys(self, pool: str) -> tuple:
+        key = self._make_key(self.PREFIX_EXECUTION_POOL, pool)
+        return key, f"{key}:leases"
+
+    async def acquire_pool_slot(
+        self,
+        pool: str,
+        lease_id: str,
+        limit: int,
+        lease_ttl_seconds: int = 120
+    ) -> Optional[tuple]:
+        """
+        Atomically take a slot in a counting semaphore.
+
+        Returns:
+            (granted, used) where granted is 1, 0, or -1 when the pool has not
+            been reconciled yet; None if Redis is unavailable
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        try:
+            result = await self._redis.eval(
+                self._POOL_ACQUIRE_SCRIPT, 2, *self._pool_keys(pool),
+                time.time(), lease_id, limit, lease_ttl_seconds
+            )
+            return int(result[0]), int(result[1])
+        except Exception as e:
+            logger.warning(f"Pool slot acquisition failed for {pool}: {e}")
+            self._connected = False
+            return None
+
+    async def release_pool_slot(self, pool: str, lease_id: str, occupied: bool = False) -> bool:
+        """
+        Drop a lease; with occupied=True its slot stays taken by the group it created.
+
+        Returns:
+            True if the lease was still held, False otherwise
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            result = await self._redis.eval(
+                self._POOL_RELEASE_SCRIPT, 2, *self._pool_keys(pool),
+                lease_id, "1" if occupied else "0"
+            )
+            return result == 1
+        except Exception as e:
+            logger.warning(f"Pool slot release failed for {pool}: {e}")
+            self._connected = False
+            return False
+
+    async def get_pool_state(self, pool: str) -> Optional[dict]:
+        """
+        Returns {"occupied", "version", "leases"} for a pool; occupied is None
+        until the pool is reconciled. None if Redis is unavailable.
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        try:
+            key, leases_key = self._pool_keys(pool)
+            occupied, version = await self._redis.hmget(key, "occupied", "version")
+            await self._redis.zremrangebyscore(leases_key, "-inf", time.time())
+            leases = await self._redis.zcard(leases_key)
+            return {
+                "occupied": int(occupied) if occupied is not None else None,
+                "version": version or "0",
+                "leases": leases,
+            }
+        except Exception as e:
+            logger.warning(f"Get pool state failed for {pool}: {e}")
+            self._connected = False
+            return None
+
+    async def set_pool_occupied(self, pool: str, occupied: int, version: str) -> bool:
+        """
+        Overwrite the reconciled occupancy, unless a group was admitted since
+        `version` was read (compare-and-set).
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            key, _ = self._pool_keys(pool)
+            result = await self._redis.eval(self._POOL_SET_OCCUPIED_SCRIPT, 1, key, occupied, version)
+            return result == 1
+        except Exception as e:
+            logger.warning(f"Set pool occupancy failed for {pool}: {e}")
+            self._connected = False
+            return False
+
+    # ==================== Deadlines ====================
+
+    async def add_deadlines(self, kind: str, deadlines: Dict[str, float]) -> bool:
+        """Store (or move) deadlines of one kind: member -> due unix timestamp."""
+        if not deadlines:
+            return True
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            await self._redis.zadd(self._make_key(self.PREFIX_DEADLINES, kind), deadlines)
+            return True
+        except Exception as e:
+            logger.warning(f"Add deadlines failed for {kind}: {e}")
+            self._connected = False
+            return False
+
+    async def remove_deadlines(self, kind: str, members: List[str]) -> bool:
+        if not members:
+            return True
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            await self._redis.zrem(self._make_key(self.PREFIX_DEADLINES, kind), *members)
+            return True
+        except Exception as e:
+            logger.warning(f"Remove deadlines failed for {kind}: {e}")
+            self._connected = False
+            return False
+
+    _REMOVE_DUE_DEADLINES_SCRIPT = """
+    local removed = 0
+    for i = 2, #ARGV do
+        local score = redis.call("zscore", KEYS[1], ARGV[i])
+        if score and tonumber(score) <= tonumber(ARGV[1]) then
+            removed = removed + redis.call("zrem", KEYS[1], ARGV[i])
+        end
+    end
+    return removed
+    """
+
+    async def remove_due_deadlines(self, kind: str, members: List[str], now: float) -> bool:
+        """Drop fired members, except those moved past `now` in the meantime."""
+        if not members:
+            return True
+        await self._ensure_connected()
+
+        if not self._connected:
+            return False
+
+        try:
+            await self._redis.eval(
+                self._REMOVE_DUE_DEADLINES_SCRIPT, 1, self._make_key(self.PREFIX_DEADLINES, kind), now, *members
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Remove due deadlines failed for {kind}: {e}")
+            self._connected = False
+            return False
+
+    async def get_deadlines(self, kind: str, until: float) -> Optional[Dict[str, float]]:
+        """
+        Deadlines of one kind due at or before `until`, overdue ones included.
+        None if Redis is unavailable.
+        """
+        await self._ensure_connected()
+
+        if not self._connected:
+            return None
+
+        try:
+            entries = await self._redis.zrangebyscore(
+                self._make_key(self.PREFIX_DEADLINES, kind), "-inf", until, withscores=True
+            )
+            return {member: float(score) for member, score in entries}
+        except Exception as e:
+            logger.warning(f"Get deadlines failed for {kind}: {e}")
+            self._connected = False
+            return None
+
     # ==================== Service Health ====================
 
     async def update_service_health(
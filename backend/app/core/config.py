@@ -10,6 +10,13 @@ class Settings(BaseModel):
     ENVIRONMENT: str = "development"
     LOG_LEVEL: str = "INFO"
     LOG_FILE_PATH: str = "logs/app.log"
+    # Replay the full fill history after every incremental position stats update
+    POSITION_LEDGER_SHADOW_VERIFY: bool = False
+    # Split fill monitoring, risk evaluation and queue promotion across all workers
+    # instead of running them on the leader only
+    BACKGROUND_SHARDING: bool = True
+    # Place TRIGGER_PENDING DCA legs as native conditional orders on exchanges that support them
+    NATIVE_TRIGGER_ORDERS: bool = False
 
     @classmethod
     def load_from_env(cls):
@@ -19,6 +26,9 @@ class Settings(BaseModel):
         environment = os.getenv("ENVIRONMENT", "development")
         log_level = os.getenv("LOG_LEVEL", "INFO")
         log_file_path = os.getenv("LOG_FILE_PATH", "logs/app.log")
+        ledger_shadow_verify = os.getenv("POSITION_LEDGER_SHADOW_VERIFY", "false").lower() == "true"
+        background_sharding = os.getenv("BACKGROUND_SHARDING", "true").lower() == "true"
+        native_trigger_orders = os.getenv("NATIVE_TRIGGER_ORDERS", "false").lower() == "true"
         
         cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:3000")
         cors_origins = [origin.strip() for origin in cors_origins_str.split(",")]
@@ -46,7 +56,10 @@ class Settings(BaseModel):
             CORS_ORIGINS=cors_origins,
             ENVIRONMENT=environment,
             LOG_LEVEL=log_level,
-            LOG_FILE_PATH=log_file_path
+            LOG_FILE_PATH=log_file_path,
+            POSITION_LEDGER_SHADOW_VERIFY=ledger_shadow_verify,
+            BACKGROUND_SHARDING=background_sharding,
+            NATIVE_TRIGGER_ORDERS=native_trigger_orders
         )
 
 # Load settings immediately. This ensures fail-fast behavior at startup/import time.
@@ -0,0 +1,344 @@
+"""
+Deadline scheduler for time-based background work.
+
+Components register a handler per deadline kind (e.g. "risk_timer") and
+schedule members of that kind at a point in time. The scheduler calls the
+handler when the deadline passes instead of the component rediscovering due
+items by scanning every cycle.
+
+Deadlines live in two places:
+- a Redis sorted set per kind (member -> due unix timestamp), so they survive
+  restarts and are visible to the other workers;
+- an in-process hierarchical timer wheel, which decides when to wake up.
+  Scheduling and cancelling are O(1) and an idle wheel costs nothing per tick.
+
+The wheel is loaded from Redis on start and periodically re-synced for the
+deadlines due within the next few resync intervals. When background work is
+sharded, a kind can be registered with an ownership predicate, and each worker
+loads and fires only the members it owns. Fired members are removed from Redis
+once their handler succeeded and only if they are still due, so a deadline
+moved later by another worker is kept, and one whose handler failed fires
+again after the next resync. Without Redis the wheel still fires locally.
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DeadlineHandler = Callable[[List[str]], Awaitable[None]]
+MemberFilter = Callable[[str], bool]
+
+_SLOT_BITS = 6
+_SLOTS = 1 << _SLOT_BITS
+
+
+def to_timestamp(due: datetime) -> float:
+    """Unix timestamp of a datetime; naive datetimes are UTC (datetime.utcnow())."""
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    return due.timestamp()
+
+
+class TimerWheel:
+    """
+    Hierarchical hashed timer wheel with 64 slots per level.
+
+    Level 0 holds the deadlines due within 64 ticks, one slot per tick.
+    Level L holds those due within 64**(L+1) ticks, one slot per 64**L ticks;
+    when the wheel reaches a slot's start, its deadlines cascade to lower
+    levels. Deadlines beyond the top level wait in an overflow bucket.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, levels: int = 4, now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self._levels: List[List[Dict[Hashable, float]]] = [[{} for _ in range(_SLOTS)] for _ in range(levels)]
+        self._overflow: Dict[Hashable, float] = {}
+        # key -> (level, slot), None for overflow
+        self._location: Dict[Hashable, Optional[Tuple[int, int]]] = {}
+        # Earliest tick that may still hold deadlines
+        self._current = self._tick(time.time() if now is None else now)
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._location
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """Due timestamp of a pending key, or None."""
+        location = self._location.get(key, False)
+        if location is False:
+            return None
+        if location is None:
+            return self._overflow[key]
+        level, slot = location
+        return self._levels[level][slot][key]
+
+    def add(self, key: Hashable, due: float):
+        """Schedules (or moves) a key; keys already due fire on the next advance."""
+        self.cancel(key)
+        self._place(key, due)
+
+    def cancel(self, key: Hashable) -> bool:
+        if key not in self._location:
+            return False
+        location = self._location.pop(key)
+        if location is None:
+            del self._overflow[key]
+        else:
+            level, slot = location
+            del self._levels[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Moves the wheel to `now` and returns the (key, due) pairs that fired."""
+        target = self._tick(now)
+        fired = []
+        while self._location:
+            next_tick = self._next_work_tick()
+            if next_tick is None or next_tick > target:
+                break
+            self._current = next_tick
+            self._cascade()
+            slot = self._current & (_SLOTS - 1)
+            bucket = self._levels[0][slot]
+            if bucket:
+                self._levels[0][slot] = {}
+                for key, due in bucket.items():
+                    del self._location[key]
+                    fired.append((key, due))
+            self._current += 1
+        # Stay on the target tick, so deadlines added for it later still fire on the next advance
+        if self._current <= target + 1:
+            self._current = target
+        return fired
+
+    def next_wakeup(self) -> Optional[float]:
+        """Time at which the wheel next has work (a firing or a cascade), or None when empty."""
+        next_tick = self._next_work_tick()
+        return None if next_tick is None else next_tick * self.tick_seconds
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def _place(self, key: Hashable, due: float):
+        # First tick boundary at or after the deadline, so nothing fires early
+        due_tick = max(math.ceil(due / self.tick_seconds), self._current)
+        for level, slots in enumerate(self._levels):
+            shift = _SLOT_BITS * level
+            if (due_tick >> shift) - (self._current >> shift) < _SLOTS:
+                slot = (due_tick >> shift) & (_SLOTS - 1)
+                slots[slot][key] = due
+                self._location[key] = (level, slot)
+                return
+        self._overflow[key] = due
+        self._location[key] = None
+
+    def _cascade(self):
+        span = _SLOT_BITS * len(self._levels)
+        if self._overflow and not self._current & ((1 << span) - 1):
+            overflow, self._overflow = self._overflow, {}
+            for key, due in overflow.items():
+                self._place(key, due)
+        # Top-down, so a cascaded deadline can cascade again within the same tick
+        for level in range(len(self._levels) - 1, 0, -1):
+            shift = _SLOT_BITS * level
+            if self._current & ((1 << shift) - 1):
+                continue
+            slot = (self._current >> shift) & (_SLOTS - 1)
+            bucket = self._levels[level][slot]
+            if bucket:
+                self._levels[level][slot] = {}
+                for key, due in bucket.items():
+                    self._place(key, due)
+
+    def _next_work_tick(self) -> Optional[int]:
+        candidates = []
+        for level, slots in enumerate(self._levels):
+            shift = _SLOT_BITS * level
+            base = self._current >> shift
+            for offset in range(_SLOTS):
+                if slots[(base + offset) & (_SLOTS - 1)]:
+                    candidates.append(max((base + offset) << shift, self._current))
+                    break
+        if self._overflow:
+            span = _SLOT_BITS * len(self._levels)
+            candidates.append(((self._current + (1 << span) - 1) >> span) << span)
+        return min(candidates) if candidates else None
+
+
+class DeadlineScheduler:
+    """Wakes registered handlers when their deadlines pass."""
+
+    def __init__(self, tick_seconds: float = 1.0, resync_interval_seconds: float = 30.0):
+        self.resync_interval_seconds = resync_interval_seconds
+        self._wheel = TimerWheel(tick_seconds)
+        self._handlers: Dict[str, DeadlineHandler] = {}
+        self._owners: Dict[str, MemberFilter] = {}
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._next_resync = 0.0
+        self._fired = 0
+
+    def register(self, kind: str, handler: DeadlineHandler, owns: Optional[MemberFilter] = None):
+        """
+        Routes fired deadlines of a kind to handler(members).
+
+        Args:
+            owns: Whether this worker handles a member; the others are left to
+                the worker that owns them. None handles every member.
+        """
+        self._handlers[kind] = handler
+        if owns is None:
+            self._owners.pop(kind, None)
+        else:
+            self._owners[kind] = owns
+        # Load the kind's persisted deadlines on the next iteration
+        self._next_resync = 0.0
+        self._wakeup.set()
+
+    def unregister(self, kind: str):
+        self._handlers.pop(kind, None)
+        self._owners.pop(kind, None)
+
+    def _owned(self, kind: str, members: List[str]) -> List[str]:
+        owns = self._owners.get(kind)
+        return list(members) if owns is None else [member for member in members if owns(member)]
+
+    async def schedule(self, kind: str, deadlines: Dict[str, datetime]):
+        """Schedules (or moves) members of a kind to the given due times; unchanged ones are skipped."""
+        timestamps = {}
+        for member, due in deadlines.items():
+            timestamp = to_timestamp(due)
+            if self._wheel.get((kind, member)) != timestamp:
+                timestamps[member] = timestamp
+        if not timestamps:
+            return
+        for member, due in timestamps.items():
+            self._wheel.add((kind, member), due)
+        self._wakeup.set()
+
+        from app.core.cache import get_cache
+        cache = await get_cache()
+        await cache.add_deadlines(kind, timestamps)
+
+    async def cancel(self, kind: str, members: List[str]):
+        if not members:
+            return
+        for member in members:
+            self._wheel.cancel((kind, member))
+
+        from app.core.cache import get_cache
+        cache = await get_cache()
+        await cache.remove_deadlines(kind, list(members))
+
+    def get_metrics(self) -> dict:
+        return {"pending": len(self._wheel), "fired": self._fired}
+
+    async def start(self):
+        if not self._running:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+            logger.info("DeadlineScheduler started.")
+
+    async def stop(self):
+        if self._running and self._task:
+            self._running = False
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("DeadlineScheduler stopped.")
+
+    async def _run(self):
+        while self._running:
+            try:
+                now = time.time()
+                if now >= self._next_resync:
+                    await self._resync(now)
+                fired = self._wheel.advance(now)
+                if fired:
+                    await self._dispatch(fired, now)
+                await self._sleep()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"DeadlineScheduler: Error in scheduler loop: {e}")
+                await asyncio.sleep(1)
+
+    async def _sleep(self):
+        timeout = self._next_resync - time.time()
+        wakeup = self._wheel.next_wakeup()
+        if wakeup is not None:
+            timeout = min(timeout, wakeup - time.time())
+        if timeout > 0 and not self._wakeup.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+
+    async def _resync(self, now: float):
+        """Loads deadlines scheduled elsewhere (other workers, previous runs) into the wheel."""
+        from app.core.cache import get_cache
+        cache = await get_cache()
+        until = now + 2 * self.resync_interval_seconds
+        for kind in list(self._handlers):
+            deadlines = await cache.get_deadlines(kind, until) or {}
+            for member in self._owned(kind, list(deadlines)):
+                due = deadlines[member]
+                if self._wheel.get((kind, member)) != due:
+                    self._wheel.add((kind, member), due)
+        self._next_resync = now + self.resync_interval_seconds
+
+    async def _dispatch(self, fired: List[Tuple[Hashable, float]], now: float):
+        by_kind: Dict[str, List[str]] = {}
+        for (kind, member), _ in fired:
+            by_kind.setdefault(kind, []).append(member)
+        self._fired += len(fired)
+
+        from app.core.cache import get_cache
+        cache = await get_cache()
+        for kind, members in by_kind.items():
+            handler = self._handlers.get(kind)
+            if handler is None:
+                # Kept in Redis for the component's next start
+                continue
+            # Ownership may have moved since the member was loaded; the new owner fires it
+            members = self._owned(kind, members)
+            if not members:
+                continue
+            try:
+                await handler(members)
+            except Exception as e:
+                # Kept in Redis; the next resync loads the members again
+                logger.error(f"DeadlineScheduler: Handler for {kind} failed: {e}")
+                continue
+            await cache.remove_due_deadlines(kind, members, now)
+
+
+# Shared instance used by the background services of this worker
+_deadline_scheduler: Optional[DeadlineScheduler] = None
+
+
+def get_deadline_scheduler() -> DeadlineScheduler:
+    """Get the process-wide deadline scheduler."""
+    global _deadline_scheduler
+    if _deadline_scheduler is None:
+        _deadline_scheduler = DeadlineScheduler()
+    return _deadline_scheduler
+
+
+def reset_deadline_scheduler():
+    """Drop the process-wide scheduler (tests); a running loop is cancelled."""
+    global _deadline_scheduler
+    if _deadline_scheduler is not None and _deadline_scheduler._task is not None:
+        _deadline_scheduler._running = False
+        _deadline_scheduler._task.cancel()
+    _deadline_scheduler = None
@@ -0,0 +1,116 @@
+"""
+In-process L1 cache in front of Redis.
+
+Hot lookups (precision rules, DCA configs, tickers, balances) are read on
+every webhook and dashboard refresh. Keeping the decoded values in the worker
+saves the Redis round trip and the JSON decode of large payloads such as the
+precision rules of a whole exchange.
+
+Entries are bounded per worker (LRU) and expire after a short per-namespace
+TTL. Writes elsewhere are pushed as invalidations over pub/sub; the TTL bounds
+staleness when a message is missed. Cached values are shared between callers
+and must be treated as read-only.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class NamespaceStats:
+    """Hit/miss and Redis latency counters of one cache namespace."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_time_ms = 0.0
+        self.invalidations = 0
+
+    def record_redis(self, hit: bool, elapsed_ms: float):
+        if hit:
+            self.redis_hits += 1
+        else:
+            self.redis_misses += 1
+        self.redis_time_ms += elapsed_ms
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        redis_reads = self.redis_hits + self.redis_misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "redis_avg_ms": round(self.redis_time_ms / redis_reads, 3) if redis_reads else None,
+            "invalidations": self.invalidations,
+        }
+
+
+class LocalCache:
+    """Bounded LRU of decoded values, keyed by (namespace, key)."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # (namespace, key) -> (expires_at, value)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation so fills that raced with it are dropped
+        self._versions: Dict[str, int] = {}
+        self._stats: Dict[str, NamespaceStats] = {}
+        self.evictions = 0
+
+    def stats(self, namespace: str) -> NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = NamespaceStats()
+        return stats
+
+    def version(self, namespace: str) -> int:
+        """Read before loading from Redis and pass to set()."""
+        return self._versions.get(namespace, 0)
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value)."""
+        entry = self._entries.get((namespace, key))
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end((namespace, key))
+                self.stats(namespace).hits += 1
+                return True, value
+            del self._entries[(namespace, key)]
+        self.stats(namespace).misses += 1
+        return False, None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, version: Optional[int] = None):
+        """Stores a value unless the namespace was invalidated since `version` was read."""
+        if version is not None and version != self.version(namespace):
+            return
+        self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, namespace: str, key_prefix: str = "") -> int:
+        """Drops the entries of a namespace whose key starts with key_prefix."""
+        self._versions[namespace] = self.version(namespace) + 1
+        self.stats(namespace).invalidations += 1
+        stale = [entry for entry in self._entries if entry[0] == namespace and entry[1].startswith(key_prefix)]
+        for entry in stale:
+            del self._entries[entry]
+        return len(stale)
+
+    def clear(self):
+        for namespace in set(self._versions) | {entry[0] for entry in self._entries}:
+            self._versions[namespace] = self.version(namespace) + 1
+        self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "namespaces": {namespace: stats.to_dict() for namespace, stats in self._stats.items()},
+        }
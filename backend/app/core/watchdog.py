@@ -356,6 +356,37 @@ async def setup_watchdog(app) -> TaskWatchdog:
             critical=True
         )
 
+    # Register order fill stream (non-critical: REST polling covers fills while it is down)
+    if hasattr(app.state, "order_fill_stream"):
+        async def ofs_health():
+            return await cache.get_service_health("order_fill_stream")
+
+        watchdog.register_task(
+            name="order_fill_stream",
+            start_func=app.state.order_fill_stream.start_monitoring_task,
+            stop_func=app.state.order_fill_stream.stop_monitoring_task,
+            health_check=ofs_health,
+            critical=False
+        )
+
+    # Register webhook intake routers (every worker persists intakes, only the current leader routes them)
+    if hasattr(app.state, "webhook_intake"):
+        async def intake_health():
+            return await cache.get_service_health("webhook_intake")
+
+        async def start_intake():
+            # Leadership may have moved since startup; followers must not route
+            if getattr(app.state, "is_leader", False):
+                await app.state.webhook_intake.start_processing_task()
+
+        watchdog.register_task(
+            name="webhook_intake",
+            start_func=start_intake,
+            stop_func=app.state.webhook_intake.stop_processing_task,
+            health_check=intake_health,
+            critical=True
+        )
+
     # Register queue manager
     if hasattr(app.state, "queue_manager_service"):
         async def qm_health():
@@ -0,0 +1,35 @@
+"""
+Short-lived sessions for units of work.
+
+Background services receive their session factory in different shapes: the
+async sessionmaker (AsyncSessionLocal), the FastAPI dependency generator
+(get_db_session) or, in tests, a callable returning a prepared session.
+session_scope() opens one session from any of them so a service can give each
+order or position group its own session and transaction instead of sharing one
+AsyncSession between concurrent tasks.
+"""
+import inspect
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@asynccontextmanager
+async def session_scope(session_factory: Callable) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session from session_factory and close it afterwards. Does not commit;
+    the unit of work commits or rolls back itself.
+    """
+    source = session_factory()
+    if inspect.isasyncgen(source):
+        session = await source.__anext__()
+        try:
+            yield session
+        finally:
+            await source.aclose()
+    elif hasattr(source, "__aenter__"):
+        async with source as session:
+            yield session
+    else:
+        yield source
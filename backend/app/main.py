@@ -9,16 +9,23 @@ import sys
 import uuid
 import asyncio
 
-from app.api import health, webhooks, risk, positions, queue, users, settings as api_settings, dashboard, logs, dca_configs, telegram
+from app.api import health, webhooks, risk, positions, queue, users, settings as api_settings, dashboard, logs, dca_configs, telegram, realtime
 from app.rate_limiter import limiter
 from app.services.order_fill_monitor import OrderFillMonitorService
+from app.services.order_fill_stream import OrderFillStreamService
+from app.services.exchange_abstraction.connector_pool import get_connector_pool
+from app.services.market_data import get_market_data_service
+from app.services.webhook_intake import WebhookIntakeService, set_webhook_intake
+from app.services.telegram_dispatcher import TelegramDispatcher, set_telegram_dispatcher
+from app.services.realtime_updates import RealtimeHub, set_realtime_hub, publish_price_update
+from app.services.shard_coordinator import ShardCoordinator
 from app.services.order_management import OrderService
 from app.repositories.dca_order import DCAOrderRepository
 from app.repositories.position_group import PositionGroupRepository
 from app.repositories.risk_action import RiskActionRepository
 from app.db.database import AsyncSessionLocal, get_db_session
 from app.services.position_manager import PositionManagerService
-from app.services.execution_pool_manager import ExecutionPoolManager
+from app.services.execution_pool_manager import ExecutionPoolManager, set_execution_pool_manager
 from app.services.grid_calculator import GridCalculatorService
 from app.services.queue_manager import QueueManagerService
 from app.services.risk_engine import RiskEngineService
@@ -26,6 +33,7 @@ from app.schemas.grid_config import RiskEngineConfig
 from app.core.logging_config import setup_logging
 from app.core.config import settings
 from app.core.cache import get_cache
+from app.core.deadline_scheduler import get_deadline_scheduler
 from app.core.correlation import CorrelationIdMiddleware
 from app.core.watchdog import setup_watchdog, get_watchdog
 from fastapi.staticfiles import StaticFiles
@@ -106,12 +114,13 @@ async def renew_leader_lock():
     cache = await get_cache()
     while app.state.is_leader:
         try:
-            # Re-acquire lock every 30 seconds (before 60s TTL expires)
+            # Extend the lock every 30 seconds (before 60s TTL expires); acquiring it
+            # again would fail on the key this worker already holds
             await asyncio.sleep(30)
             if app.state.is_leader:
-                acquired = await cache.acquire_lock("background_task_leader", WORKER_ID, ttl_seconds=60)
-                if not acquired:
-                    # Lost leadership
+                held = await cache.extend_lock("background_task_leader", WORKER_ID, ttl_seconds=60)
+                if held is False:
+                    # The key expired or another worker holds it
                     logger.warning(f"Worker {WORKER_ID} lost leader status")
                     app.state.is_leader = False
                     break
@@ -121,6 +130,33 @@ async def renew_leader_lock():
             logger.warning(f"Failed to renew leader lock: {e}")
 
 
+async def leader_election_loop():
+    """
+    Keeps this worker contending for the leader lock, so webhook routing moves to
+    another worker when the leader dies or loses the lock. The webhook dispatcher
+    runs while, and only while, this worker holds the lock.
+    """
+    cache = await get_cache()
+    while True:
+        if app.state.is_leader:
+            await app.state.webhook_intake.start_processing_task()
+            await renew_leader_lock()
+            if app.state.is_leader:
+                # Renewal only returns as leader when cancelled (shutdown)
+                return
+            logger.warning(f"Worker {WORKER_ID} stops routing webhooks")
+            await app.state.webhook_intake.stop_processing_task()
+        try:
+            await asyncio.sleep(30)
+            if await cache.acquire_lock("background_task_leader", WORKER_ID, ttl_seconds=60):
+                logger.info(f"Worker {WORKER_ID} elected as LEADER - will route webhooks")
+                app.state.is_leader = True
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.warning(f"Failed to contend for leader lock: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     # Setup Logging
@@ -137,23 +173,59 @@ async def startup_event():
     # GridCalculatorService is stateless, so it can be initialized at startup
     app.state.grid_calculator_service = GridCalculatorService()
 
-    # ExecutionPoolManager - needed before QueueManagerService
+    # Every worker keeps hot cache entries in process; writes elsewhere invalidate them over pub/sub
+    await (await get_cache()).start_invalidation_listener()
+
+    # Background work is sharded by user across all workers; without sharding only the leader runs it
+    app.state.shard_coordinator = None
+    if settings.BACKGROUND_SHARDING:
+        app.state.shard_coordinator = ShardCoordinator(WORKER_ID, cache=await get_cache())
+        await app.state.shard_coordinator.start()
+    runs_background = app.state.is_leader or app.state.shard_coordinator is not None
+    # Leadership may move later; shutdown stops what this worker started
+    app.state.runs_background = runs_background
+
+    # ExecutionPoolManager - needed before QueueManagerService; shared with the signal router
     app.state.execution_pool_manager = ExecutionPoolManager(
         session_factory=AsyncSessionLocal,
-        position_group_repository_class=PositionGroupRepository
+        position_group_repository_class=PositionGroupRepository,
+        shard_coordinator=app.state.shard_coordinator
     )
+    set_execution_pool_manager(app.state.execution_pool_manager)
 
     # QueueManagerService - needed by all workers for API endpoints
     app.state.queue_manager_service = QueueManagerService(
         session_factory=AsyncSessionLocal,
-        execution_pool_manager=app.state.execution_pool_manager
+        execution_pool_manager=app.state.execution_pool_manager,
+        market_data=get_market_data_service(),
+        shard_coordinator=app.state.shard_coordinator
+    )
+
+    # WebhookIntakeService - every worker persists webhooks; only the current leader routes them
+    app.state.webhook_intake = WebhookIntakeService(session_factory=AsyncSessionLocal)
+    set_webhook_intake(app.state.webhook_intake)
+
+    # TelegramDispatcher - every worker broadcasts signals; delivery happens off the request path
+    app.state.telegram_dispatcher = TelegramDispatcher(report_health=app.state.is_leader)
+    await app.state.telegram_dispatcher.start()
+    set_telegram_dispatcher(app.state.telegram_dispatcher)
+
+    # RealtimeHub - every worker serves dashboard WebSockets, fed by Redis pub/sub change events
+    app.state.realtime_hub = RealtimeHub(
+        snapshot_loader=realtime.make_snapshot_loader(app.state.queue_manager_service)
     )
+    await app.state.realtime_hub.start()
+    set_realtime_hub(app.state.realtime_hub)
 
     if app.state.is_leader:
-        logger.info(f"Worker {WORKER_ID} elected as LEADER - will run background tasks")
+        logger.info(f"Worker {WORKER_ID} elected as LEADER - will route webhooks")
 
-        # Start leader lock renewal task
-        app.state.leader_renewal_task = asyncio.create_task(renew_leader_lock())
+    # Leader lock renewal and re-election; starts and stops the webhook router workers with leadership
+    app.state.leader_renewal_task = asyncio.create_task(leader_election_loop())
+
+    if runs_background:
+        if app.state.shard_coordinator is not None:
+            logger.info(f"Worker {WORKER_ID} runs background tasks for its shard of users")
 
         # OrderFillMonitorService
         # Now initialized without specific exchange connector, it handles multi-user iteration internally.
@@ -162,11 +234,29 @@ async def startup_event():
             dca_order_repository_class=DCAOrderRepository,
             position_group_repository_class=PositionGroupRepository,
             order_service_class=OrderService,
-            position_manager_service_class=PositionManagerService
+            position_manager_service_class=PositionManagerService,
+            connector_pool=get_connector_pool(),
+            market_data=get_market_data_service(),
+            shard_coordinator=app.state.shard_coordinator
         )
         await app.state.order_fill_monitor.start_monitoring_task()
 
-        # Start queue promotion background task (only on leader)
+        # Push-based fill detection; the monitor falls back to REST polling when a stream is down
+        app.state.order_fill_stream = OrderFillStreamService(
+            session_factory=AsyncSessionLocal,
+            order_fill_monitor=app.state.order_fill_monitor,
+            shard_coordinator=app.state.shard_coordinator
+        )
+        app.state.order_fill_monitor.fill_stream = app.state.order_fill_stream
+        await app.state.order_fill_stream.start_monitoring_task()
+
+        # Price refreshes move unrealized PnL on connected dashboards
+        get_market_data_service().add_listener(publish_price_update)
+
+        # Pool slots of closed groups are freed by periodic reconciliation against the DB
+        await app.state.execution_pool_manager.start_reconciliation_task()
+
+        # Start queue promotion background task
         await app.state.queue_manager_service.start_promotion_task()
 
         # RiskEngineService - Background monitoring task for automatic risk management
@@ -177,10 +267,15 @@ async def startup_event():
             dca_order_repository_class=DCAOrderRepository,
             order_service_class=OrderService,
             risk_engine_config=RiskEngineConfig(),  # Uses default config; user-specific configs loaded per evaluation
-            polling_interval_seconds=60  # Check positions every 60 seconds
+            polling_interval_seconds=60,  # Full sweep every minute; price moves and timer expiries trigger evaluations in between
+            connector_pool=get_connector_pool(),
+            market_data=get_market_data_service(),
+            shard_coordinator=app.state.shard_coordinator,
+            deadline_scheduler=get_deadline_scheduler()
         )
+        app.state.order_fill_monitor.risk_engine = app.state.risk_engine_service
         await app.state.risk_engine_service.start_monitoring_task()
-        logger.info("Risk Engine monitoring task started (polling every 60 seconds)")
+        logger.info("Risk Engine monitoring task started (price-triggered, full sweep every 60 seconds)")
 
         # Setup and start the watchdog for background task monitoring
         app.state.watchdog = await setup_watchdog(app)
@@ -196,25 +291,50 @@ async def startup_event():
 async def shutdown_event():
     logger.info(f"Worker {WORKER_ID} shutting down (is_leader={getattr(app.state, 'is_leader', False)})")
 
-    # Only stop background tasks if this worker was the leader
-    if getattr(app.state, 'is_leader', False):
-        # Stop watchdog first
-        if hasattr(app.state, "watchdog"):
-            await app.state.watchdog.stop()
-            logger.info("Watchdog stopped")
+    shard_coordinator = getattr(app.state, 'shard_coordinator', None)
 
+    # Stop watchdog first
+    if hasattr(app.state, "watchdog"):
+        await app.state.watchdog.stop()
+        logger.info("Watchdog stopped")
+
+    # Stop contending for leadership before routing stops, so the dispatcher is not restarted
+    if getattr(app.state, "leader_renewal_task", None):
+        app.state.leader_renewal_task.cancel()
+        try:
+            await app.state.leader_renewal_task
+        except asyncio.CancelledError:
+            pass
+    if hasattr(app.state, "webhook_intake"):
+        await app.state.webhook_intake.stop_processing_task()
+
+    # Only stop background tasks if this worker ran them
+    if getattr(app.state, 'runs_background', False):
+        if hasattr(app.state, "order_fill_stream"):
+            await app.state.order_fill_stream.stop_monitoring_task()
         if hasattr(app.state, "order_fill_monitor"):
             await app.state.order_fill_monitor.stop_monitoring_task()
         if hasattr(app.state, "queue_manager_service"):
             await app.state.queue_manager_service.stop_promotion_task()
+        if hasattr(app.state, "execution_pool_manager"):
+            await app.state.execution_pool_manager.stop_reconciliation_task()
         if hasattr(app.state, "risk_engine_service"):
             await app.state.risk_engine_service.stop_monitoring_task()
             logger.info("Risk Engine monitoring task stopped")
 
-        # Cancel leader renewal task
-        if hasattr(app.state, "leader_renewal_task") and app.state.leader_renewal_task:
-            app.state.leader_renewal_task.cancel()
+        # Hand this worker's users to the remaining workers
+        if shard_coordinator is not None:
+            await shard_coordinator.stop()
+            app.state.shard_coordinator = None
+
+        get_market_data_service().remove_listener(publish_price_update)
+        await get_deadline_scheduler().stop()
 
+        # Close pooled exchange sessions once no background service can borrow them
+        await get_connector_pool().close_all()
+
+    is_leader = getattr(app.state, 'is_leader', False)
+    if is_leader:
         # Release leader lock
         try:
             cache = await get_cache()
@@ -223,6 +343,19 @@ async def shutdown_event():
         except Exception as e:
             logger.warning(f"Failed to release leader lock: {e}")
 
+    set_execution_pool_manager(None)
+
+    if hasattr(app.state, "realtime_hub"):
+        set_realtime_hub(None)
+        await app.state.realtime_hub.stop()
+
+    # Flush queued Telegram messages after background services can no longer produce them
+    if hasattr(app.state, "telegram_dispatcher"):
+        set_telegram_dispatcher(None)
+        await app.state.telegram_dispatcher.stop()
+
+    await (await get_cache()).stop_invalidation_listener()
+
 
 app.include_router(health.router, prefix="/api/v1/health", tags=["Health Check"])
 app.include_router(risk.router, prefix="/api/v1/risk", tags=["Risk Management"])
@@ -235,6 +368,7 @@ app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["Dashboar
 app.include_router(logs.router, prefix="/api/v1/logs", tags=["Logs"])
 app.include_router(dca_configs.router, prefix="/api/v1/dca-configs", tags=["DCA Configuration"])
 app.include_router(telegram.router, prefix="/api/v1/telegram", tags=["Telegram"])
+app.include_router(realtime.router, prefix="/api/v1/realtime", tags=["Realtime"])
 
 # Serve Frontend Static Files
 frontend_build_path = os.path.join(os.getcwd(), "frontend/build")
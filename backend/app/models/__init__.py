@@ -2,18 +2,23 @@ from .base import Base
 from .dca_configuration import DCAConfiguration
 from .dca_order import DCAOrder
 from .position_group import PositionGroup
+from .performance_aggregate import PerformanceDaily, PerformanceSummary
 from .pyramid import Pyramid
 from .queued_signal import QueuedSignal
 from .risk_action import RiskAction
 from .user import User
+from .webhook_intake import WebhookIntake
 
 __all__ = [
     "Base",
     "DCAConfiguration",
     "DCAOrder",
+    "PerformanceDaily",
+    "PerformanceSummary",
     "PositionGroup",
     "Pyramid",
     "QueuedSignal",
     "RiskAction",
     "User",
+    "WebhookIntake",
 ]
@@ -86,6 +86,10 @@ class DCAOrder(Base):
     tp_order_id = Column(String)
     tp_executed_at = Column(DateTime)
 
+    # Incremental position accounting (see services/position/position_ledger.py)
+    ledger_applied = Column(Boolean, default=False, server_default="false", nullable=False)
+    ledger_tp_applied = Column(Boolean, default=False, server_default="false", nullable=False)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     submitted_at = Column(DateTime)
     filled_at = Column(DateTime)
@@ -0,0 +1,50 @@
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    JSON,
+    Numeric,
+)
+
+from app.db.types import GUID
+
+from .base import Base
+
+
+from datetime import datetime
+from decimal import Decimal
+
+
+class PerformanceSummary(Base):
+    """
+    Running all-time performance totals of a user's closed position groups,
+    maintained by PerformanceStore as groups close.
+    """
+
+    __tablename__ = "performance_summaries"
+
+    user_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+
+    # Serialized PerformanceAggregate totals (counts, sums, per pair/timeframe PnL,
+    # best/worst trades, running equity and drawdown)
+    state = Column(JSON, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PerformanceDaily(Base):
+    """Realized PnL of a user's position groups closed on one UTC day."""
+
+    __tablename__ = "performance_daily"
+
+    user_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    trades = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    realized_pnl_usd = Column(Numeric(20, 10), nullable=False, default=Decimal("0"))
+    # Running equity after the day's last close, for the equity curve
+    closing_equity_usd = Column(Numeric(20, 10), nullable=False, default=Decimal("0"))
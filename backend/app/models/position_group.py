@@ -56,6 +56,7 @@ class PositionGroup(Base):
         Index('ix_position_groups_user_status', 'user_id', 'status'),
         Index('ix_position_groups_exchange', 'exchange'),
         Index('ix_position_groups_risk_timer', 'risk_timer_expires', postgresql_where="risk_timer_expires IS NOT NULL"),
+        Index('ix_position_groups_analytics_pending', 'user_id', 'closed_at', postgresql_where="status = 'closed' AND NOT analytics_applied"),
     )
 
     # Identity
@@ -111,6 +112,11 @@ class PositionGroup(Base):
     total_hedged_qty = Column(Numeric(20, 10), default=Decimal("0"))
     total_hedged_value_usd = Column(Numeric(20, 10), default=Decimal("0"))
 
+    # Running fill aggregates maintained incrementally by PositionLedger
+    ledger_state = Column(JSON, nullable=True)
+    # Set once the closed group is folded into the user's performance aggregates
+    analytics_applied = Column(Boolean, default=False, server_default="false", nullable=False)
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
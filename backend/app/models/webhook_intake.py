@@ -0,0 +1,62 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum as SQLAlchemyEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+)
+
+from app.db.types import GUID
+
+from .base import Base
+
+
+import uuid
+from enum import Enum
+from datetime import datetime
+
+
+class WebhookIntakeStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class WebhookIntake(Base):
+    """
+    A received TradingView webhook waiting for (or done with) signal routing.
+    Persisted before the HTTP response so accepted signals survive restarts.
+    """
+
+    __tablename__ = "webhook_intake"
+
+    __table_args__ = (
+        Index('ix_webhook_intake_status_received', 'status', 'received_at'),
+        Index('ix_webhook_intake_user_idempotency', 'user_id', 'idempotency_key'),
+    )
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False)
+
+    # Signals sharing an ordering key are routed strictly in arrival order
+    ordering_key = Column(String, nullable=False)
+    # strategy_info.trade_id + action + intent; duplicates inside the dedup window are dropped
+    idempotency_key = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    status = Column(
+        SQLAlchemyEnum(WebhookIntakeStatus, name="webhook_intake_status_enum", values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        default=WebhookIntakeStatus.PENDING.value,
+    )
+    attempts = Column(Integer, default=0)
+    result = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
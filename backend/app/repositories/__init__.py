@@ -1,7 +1,9 @@
 from .base import BaseRepository
+from .performance_aggregate import PerformanceDailyRepository, PerformanceSummaryRepository
 from .position_group import PositionGroupRepository
 from .pyramid import PyramidRepository
 from .dca_order import DCAOrderRepository
 from .queued_signal import QueuedSignalRepository
 from .risk_action import RiskActionRepository
 from .user import UserRepository
+from .webhook_intake import WebhookIntakeRepository
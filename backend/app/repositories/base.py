@@ -38,6 +38,12 @@ class BaseRepository(Generic[ModelType]):
         await self.session.refresh(instance)
         return instance
 
+    async def update_all(self, instances: list[ModelType]) -> list[ModelType]:
+        """Writes the changes of several instances with a single flush."""
+        self.session.add_all(instances)
+        await self.session.flush()
+        return instances
+
     async def count_by_status(self, statuses: list, for_update: bool = False) -> int:
         query = select(func.count(self.model.id)).where(self.model.status.in_(statuses))
         if for_update:
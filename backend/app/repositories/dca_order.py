@@ -129,3 +129,27 @@ class DCAOrderRepository(BaseRepository[DCAOrder]):
                 orders_by_user[uid].append(order)
 
         return orders_by_user
+
+    async def get_by_exchange_order_id_for_user(self, exchange_order_id: str, user_id: str) -> DCAOrder | None:
+        """
+        Find the DCA order a pushed exchange order update refers to.
+        Matches either the entry order (exchange_order_id) or its TP order (tp_order_id).
+        Eager loads group and pyramid so the fill handling can run without extra queries.
+        """
+        result = await self.session.execute(
+            select(self.model)
+            .options(
+                joinedload(self.model.group),
+                joinedload(self.model.pyramid)
+            )
+            .join(PositionGroup, self.model.group_id == PositionGroup.id)
+            .where(
+                or_(
+                    self.model.exchange_order_id == exchange_order_id,
+                    self.model.tp_order_id == exchange_order_id
+                ),
+                self.model.leg_index != 999,  # TP fill records reuse the TP's exchange id
+                PositionGroup.user_id == user_id
+            )
+        )
+        return result.scalars().first()
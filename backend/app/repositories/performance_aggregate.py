@@ -0,0 +1,49 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.performance_aggregate import PerformanceDaily, PerformanceSummary
+from app.repositories.base import BaseRepository
+
+
+class PerformanceSummaryRepository(BaseRepository[PerformanceSummary]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(PerformanceSummary, session)
+
+    async def get_for_user(self, user_id, for_update: bool = False) -> PerformanceSummary | None:
+        """The user's summary row; for_update serializes concurrent aggregate updates."""
+        query = select(self.model).where(self.model.user_id == user_id)
+        if for_update:
+            query = query.with_for_update()
+        result = await self.session.execute(query)
+        return result.scalars().first()
+
+    async def delete_for_user(self, user_id) -> None:
+        await self.session.execute(delete(self.model).where(self.model.user_id == user_id))
+
+
+class PerformanceDailyRepository(BaseRepository[PerformanceDaily]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(PerformanceDaily, session)
+
+    async def get_for_user(self, user_id) -> List[PerformanceDaily]:
+        """All daily rollups of a user, oldest first."""
+        result = await self.session.execute(
+            select(self.model)
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.day)
+        )
+        return result.scalars().all()
+
+    async def get_days(self, user_id, days: List[date]) -> List[PerformanceDaily]:
+        if not days:
+            return []
+        result = await self.session.execute(
+            select(self.model).where(self.model.user_id == user_id, self.model.day.in_(days))
+        )
+        return result.scalars().all()
+
+    async def delete_for_user(self, user_id) -> None:
+        await self.session.execute(delete(self.model).where(self.model.user_id == user_id))
@@ -27,17 +27,24 @@ class PositionGroupRepository(BaseRepository[PositionGroup]):
         )
         return result.scalars().all()
 
-    async def get_with_orders(self, group_id: uuid.UUID, refresh: bool = False) -> PositionGroup | None:
+    async def get_with_orders(
+        self, group_id: uuid.UUID, refresh: bool = False, load_orders: bool = True
+    ) -> PositionGroup | None:
         """
         Retrieves a position group by ID, eagerly loading its DCA orders and pyramids.
+        With load_orders=False only the pyramids are loaded.
         """
-        query = (
-            select(self.model)
-            .where(self.model.id == group_id)
-            .options(
+        if load_orders:
+            options = (
                 selectinload(self.model.dca_orders),
                 selectinload(self.model.pyramids).selectinload(Pyramid.dca_orders)
             )
+        else:
+            options = (selectinload(self.model.pyramids),)
+        query = (
+            select(self.model)
+            .where(self.model.id == group_id)
+            .options(*options)
         )
         if refresh:
             query = query.execution_options(populate_existing=True)
@@ -76,6 +83,33 @@ class PositionGroupRepository(BaseRepository[PositionGroup]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_active_user_exchanges(self) -> list[tuple[uuid.UUID, str]]:
+        """
+        Returns the distinct (user_id, exchange) pairs that have live position groups.
+        Used to decide which exchange accounts need an open order stream.
+        """
+        result = await self.session.execute(
+            select(self.model.user_id, func.lower(self.model.exchange))
+            .where(self.model.status.in_(["live", "partially_filled", "active", "closing"]))
+            .distinct()
+        )
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def count_active_by_user(self, user_id: uuid.UUID | None = None) -> dict[uuid.UUID, int]:
+        """
+        Counts live position groups per user (or for a single user), for
+        reconciling the execution pool occupancy.
+        """
+        query = (
+            select(self.model.user_id, func.count(self.model.id))
+            .where(self.model.status.in_(["live", "partially_filled", "active", "closing"]))
+            .group_by(self.model.user_id)
+        )
+        if user_id is not None:
+            query = query.where(self.model.user_id == user_id)
+        result = await self.session.execute(query)
+        return {row[0]: row[1] for row in result.all()}
+
     async def get_active_position_group_for_signal(
         self,
         user_id: uuid.UUID,
@@ -166,6 +200,21 @@ class PositionGroupRepository(BaseRepository[PositionGroup]):
         )
         return result.scalars().all()
 
+    async def get_all_active_for_users(self, user_ids: list[uuid.UUID]) -> list[PositionGroup]:
+        """
+        Open position groups (live, partially_filled, active) of many users in
+        one query, for the batch risk evaluation.
+        """
+        if not user_ids:
+            return []
+        result = await self.session.execute(
+            select(self.model).where(
+                self.model.user_id.in_(user_ids),
+                self.model.status.in_(("live", "partially_filled", "active"))
+            )
+        )
+        return result.scalars().all()
+
     async def get_by_user_and_id(self, user_id: uuid.UUID, group_id: uuid.UUID) -> PositionGroup | None:
         """
         Retrieves a specific position group for a given user and group ID.
@@ -188,6 +237,21 @@ class PositionGroupRepository(BaseRepository[PositionGroup]):
         )
         return result.scalars().all()
 
+    async def get_closing_for_users(self, user_ids: list[uuid.UUID]) -> list[PositionGroup]:
+        """
+        Position groups in 'closing' status of many users in one query.
+        Used by the batch risk evaluation to recover stuck closing positions.
+        """
+        if not user_ids:
+            return []
+        result = await self.session.execute(
+            select(self.model).where(
+                self.model.user_id.in_(user_ids),
+                self.model.status == "closing"
+            )
+        )
+        return result.scalars().all()
+
     async def get_daily_realized_pnl(self, user_id: uuid.UUID, query_date: date = None) -> Decimal:
         """
         Calculates the total realized PnL for a user on a specific date (UTC).
@@ -285,6 +349,48 @@ class PositionGroupRepository(BaseRepository[PositionGroup]):
         )
         return result.scalars().all()
 
+    async def get_closed_pending_analytics(self, user_id: uuid.UUID, limit: int | None = 1000) -> list[PositionGroup]:
+        """Closed groups not yet folded into the user's performance aggregates, oldest close first."""
+        query = (
+            select(self.model)
+            .where(
+                self.model.user_id == user_id,
+                self.model.status == "closed",
+                self.model.analytics_applied.is_(False)
+            )
+            .order_by(self.model.closed_at, self.model.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def get_user_ids_pending_analytics(self) -> list[uuid.UUID]:
+        """Users with closed groups not yet folded into their performance aggregates."""
+        result = await self.session.execute(
+            select(self.model.user_id)
+            .where(self.model.status == "closed", self.model.analytics_applied.is_(False))
+            .distinct()
+        )
+        return result.scalars().all()
+
+    async def mark_analytics_applied(self, group_ids: list, applied: bool = True) -> None:
+        if not group_ids:
+            return
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.id.in_(group_ids))
+            .values(analytics_applied=applied)
+        )
+
+    async def reset_analytics_applied(self, user_id: uuid.UUID) -> None:
+        """Mark every closed group of a user as not yet aggregated (before a rebuild)."""
+        await self.session.execute(
+            update(self.model)
+            .where(self.model.user_id == user_id, self.model.status == "closed")
+            .values(analytics_applied=False)
+        )
+
     async def increment_pyramid_count(
         self,
         group_id: uuid.UUID,
@@ -34,3 +34,11 @@ class UserRepository(BaseRepository[User]):
     async def get_all_active_users(self) -> list[User]:
         result = await self.session.execute(select(User).where(User.is_active == True))
         return result.scalars().all()
+
+    async def get_active_by_ids(self, user_ids) -> list[User]:
+        if not user_ids:
+            return []
+        result = await self.session.execute(
+            select(User).where(User.id.in_(list(user_ids)), User.is_active == True)
+        )
+        return result.scalars().all()
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.webhook_intake import WebhookIntake, WebhookIntakeStatus
+from app.repositories.base import BaseRepository
+
+
+class WebhookIntakeRepository(BaseRepository[WebhookIntake]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(WebhookIntake, session)
+
+    async def find_recent_duplicate(
+        self, user_id, idempotency_key: str, since: datetime
+    ) -> WebhookIntake | None:
+        """Most recent intake with the same idempotency key received after `since`."""
+        result = await self.session.execute(
+            select(self.model)
+            .where(
+                self.model.user_id == user_id,
+                self.model.idempotency_key == idempotency_key,
+                self.model.received_at >= since,
+                self.model.status != WebhookIntakeStatus.FAILED.value
+            )
+            .order_by(self.model.received_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def claim_pending(self, limit: int = 100) -> List[WebhookIntake]:
+        """
+        Moves up to `limit` pending intakes to PROCESSING in one statement and
+        returns them in arrival order. Rows claimed by a concurrent transaction
+        are skipped rather than claimed twice.
+        """
+        pending = (
+            select(self.model.id)
+            .where(self.model.status == WebhookIntakeStatus.PENDING.value)
+            .order_by(self.model.received_at, self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id.in_(pending.scalar_subquery()))
+            .values(
+                status=WebhookIntakeStatus.PROCESSING.value,
+                started_at=datetime.utcnow(),
+                attempts=self.model.attempts + 1
+            )
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING does not preserve the subquery's order
+        return sorted(result.scalars().all(), key=lambda intake: (intake.received_at, intake.id))
+
+    async def requeue_processing(self, started_before: datetime) -> int:
+        """
+        Return intakes left in PROCESSING by a previous leader to PENDING.
+        Only rows started before `started_before` are requeued; newer ones may
+        still be routed by a leader that is draining.
+        Returns the number of requeued rows.
+        """
+        result = await self.session.execute(
+            update(self.model)
+            .where(
+                self.model.status == WebhookIntakeStatus.PROCESSING.value,
+                or_(self.model.started_at.is_(None), self.model.started_at < started_before)
+            )
+            .values(status=WebhookIntakeStatus.PENDING.value, started_at=None)
+        )
+        return result.rowcount or 0
+
+    async def requeue(self, intake_ids: List) -> int:
+        """
+        Return the given PROCESSING intakes to PENDING.
+        Returns the number of requeued rows.
+        """
+        result = await self.session.execute(
+            update(self.model)
+            .where(
+                self.model.id.in_(intake_ids),
+                self.model.status == WebhookIntakeStatus.PROCESSING.value
+            )
+            .values(status=WebhookIntakeStatus.PENDING.value, started_at=None)
+        )
+        return result.rowcount or 0
+
+    async def count_pending(self) -> int:
+        result = await self.session.execute(
+            select(func.count(self.model.id)).where(
+                self.model.status.in_([WebhookIntakeStatus.PENDING.value, WebhookIntakeStatus.PROCESSING.value])
+            )
+        )
+        return result.scalar_one()
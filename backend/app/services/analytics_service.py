@@ -1,13 +1,15 @@
 """
 Analytics Service - Comprehensive dashboard metrics calculation
 Optimized for performance with minimal database and exchange queries
+
+Closed-trade metrics come from the incrementally maintained PerformanceAggregate
+(see performance_aggregates.py) instead of the full closed-position history.
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
@@ -17,7 +19,9 @@ from app.models.queued_signal import QueuedSignal
 from app.models.user import User
 from app.repositories.position_group import PositionGroupRepository
 from app.services.exchange_config_service import ExchangeConfigService
+from app.services.performance_aggregates import PerformanceAggregate, PerformanceStore
 from app.core.cache import get_cache
+from app.services.market_data import get_symbol_tickers
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +43,7 @@ class AnalyticsService:
         # Fetch all database metrics in parallel
         (
             active_positions,
-            closed_positions,
+            performance,
             queued_signals_count,
             last_webhook_time
         ) = await self._fetch_database_metrics()
@@ -50,14 +54,14 @@ class AnalyticsService:
         # Calculate all metrics
         live_dashboard = self._calculate_live_dashboard(
             active_positions,
-            closed_positions,
+            performance,
             queued_signals_count,
             last_webhook_time,
             exchange_data
         )
 
         performance_dashboard = self._calculate_performance_dashboard(
-            closed_positions,
+            performance,
             active_positions,
             exchange_data
         )
@@ -72,8 +76,8 @@ class AnalyticsService:
         """Fetch all database metrics in parallel"""
         # Get all positions
         active_positions = await self.position_repo.get_active_position_groups_for_user(self.user.id)
-        # Analytics needs all closed positions for calculations
-        closed_positions = await self.position_repo.get_closed_by_user_all(self.user.id)
+        # Closed-trade aggregates, including groups closed since the last sweep
+        performance = await PerformanceStore(self.session).load(self.user.id)
 
         # Get queued signals count
         queued_result = await self.session.execute(
@@ -93,7 +97,7 @@ class AnalyticsService:
                 default=None
             )
 
-        return active_positions, closed_positions, queued_signals_count, last_webhook_time
+        return active_positions, performance, queued_signals_count, last_webhook_time
 
     async def _fetch_exchange_data_optimized(self, active_positions: List[PositionGroup]) -> Dict:
         """
@@ -138,15 +142,14 @@ class AnalyticsService:
                     balances = await connector.fetch_balance()
                     await cache.set_balance(user_id_str, exchange_name, balances)
 
-                # Try to get cached tickers first
-                all_tickers = await cache.get_tickers(exchange_name)
-                if not all_tickers:
-                    try:
-                        all_tickers = await connector.get_all_tickers()
-                        await cache.set_tickers(exchange_name, all_tickers)
-                    except Exception as e:
-                        logger.warning(f"Could not fetch tickers from {exchange_name}: {e}")
-                        all_tickers = {}
+                # Read only the tickers of the positions and held assets on this exchange
+                total_balances = balances.get('total', balances)
+                priced_symbols = [pos.symbol for pos in active_positions if pos.exchange == exchange_name]
+                priced_symbols += [
+                    f"{asset}/USDT" for asset, amount in total_balances.items()
+                    if asset not in ("USDT", exchange_name) and float(amount or 0) > 0
+                ]
+                all_tickers = await get_symbol_tickers(cache, exchange_name, priced_symbols, connector)
 
                 # Fetch trading fee rate (fallback to 0.1% if unavailable)
                 try:
@@ -170,7 +173,7 @@ class AnalyticsService:
     def _calculate_live_dashboard(
         self,
         active_positions: List[PositionGroup],
-        closed_positions: List[PositionGroup],
+        performance: PerformanceAggregate,
         queued_signals_count: int,
         last_webhook_time: Optional[datetime],
         exchange_data: Dict
@@ -210,27 +213,12 @@ class AnalyticsService:
                 except Exception as e:
                     logger.error(f"Error calculating PnL for {group.symbol}: {e}")
 
-        # Calculate realized PnL from closed positions
-        total_realized_pnl = 0.0
-        now = datetime.utcnow()
-        pnl_today = 0.0
-        total_trades = len(closed_positions)
-        wins = 0
-        losses = 0
-
-        for group in closed_positions:
-            pnl = float(group.realized_pnl_usd) if group.realized_pnl_usd else 0.0
-            total_realized_pnl += pnl
-
-            # Win/Loss tracking
-            if pnl > 0:
-                wins += 1
-            elif pnl < 0:
-                losses += 1
-
-            # Today's PnL
-            if group.closed_at and group.closed_at >= now - timedelta(days=1):
-                pnl_today += pnl
+        # Realized PnL from the closed-trade aggregates
+        total_realized_pnl = performance.realized_pnl
+        pnl_today = performance.pnl_today()
+        total_trades = performance.total_trades
+        wins = performance.wins
+        losses = performance.losses
 
         win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
 
@@ -318,7 +306,7 @@ class AnalyticsService:
 
     def _calculate_performance_dashboard(
         self,
-        closed_positions: List[PositionGroup],
+        performance: PerformanceAggregate,
         active_positions: List[PositionGroup],
         exchange_data: Dict
     ) -> Dict:
@@ -353,113 +341,30 @@ class AnalyticsService:
                 except Exception:
                     pass
 
-        # Process closed positions for performance metrics
-        total_realized_pnl = 0.0
-        wins = 0
-        losses = 0
-        win_amounts = []
-        loss_amounts = []
-        pnl_by_pair = defaultdict(float)
-        pnl_by_timeframe = defaultdict(float)
-        trade_returns = []
-
-        # Time-based PnL
-        now = datetime.utcnow()
-        pnl_today = 0.0
-        pnl_week = 0.0
-        pnl_month = 0.0
-
-        for group in closed_positions:
-            pnl = float(group.realized_pnl_usd) if group.realized_pnl_usd else 0.0
-            total_realized_pnl += pnl
-            trade_returns.append(pnl)
-
-            # Win/Loss tracking
-            if pnl > 0:
-                wins += 1
-                win_amounts.append(pnl)
-            else:
-                losses += 1
-                loss_amounts.append(abs(pnl))
-
-            # By pair
-            if group.symbol:
-                pnl_by_pair[group.symbol] += pnl
-
-            # By timeframe
-            if group.timeframe:
-                pnl_by_timeframe[str(group.timeframe)] += pnl
-
-            # Time-based
-            if group.closed_at:
-                if group.closed_at >= now - timedelta(days=1):
-                    pnl_today += pnl
-                if group.closed_at >= now - timedelta(days=7):
-                    pnl_week += pnl
-                if group.closed_at >= now - timedelta(days=30):
-                    pnl_month += pnl
-
-        total_trades = len(closed_positions)
+        # Closed-trade metrics from the running aggregates
+        total_realized_pnl = performance.realized_pnl
+        wins = performance.wins
+        # Break-even trades count as losses here (but not on the live dashboard)
+        losses = performance.losses + performance.breakeven
+        total_trades = performance.total_trades
         win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
 
-        avg_win = sum(win_amounts) / len(win_amounts) if win_amounts else 0.0
-        avg_loss = sum(loss_amounts) / len(loss_amounts) if loss_amounts else 0.0
+        avg_win = performance.gross_win / wins if wins else 0.0
+        avg_loss = performance.gross_loss / losses if losses else 0.0
         rr_ratio = avg_win / avg_loss if avg_loss > 0 else 0.0
 
-        # Calculate drawdown
-        equity_curve = []
-        running_equity = 0.0
-        peak_equity = 0.0
-        max_drawdown = 0.0
-        current_drawdown = 0.0
-
-        for group in sorted(closed_positions, key=lambda x: x.closed_at or datetime.min):
-            pnl = float(group.realized_pnl_usd) if group.realized_pnl_usd else 0.0
-            running_equity += pnl
-            equity_curve.append({
-                "timestamp": group.closed_at.isoformat() if group.closed_at else None,
-                "equity": running_equity
-            })
-
-            if running_equity > peak_equity:
-                peak_equity = running_equity
-
-            drawdown = peak_equity - running_equity
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-
-        current_drawdown = peak_equity - running_equity if peak_equity > 0 else 0.0
-
-        # Best and worst trades
-        sorted_trades = sorted(
-            [(g.symbol, float(g.realized_pnl_usd) if g.realized_pnl_usd else 0.0) for g in closed_positions],
-            key=lambda x: x[1]
-        )
-        worst_trades = sorted_trades[:10]
-        best_trades = sorted_trades[-10:][::-1]
-
-        # Profit factor
-        total_wins = sum(win_amounts)
-        total_losses = sum(loss_amounts)
-        profit_factor = total_wins / total_losses if total_losses > 0 else 0.0
-
-        # Sharpe/Sortino (simplified)
-        if trade_returns:
-            avg_return = sum(trade_returns) / len(trade_returns)
-            variance = sum((r - avg_return) ** 2 for r in trade_returns) / len(trade_returns)
-            std_dev = variance ** 0.5
-            sharpe_ratio = avg_return / std_dev if std_dev > 0 else 0.0
-
-            negative_returns = [r for r in trade_returns if r < 0]
-            if negative_returns:
-                downside_variance = sum((r - avg_return) ** 2 for r in negative_returns) / len(negative_returns)
-                downside_dev = downside_variance ** 0.5
-                sortino_ratio = avg_return / downside_dev if downside_dev > 0 else 0.0
-            else:
-                sortino_ratio = 0.0
-        else:
-            sharpe_ratio = 0.0
-            sortino_ratio = 0.0
+        pnl_today = performance.pnl_today()
+        pnl_week = performance.pnl_last_days(7)
+        pnl_month = performance.pnl_last_days(30)
+
+        max_drawdown = performance.max_drawdown
+        current_drawdown = performance.current_drawdown
+
+        best_trades = [tuple(trade) for trade in performance.best_trades]
+        worst_trades = [tuple(trade) for trade in performance.worst_trades]
+
+        profit_factor = performance.gross_win / performance.gross_loss if performance.gross_loss > 0 else 0.0
+        sharpe_ratio, sortino_ratio = performance.sharpe_sortino()
 
         return {
             "pnl_metrics": {
@@ -470,10 +375,11 @@ class AnalyticsService:
                 "pnl_week": pnl_week,
                 "pnl_month": pnl_month,
                 "pnl_all_time": total_realized_pnl,
-                "pnl_by_pair": dict(pnl_by_pair),
-                "pnl_by_timeframe": dict(pnl_by_timeframe)
+                "pnl_by_pair": dict(performance.pnl_by_pair),
+                "pnl_by_timeframe": dict(performance.pnl_by_timeframe)
             },
-            "equity_curve": equity_curve,
+            # One point per day with closes
+            "equity_curve": performance.equity_curve(),
             "win_loss_stats": {
                 "total_trades": total_trades,
                 "wins": wins,
@@ -484,7 +390,8 @@ class AnalyticsService:
                 "rr_ratio": rr_ratio
             },
             "trade_distribution": {
-                "returns": trade_returns,
+                # Realized PnL per day with closes
+                "returns": performance.daily_returns(),
                 "best_trades": best_trades,
                 "worst_trades": worst_trades
             },
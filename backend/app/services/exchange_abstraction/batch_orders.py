@@ -0,0 +1,97 @@
+"""
+Batched placement of the legs of a grid.
+
+Placing a DCA grid leg by leg costs one round trip per leg. The exchanges take
+several orders per request:
+
+- Binance futures: POST /fapi/v1/batchOrders, up to 5 orders
+- Bybit v5: POST /v5/order/create-batch, up to 20 orders (10 on spot)
+
+A batch request fails as a whole only on transport or authentication errors;
+otherwise each order is accepted or rejected on its own. Results are reported
+per leg, in the order of the request: the order dictionary of an accepted leg,
+or the exception (already mapped to the application exceptions) of a rejected
+one. Callers decide what to retry.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import ccxt
+
+from app.services.exchange_abstraction.error_mapping import map_exchange_error
+
+# place_order() keyword arguments of one leg
+OrderRequest = Dict[str, Any]
+# Placed order dictionary, or the exception the leg failed with
+LegResult = Union[Dict[str, Any], Exception]
+
+
+def leg_result(exchange, order: Optional[Dict[str, Any]]) -> LegResult:
+    """
+    Result of one leg of a ccxt create_orders() response. Rejected legs come
+    back without an ID (or as 'rejected') with the exchange's code and message
+    in 'info'; the code is mapped through the exchange's own error table.
+    """
+    if order and order.get("id") and order.get("status") != "rejected":
+        return order
+
+    info = (order or {}).get("info") or {}
+    code = info.get("code")
+    message = info.get("msg") or info.get("retMsg") or "no result for the order in the batch response"
+    exact = (getattr(exchange, "exceptions", None) or {}).get("exact") or {}
+    error_class = exact.get(str(code)) if isinstance(exact, dict) else None
+    if not (isinstance(error_class, type) and issubclass(error_class, ccxt.BaseError)):
+        error_class = ccxt.InvalidOrder
+    return map_exchange_error(error_class(f"{code} {message}"))
+
+
+async def place_in_batches(
+    orders: List[OrderRequest],
+    batch_limit: int,
+    to_batch_entry: Callable[[OrderRequest], Optional[Dict[str, Any]]],
+    place_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[LegResult]]],
+    place_single: Callable[..., Awaitable[Dict[str, Any]]],
+) -> List[LegResult]:
+    """
+    Places the legs in chunks of batch_limit through place_batch, all chunks
+    concurrently. Legs the batch endpoint cannot express (to_batch_entry
+    returns None) are placed individually through place_single at the same time.
+
+    Args:
+        to_batch_entry: Converts a leg to a ccxt create_orders() entry, or None
+        place_batch: Places one chunk and returns one result per entry
+        place_single: The connector's place_order
+    """
+    results: List[Optional[LegResult]] = [None] * len(orders)
+    batched = []
+    singles = []
+    for index, order in enumerate(orders):
+        entry = to_batch_entry(order)
+        if entry is None:
+            singles.append(index)
+        else:
+            batched.append((index, entry))
+
+    async def run_batch(chunk):
+        try:
+            placed = await place_batch([entry for _, entry in chunk])
+        except Exception as e:
+            error = map_exchange_error(e)
+            for index, _ in chunk:
+                results[index] = error
+            return
+        for position, (index, _) in enumerate(chunk):
+            results[index] = placed[position] if position < len(placed) else leg_result(None, None)
+
+    async def run_single(index):
+        try:
+            results[index] = await place_single(**orders[index])
+        except Exception as e:
+            results[index] = map_exchange_error(e)
+
+    chunks = [batched[start:start + batch_limit] for start in range(0, len(batched), batch_limit)]
+    await asyncio.gather(
+        *(run_batch(chunk) for chunk in chunks),
+        *(run_single(index) for index in singles)
+    )
+    return results
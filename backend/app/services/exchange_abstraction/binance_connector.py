@@ -1,13 +1,26 @@
 import asyncio
 import ccxt.async_support as ccxt
-from typing import Literal
+import ccxt.pro as ccxtpro
+from typing import Any, Dict, Iterable, List, Literal, Optional
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.services.exchange_abstraction.error_mapping import map_exchange_errors
+from app.services.exchange_abstraction.batch_orders import leg_result, place_in_batches
+from app.services.exchange_abstraction.precision_index import get_precision_index, normalize_symbol
+from app.services.exchange_abstraction.order_reconciliation import RECENT_TRADES_LIMIT, build_order_snapshots
+from app.services.exchange_abstraction.request_scheduler import (
+    RequestPriority,
+    account_key,
+    get_request_scheduler,
+    scheduled,
+)
 from app.core.cache import get_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Orders per batchOrders request (futures only; spot has no batch endpoint)
+BATCH_ORDERS_LIMIT = 5
+
 
 class OrderCancellationError(ccxt.NetworkError):
     """Raised when order cancellation fails after retries."""
@@ -18,7 +31,7 @@ class BinanceConnector(ExchangeInterface):
     Binance exchange connector implementing ExchangeInterface.
     """
     def __init__(self, api_key: str, secret_key: str, testnet: bool = False, default_type: str = "spot"):
-        self.exchange = ccxt.binance({
+        self._exchange_config = {
             'apiKey': api_key,
             'secret': secret_key,
             'timeout': 60000,  # 60 seconds timeout
@@ -26,16 +39,29 @@ class BinanceConnector(ExchangeInterface):
             'options': {
                 'defaultType': default_type,
             },
-        })
+        }
+        self.testnet = testnet
+        self.exchange = ccxt.binance(dict(self._exchange_config))
         if testnet:
             self.exchange.set_sandbox_mode(True)
 
+        # REST budget shared with every other connector on this exchange host
+        self.request_scheduler = get_request_scheduler("binance", testnet)
+        self.account_key = account_key(api_key)
+
+        # ccxt.pro instance for the user data stream, created on first watch_orders() call
+        self._stream_exchange = None
+
+    def _request_slot(self, endpoint: str, priority: RequestPriority = RequestPriority.STATUS, orders: int = 1):
+        """Scheduler slot for calls that are not made through a @scheduled method."""
+        return self.request_scheduler.slot(endpoint, priority, self.account_key, self.exchange, orders)
+
     @map_exchange_errors
     async def get_precision_rules(self):
         """
-        Fetches market data to get precision rules for all symbols.
-        Uses Redis cache with 24h TTL to avoid repeated expensive API calls.
-        Returns a normalized dictionary:
+        Precision rules of every symbol, served from the in-process precision index
+        (reloaded from the exchange markets in the background).
+        Returns a PrecisionTable mapping symbols to normalized rules:
         {
             "SYMBOL": {
                 "tick_size": float,
@@ -44,16 +70,21 @@ class BinanceConnector(ExchangeInterface):
                 "min_notional": float
             }
         }
+        Lookups accept both the unified ("BTC/USDT") and the market id ("BTCUSDT") form.
         """
-        # Try to get from cache first
-        cache = await get_cache()
-        cached_rules = await cache.get_precision_rules("binance")
-        if cached_rules:
-            logger.debug("Using cached precision rules for binance")
-            return cached_rules
-
-        logger.info("Fetching precision rules from Binance API (cache miss)")
-        markets = await self.exchange.load_markets()
+        return await get_precision_index().get_table("binance", self._load_precision_rules)
+
+    @map_exchange_errors
+    async def get_symbol_precision(self, symbol: str):
+        """Precision rule of one symbol, or None if the exchange does not list it."""
+        return await get_precision_index().get_symbol("binance", symbol, self._load_precision_rules)
+
+    async def _load_precision_rules(self) -> Dict[str, dict]:
+        """Builds the precision index of the exchange from its markets, one rule per symbol."""
+        logger.info("Fetching precision rules from Binance API")
+        async with self._request_slot("get_precision_rules"):
+            markets = await self.exchange.load_markets()
+        default_type = self.exchange.options.get('defaultType')
         precision_rules = {}
 
         for symbol, market in markets.items():
@@ -87,17 +118,16 @@ class BinanceConnector(ExchangeInterface):
                 "min_notional": min_notional
             }
 
-            precision_rules[symbol] = rules
-            if market.get('id'):
-                precision_rules[market['id']] = rules
-
-        # Cache the results
-        await cache.set_precision_rules("binance", precision_rules)
-        logger.info(f"Cached precision rules for binance ({len(precision_rules)} symbols)")
+            # Spot and derivative markets of a pair share an index entry; keep the configured type
+            indexed = normalize_symbol(symbol)
+            if indexed in precision_rules and market.get('type') != default_type:
+                continue
+            precision_rules[indexed] = rules
 
         return precision_rules
 
     @map_exchange_errors
+    @scheduled(RequestPriority.ORDER)
     async def place_order(
         self,
         symbol: str,
@@ -168,7 +198,87 @@ class BinanceConnector(ExchangeInterface):
                 params=params
             )
 
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Places a grid through batchOrders, up to 5 legs per request. Spot has no
+        batch endpoint, so spot grids are placed concurrently leg by leg, as are
+        quote-amount market legs (quoteOrderQty is spot-only).
+        """
+        if self.exchange.options.get('defaultType') == 'spot':
+            return await super().place_orders(orders)
+        return await place_in_batches(
+            orders, BATCH_ORDERS_LIMIT, self._batch_entry, self._place_batch, self.place_order
+        )
+
+    def _batch_entry(self, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ccxt create_orders() entry of a place_order() request, None if it must be placed alone."""
+        order = dict(order)
+        symbol = order.pop('symbol')
+        order_type = order.pop('order_type')
+        side = order.pop('side')
+        quantity = order.pop('quantity')
+        price = order.pop('price', None)
+        amount_type = order.pop('amount_type', "base")
+        is_market = order_type.upper() == 'MARKET'
+
+        if amount_type == "quote":
+            if is_market or not price or price <= 0:
+                return None
+            quantity = quantity / price
+        return {
+            'symbol': symbol,
+            'type': order_type,
+            'side': side,
+            'amount': quantity,
+            'price': None if is_market else price,
+            'params': order,
+        }
+
+    async def _place_batch(self, entries: List[Dict[str, Any]]) -> List[Any]:
+        logger.info(f"Placing batch of {len(entries)} orders: symbol={entries[0]['symbol']}")
+        async with self._request_slot("create_orders", RequestPriority.ORDER, len(entries)):
+            placed = await self.exchange.create_orders(entries)
+        return [leg_result(self.exchange, order) for order in placed]
+
+    def supports_trigger_orders(self) -> bool:
+        return True
+
     @map_exchange_errors
+    @scheduled(RequestPriority.ORDER)
+    async def place_trigger_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        trigger_price: float,
+        **kwargs
+    ):
+        """
+        Places a TAKE_PROFIT (spot) / TAKE_PROFIT_MARKET (futures) order: Binance
+        triggers a BUY when the price falls to stopPrice and a SELL when it rises to it.
+        """
+        logger.info(f"Placing trigger order: symbol={symbol}, side={side}, "
+                    f"quantity={quantity}, trigger_price={trigger_price}")
+        params = {**kwargs, 'takeProfitPrice': trigger_price}
+        return await self.exchange.create_order(
+            symbol=symbol,
+            type='market',
+            side=side,
+            amount=quantity,
+            price=None,
+            params=params
+        )
+
+    @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
+    async def get_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.exchange.fetch_order(None, symbol, params={'origClientOrderId': client_order_id})
+        except ccxt.OrderNotFound:
+            return None
+
+    @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_order_status(self, order_id: str, symbol: str = None):
         """
         Fetches the status of a specific order by its ID.
@@ -178,6 +288,27 @@ class BinanceConnector(ExchangeInterface):
         return order
 
     @map_exchange_errors
+    async def reconcile_orders(self, symbol: str, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolves several orders of a symbol from its open orders and, for the
+        ones no longer open, the account's recent trades.
+        """
+        order_ids = {str(order_id) for order_id in order_ids}
+        if not order_ids:
+            return {}
+
+        async with self._request_slot("fetch_open_orders"):
+            open_orders = await self.exchange.fetch_open_orders(symbol)
+
+        trades = []
+        if order_ids - {str(o.get('id')) for o in open_orders}:
+            async with self._request_slot("fetch_my_trades"):
+                trades = await self.exchange.fetch_my_trades(symbol, limit=RECENT_TRADES_LIMIT)
+
+        return build_order_snapshots(order_ids, open_orders, trades, symbol)
+
+    @map_exchange_errors
+    @scheduled(RequestPriority.CANCEL)
     async def cancel_order(self, order_id: str, symbol: str = None):
         """
         Cancels an existing order by its ID with retry logic and status verification.
@@ -238,6 +369,7 @@ class BinanceConnector(ExchangeInterface):
             raise OrderCancellationError(f"Failed to verify cancellation of order {order_id}: {e}")
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_current_price(self, symbol: str) -> float:
         """
         Fetches the last traded price for a symbol.
@@ -246,6 +378,7 @@ class BinanceConnector(ExchangeInterface):
         return ticker['last']
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_all_tickers(self):
         """
         Fetches all tickers from the exchange.
@@ -253,6 +386,7 @@ class BinanceConnector(ExchangeInterface):
         return await self.exchange.fetch_tickers()
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def fetch_balance(self):
         """
         Fetches the total balance for all assets.
@@ -261,6 +395,7 @@ class BinanceConnector(ExchangeInterface):
         return balance['total']
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def fetch_free_balance(self):
         """
         Fetches the free (available) balance for all assets.
@@ -268,12 +403,35 @@ class BinanceConnector(ExchangeInterface):
         balance = await self.exchange.fetch_balance()
         return balance['free']
 
+    def supports_order_stream(self) -> bool:
+        return True
+
+    def _get_stream_exchange(self):
+        """Get or create the ccxt.pro instance used for the user data stream."""
+        if self._stream_exchange is None:
+            self._stream_exchange = ccxtpro.binance(dict(self._exchange_config))
+            if self.testnet:
+                self._stream_exchange.set_sandbox_mode(True)
+        return self._stream_exchange
+
+    @map_exchange_errors
+    async def watch_orders(self, symbol: str = None):
+        """
+        Waits for order updates from the Binance user data stream (executionReport /
+        ORDER_TRADE_UPDATE). ccxt.pro manages the listenKey and its keepalive.
+        """
+        stream = self._get_stream_exchange()
+        return await stream.watch_orders(symbol)
+
     async def close(self):
         """
-        Closes the underlying ccxt exchange instance.
+        Closes the underlying ccxt exchange instance and the user data stream, if open.
         """
         if self.exchange:
             await self.exchange.close()
+        if self._stream_exchange is not None:
+            await self._stream_exchange.close()
+            self._stream_exchange = None
 
     @map_exchange_errors
     async def get_trading_fee_rate(self, symbol: str = None) -> float:
@@ -301,11 +459,13 @@ class BinanceConnector(ExchangeInterface):
             # Fetch from exchange
             if symbol:
                 # Fetch fee for specific symbol
-                fee_info = await self.exchange.fetch_trading_fee(symbol)
+                async with self._request_slot("get_trading_fee_rate"):
+                    fee_info = await self.exchange.fetch_trading_fee(symbol)
                 taker_fee = fee_info.get('taker', DEFAULT_FEE)
             else:
                 # Fetch account-level fees
-                fees = await self.exchange.fetch_trading_fees()
+                async with self._request_slot("get_trading_fee_rate"):
+                    fees = await self.exchange.fetch_trading_fees()
                 # Get first available or default
                 if fees:
                     first_fee = next(iter(fees.values()), {})
@@ -1,13 +1,30 @@
 import asyncio
 import ccxt.async_support as ccxt
+import ccxt.pro as ccxtpro
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.services.exchange_abstraction.error_mapping import map_exchange_errors
+from app.services.exchange_abstraction.batch_orders import leg_result, place_in_batches
+from app.services.exchange_abstraction.precision_index import get_precision_index, normalize_symbol
+from app.services.exchange_abstraction.order_reconciliation import RECENT_TRADES_LIMIT, build_order_snapshots
+from app.services.exchange_abstraction.request_scheduler import (
+    RequestPriority,
+    account_key,
+    get_request_scheduler,
+    scheduled,
+)
 from app.core.cache import get_cache
 import logging
-from typing import List, Dict, Any, Optional, Literal
+from typing import List, Dict, Any, Iterable, Optional, Literal
 
 logger = logging.getLogger(__name__)
 
+# Orders per place-batch-order request
+BATCH_ORDERS_LIMIT = 20
+SPOT_BATCH_ORDERS_LIMIT = 10
+
+# Error codes place_order retries with the CONTRACT/SPOT account types on UNIFIED accounts
+ACCOUNT_TYPE_FALLBACK_CODES = ("10005", "170131")
+
 class OrderCancellationError(ccxt.NetworkError):
     pass
 
@@ -35,7 +52,7 @@ class BybitConnector(ExchangeInterface):
         if testnet:
             options['testnet'] = True
 
-        self.exchange = ccxt.bybit({
+        self._exchange_config = {
             'apiKey': api_key,
             'secret': secret_key,
             'options': options,
@@ -43,34 +60,63 @@ class BybitConnector(ExchangeInterface):
             'enableRateLimit': True,
             'asyncio_loop': None,  # Let ccxt manage its own event loop
             'verbose': False,  # Disable verbose to reduce log spam
-        })
+        }
+        self.exchange = ccxt.bybit({**self._exchange_config, 'options': dict(options)})
 
         self.testnet_mode = testnet
 
         if testnet:
             self.exchange.set_sandbox_mode(True)
+
+        # REST budget shared with every other connector on this exchange host
+        self.request_scheduler = get_request_scheduler("bybit", testnet)
+        self.account_key = account_key(api_key)
+
+        # ccxt.pro instance for the private order stream, created on first watch_orders() call
+        self._stream_exchange = None
         
         logger.info(f"BybitConnector initialized: testnet={testnet}, account_type={account_type}, ccxt_testnet_mode={self.exchange.options.get('testnet')}, ccxt_default_type={self.exchange.options.get('defaultType')}")
         logger.info(f"CCXT Exchange Options: {self.exchange.options}")
         logger.info(f"CCXT Exchange URLs: {self.exchange.urls}")
 
+    @property
+    def _precision_key(self) -> str:
+        """Testnet markets differ from mainnet, so they are indexed separately."""
+        return f"bybit{'_testnet' if self.testnet_mode else ''}"
+
+    def _request_slot(self, endpoint: str, priority: RequestPriority = RequestPriority.STATUS, orders: int = 1):
+        """Scheduler slot for calls that are not made through a @scheduled method."""
+        return self.request_scheduler.slot(endpoint, priority, self.account_key, self.exchange, orders)
+
     @map_exchange_errors
     async def get_precision_rules(self):
         """
-        Fetches market data to get precision rules for all symbols.
-        Uses Redis cache with 24h TTL to avoid repeated expensive API calls.
-        Returns a normalized dictionary.
+        Precision rules of every symbol, served from the in-process precision index
+        (reloaded from the exchange markets in the background).
+        Returns a PrecisionTable mapping symbols to normalized rules:
+        {
+            "SYMBOL": {
+                "tick_size": float,
+                "step_size": float,
+                "min_qty": float,
+                "min_notional": float
+            }
+        }
+        Lookups accept both the unified ("BTC/USDT") and the market id ("BTCUSDT") form.
         """
-        # Try to get from cache first
-        cache = await get_cache()
-        cache_key = f"bybit{'_testnet' if self.testnet_mode else ''}"
-        cached_rules = await cache.get_precision_rules(cache_key)
-        if cached_rules:
-            logger.debug(f"Using cached precision rules for {cache_key}")
-            return cached_rules
+        return await get_precision_index().get_table(self._precision_key, self._load_precision_rules)
 
-        logger.info(f"Fetching precision rules from Bybit API (cache miss)")
-        markets = await self.exchange.load_markets()
+    @map_exchange_errors
+    async def get_symbol_precision(self, symbol: str):
+        """Precision rule of one symbol, or None if the exchange does not list it."""
+        return await get_precision_index().get_symbol(self._precision_key, symbol, self._load_precision_rules)
+
+    async def _load_precision_rules(self) -> Dict[str, dict]:
+        """Builds the precision index of the exchange from its markets, one rule per symbol."""
+        logger.info("Fetching precision rules from Bybit API")
+        async with self._request_slot("get_precision_rules"):
+            markets = await self.exchange.load_markets()
+        default_type = self.exchange.options.get('defaultType')
         precision_rules = {}
 
         for symbol, market in markets.items():
@@ -104,17 +150,16 @@ class BybitConnector(ExchangeInterface):
                 "min_notional": min_notional
             }
 
-            precision_rules[symbol] = rules
-            if market.get('id'):
-                precision_rules[market['id']] = rules
-
-        # Cache the results
-        await cache.set_precision_rules(cache_key, precision_rules)
-        logger.info(f"Cached precision rules for {cache_key} ({len(precision_rules)} symbols)")
+            # Spot and derivative markets of a pair share an index entry; keep the configured type
+            indexed = normalize_symbol(symbol)
+            if indexed in precision_rules and market.get('type') != default_type:
+                continue
+            precision_rules[indexed] = rules
 
         return precision_rules
 
     @map_exchange_errors
+    @scheduled(RequestPriority.ORDER)
     async def place_order(
         self,
         symbol: str,
@@ -259,7 +304,128 @@ class BybitConnector(ExchangeInterface):
             else:
                 raise e
 
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Places a grid through place-batch-order, up to 20 legs per request (10 on
+        spot). Quote-amount market legs are placed alone with marketUnit=quoteCoin.
+        Legs rejected for the account type go through place_order's
+        CONTRACT/SPOT fallback, as a single order would.
+        """
+        is_spot = self.exchange.options.get('defaultType') == 'spot'
+        results = await place_in_batches(
+            orders,
+            SPOT_BATCH_ORDERS_LIMIT if is_spot else BATCH_ORDERS_LIMIT,
+            self._batch_entry,
+            self._place_batch,
+            self.place_order
+        )
+
+        if self.exchange.options.get('accountType') == 'UNIFIED':
+            for index, result in enumerate(results):
+                if isinstance(result, Exception) and any(code in str(result) for code in ACCOUNT_TYPE_FALLBACK_CODES):
+                    logger.warning(f"Bybit batch leg rejected with UNIFIED account type ({result}). Retrying it alone.")
+                    try:
+                        results[index] = await self.place_order(**orders[index])
+                    except Exception as e:
+                        results[index] = e
+        return results
+
+    def _batch_entry(self, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ccxt create_orders() entry of a place_order() request, None if it must be placed alone."""
+        order = dict(order)
+        symbol = order.pop('symbol')
+        order_type = order.pop('order_type')
+        side = order.pop('side')
+        quantity = order.pop('quantity')
+        price = order.pop('price', None)
+        amount_type = order.pop('amount_type', "base")
+        is_market = order_type.upper() == 'MARKET'
+        if 'reduce_only' in order:
+            order['reduceOnly'] = order.pop('reduce_only')
+
+        if amount_type == "quote":
+            if is_market or not price or price <= 0:
+                return None
+            quantity = quantity / price
+        return {
+            'symbol': symbol,
+            'type': order_type,
+            'side': side,
+            'amount': quantity,
+            'price': None if is_market else price,
+            'params': order,
+        }
+
+    async def _place_batch(self, entries: List[Dict[str, Any]]) -> List[Any]:
+        logger.info(f"Placing batch of {len(entries)} orders: symbol={entries[0]['symbol']}")
+        async with self._request_slot("create_orders", RequestPriority.ORDER, len(entries)):
+            placed = await self.exchange.create_orders(entries)
+
+        results = []
+        for order in placed:
+            result = leg_result(self.exchange, order)
+            # Replace CCXT's composite ID with Bybit's native ID, as place_order does
+            if not isinstance(result, Exception) and 'orderId' in (result.get('info') or {}):
+                result['id'] = str(result['info']['orderId'])
+            results.append(result)
+        return results
+
+    def supports_trigger_orders(self) -> bool:
+        return True
+
+    @map_exchange_errors
+    @scheduled(RequestPriority.ORDER)
+    async def place_trigger_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        trigger_price: float,
+        **kwargs
+    ):
+        """
+        Places a conditional market order with triggerPrice: triggerDirection is
+        falling for a BUY and rising for a SELL.
+        """
+        logger.info(f"Placing trigger order: symbol={symbol}, side={side}, "
+                    f"quantity={quantity}, trigger_price={trigger_price}")
+        params = kwargs.copy()
+        if 'reduce_only' in params:
+            params['reduceOnly'] = params.pop('reduce_only')
+        params['triggerPrice'] = trigger_price
+        params['triggerDirection'] = 'below' if side.upper() == 'BUY' else 'above'
+
+        result = await self.exchange.create_order(
+            symbol=symbol,
+            type='market',
+            side=side,
+            amount=quantity,
+            price=None,
+            params=params
+        )
+        # Replace CCXT's composite ID with Bybit's native ID, as place_order does
+        if 'info' in result and 'orderId' in result['info']:
+            result['id'] = str(result['info']['orderId'])
+        return result
+
+    @map_exchange_errors
+    async def get_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Finds the order among the symbol's open and recent orders, where CCXT
+        reports Bybit's orderLinkId as clientOrderId.
+        """
+        for order in await self.fetch_open_orders(symbol):
+            if order.get('clientOrderId') == client_order_id:
+                return order
+        async with self._request_slot("fetch_orders"):
+            recent_orders = await self.exchange.fetch_orders(symbol=symbol, limit=50)
+        for order in recent_orders:
+            if order.get('clientOrderId') == client_order_id:
+                return order
+        return None
+
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_order_status(self, order_id: str, symbol: str = None):
         """
         Fetches the status of a specific order by its ID.
@@ -357,6 +523,27 @@ class BybitConnector(ExchangeInterface):
                     raise retry_e # Re-raise original error
 
     @map_exchange_errors
+    async def reconcile_orders(self, symbol: str, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolves several orders of a symbol from its open orders and, for the
+        ones no longer open, the account's recent trades. Replaces the per-order
+        fetch_order fallback cascade of get_order_status for the fill monitor.
+        """
+        order_ids = {str(order_id) for order_id in order_ids}
+        if not order_ids:
+            return {}
+
+        open_orders = await self.fetch_open_orders(symbol)
+
+        trades = []
+        if order_ids - {str(o.get('id')) for o in open_orders}:
+            async with self._request_slot("fetch_my_trades"):
+                trades = await self.exchange.fetch_my_trades(symbol=symbol, limit=RECENT_TRADES_LIMIT)
+
+        return build_order_snapshots(order_ids, open_orders, trades, symbol)
+
+    @map_exchange_errors
+    @scheduled(RequestPriority.CANCEL)
     async def cancel_order(self, order_id: str, symbol: str = None):
         """
         Cancels an existing order by its ID with retry logic and status verification.
@@ -436,6 +623,7 @@ class BybitConnector(ExchangeInterface):
              raise OrderCancellationError(f"Failed to cancel order {order_id}: {e}")
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_current_price(self, symbol: str) -> float:
         """
         Fetches the last traded price for a symbol.
@@ -444,6 +632,7 @@ class BybitConnector(ExchangeInterface):
         return ticker['last']
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def get_all_tickers(self):
         """
         Fetches all tickers from the exchange.
@@ -451,6 +640,7 @@ class BybitConnector(ExchangeInterface):
         return await self.exchange.fetch_tickers()
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def fetch_balance(self):
         """
         Fetches the total balance for all assets.
@@ -473,6 +663,7 @@ class BybitConnector(ExchangeInterface):
                     raise e
 
     @map_exchange_errors
+    @scheduled(RequestPriority.STATUS)
     async def fetch_free_balance(self):
         """
         Fetches the free (available) balance for all assets.
@@ -510,6 +701,7 @@ class BybitConnector(ExchangeInterface):
                     logger.error(f"All fetch_free_balance fallbacks failed. Last error: {e3}")
                     raise e
 
+    @scheduled(RequestPriority.STATUS)
     async def fetch_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
         """
         Fetches all currently open orders for a given symbol or all symbols on Bybit.
@@ -528,12 +720,43 @@ class BybitConnector(ExchangeInterface):
                     logger.error(f"All fetch_open_orders fallbacks failed. Last error: {e3}")
                     raise e
 
+    def supports_order_stream(self) -> bool:
+        return True
+
+    def _get_stream_exchange(self):
+        """Get or create the ccxt.pro instance used for the private order stream."""
+        if self._stream_exchange is None:
+            self._stream_exchange = ccxtpro.bybit({
+                **self._exchange_config,
+                'options': dict(self._exchange_config['options'])
+            })
+            if self.testnet_mode:
+                self._stream_exchange.set_sandbox_mode(True)
+        return self._stream_exchange
+
+    @map_exchange_errors
+    async def watch_orders(self, symbol: str = None):
+        """
+        Waits for order updates from Bybit's private 'order' topic.
+        Order IDs are normalized to the native Bybit orderId, matching place_order().
+        """
+        stream = self._get_stream_exchange()
+        orders = await stream.watch_orders(symbol)
+        for order in orders:
+            info = order.get('info') or {}
+            if info.get('orderId'):
+                order['id'] = str(info['orderId'])
+        return orders
+
     async def close(self):
         """
-        Closes the underlying ccxt exchange instance.
+        Closes the underlying ccxt exchange instance and the order stream, if open.
         """
         if self.exchange:
             await self.exchange.close()
+        if self._stream_exchange is not None:
+            await self._stream_exchange.close()
+            self._stream_exchange = None
 
     @map_exchange_errors
     async def get_trading_fee_rate(self, symbol: str = None) -> float:
@@ -561,11 +784,13 @@ class BybitConnector(ExchangeInterface):
             # Fetch from exchange
             if symbol:
                 # Fetch fee for specific symbol
-                fee_info = await self.exchange.fetch_trading_fee(symbol)
+                async with self._request_slot("get_trading_fee_rate"):
+                    fee_info = await self.exchange.fetch_trading_fee(symbol)
                 taker_fee = fee_info.get('taker', DEFAULT_FEE)
             else:
                 # Fetch account-level fees
-                fees = await self.exchange.fetch_trading_fees()
+                async with self._request_slot("get_trading_fee_rate"):
+                    fees = await self.exchange.fetch_trading_fees()
                 # Get first available or default
                 if fees:
                     first_fee = next(iter(fees.values()), {})
@@ -582,6 +807,7 @@ class BybitConnector(ExchangeInterface):
             logger.warning(f"Failed to fetch trading fee from Bybit: {e}. Using default {DEFAULT_FEE}")
             return DEFAULT_FEE
 
+    @scheduled(RequestPriority.CANCEL)
     async def cancel_all_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
         """
         Cancels all open orders for a given symbol or all symbols on Bybit.
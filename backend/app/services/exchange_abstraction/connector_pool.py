@@ -0,0 +1,224 @@
+"""
+Long-lived exchange connector pool for background services.
+
+The factory's connector cache hands out shared instances, but the polling loops
+used to close() them at the end of every cycle, which tore down the ccxt HTTP
+session and forced a new TLS handshake and load_markets() on the next cycle.
+
+ConnectorPool owns connector lifetime instead:
+- One connector per (user, exchange) account, reused across polling cycles
+- Borrowers acquire()/release() instead of closing; borrows are reference counted
+- A change in the user's stored keys retires the old connector and opens a new one
+  (the retired connector is closed once its last borrower releases it)
+- Idle connectors are closed after idle_ttl_seconds
+- Hit/miss/refresh/eviction and open-session metrics for health reporting
+"""
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from app.services.exchange_abstraction.interface import ExchangeInterface
+from app.services.exchange_abstraction.factory import get_exchange_connector
+
+logger = logging.getLogger(__name__)
+
+# Close connectors nobody has borrowed for this long
+DEFAULT_IDLE_TTL_SECONDS = 600
+
+PoolKey = Tuple[str, str]
+
+
+def _config_fingerprint(exchange_config: dict) -> str:
+    """Stable hash of an account's stored exchange config (encrypted keys + options)."""
+    payload = json.dumps(exchange_config or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class _PoolEntry:
+    connector: ExchangeInterface
+    fingerprint: str
+    refcount: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    retired: bool = False
+
+
+class ConnectorPool:
+    """
+    Reference-counted pool of exchange connectors keyed by user and exchange account.
+
+    Usage:
+        connector = await pool.acquire(user.id, "binance", user.encrypted_api_keys["binance"])
+        try:
+            await connector.get_order_status(...)
+        finally:
+            await pool.release(connector)
+    """
+
+    def __init__(self, idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        # Entries by connector identity, including retired ones still borrowed
+        self._by_connector: Dict[int, _PoolEntry] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._key_refreshes = 0
+        self._evictions = 0
+
+    async def acquire(
+        self,
+        user_id,
+        exchange_type: str,
+        exchange_config: dict,
+        connector_factory: Optional[Callable[..., ExchangeInterface]] = None
+    ) -> ExchangeInterface:
+        """
+        Borrow the connector for a user's exchange account, creating it on first use.
+
+        Args:
+            user_id: Owner of the exchange account
+            exchange_type: Exchange name (binance, bybit, mock)
+            exchange_config: The user's stored config for this exchange (encrypted keys)
+            connector_factory: Override for creating connectors (defaults to get_exchange_connector)
+
+        Returns:
+            A connector that must be handed back with release()
+        """
+        exchange_type = exchange_type.lower()
+        key = (str(user_id), exchange_type)
+        fingerprint = _config_fingerprint(exchange_config)
+
+        entry = self._entries.get(key)
+        if entry and entry.fingerprint != fingerprint:
+            # Keys or account options changed - stop handing out the old session
+            logger.info(f"ConnectorPool: Keys changed for user {key[0]} on {exchange_type}, refreshing connector")
+            self._key_refreshes += 1
+            await self._retire(key, entry)
+            entry = None
+
+        if entry:
+            self._hits += 1
+        else:
+            self._misses += 1
+            factory = connector_factory or get_exchange_connector
+            # Pool owns the instance, so bypass the factory's short-lived cache
+            connector = factory(exchange_type, exchange_config=exchange_config, use_cache=False)
+            entry = _PoolEntry(connector=connector, fingerprint=fingerprint)
+            self._entries[key] = entry
+            self._by_connector[id(connector)] = entry
+            logger.debug(f"ConnectorPool: Opened connector for user {key[0]} on {exchange_type}")
+
+        entry.refcount += 1
+        entry.last_used = time.monotonic()
+        return entry.connector
+
+    async def release(self, connector: ExchangeInterface):
+        """
+        Return a borrowed connector. Connectors not owned by the pool are closed.
+        """
+        entry = self._by_connector.get(id(connector))
+        if entry is None or entry.connector is not connector:
+            await self._close_connector(connector)
+            return
+
+        entry.refcount = max(0, entry.refcount - 1)
+        entry.last_used = time.monotonic()
+        if entry.retired and entry.refcount == 0:
+            self._by_connector.pop(id(connector), None)
+            await self._close_connector(connector)
+
+    @asynccontextmanager
+    async def connection(
+        self,
+        user_id,
+        exchange_type: str,
+        exchange_config: dict,
+        connector_factory: Optional[Callable[..., ExchangeInterface]] = None
+    ):
+        """Borrow a connector for the duration of an `async with` block."""
+        connector = await self.acquire(user_id, exchange_type, exchange_config, connector_factory)
+        try:
+            yield connector
+        finally:
+            await self.release(connector)
+
+    async def invalidate(self, user_id, exchange_type: str):
+        """Drop an account's connector (e.g. after its API keys were deleted)."""
+        key = (str(user_id), exchange_type.lower())
+        entry = self._entries.get(key)
+        if entry:
+            await self._retire(key, entry)
+
+    async def evict_idle(self) -> int:
+        """
+        Close connectors that have not been borrowed for idle_ttl_seconds.
+
+        Returns:
+            Number of connectors evicted
+        """
+        now = time.monotonic()
+        idle_keys = [
+            key for key, entry in self._entries.items()
+            if entry.refcount == 0 and now - entry.last_used > self.idle_ttl_seconds
+        ]
+        for key in idle_keys:
+            await self._retire(key, self._entries[key])
+            self._evictions += 1
+        if idle_keys:
+            logger.debug(f"ConnectorPool: Evicted {len(idle_keys)} idle connectors")
+        return len(idle_keys)
+
+    async def close_all(self):
+        """Close every pooled connector. Call on shutdown."""
+        entries = list(self._by_connector.values())
+        self._entries.clear()
+        self._by_connector.clear()
+        for entry in entries:
+            await self._close_connector(entry.connector)
+        logger.info(f"ConnectorPool: Closed {len(entries)} connectors")
+
+    def get_metrics(self) -> dict:
+        """Pool statistics for health reporting."""
+        total = self._hits + self._misses
+        return {
+            "open_sessions": len(self._by_connector),
+            "borrowed": sum(1 for entry in self._by_connector.values() if entry.refcount > 0),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            "key_refreshes": self._key_refreshes,
+            "evictions": self._evictions,
+        }
+
+    async def _retire(self, key: PoolKey, entry: _PoolEntry):
+        """Stop handing out an entry; close it now or when the last borrower releases it."""
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.retired = True
+        if entry.refcount == 0:
+            self._by_connector.pop(id(entry.connector), None)
+            await self._close_connector(entry.connector)
+
+    @staticmethod
+    async def _close_connector(connector: ExchangeInterface):
+        try:
+            await connector.close()
+        except Exception as e:
+            logger.debug(f"ConnectorPool: Error closing connector: {e}")
+
+
+# Shared pool used by the leader's background services
+_connector_pool: Optional[ConnectorPool] = None
+
+
+def get_connector_pool() -> ConnectorPool:
+    """Get the process-wide connector pool."""
+    global _connector_pool
+    if _connector_pool is None:
+        _connector_pool = ConnectorPool()
+    return _connector_pool
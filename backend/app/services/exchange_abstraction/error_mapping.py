@@ -20,11 +20,30 @@ CCXT_ERROR_MAP = {
     ccxt.InsufficientFunds: InsufficientFundsError,
     ccxt.InvalidOrder: OrderValidationError,
     ccxt.RateLimitExceeded: RateLimitError,
+    ccxt.DDoSProtection: RateLimitError,
     ccxt.NetworkError: ExchangeConnectionError,
     ccxt.RequestTimeout: ExchangeConnectionError,
     ccxt.ExchangeError: GenericExchangeError,
 }
 
+def map_exchange_error(e: Exception) -> APIError:
+    """
+    The application exception for an exception raised by a ccxt call.
+    Already mapped exceptions are returned unchanged.
+    """
+    if isinstance(e, APIError):
+        # Already mapped, e.g. a call shed by the request scheduler
+        return e
+    if isinstance(e, (ccxt.ExchangeError, ccxt.DDoSProtection)):
+        for ccxt_exception, app_exception in CCXT_ERROR_MAP.items():
+            if isinstance(e, ccxt_exception):
+                return app_exception(f"{app_exception().message} Original error: {e}")
+        # Fallback for any unmapped ccxt.ExchangeError
+        return GenericExchangeError(f"An unexpected exchange error occurred: {e}")
+    # Any other unexpected exception is wrapped in a generic APIError
+    return APIError(f"An unexpected application error occurred: {e}")
+
+
 def map_exchange_errors(func):
     """
     Decorator to catch ccxt exceptions and re-raise them as custom APIError exceptions.
@@ -33,13 +52,9 @@ def map_exchange_errors(func):
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
-        except ccxt.ExchangeError as e:
-            for ccxt_exception, app_exception in CCXT_ERROR_MAP.items():
-                if isinstance(e, ccxt_exception):
-                    raise app_exception(f"{app_exception().message} Original error: {e}") from e
-            # Fallback for any unmapped ccxt.ExchangeError
-            raise GenericExchangeError(f"An unexpected exchange error occurred: {e}") from e
         except Exception as e:
-            # Catch any other unexpected exceptions and wrap them in a generic APIError
-            raise APIError(f"An unexpected application error occurred: {e}") from e
+            mapped = map_exchange_error(e)
+            if mapped is e:
+                raise
+            raise mapped from e
     return wrapper
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Literal, Optional
+import asyncio
+from typing import Any, Dict, Iterable, List, Literal, Optional
 
 class ExchangeInterface(ABC):
     """
@@ -9,6 +10,15 @@ class ExchangeInterface(ABC):
     async def get_precision_rules(self):
         pass
 
+    async def get_symbol_precision(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Precision rule of one symbol, or None if the exchange does not list it.
+        Connectors backed by the precision index override this to avoid
+        loading every market.
+        """
+        rules = await self.get_precision_rules()
+        return rules.get(symbol) or rules.get(symbol.replace("/", ""))
+
     @abstractmethod
     async def place_order(
         self,
@@ -35,6 +45,52 @@ class ExchangeInterface(ABC):
         """
         pass
 
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Places several orders, each given as place_order() keyword arguments.
+        Returns one entry per order, in the same order: the placed order
+        dictionary, or the exception that order failed with. Connectors with a
+        batch endpoint override this; the default places them concurrently.
+        """
+        return list(await asyncio.gather(
+            *(self.place_order(**order) for order in orders),
+            return_exceptions=True
+        ))
+
+    def supports_trigger_orders(self) -> bool:
+        """
+        Whether this connector can rest conditional orders on the exchange through
+        place_trigger_order(). Without it, TRIGGER_PENDING legs are triggered by
+        the fill monitor comparing prices every poll.
+        """
+        return False
+
+    async def place_trigger_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        trigger_price: float,
+        **kwargs
+    ):
+        """
+        Places a conditional market order that the exchange executes once the
+        price reaches trigger_price: a BUY when the price falls to it, a SELL
+        when the price rises to it (a DCA leg waiting for a better price).
+        Returns the order dictionary like place_order(); the order stays open
+        until triggered.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support trigger orders")
+
+    async def get_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up an order by the client order ID it was placed with (the
+        clientOrderId keyword of place_trigger_order), in the get_order_status()
+        shape. Returns None when the exchange has no such order. Settles a
+        placement whose response was lost to a timeout or a dropped connection.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support client order ID lookups")
+
     @abstractmethod
     async def get_order_status(self):
         """
@@ -70,6 +126,30 @@ class ExchangeInterface(ABC):
         """
         pass
 
+    async def reconcile_orders(self, symbol: str, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Snapshots of several orders of one symbol from a constant number of calls,
+        keyed by exchange order ID, in the same shape as get_order_status().
+        Orders missing from the result could not be resolved in bulk; callers check
+        them with get_order_status(). Connectors without a bulk path resolve none.
+        """
+        return {}
+
+    def supports_order_stream(self) -> bool:
+        """
+        Whether this connector can push order updates through watch_orders().
+        Connectors without a private order stream are reconciled by REST polling only.
+        """
+        return False
+
+    async def watch_orders(self, symbol: str = None) -> list:
+        """
+        Waits for the next batch of order updates from the account's private stream.
+        Returns a list of order dictionaries in the same shape as get_order_status()
+        (at least 'id', 'status', 'filled', 'average' and 'symbol').
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support order streams")
+
     @abstractmethod
     async def close(self):
         """
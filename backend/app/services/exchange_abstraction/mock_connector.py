@@ -3,19 +3,21 @@ Mock Exchange Connector - Enhanced version compatible with the full mock exchang
 Implements the same interface as Binance/Bybit connectors.
 """
 import os
+import json
 import logging
 import hashlib
 import hmac
 import time
 from decimal import Decimal
-from typing import Dict, Optional, Any, TYPE_CHECKING, Literal
+from typing import Dict, Iterable, Optional, Any, TYPE_CHECKING, Literal
 import uuid
 
 if TYPE_CHECKING:
     import httpx
 
 from app.services.exchange_abstraction.interface import ExchangeInterface
-from app.exceptions import ExchangeConnectionError, APIError
+from app.services.exchange_abstraction.order_reconciliation import build_order_snapshots
+from app.exceptions import ExchangeConnectionError, APIError, OrderValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +58,10 @@ class MockConnector(ExchangeInterface):
         # Shared HTTP client to avoid connection pool churn
         self._client: Optional["httpx.AsyncClient"] = None
 
+        # User data stream (WebSocket) - opened lazily by watch_orders()
+        self._ws_session = None
+        self._ws = None
+
         # Error simulation for testing
         self._error_injection: Dict[str, Any] = {}
 
@@ -255,28 +261,101 @@ class MockConnector(ExchangeInterface):
                 raise APIError(f"Order rejected: {error_data.get('detail', error_data)}")
 
             response.raise_for_status()
-            data = response.json()
+            return self._order_from_response(response.json())
 
-            return {
-                "id": str(data["orderId"]),
-                "client_order_id": data.get("clientOrderId"),
-                "symbol": data["symbol"],
-                "side": data["side"].lower(),
-                "type": data["type"].lower(),
-                "quantity": float(data["origQty"]),
-                "price": float(data["price"]),
-                "avg_price": float(data.get("avgPrice", 0)),
-                "status": data["status"].lower(),
-                "filled": float(data.get("executedQty", 0)),
-                "remaining": float(data["origQty"]) - float(data.get("executedQty", 0)),
-                "fee": float(data.get("fee", 0)),
-                "fee_currency": data.get("feeCurrency", "USDT"),
+        except APIError:
+            raise
+        except Exception as e:
+            raise APIError(f"MockConnector place_order failed: {e}")
+
+    def supports_trigger_orders(self) -> bool:
+        return True
+
+    async def place_trigger_order(
+        self,
+        symbol: str,
+        side: str,
+        quantity: Decimal,
+        trigger_price: Decimal,
+        **kwargs
+    ) -> Dict:
+        """
+        Place a TAKE_PROFIT_MARKET order, which the mock exchange fills at market
+        once a BUY's stopPrice is reached from above (a SELL's from below).
+        """
+        self._check_error_injection("place_trigger_order")
+        import httpx
+        try:
+            client = await self._get_client()
+            payload = {
+                "symbol": self._normalize_symbol(symbol),
+                "side": side.upper(),
+                "type": "TAKE_PROFIT_MARKET",
+                "quantity": float(quantity),
+                "stopPrice": float(trigger_price),
+                "timeInForce": None,
+                "newClientOrderId": kwargs.get("clientOrderId"),
             }
 
+            response = await client.post("/fapi/v1/order", json=payload)
+
+            if response.status_code >= 400:
+                error_data = response.json()
+                raise OrderValidationError(f"Order rejected: {error_data.get('detail', error_data)}")
+
+            response.raise_for_status()
+            return self._order_from_response(response.json())
+
         except APIError:
             raise
+        except httpx.TransportError as e:
+            raise ExchangeConnectionError(f"MockConnector place_trigger_order failed: {e}")
         except Exception as e:
-            raise APIError(f"MockConnector place_order failed: {e}")
+            raise APIError(f"MockConnector place_trigger_order failed: {e}")
+
+    async def get_order_by_client_id(self, symbol: str, client_order_id: str) -> Optional[Dict]:
+        self._check_error_injection("get_order_by_client_id")
+        import httpx
+        try:
+            client = await self._get_client()
+            response = await client.get(
+                "/fapi/v1/order",
+                params={"symbol": self._normalize_symbol(symbol), "origClientOrderId": client_order_id}
+            )
+
+            if response.status_code == 400:
+                error_data = response.json()
+                if error_data.get("detail", {}).get("code") == -2013:
+                    return None
+                raise APIError(f"Order query failed: {error_data}")
+
+            response.raise_for_status()
+            return self._order_from_response(response.json())
+
+        except APIError:
+            raise
+        except httpx.TransportError as e:
+            raise ExchangeConnectionError(f"MockConnector get_order_by_client_id failed: {e}")
+        except Exception as e:
+            raise APIError(f"MockConnector get_order_by_client_id failed: {e}")
+
+    @staticmethod
+    def _order_from_response(data: Dict) -> Dict:
+        return {
+            "id": str(data["orderId"]),
+            "client_order_id": data.get("clientOrderId"),
+            "symbol": data["symbol"],
+            "side": data["side"].lower(),
+            "type": data["type"].lower(),
+            "quantity": float(data["origQty"]),
+            "price": float(data["price"]),
+            "avg_price": float(data.get("avgPrice", 0)),
+            "status": data["status"].lower(),
+            "filled": float(data.get("executedQty", 0)),
+            "remaining": float(data["origQty"]) - float(data.get("executedQty", 0)),
+            "fee": float(data.get("fee", 0)),
+            "fee_currency": data.get("feeCurrency", "USDT"),
+        }
 
     async def get_order_status(self, order_id: str, symbol: str = None) -> Dict:
         """
@@ -472,6 +551,9 @@ class MockConnector(ExchangeInterface):
                     "price": float(order["price"]),
                     "quantity": float(order["origQty"]),
                     "filled": float(order.get("executedQty", 0)),
+                    "average": float(order.get("avgPrice") or 0),
+                    "fee": float(order.get("fee") or 0),
+                    "fee_currency": order.get("feeCurrency", "USDT"),
                     "status": order["status"].lower(),
                 }
                 for order in data
@@ -480,6 +562,18 @@ class MockConnector(ExchangeInterface):
         except Exception as e:
             raise APIError(f"MockConnector get_open_orders failed: {e}")
 
+    async def reconcile_orders(self, symbol: str, order_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Resolves the orders still open on the mock exchange from one openOrders call.
+        The mock exchange has no trade history, so orders no longer open are left
+        to get_order_status().
+        """
+        order_ids = list(order_ids)
+        if not order_ids:
+            return {}
+        open_orders = await self.get_open_orders(self._normalize_symbol(symbol))
+        return build_order_snapshots(order_ids, open_orders, [], symbol)
+
     async def get_positions(self, symbol: str = None) -> list:
         """
         Get open positions.
@@ -517,11 +611,88 @@ class MockConnector(ExchangeInterface):
         except Exception as e:
             raise APIError(f"MockConnector get_positions failed: {e}")
 
+    def supports_order_stream(self) -> bool:
+        return True
+
+    async def _get_order_stream(self):
+        """Get or open the WebSocket connection to the mock exchange's /ws/orders feed."""
+        if self._ws is None or self._ws.closed:
+            import aiohttp
+            if self._ws_session is None or self._ws_session.closed:
+                self._ws_session = aiohttp.ClientSession()
+            ws_url = self.base_url.replace("http://", "ws://").replace("https://", "wss://") + "/ws/orders"
+            self._ws = await self._ws_session.ws_connect(
+                ws_url,
+                headers={"X-MBX-APIKEY": self.api_key},
+                heartbeat=30
+            )
+        return self._ws
+
+    @staticmethod
+    def _parse_order_event(event: dict) -> Optional[Dict]:
+        """Convert an ORDER_TRADE_UPDATE event into the get_order_status() shape."""
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return None
+        o = event.get("o", {})
+        avg_price = float(o.get("ap", 0) or 0)
+        price = float(o.get("p", 0) or 0)
+        return {
+            "id": str(o["i"]),
+            "symbol": o.get("s"),
+            "status": str(o.get("X", "")).lower(),
+            "filled": float(o.get("z", 0) or 0),
+            "price": avg_price or price,
+            "average": avg_price or price,
+            "quantity": float(o.get("q", 0) or 0),
+            "fee": float(o.get("n", 0) or 0),
+            "fee_currency": o.get("N", "USDT"),
+        }
+
+    async def watch_orders(self, symbol: str = None) -> list:
+        """
+        Wait for the next order update pushed by the mock exchange.
+
+        Args:
+            symbol: Optional symbol filter
+
+        Returns:
+            List with the updated order(s), same shape as get_order_status()
+        """
+        import aiohttp
+        try:
+            ws = await self._get_order_stream()
+            while True:
+                msg = await ws.receive()
+                if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                    self._ws = None
+                    raise ExchangeConnectionError("Mock exchange order stream closed")
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+
+                order = self._parse_order_event(json.loads(msg.data))
+                if order is None:
+                    continue
+                if symbol and order["symbol"] != self._normalize_symbol(symbol):
+                    continue
+                return [order]
+
+        except ExchangeConnectionError:
+            raise
+        except Exception as e:
+            self._ws = None
+            raise ExchangeConnectionError(f"MockConnector watch_orders failed: {e}")
+
     async def close(self):
-        """Cleanup the shared HTTP client."""
+        """Cleanup the shared HTTP client and the order stream."""
         if self._client is not None:
             await self._client.aclose()
             self._client = None
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        if self._ws_session is not None:
+            await self._ws_session.close()
+            self._ws_session = None
 
     async def get_trading_fee_rate(self, symbol: str = None) -> float:
         """
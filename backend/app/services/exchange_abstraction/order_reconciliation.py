@@ -0,0 +1,108 @@
+"""
+Bulk order reconciliation from one open-orders and one recent-trades fetch.
+
+Checking orders one by one costs a fetch_order per leg, and on Bybit a cascade
+of fallbacks for orders the endpoint no longer returns. Per symbol the open
+orders and the account's recent trades describe every order that is still
+working or has just filled:
+
+- An order listed as open is taken as is (status, filled, average)
+- An order that is not open but has trades is reported as closed, with its
+  filled quantity, average price and fees summed from the trades
+- Anything else is left out; the caller checks it individually
+
+Trades only cover the recent history, so an order with fewer traded units than
+its quantity may have older fills or have been cancelled after a partial fill.
+Callers compare the filled quantity with their own record before trusting a
+trade-derived snapshot (see OrderService.check_order_status).
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+# Trades per symbol fetched for a reconciliation; a cycle runs every few seconds
+RECENT_TRADES_LIMIT = 100
+
+SOURCE_OPEN_ORDERS = "open_orders"
+SOURCE_TRADES = "trades"
+
+
+def _order_ids_of(entry: Dict[str, Any], *keys: str) -> List[str]:
+    info = entry.get("info") or {}
+    ids = [entry.get(key) for key in keys] + [info.get("orderId")]
+    return [str(i) for i in ids if i]
+
+
+def _aggregate_trades(order_id: str, symbol: Optional[str], trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+    filled = Decimal("0")
+    cost = Decimal("0")
+    fees: Dict[Optional[str], Decimal] = {}
+    for trade in trades:
+        amount = Decimal(str(trade.get("amount") or 0))
+        price = Decimal(str(trade.get("price") or 0))
+        filled += amount
+        cost += Decimal(str(trade.get("cost") or amount * price))
+        fee = trade.get("fee") or {}
+        if fee.get("cost"):
+            currency = fee.get("currency")
+            fees[currency] = fees.get(currency, Decimal("0")) + Decimal(str(fee["cost"]))
+
+    fee = None
+    if len(fees) == 1:
+        currency, fee_cost = next(iter(fees.items()))
+        fee = {"cost": float(fee_cost), "currency": currency}
+
+    return {
+        "id": order_id,
+        "symbol": symbol,
+        "status": "closed",
+        "filled": float(filled),
+        "average": float(cost / filled) if filled else 0.0,
+        "cost": float(cost),
+        "fee": fee,
+        "info": {},
+        "reconciled_from": SOURCE_TRADES,
+    }
+
+
+def build_order_snapshots(
+    order_ids: Iterable[str],
+    open_orders: List[Dict[str, Any]],
+    trades: List[Dict[str, Any]],
+    symbol: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshots in the get_order_status() shape for the requested order IDs that
+    appear in the open orders or the trades, keyed by the requested ID.
+    """
+    wanted = {str(order_id) for order_id in order_ids}
+    snapshots: Dict[str, Dict[str, Any]] = {}
+
+    for order in open_orders:
+        for order_id in _order_ids_of(order, "id", "clientOrderId"):
+            if order_id in wanted:
+                snapshots[order_id] = {**order, "reconciled_from": SOURCE_OPEN_ORDERS}
+                break
+
+    trades_by_order: Dict[str, List[Dict[str, Any]]] = {}
+    for trade in trades:
+        for order_id in _order_ids_of(trade, "order"):
+            if order_id in wanted and order_id not in snapshots:
+                trades_by_order.setdefault(order_id, []).append(trade)
+                break
+
+    for order_id, order_trades in trades_by_order.items():
+        snapshots[order_id] = _aggregate_trades(order_id, symbol, order_trades)
+
+    return snapshots
+
+
+def is_conclusive(snapshot: Dict[str, Any], quantity: Optional[Decimal] = None) -> bool:
+    """
+    Whether a snapshot settles the order without an individual fetch: always for
+    open orders, for trade-derived ones only when the trades cover the quantity.
+    """
+    if snapshot.get("reconciled_from") != SOURCE_TRADES:
+        return True
+    if quantity is None:
+        return False
+    return Decimal(str(snapshot.get("filled") or 0)) >= quantity
@@ -0,0 +1,188 @@
+"""
+Symbol-level index of exchange precision rules.
+
+Validating one webhook symbol used to decode the rules of every market of the
+exchange, cached as one blob that held each rule twice (unified symbol and
+market id). The index keeps one record per symbol instead:
+
+- Redis: a hash per exchange with one field per normalized symbol, so a worker
+  without a table can read the single symbol it needs.
+- Memory: a compiled PrecisionTable per exchange, served without a Redis round
+  trip. A table older than the refresh interval keeps being served while one
+  background task per exchange reloads it from the exchange's markets.
+"""
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.cache import CacheService, get_cache, normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+# Markets are reloaded in the background once the table is this old
+REFRESH_INTERVAL_SECONDS = 6 * 3600
+
+PrecisionLoader = Callable[[], Awaitable[Dict[str, dict]]]
+
+
+class SymbolPrecision(dict):
+    """
+    A symbol's rule dict (floats, as connectors always returned it), with the
+    Decimal values compiled once as attributes.
+    """
+    __slots__ = ("tick_size", "step_size", "min_qty", "min_notional")
+
+    def __init__(self, rule: dict):
+        super().__init__(rule)
+        for field in self.__slots__:
+            value = rule.get(field)
+            setattr(self, field, Decimal(str(value)) if value is not None else None)
+
+
+class PrecisionTable(dict):
+    """Rules by normalized symbol; lookups accept any spelling of the symbol."""
+
+    def __init__(self, rules: Dict[str, dict], loaded_at: Optional[float] = None):
+        super().__init__((normalize_symbol(symbol), SymbolPrecision(rule)) for symbol, rule in rules.items())
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+
+    def __getitem__(self, symbol: str) -> SymbolPrecision:
+        return super().__getitem__(normalize_symbol(symbol))
+
+    def __contains__(self, symbol) -> bool:
+        return isinstance(symbol, str) and super().__contains__(normalize_symbol(symbol))
+
+    def get(self, symbol, default=None):
+        if not isinstance(symbol, str):
+            return default
+        return super().get(normalize_symbol(symbol), default)
+
+
+class PrecisionIndex:
+    """Per-process compiled precision tables, keyed by exchange cache key."""
+
+    def __init__(self, refresh_interval_seconds: float = REFRESH_INTERVAL_SECONDS):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._tables: Dict[str, PrecisionTable] = {}
+        self._loads: Dict[str, asyncio.Task] = {}
+        # Bumped on invalidation so loads that raced with it are not installed
+        self._generations: Dict[str, int] = {}
+        self._cache: Optional[CacheService] = None
+
+        self._market_loads = 0
+        self._redis_loads = 0
+        self._symbol_reads = 0
+        self._load_failures = 0
+
+    async def get_table(self, exchange: str, loader: PrecisionLoader) -> PrecisionTable:
+        """The compiled table of an exchange, loading it on first use."""
+        table = self._tables.get(exchange)
+        if table is None:
+            return await asyncio.shield(self._start_load(exchange, loader))
+        if time.time() - table.loaded_at > self.refresh_interval_seconds:
+            self._start_load(exchange, loader)
+        return table
+
+    async def get_symbol(self, exchange: str, symbol: str, loader: PrecisionLoader) -> Optional[SymbolPrecision]:
+        """
+        The rule of one symbol. A worker without a table reads the symbol's
+        field from Redis and warms the table in the background.
+        """
+        if exchange not in self._tables:
+            cache = await self._get_cache()
+            rule = await cache.get_symbol_precision(exchange, symbol)
+            if rule is not None:
+                self._symbol_reads += 1
+                self._start_load(exchange, loader)
+                return SymbolPrecision(rule)
+        return (await self.get_table(exchange, loader)).get(symbol)
+
+    def invalidate(self, exchange: str):
+        self._generations[exchange] = self._generations.get(exchange, 0) + 1
+        self._tables.pop(exchange, None)
+
+    def handle_invalidation(self, namespace: str, key_prefix: str):
+        """CacheService listener: precision rules were invalidated here or on another worker."""
+        if namespace != CacheService.PREFIX_PRECISION:
+            return
+        for exchange in set(self._tables) | set(self._loads):
+            if f"{CacheService.PREFIX_PRECISION}:{exchange}".startswith(key_prefix):
+                self.invalidate(exchange)
+
+    async def _get_cache(self) -> CacheService:
+        cache = await get_cache()
+        if cache is not self._cache:
+            cache.add_invalidation_listener(self.handle_invalidation)
+            self._cache = cache
+        return cache
+
+    def _start_load(self, exchange: str, loader: PrecisionLoader) -> asyncio.Task:
+        """One load per exchange at a time; concurrent callers share it."""
+        task = self._loads.get(exchange)
+        if task is None:
+            task = asyncio.create_task(self._load(exchange, loader, self._generations.get(exchange, 0)))
+            self._loads[exchange] = task
+            task.add_done_callback(lambda done: self._load_done(exchange, done))
+        return task
+
+    def _load_done(self, exchange: str, task: asyncio.Task):
+        if self._loads.get(exchange) is task:
+            del self._loads[exchange]
+        if not task.cancelled() and task.exception() is not None:
+            self._load_failures += 1
+            if exchange in self._tables:
+                logger.warning(f"Precision index: refresh for {exchange} failed, serving rules loaded at "
+                               f"{self._tables[exchange].loaded_at:.0f}: {task.exception()}")
+
+    async def _load(self, exchange: str, loader: PrecisionLoader, generation: int) -> PrecisionTable:
+        cache = await self._get_cache()
+
+        # Another worker may already have reloaded the markets
+        stored = await cache.get_precision_index(exchange)
+        current = self._tables.get(exchange)
+        if stored and time.time() - stored["loaded_at"] < self.refresh_interval_seconds \
+                and (current is None or stored["loaded_at"] > current.loaded_at):
+            table = PrecisionTable(stored["rules"], stored["loaded_at"])
+            self._redis_loads += 1
+        else:
+            rules = await loader()
+            table = PrecisionTable(rules)
+            await cache.set_precision_index(exchange, rules, table.loaded_at)
+            self._market_loads += 1
+            logger.info(f"Precision index: loaded {len(table)} symbols for {exchange}")
+
+        if generation == self._generations.get(exchange, 0):
+            self._tables[exchange] = table
+        return table
+
+    def get_metrics(self) -> dict:
+        now = time.time()
+        return {
+            "exchanges": {
+                exchange: {"symbols": len(table), "age_seconds": round(now - table.loaded_at)}
+                for exchange, table in self._tables.items()
+            },
+            "market_loads": self._market_loads,
+            "redis_loads": self._redis_loads,
+            "symbol_reads": self._symbol_reads,
+            "load_failures": self._load_failures,
+            "refreshing": sorted(self._loads),
+        }
+
+
+_precision_index: Optional[PrecisionIndex] = None
+
+
+def get_precision_index() -> PrecisionIndex:
+    global _precision_index
+    if _precision_index is None:
+        _precision_index = PrecisionIndex()
+    return _precision_index
+
+
+def reset_precision_index():
+    """Drop all compiled tables (used by tests)."""
+    global _precision_index
+    _precision_index = None
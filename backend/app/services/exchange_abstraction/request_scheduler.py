@@ -0,0 +1,413 @@
+"""
+Shared scheduler for REST calls to an exchange.
+
+Every connector instance used to rely on its own ccxt rate limiter, so the fill
+monitor, risk engine, queue promotion, dashboard and signal router each believed
+they had the full budget. Bursts from several callers ended in 429s and 418 bans
+that tripped the exchange circuit breaker. All connectors of a process now take
+their budget from one scheduler per exchange host:
+
+- Request weight follows the exchange's own accounting: Binance counts weight
+  per IP (6000 per minute, fetch_tickers costs 80), Bybit counts requests per IP
+  (600 per 5 seconds). Order placements are additionally limited per account
+- Calls are served by priority: order placement > cancels > status polls >
+  dashboard reads. Lower classes may only use part of the budget, so reads
+  queue up before they can starve orders
+- A call whose expected wait exceeds its class's limit is shed with a
+  RateLimitError instead of joining a queue it cannot leave in time
+- Binance reports the weight used by the IP in x-mbx-used-weight-1m; the
+  scheduler adopts it, which also accounts for the other worker processes
+- A 429/418 pauses the whole host until its Retry-After has passed
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import wraps
+from typing import Deque, Dict, Optional, Tuple
+
+import ccxt
+
+from app.exceptions import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Priority classes; lower values are served first."""
+    ORDER = 0
+    CANCEL = 1
+    STATUS = 2
+    READ = 3
+
+
+@dataclass(frozen=True)
+class PriorityPolicy:
+    budget_share: float       # Share of the weight budget the class may fill
+    max_wait_seconds: float   # Calls expected to wait longer are shed
+
+
+PRIORITY_POLICIES: Dict[RequestPriority, PriorityPolicy] = {
+    RequestPriority.ORDER: PriorityPolicy(budget_share=1.0, max_wait_seconds=60),
+    RequestPriority.CANCEL: PriorityPolicy(budget_share=1.0, max_wait_seconds=60),
+    RequestPriority.STATUS: PriorityPolicy(budget_share=0.9, max_wait_seconds=15),
+    RequestPriority.READ: PriorityPolicy(budget_share=0.7, max_wait_seconds=2),
+}
+
+
+@dataclass(frozen=True)
+class RateLimitProfile:
+    weight_limit: int
+    window_seconds: float
+    order_limit: int
+    order_window_seconds: float
+    weights: Dict[str, int] = field(default_factory=dict)
+    used_weight_header: Optional[str] = None
+    default_retry_after_seconds: float = 30
+
+
+EXCHANGE_PROFILES: Dict[str, RateLimitProfile] = {
+    "binance": RateLimitProfile(
+        weight_limit=6000,
+        window_seconds=60,
+        order_limit=100,
+        order_window_seconds=10,
+        # Spot REQUEST_WEIGHT of the endpoint behind each connector method
+        weights={
+            "get_precision_rules": 20,
+            "place_order": 1,
+            "get_order_status": 4,
+            "cancel_order": 1,
+            "get_current_price": 2,
+            "get_all_tickers": 80,
+            "fetch_balance": 20,
+            "fetch_free_balance": 20,
+            "get_trading_fee_rate": 1,
+            "fetch_open_orders": 6,
+            "fetch_my_trades": 20,
+            # Futures batchOrders
+            "create_orders": 5,
+        },
+        used_weight_header="x-mbx-used-weight-1m",
+    ),
+    "bybit": RateLimitProfile(
+        weight_limit=600,
+        window_seconds=5,
+        order_limit=10,
+        order_window_seconds=1,
+    ),
+}
+
+
+# Priority set by the caller for every exchange call in its context
+_priority_override: ContextVar[Optional[RequestPriority]] = ContextVar("exchange_request_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """
+    Demote exchange calls made inside the block to at least this priority.
+    A call never runs above the class of its connector method.
+    """
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def read_priority(func):
+    """Endpoint decorator: exchange calls made while serving it are dashboard reads."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with request_priority(RequestPriority.READ):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def effective_priority(priority: RequestPriority) -> RequestPriority:
+    override = _priority_override.get()
+    if override is None:
+        return priority
+    return max(priority, override)
+
+
+def account_key(api_key: str) -> str:
+    """Identifier of an exchange account that does not expose its API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class _SlidingWindow:
+    """Weight spent during the last window_seconds."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._entries: Deque[Tuple[float, int]] = deque()
+        self._used = 0
+
+    def used(self, now: float) -> int:
+        while self._entries and self._entries[0][0] + self.window_seconds <= now:
+            self._used -= self._entries.popleft()[1]
+        return self._used
+
+    def add(self, now: float, weight: int):
+        self._entries.append((now, weight))
+        self._used += weight
+
+    def delay(self, now: float, weight: int, ceiling: float) -> float:
+        """Seconds until weight fits under ceiling."""
+        # A call heavier than the ceiling runs once the window is empty
+        ceiling = max(ceiling, weight)
+        excess = self.used(now) + weight - ceiling
+        if excess <= 0:
+            return 0.0
+        for timestamp, entry_weight in self._entries:
+            excess -= entry_weight
+            if excess <= 0:
+                return timestamp + self.window_seconds - now
+        return 0.0
+
+
+class RequestScheduler:
+    """
+    Admission control for the REST calls of every connector on one exchange host.
+    """
+
+    def __init__(self, exchange: str, profile: RateLimitProfile, clock=time.monotonic):
+        self.exchange = exchange
+        self.profile = profile
+        self._clock = clock
+
+        self._weights = _SlidingWindow(profile.window_seconds)
+        self._orders: Dict[str, _SlidingWindow] = {}
+        self._reported_used = 0
+        self._reported_until = 0.0
+        self._paused_until = 0.0
+
+        self._loop = None
+        self._condition = None
+        self._waiters = []
+        self._sequence = itertools.count()
+
+        self._admitted = 0
+        self._shed = 0
+        self._throttled = 0
+        self._total_wait_seconds = 0.0
+
+    def weight_of(self, endpoint: str) -> int:
+        return self.profile.weights.get(endpoint, 1)
+
+    # ==================== Admission ====================
+
+    def _weight_delay(self, priority: RequestPriority, weight: int, now: float) -> float:
+        if now < self._paused_until:
+            return self._paused_until - now
+        ceiling = self.profile.weight_limit * PRIORITY_POLICIES[priority].budget_share
+        delay = self._weights.delay(now, weight, ceiling)
+        if now < self._reported_until and self._reported_used + weight > max(ceiling, weight):
+            # Weight reported by the exchange is only released with its window
+            delay = max(delay, self._reported_until - now)
+        return delay
+
+    def _shed_if_too_slow(self, priority: RequestPriority, waited: float, delay: float, endpoint: str):
+        max_wait = PRIORITY_POLICIES[priority].max_wait_seconds
+        if waited >= max_wait or waited + delay > max_wait:
+            self._shed += 1
+            logger.warning(
+                f"RequestScheduler[{self.exchange}]: Shedding {priority.name} call {endpoint} "
+                f"(expected wait {waited + delay:.1f}s)"
+            )
+            raise RateLimitError(
+                f"Exchange request budget exhausted for {self.exchange}; {endpoint} was not sent."
+            )
+
+    async def _acquire_order_slot(self, account: str, start: float, endpoint: str, orders: int = 1):
+        window = self._orders.setdefault(account, _SlidingWindow(self.profile.order_window_seconds))
+        while True:
+            now = self._clock()
+            delay = window.delay(now, orders, self.profile.order_limit)
+            if delay <= 0:
+                window.add(now, orders)
+                return
+            self._shed_if_too_slow(RequestPriority.ORDER, now - start, delay, endpoint)
+            await asyncio.sleep(delay)
+
+    async def acquire(
+        self,
+        endpoint: str,
+        priority: RequestPriority,
+        account: Optional[str] = None,
+        weight: Optional[int] = None,
+        orders: int = 1
+    ) -> float:
+        """
+        Wait until the call fits its class's budget and every higher priority
+        caller has been served. Returns the seconds spent waiting.
+        ORDER calls count `orders` against the account's order rate (batch calls).
+
+        Raises:
+            RateLimitError: If the call would wait longer than its class allows
+        """
+        weight = self.weight_of(endpoint) if weight is None else weight
+        start = self._clock()
+
+        if priority == RequestPriority.ORDER and account is not None:
+            await self._acquire_order_slot(account, start, endpoint, orders)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives are bound to the loop that first waits on them
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self._waiters = []
+
+        ticket = (int(priority), next(self._sequence))
+        async with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    delay = self._weight_delay(priority, weight, now)
+                    if delay <= 0 and self._waiters[0] == ticket:
+                        heapq.heappop(self._waiters)
+                        self._weights.add(now, weight)
+                        if now < self._reported_until:
+                            self._reported_used += weight
+                        waited = now - start
+                        self._admitted += 1
+                        self._total_wait_seconds += waited
+                        self._condition.notify_all()
+                        return waited
+
+                    self._shed_if_too_slow(priority, now - start, delay, endpoint)
+                    # The head sleeps until its budget frees up; callers behind it are
+                    # woken when it leaves, or when they have to give up
+                    if self._waiters[0] == ticket:
+                        timeout = delay
+                    else:
+                        timeout = PRIORITY_POLICIES[priority].max_wait_seconds - (now - start)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        endpoint: str,
+        priority: RequestPriority,
+        account: Optional[str] = None,
+        exchange=None,
+        orders: int = 1
+    ):
+        """
+        Admit one call and learn from its response: the reported weight on
+        success, a pause on 429/418.
+        """
+        await self.acquire(endpoint, effective_priority(priority), account, orders=orders)
+        try:
+            yield
+        except ccxt.DDoSProtection as e:
+            # RateLimitExceeded (429) and IP bans (418) both derive from DDoSProtection
+            self.pause(self._retry_after(exchange), reason=str(e))
+            raise
+        self.observe_headers(getattr(exchange, "last_response_headers", None))
+
+    # ==================== Feedback ====================
+
+    def observe_headers(self, headers):
+        """Adopt the weight the exchange reports as used by this IP."""
+        header = self.profile.used_weight_header
+        if not header or not isinstance(headers, dict):
+            return
+        value = next((v for k, v in headers.items() if k.lower() == header), None)
+        try:
+            used = int(value)
+        except (TypeError, ValueError):
+            return
+        self._reported_used = used
+        # Binance windows are aligned to wall-clock minutes
+        wall = time.time()
+        remaining = self.profile.window_seconds - (wall % self.profile.window_seconds)
+        self._reported_until = self._clock() + remaining
+
+    def _retry_after(self, exchange) -> float:
+        headers = getattr(exchange, "last_response_headers", None)
+        if isinstance(headers, dict):
+            value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                pass
+        return self.profile.default_retry_after_seconds
+
+    def pause(self, seconds: float, reason: str = ""):
+        """Stop admitting calls to this host for the given time."""
+        self._throttled += 1
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        logger.warning(f"RequestScheduler[{self.exchange}]: Throttled by exchange, pausing {seconds:.0f}s. {reason}")
+
+    def get_metrics(self) -> dict:
+        now = self._clock()
+        return {
+            "exchange": self.exchange,
+            "used_weight": self._weights.used(now),
+            "reported_used_weight": self._reported_used if now < self._reported_until else None,
+            "weight_limit": self.profile.weight_limit,
+            "queued": len(self._waiters),
+            "admitted": self._admitted,
+            "shed": self._shed,
+            "throttled": self._throttled,
+            "paused_seconds": max(0.0, self._paused_until - now),
+            "avg_wait_seconds": self._total_wait_seconds / self._admitted if self._admitted else 0.0,
+        }
+
+
+def scheduled(priority: RequestPriority):
+    """
+    Connector method decorator: run the call through the connector's scheduler.
+    Place it below map_exchange_errors so raw ccxt errors reach the scheduler.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            scheduler = getattr(self, "request_scheduler", None)
+            if scheduler is None:
+                return await func(self, *args, **kwargs)
+            async with scheduler.slot(func.__name__, priority, getattr(self, "account_key", None), self.exchange):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+
+
+def get_request_scheduler(exchange: str, testnet: bool = False) -> RequestScheduler:
+    """Scheduler shared by every connector of this process talking to the exchange host."""
+    exchange = exchange.lower()
+    key = f"{exchange}:{'testnet' if testnet else 'live'}"
+    if key not in _schedulers:
+        _schedulers[key] = RequestScheduler(key, EXCHANGE_PROFILES[exchange])
+    return _schedulers[key]
+
+
+def get_all_scheduler_metrics() -> Dict[str, dict]:
+    return {key: scheduler.get_metrics() for key, scheduler in _schedulers.items()}
+
+
+def reset_request_schedulers():
+    """Drop all schedulers (used by tests)."""
+    _schedulers.clear()
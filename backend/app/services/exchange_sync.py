@@ -189,6 +189,9 @@ class ExchangeSyncService:
                             order.filled_at = datetime.utcnow()
 
                     await self.dca_order_repo.update(order)
+                    if order.ledger_applied is True:
+                        from app.services.position.position_ledger import invalidate_ledger
+                        await invalidate_ledger(self.session, order.group_id)
                     logger.info(
                         f"Order {order.id} status updated: {detail['old_status']} -> {new_local_status}"
                     )
@@ -1,61 +1,243 @@
 """
 Service for managing the execution pool, limiting the number of active position groups.
+
+Each user's pool is a counting semaphore in Redis: admission atomically checks
+the reconciled count of live groups plus outstanding leases against the limit
+and takes a lease, so concurrent webhooks cannot over-admit. A lease becomes an
+occupied slot once its position group exists. Closed groups are picked up by a
+per-user recount when a request is denied and by the periodic reconciliation.
 """
 import asyncio
 import logging
-from typing import Optional, Callable # Added Callable
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 
-from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.repositories.position_group import PositionGroupRepository
 
 logger = logging.getLogger(__name__)
 
+# Reconciliation retries when an admission lands between reading the DB and writing the count
+MAX_RECONCILE_ATTEMPTS = 3
+
+
+@dataclass
+class PoolSlot:
+    """A granted admission; hand it back through release_slot once the signal ran."""
+    user_id: str
+    lease_id: Optional[str] = None  # None when granted by the DB fallback without Redis
+
+
 class ExecutionPoolManager:
     def __init__(
         self,
-        session_factory: Callable[..., AsyncSession], # Changed to session_factory
+        session_factory: Callable[..., AsyncSession],
         position_group_repository_class: type[PositionGroupRepository],
-        max_open_groups: int = 10
+        max_open_groups: int = 10,
+        lease_ttl_seconds: int = 120,
+        reconcile_interval_seconds: int = 60,
+        shard_coordinator=None,
+        cache=None
     ):
-        self.session_factory = session_factory # Stored session_factory
+        self.session_factory = session_factory
         self.position_group_repository_class = position_group_repository_class
         self.max_open_groups = max_open_groups
-        # self.repo will be instantiated per session in methods
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self.shard_coordinator = shard_coordinator
+        self._cache = cache
+        self._running = False
+        self._reconcile_task: Optional[asyncio.Task] = None
 
+        self._granted = 0
+        self._denied = 0
+        self._recounts = 0
+        self._fallbacks = 0
+        self._reconciliations = 0
+        self._reconcile_conflicts = 0
+        self._occupancy: Dict[str, dict] = {}
 
-    async def get_current_pool_size(self, for_update: bool = False) -> int:
+    async def _get_cache(self):
+        if self._cache is None:
+            from app.core.cache import get_cache
+            self._cache = await get_cache()
+        return self._cache
+
+    async def get_current_pool_size(self, user_id: uuid.UUID) -> int:
         """
-        Returns the current number of active position groups in the pool.
+        Returns the number of active position groups of a user, read from the database.
         """
         async with self.session_factory() as session:
             repo = self.position_group_repository_class(session)
-            active_statuses = [PositionGroupStatus.LIVE.value, PositionGroupStatus.PARTIALLY_FILLED.value, PositionGroupStatus.ACTIVE.value, PositionGroupStatus.CLOSING.value]
-            # Always call with for_update=False for aggregate functions like count
-            count = await repo.count_by_status(active_statuses, for_update=False)
-            logger.info(f"ExecutionPoolManager: Counted {count} active groups with statuses {active_statuses}")
-            return count
+            counts = await repo.count_active_by_user(user_id)
+            return counts.get(user_id, 0)
 
-    async def request_slot(self, max_open_groups_override: Optional[int] = None) -> bool:
+    async def request_slot(
+        self,
+        user_id: uuid.UUID,
+        max_open_groups_override: Optional[int] = None
+    ) -> Optional[PoolSlot]:
         """
-        Requests a slot in the execution pool.
-        Returns True if a slot is granted, False otherwise.
+        Requests a slot in the user's execution pool.
+        Returns a PoolSlot if granted, None otherwise. A granted slot must be
+        passed to release_slot after the signal was executed (or abandoned).
 
         Note: Pyramid continuation bypass is handled at the signal routing level
         via the `same_pair_timeframe` priority rule configuration, not here.
         When the rule is enabled, pyramids skip calling this method entirely.
 
         Args:
+            user_id: Owner of the pool
             max_open_groups_override: Optional override for max open groups limit
         """
-        current_size = await self.get_current_pool_size(for_update=True)
         limit = max_open_groups_override if max_open_groups_override is not None else self.max_open_groups
+        pool = str(user_id)
+        lease_id = str(uuid.uuid4())
+        cache = await self._get_cache()
 
-        logger.info(f"ExecutionPoolManager: Requesting slot. Current: {current_size}, Max: {limit}")
+        result = await cache.acquire_pool_slot(pool, lease_id, limit, self.lease_ttl_seconds)
+        if result is not None and result[0] != 1:
+            # Unreconciled, or full with a count that may still include closed groups
+            await self._reconcile_user(user_id)
+            self._recounts += 1
+            result = await cache.acquire_pool_slot(pool, lease_id, limit, self.lease_ttl_seconds)
+
+        if result is None:
+            # Redis unavailable: fall back to a (non-atomic) database count
+            self._fallbacks += 1
+            used = await self.get_current_pool_size(user_id)
+            granted = used < limit
+            slot = PoolSlot(user_id=pool) if granted else None
+        else:
+            granted, used = result[0] == 1, result[1]
+            slot = PoolSlot(user_id=pool, lease_id=lease_id) if granted else None
 
-        if current_size < limit:
-            return True
+        logger.info(f"ExecutionPoolManager: Slot {'granted' if granted else 'denied'} for user {user_id}. Used: {used}, Max: {limit}")
+        if granted:
+            self._granted += 1
         else:
-            return False
+            self._denied += 1
+        self._occupancy[pool] = {"used": used, "limit": limit}
+        return slot
+
+    async def release_slot(self, slot: Optional[PoolSlot], occupied: bool = False):
+        """
+        Returns a slot's lease. With occupied=True the slot stays taken by the
+        position group the admission created, until the group is reconciled away.
+        """
+        if slot is None or slot.lease_id is None:
+            return
+        cache = await self._get_cache()
+        await cache.release_pool_slot(slot.user_id, slot.lease_id, occupied=occupied)
+
+    async def _reconcile_user(self, user_id: uuid.UUID):
+        cache = await self._get_cache()
+        pool = str(user_id)
+        for _ in range(MAX_RECONCILE_ATTEMPTS):
+            state = await cache.get_pool_state(pool)
+            if state is None:
+                return
+            count = await self.get_current_pool_size(user_id)
+            if await cache.set_pool_occupied(pool, count, state["version"]):
+                return
+            self._reconcile_conflicts += 1
+
+    async def reconcile(self):
+        """
+        Resets every pool's occupancy to the live groups in the database, so
+        groups closed anywhere in the engine free their slots.
+        """
+        cache = await self._get_cache()
+        async with self.session_factory() as session:
+            repo = self.position_group_repository_class(session)
+            pools = {str(user_id) for user_id in await repo.count_active_by_user()}
+
+        # Users whose last group closed no longer show up in the count
+        pools = sorted(pools | set(self._occupancy))
+        if self.shard_coordinator is not None:
+            pools = self.shard_coordinator.filter_owned(pools)
+
+        # Versions are read before the count so admissions in between are detected
+        states = {}
+        for pool in pools:
+            state = await cache.get_pool_state(pool)
+            if state is not None:
+                states[pool] = state
+
+        async with self.session_factory() as session:
+            repo = self.position_group_repository_class(session)
+            counts = {str(user_id): count for user_id, count in (await repo.count_active_by_user()).items()}
+
+        for pool, state in states.items():
+            count = counts.get(pool, 0)
+            if not await cache.set_pool_occupied(pool, count, state["version"]):
+                self._reconcile_conflicts += 1
+                await self._reconcile_user(uuid.UUID(pool))
+                continue
+            limit = self._occupancy.get(pool, {}).get("limit", self.max_open_groups)
+            self._occupancy[pool] = {"used": count + state["leases"], "limit": limit}
+        self._reconciliations += 1
+
+    async def start_reconciliation_task(self):
+        self._running = True
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+        logger.info("Execution pool reconciliation task started")
+
+    async def stop_reconciliation_task(self):
+        self._running = False
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+        logger.info("Execution pool reconciliation task stopped")
+
+    async def _reconcile_loop(self):
+        while self._running:
+            try:
+                await self.reconcile()
+                await self._report_health("running", self.get_metrics())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ExecutionPoolManager: Reconciliation failed: {e}")
+                await self._report_health("error", {**self.get_metrics(), "last_error": str(e)})
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+    def get_metrics(self) -> dict:
+        full = sum(1 for pool in self._occupancy.values() if pool["used"] >= pool["limit"])
+        return {
+            "granted": self._granted,
+            "denied": self._denied,
+            "recounts": self._recounts,
+            "fallbacks": self._fallbacks,
+            "reconciliations": self._reconciliations,
+            "reconcile_conflicts": self._reconcile_conflicts,
+            "pools": len(self._occupancy),
+            "full_pools": full,
+            "occupied_slots": sum(pool["used"] for pool in self._occupancy.values()),
+        }
+
+    async def _report_health(self, status: str, metrics: dict = None):
+        try:
+            cache = await self._get_cache()
+            await cache.update_service_health("execution_pool", status, metrics)
+        except Exception as e:
+            logger.debug(f"Failed to report health: {e}")
+
+
+# Shared by the API and background workers so counters cover every admission
+_execution_pool_manager: Optional[ExecutionPoolManager] = None
+
+
+def get_execution_pool_manager() -> Optional[ExecutionPoolManager]:
+    return _execution_pool_manager
+
+
+def set_execution_pool_manager(manager: Optional[ExecutionPoolManager]):
+    global _execution_pool_manager
+    _execution_pool_manager = manager
@@ -0,0 +1,256 @@
+"""
+Shared in-process market data for background services.
+
+The fill monitor, risk engine and queue manager each used to fetch tickers on
+their own schedule (get_all_tickers per cycle, or get_current_price per symbol).
+MarketDataService keeps one symbol -> (price, fetched_at) table per exchange feed
+and refreshes it with a single batched get_all_tickers call:
+
+- Consumers ask for prices with a staleness bound (max_age_seconds); fresh
+  entries are served from memory without any exchange call
+- Refreshes are single-flight per feed, so concurrent consumers that all find
+  the table stale share one REST call
+- Every refresh is published to the Redis ticker cache, so API workers reading
+  CacheService.get_tickers() see the leader's prices
+- Listeners can subscribe to price updates (e.g. trigger evaluation)
+
+API requests price a handful of symbols through get_symbol_tickers(), which
+reads only those symbols from the Redis ticker table.
+"""
+import asyncio
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import normalize_symbol
+from app.services.exchange_abstraction.interface import ExchangeInterface
+
+logger = logging.getLogger(__name__)
+
+# Default staleness bound when a consumer does not pass one
+DEFAULT_MAX_AGE_SECONDS = 2.0
+
+PriceListener = Callable[[str, Dict[str, Decimal]], Awaitable[None]]
+
+
+def feed_key(exchange_name: str, connector: Optional[ExchangeInterface] = None, testnet: bool = False) -> str:
+    """
+    Name of the price feed for an exchange. Testnet and mainnet prices differ,
+    so testnet connectors (or testnet keys, before a connector exists) get
+    their own feed.
+    """
+    exchange_name = exchange_name.lower()
+    if testnet is True:
+        return f"{exchange_name}_testnet"
+    if connector is not None and (
+        getattr(connector, "testnet", False) is True or getattr(connector, "testnet_mode", False) is True
+    ):
+        return f"{exchange_name}_testnet"
+    return exchange_name
+
+
+class MarketDataService:
+    def __init__(self, default_max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS, publish_to_cache: bool = True):
+        self.default_max_age_seconds = default_max_age_seconds
+        self.publish_to_cache = publish_to_cache
+
+        # feed -> symbol -> (price, monotonic fetch time)
+        self._prices: Dict[str, Dict[str, Tuple[Decimal, float]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._listeners: List[PriceListener] = []
+
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+
+    # ==================== Table ====================
+
+    def update_tickers(self, feed: str, tickers: dict, fetched_at: Optional[float] = None) -> Dict[str, Decimal]:
+        """
+        Store a get_all_tickers() style payload ({symbol: {"last": price}}).
+
+        Returns:
+            The parsed symbol -> price mapping
+        """
+        if not isinstance(tickers, dict):
+            return {}
+
+        fetched_at = fetched_at if fetched_at is not None else time.monotonic()
+        table = self._prices.setdefault(feed, {})
+        parsed: Dict[str, Decimal] = {}
+
+        for symbol, ticker in tickers.items():
+            last = ticker.get("last") if isinstance(ticker, dict) else ticker
+            if last is None:
+                continue
+            try:
+                price = Decimal(str(last))
+            except (InvalidOperation, ValueError):
+                continue
+            parsed[symbol] = price
+            table[symbol] = (price, fetched_at)
+            # Index the slash-less form too ("BTC/USDT" is looked up as "BTCUSDT" by some callers)
+            flat = symbol.replace("/", "")
+            if flat != symbol:
+                table[flat] = (price, fetched_at)
+
+        return parsed
+
+    def lookup(self, feed: str, symbol: str, max_age_seconds: Optional[float] = None) -> Optional[Decimal]:
+        """Return a cached price if it is younger than max_age_seconds, else None."""
+        max_age = self.default_max_age_seconds if max_age_seconds is None else max_age_seconds
+        table = self._prices.get(feed)
+        if not table:
+            return None
+
+        entry = table.get(symbol) or table.get(symbol.replace("/", ""))
+        if entry is None:
+            return None
+
+        price, fetched_at = entry
+        if time.monotonic() - fetched_at > max_age:
+            return None
+        return price
+
+    # ==================== Consumers ====================
+
+    async def get_prices(
+        self,
+        exchange_name: str,
+        symbols: Iterable[str],
+        connector: ExchangeInterface,
+        max_age_seconds: Optional[float] = None
+    ) -> Dict[str, Decimal]:
+        """
+        Prices for the given symbols, refreshing the exchange feed at most once.
+        Symbols the exchange does not quote are omitted from the result.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        feed = feed_key(exchange_name, connector)
+
+        prices = self._lookup_many(feed, symbols, max_age_seconds)
+        if len(prices) == len(symbols):
+            self._hits += 1
+            return prices
+
+        self._misses += 1
+        lock = self._locks.setdefault(feed, asyncio.Lock())
+        async with lock:
+            # Another consumer may have refreshed the feed while we waited
+            prices = self._lookup_many(feed, symbols, max_age_seconds)
+            if len(prices) == len(symbols):
+                return prices
+            await self._refresh(feed, connector)
+
+        return self._lookup_many(feed, symbols, max_age_seconds)
+
+    async def get_price(
+        self,
+        exchange_name: str,
+        symbol: str,
+        connector: ExchangeInterface,
+        max_age_seconds: Optional[float] = None
+    ) -> Optional[Decimal]:
+        """Single-symbol convenience wrapper around get_prices()."""
+        prices = await self.get_prices(exchange_name, [symbol], connector, max_age_seconds)
+        return prices.get(symbol)
+
+    def add_listener(self, listener: PriceListener):
+        """Register a coroutine called with (feed, prices) after every refresh."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: PriceListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get_metrics(self) -> dict:
+        """Hit/miss and refresh statistics for health reporting."""
+        return {
+            "feeds": len(self._prices),
+            "hits": self._hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+        }
+
+    # ==================== Internals ====================
+
+    def _lookup_many(self, feed: str, symbols: List[str], max_age_seconds: Optional[float]) -> Dict[str, Decimal]:
+        prices = {}
+        for symbol in symbols:
+            price = self.lookup(feed, symbol, max_age_seconds)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    async def _refresh(self, feed: str, connector: ExchangeInterface):
+        """Fetch all tickers for a feed in one call and fan the result out."""
+        try:
+            tickers = await connector.get_all_tickers()
+        except Exception as e:
+            self._refresh_errors += 1
+            logger.warning(f"MarketData: Could not refresh tickers for {feed}: {e}")
+            return
+
+        prices = self.update_tickers(feed, tickers)
+        self._refreshes += 1
+        if not prices:
+            return
+
+        if self.publish_to_cache:
+            try:
+                from app.core.cache import get_cache
+                cache = await get_cache()
+                await cache.set_tickers(feed, tickers)
+            except Exception as e:
+                logger.debug(f"MarketData: Failed to publish tickers for {feed}: {e}")
+
+        for listener in list(self._listeners):
+            try:
+                await listener(feed, prices)
+            except Exception as e:
+                logger.error(f"MarketData: Price listener failed for {feed}: {e}")
+
+
+async def get_symbol_tickers(cache, exchange_name: str, symbols: Iterable[str], connector: ExchangeInterface) -> Dict[str, dict]:
+    """
+    Tickers of the given symbols, keyed as requested. Only those symbols are
+    read from the Redis ticker table; when the table is not cached, all tickers
+    are fetched once and cached for the other readers. Symbols without a ticker
+    are omitted (callers fall back to get_current_price).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    tickers = await cache.get_tickers(exchange_name, symbols)
+    if tickers is not None:
+        return tickers
+
+    try:
+        all_tickers = await connector.get_all_tickers()
+    except Exception as e:
+        logger.warning(f"MarketData: Could not fetch tickers from {exchange_name}: {e}")
+        return {}
+    logger.debug(f"MarketData: Fetched {len(all_tickers)} tickers from {exchange_name}")
+    await cache.set_tickers(exchange_name, all_tickers)
+
+    by_symbol = {normalize_symbol(symbol): ticker for symbol, ticker in all_tickers.items()}
+    return {
+        symbol: by_symbol[normalize_symbol(symbol)]
+        for symbol in symbols if normalize_symbol(symbol) in by_symbol
+    }
+
+
+# Shared instance used by the leader's background services
+_market_data_service: Optional[MarketDataService] = None
+
+
+def get_market_data_service() -> MarketDataService:
+    """Get the process-wide market data service."""
+    global _market_data_service
+    if _market_data_service is None:
+        _market_data_service = MarketDataService()
+    return _market_data_service
@@ -4,13 +4,22 @@ Key fix: Properly handles the Bybit testnet workaround by continuing with positi
 even when check_order_status triggers the workaround.
 
 Performance optimizations:
-- Parallel processing of orders using asyncio.gather with semaphore
-- Batch price fetching using get_all_tickers instead of per-order price calls
+- Each position group is processed as its own unit of work (dedicated session and
+  transaction), in parallel up to a per-exchange concurrency limit
+- Batch price fetching from the shared MarketDataService table (one get_all_tickers
+  per exchange per polling interval) instead of per-order price calls
 - Eager loading of pyramid relationships to avoid N+1 queries
+- Connectors are borrowed from a ConnectorPool and reused across cycles
+  (warm HTTP sessions and loaded markets) instead of being closed every cycle
+- Event-driven fill detection: when an OrderFillStreamService reports a live
+  order stream for a user's exchange account, fills are applied as soon as they
+  are pushed and REST status checks only run as a slow reconciliation pass
 """
 import asyncio
+import contextlib
 import logging
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Tuple
 import json
 import ccxt
 from decimal import Decimal
@@ -27,15 +36,19 @@ from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.repositories.dca_configuration import DCAConfigurationRepository
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.services.exchange_abstraction.factory import get_exchange_connector
+from app.services.exchange_abstraction.connector_pool import ConnectorPool, get_connector_pool
+from app.services.market_data import MarketDataService
 from app.services.order_management import OrderService
 from app.services.position_manager import PositionManagerService
 from app.services.risk_engine import RiskEngineService
 from app.models.dca_order import DCAOrder, OrderStatus
 from app.models.pyramid import Pyramid
 from app.schemas.grid_config import RiskEngineConfig, DCAGridConfig
+from app.core.config import settings
 from app.core.security import EncryptionService
 from app.core.distributed_lock import get_lock_manager, DistributedLockManager
 from app.services.telegram_signal_helper import broadcast_dca_fill, broadcast_tp_hit
+from app.services.realtime_updates import publish_user_update, TOPIC_POSITIONS
 from app.utils.status_utils import (
     is_order_filled, is_order_open, is_order_active,
     is_pyramid_closed, normalize_order_status
@@ -43,9 +56,17 @@ from app.utils.status_utils import (
 
 logger = logging.getLogger(__name__)
 
-# Semaphore to limit concurrent order processing (prevent overwhelming exchange APIs)
+# Default number of position groups processed concurrently per exchange
 MAX_CONCURRENT_ORDERS = 10
 
+# Per-exchange overrides, sized to the exchanges' private REST rate limits
+DEFAULT_EXCHANGE_CONCURRENCY = {
+    "binance": 10,
+    "bybit": 5,
+    "okx": 5,
+    "mock": 10,
+}
+
 # Lock TTL for position updates (seconds)
 POSITION_LOCK_TTL = 30
 
@@ -62,7 +83,12 @@ class OrderFillMonitorService:
         order_service_class: type[OrderService],
         position_manager_service_class: type[PositionManagerService],
         risk_engine_config: RiskEngineConfig = None,
-        polling_interval_seconds: int = 2
+        polling_interval_seconds: int = 2,
+        reconciliation_interval_seconds: int = 30,
+        connector_pool: Optional[ConnectorPool] = None,
+        market_data: Optional[MarketDataService] = None,
+        shard_coordinator=None,
+        exchange_concurrency: Optional[Dict[str, int]] = None
     ):
         self.session_factory = session_factory
         self.dca_order_repository_class = dca_order_repository_class
@@ -71,6 +97,20 @@ class OrderFillMonitorService:
         self.position_manager_service_class = position_manager_service_class
         self.risk_engine_config = risk_engine_config or RiskEngineConfig()
         self.polling_interval_seconds = polling_interval_seconds
+        # REST status checks for accounts covered by a live order stream
+        self.reconciliation_interval_seconds = reconciliation_interval_seconds
+        self._last_reconciliation: Dict[Tuple[str, str], float] = {}
+        self.connector_pool = connector_pool or get_connector_pool()
+        self.market_data = market_data or MarketDataService()
+        # Restricts the monitor to the users this worker owns; None monitors everyone
+        self.shard_coordinator = shard_coordinator
+        # Position groups processed concurrently per exchange
+        self.exchange_concurrency = {**DEFAULT_EXCHANGE_CONCURRENCY, **(exchange_concurrency or {})}
+        self._exchange_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Set when an OrderFillStreamService is running on this worker
+        self.fill_stream = None
+        # Set to the background RiskEngineService, which re-indexes a user's risk triggers after fills
+        self.risk_engine = None
         self._running = False
         self._monitor_task = None
         # Use distributed lock manager for position-level locks
@@ -102,6 +142,10 @@ class OrderFillMonitorService:
         Triggers risk engine evaluation if evaluate_on_fill is enabled.
         Called after a position fill is detected.
         """
+        # Fills move the entry price the risk engine's trigger levels are derived from
+        if self.risk_engine is not None:
+            self.risk_engine.request_evaluation(user.id)
+
         if not self.risk_engine_config.evaluate_on_fill:
             return
 
@@ -204,6 +248,132 @@ class OrderFillMonitorService:
         except Exception as e:
             logger.warning(f"Failed to check DCA beyond threshold for order {order.id}: {e}")
 
+    async def _handle_tp_hit(
+        self,
+        updated_order: DCAOrder,
+        order_pyramid_id,
+        position_manager: PositionManagerService,
+        session: AsyncSession,
+        user
+    ) -> None:
+        """
+        Runs the per-leg TP hit handling: position stats update, Telegram broadcast
+        and risk evaluation. Shared by the polling and the order stream paths.
+        """
+        # Acquire distributed position lock to prevent deadlock with aggregate TP check
+        group_id_str = str(updated_order.group_id)
+        lock_resource = self._get_position_lock_resource(group_id_str)
+        async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
+            await position_manager.update_position_stats(updated_order.group_id, session=session)
+
+        # Broadcast per-leg TP hit notification
+        # Re-fetch pyramid since concurrent update_position_stats may have cleared it
+        pyramid = None
+        if order_pyramid_id:
+            result = await session.execute(select(Pyramid).where(Pyramid.id == order_pyramid_id))
+            pyramid = result.scalar_one_or_none()
+
+        if updated_order.group and pyramid:
+            entry_price = updated_order.price
+            exit_price = updated_order.tp_price
+            if entry_price and exit_price:
+                pnl_percent = ((exit_price - entry_price) / entry_price) * 100
+                pnl_usd = (exit_price - entry_price) * updated_order.filled_quantity
+                logger.info(f"Broadcasting per-leg TP hit for order {updated_order.id}")
+                await broadcast_tp_hit(
+                    position_group=updated_order.group,
+                    pyramid=pyramid,
+                    tp_type="per_leg",
+                    tp_price=exit_price,
+                    pnl_percent=pnl_percent,
+                    session=session,
+                    pnl_usd=pnl_usd,
+                    closed_quantity=updated_order.filled_quantity,
+                    leg_index=updated_order.leg_index
+                )
+        else:
+            logger.warning(f"Cannot broadcast TP hit for order {updated_order.id}: group={updated_order.group is not None}, pyramid={pyramid is not None}, pyramid_id={order_pyramid_id}")
+
+        await self._trigger_risk_evaluation_on_fill(user, session)
+
+    async def _handle_order_status_update(
+        self,
+        updated_order: DCAOrder,
+        order_service: OrderService,
+        position_manager: PositionManagerService,
+        session: AsyncSession,
+        user
+    ) -> None:
+        """
+        Runs the fill handling for an entry order whose exchange status was just applied:
+        position stats update, TP placement, Telegram broadcast and risk evaluation.
+        Shared by the polling and the order stream paths.
+        """
+        if updated_order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.FAILED]:
+            logger.info(f"Order {updated_order.id} status updated to {updated_order.status}")
+
+        # Handle filled orders
+        if updated_order.status == OrderStatus.FILLED.value:
+            await session.flush()
+
+            logger.info(f"Order {updated_order.id} FILLED - updating position stats")
+            # Acquire distributed position lock to prevent deadlock with aggregate TP check
+            group_id_str = str(updated_order.group_id)
+            lock_resource = self._get_position_lock_resource(group_id_str)
+            async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
+                await position_manager.update_position_stats(updated_order.group_id, session=session)
+            # Only place per-leg TP orders if tp_mode supports it
+            if updated_order.group and updated_order.group.tp_mode in ["per_leg", "hybrid"]:
+                await order_service.place_tp_order(updated_order)
+                logger.info(f"✓ Successfully placed TP order for {updated_order.id}")
+
+            # Broadcast DCA fill notification
+            if updated_order.group and updated_order.pyramid:
+                logger.info(f"Broadcasting DCA fill for order {updated_order.id}")
+                await broadcast_dca_fill(
+                    position_group=updated_order.group,
+                    order=updated_order,
+                    pyramid=updated_order.pyramid,
+                    session=session
+                )
+            else:
+                logger.warning(f"Cannot broadcast DCA fill for order {updated_order.id}: group={updated_order.group is not None}, pyramid={updated_order.pyramid is not None}")
+
+            await self._trigger_risk_evaluation_on_fill(user, session)
+
+        # Handle partially filled orders
+        elif updated_order.status == OrderStatus.PARTIALLY_FILLED.value:
+            await session.flush()
+
+            if updated_order.filled_quantity and updated_order.filled_quantity > 0 and not updated_order.tp_order_id:
+                logger.info(
+                    f"Order {updated_order.id} PARTIALLY_FILLED ({updated_order.filled_quantity}/{updated_order.quantity}) "
+                    f"- updating position stats"
+                )
+                # Acquire distributed position lock to prevent deadlock with aggregate TP check
+                group_id_str = str(updated_order.group_id)
+                lock_resource = self._get_position_lock_resource(group_id_str)
+                async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
+                    await position_manager.update_position_stats(updated_order.group_id, session=session)
+                # Only place per-leg TP orders if tp_mode supports it
+                if updated_order.group and updated_order.group.tp_mode in ["per_leg", "hybrid"]:
+                    await order_service.place_tp_order_for_partial_fill(updated_order)
+                    logger.info(f"✓ Successfully placed partial TP order for {updated_order.id}")
+
+                # Broadcast DCA fill notification
+                if updated_order.group and updated_order.pyramid:
+                    logger.info(f"Broadcasting DCA fill for partial order {updated_order.id}")
+                    await broadcast_dca_fill(
+                        position_group=updated_order.group,
+                        order=updated_order,
+                        pyramid=updated_order.pyramid,
+                        session=session
+                    )
+                else:
+                    logger.warning(f"Cannot broadcast DCA fill for partial order {updated_order.id}: group={updated_order.group is not None}, pyramid={updated_order.pyramid is not None}")
+
+                await self._trigger_risk_evaluation_on_fill(user, session)
+
     async def _process_single_order(
         self,
         order: DCAOrder,
@@ -213,14 +383,23 @@ class OrderFillMonitorService:
         session: AsyncSession,
         user,
         prices_cache: Dict[str, Decimal],
-        semaphore: asyncio.Semaphore
+        semaphore: Optional[asyncio.Semaphore] = None,
+        check_exchange_status: bool = True,
+        order_snapshots: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> None:
         """
-        Process a single order. Called in parallel with other orders.
-        Uses semaphore to limit concurrency.
+        Process a single order within its position group's unit of work.
+        An optional semaphore limits concurrency when called outside one.
         Handles deadlock errors gracefully by skipping the order for this cycle.
+
+        When check_exchange_status is False (a live order stream covers this account),
+        the REST status checks of entry and TP orders are skipped; only price-driven
+        work (triggers, DCA cancel threshold) and missing TP placement run.
+
+        order_snapshots holds the bulk reconciliation of this cycle, keyed by exchange
+        order ID; orders without a snapshot are fetched individually.
         """
-        async with semaphore:
+        async with semaphore or contextlib.nullcontext():
             try:
                 # Refresh order to get latest state - skip if it's been modified elsewhere
                 try:
@@ -255,61 +434,32 @@ class OrderFillMonitorService:
                             logger.error(f"Failed to place missing TP order for {order.id}: {tp_err}")
                         return
 
+                    # TP fills are pushed by the order stream between reconciliations
+                    if not check_exchange_status:
+                        return
+
                     # Check status of existing TP order
                     # Store IDs (not objects) - IDs are simple values that can't be expired by concurrent operations
                     order_group = order.group
                     order_pyramid_id = order.pyramid_id  # Store the ID, not the object
-                    updated_order = await order_service.check_tp_status(order)
+                    tp_snapshot = (order_snapshots or {}).get(order.tp_order_id)
+                    if tp_snapshot is not None:
+                        updated_order = await order_service.check_tp_status(order, snapshot=tp_snapshot)
+                    else:
+                        updated_order = await order_service.check_tp_status(order)
                     # Restore group relationship
                     updated_order.group = order_group
 
                     if updated_order.tp_hit:
                         logger.info(f"TP hit for order {order.id}. Updating position stats.")
                         await session.flush()
-
-                        # Acquire distributed position lock to prevent deadlock with aggregate TP check
-                        group_id_str = str(updated_order.group_id)
-                        lock_resource = self._get_position_lock_resource(group_id_str)
-                        async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
-                            await position_manager.update_position_stats(updated_order.group_id, session=session)
-
-                        # Broadcast per-leg TP hit notification
-                        # Re-fetch pyramid since concurrent update_position_stats may have cleared it
-                        pyramid = None
-                        if order_pyramid_id:
-                            from sqlalchemy import select
-                            from app.models.pyramid import Pyramid
-                            result = await session.execute(select(Pyramid).where(Pyramid.id == order_pyramid_id))
-                            pyramid = result.scalar_one_or_none()
-
-                        if updated_order.group and pyramid:
-                            entry_price = updated_order.price
-                            exit_price = updated_order.tp_price
-                            if entry_price and exit_price:
-                                pnl_percent = ((exit_price - entry_price) / entry_price) * 100
-                                pnl_usd = (exit_price - entry_price) * updated_order.filled_quantity
-                                logger.info(f"Broadcasting per-leg TP hit for order {updated_order.id}")
-                                await broadcast_tp_hit(
-                                    position_group=updated_order.group,
-                                    pyramid=pyramid,
-                                    tp_type="per_leg",
-                                    tp_price=exit_price,
-                                    pnl_percent=pnl_percent,
-                                    session=session,
-                                    pnl_usd=pnl_usd,
-                                    closed_quantity=updated_order.filled_quantity,
-                                    leg_index=updated_order.leg_index
-                                )
-                        else:
-                            logger.warning(f"Cannot broadcast TP hit for order {updated_order.id}: group={updated_order.group is not None}, pyramid={pyramid is not None}, pyramid_id={order_pyramid_id}")
-
-                        await self._trigger_risk_evaluation_on_fill(user, session)
+                        await self._handle_tp_hit(updated_order, order_pyramid_id, position_manager, session, user)
                     return
 
                 # --- TRIGGER LOGIC ---
                 if order.status == OrderStatus.TRIGGER_PENDING.value:
                     if current_price is None:
-                        current_price = Decimal(str(await connector.get_current_price(order.symbol)))
+                        current_price = await self._get_current_price(connector, order.group.exchange, order.symbol)
 
                     should_trigger = False
 
@@ -333,6 +483,10 @@ class OrderFillMonitorService:
                         if current_price >= order.price:
                             should_trigger = True
 
+                    if should_trigger and settings.NATIVE_TRIGGER_ORDERS and await order_service.adopt_trigger_order(order):
+                        # Its native trigger order rested after all; tracked as an open order from now on
+                        return
+
                     if should_trigger:
                         logger.info(f"Trigger condition met for Order {order.id}. Submitting Market Order.")
                         await order_service.submit_order(order)
@@ -365,7 +519,7 @@ class OrderFillMonitorService:
                 if order.status == OrderStatus.OPEN.value:
                     try:
                         if current_price is None:
-                            current_price = Decimal(str(await connector.get_current_price(order.symbol)))
+                            current_price = await self._get_current_price(connector, order.group.exchange, order.symbol)
                         await self._check_dca_beyond_threshold(order, current_price, order_service, session)
                         await session.refresh(order)
                         if order.status == OrderStatus.CANCELLED.value:
@@ -373,12 +527,20 @@ class OrderFillMonitorService:
                     except Exception as price_err:
                         logger.debug(f"Could not fetch price for DCA threshold check: {price_err}")
 
+                # Entry fills are pushed by the order stream between reconciliations
+                if not check_exchange_status:
+                    return
+
                 # Check order status on exchange
                 logger.info(f"Checking order {order.id} status on exchange...")
                 # Preserve eager-loaded relationships before refresh (refresh clears them)
                 order_group = order.group
                 order_pyramid = order.pyramid
-                updated_order = await order_service.check_order_status(order)
+                snapshot = (order_snapshots or {}).get(order.exchange_order_id)
+                if snapshot is not None:
+                    updated_order = await order_service.check_order_status(order, snapshot=snapshot)
+                else:
+                    updated_order = await order_service.check_order_status(order)
                 await session.refresh(updated_order)
                 # Restore relationships after refresh
                 updated_order.group = order_group
@@ -386,70 +548,7 @@ class OrderFillMonitorService:
 
                 logger.info(f"Order {order.id} status after check: {updated_order.status}")
 
-                if updated_order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.FAILED]:
-                    logger.info(f"Order {order.id} status updated to {updated_order.status}")
-
-                # Handle filled orders
-                if updated_order.status == OrderStatus.FILLED.value:
-                    await session.flush()
-
-                    logger.info(f"Order {order.id} FILLED - updating position stats")
-                    # Acquire distributed position lock to prevent deadlock with aggregate TP check
-                    group_id_str = str(updated_order.group_id)
-                    lock_resource = self._get_position_lock_resource(group_id_str)
-                    async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
-                        await position_manager.update_position_stats(updated_order.group_id, session=session)
-                    # Only place per-leg TP orders if tp_mode supports it
-                    if updated_order.group and updated_order.group.tp_mode in ["per_leg", "hybrid"]:
-                        await order_service.place_tp_order(updated_order)
-                        logger.info(f"✓ Successfully placed TP order for {updated_order.id}")
-
-                    # Broadcast DCA fill notification
-                    if updated_order.group and updated_order.pyramid:
-                        logger.info(f"Broadcasting DCA fill for order {updated_order.id}")
-                        await broadcast_dca_fill(
-                            position_group=updated_order.group,
-                            order=updated_order,
-                            pyramid=updated_order.pyramid,
-                            session=session
-                        )
-                    else:
-                        logger.warning(f"Cannot broadcast DCA fill for order {updated_order.id}: group={updated_order.group is not None}, pyramid={updated_order.pyramid is not None}")
-
-                    await self._trigger_risk_evaluation_on_fill(user, session)
-
-                # Handle partially filled orders
-                elif updated_order.status == OrderStatus.PARTIALLY_FILLED.value:
-                    await session.flush()
-
-                    if updated_order.filled_quantity and updated_order.filled_quantity > 0 and not updated_order.tp_order_id:
-                        logger.info(
-                            f"Order {order.id} PARTIALLY_FILLED ({updated_order.filled_quantity}/{updated_order.quantity}) "
-                            f"- updating position stats"
-                        )
-                        # Acquire distributed position lock to prevent deadlock with aggregate TP check
-                        group_id_str = str(updated_order.group_id)
-                        lock_resource = self._get_position_lock_resource(group_id_str)
-                        async with self._lock_manager.lock(lock_resource, ttl=POSITION_LOCK_TTL, timeout=POSITION_LOCK_TIMEOUT):
-                            await position_manager.update_position_stats(updated_order.group_id, session=session)
-                        # Only place per-leg TP orders if tp_mode supports it
-                        if updated_order.group and updated_order.group.tp_mode in ["per_leg", "hybrid"]:
-                            await order_service.place_tp_order_for_partial_fill(updated_order)
-                            logger.info(f"✓ Successfully placed partial TP order for {updated_order.id}")
-
-                        # Broadcast DCA fill notification
-                        if updated_order.group and updated_order.pyramid:
-                            logger.info(f"Broadcasting DCA fill for partial order {updated_order.id}")
-                            await broadcast_dca_fill(
-                                position_group=updated_order.group,
-                                order=updated_order,
-                                pyramid=updated_order.pyramid,
-                                session=session
-                            )
-                        else:
-                            logger.warning(f"Cannot broadcast DCA fill for partial order {updated_order.id}: group={updated_order.group is not None}, pyramid={updated_order.pyramid is not None}")
-
-                        await self._trigger_risk_evaluation_on_fill(user, session)
+                await self._handle_order_status_update(updated_order, order_service, position_manager, session, user)
 
             except Exception as e:
                 error_msg = str(e).lower()
@@ -464,23 +563,33 @@ class OrderFillMonitorService:
     async def _fetch_all_prices(
         self,
         connector: ExchangeInterface,
-        symbols: List[str]
+        symbols: List[str],
+        exchange_name: str
     ) -> Dict[str, Decimal]:
         """
-        Batch fetch all prices for given symbols using get_all_tickers.
-        Returns a dict mapping symbol to current price.
+        Batch fetch all prices for given symbols from the shared market data table.
+        The table is refreshed with one get_all_tickers call when it is older than
+        one polling interval. Returns a dict mapping symbol to current price.
         """
-        prices = {}
         try:
-            all_tickers = await connector.get_all_tickers()
-            for symbol in symbols:
-                if symbol in all_tickers:
-                    prices[symbol] = Decimal(str(all_tickers[symbol].get('last', 0)))
-                elif symbol.replace('/', '') in all_tickers:
-                    prices[symbol] = Decimal(str(all_tickers[symbol.replace('/', '')].get('last', 0)))
+            return await self.market_data.get_prices(
+                exchange_name, symbols, connector, max_age_seconds=self.polling_interval_seconds
+            )
         except Exception as e:
             logger.warning(f"Could not batch fetch tickers: {e}")
-        return prices
+            return {}
+
+    async def _get_current_price(self, connector: ExchangeInterface, exchange_name: str, symbol: str) -> Decimal:
+        """
+        Price for a single symbol from the shared market data table,
+        falling back to a direct ticker call if the exchange feed does not quote it.
+        """
+        price = await self.market_data.get_price(
+            exchange_name, symbol, connector, max_age_seconds=self.polling_interval_seconds
+        )
+        if price is None:
+            price = Decimal(str(await connector.get_current_price(symbol)))
+        return price
 
     async def _check_orders(self):
         """
@@ -489,13 +598,18 @@ class OrderFillMonitorService:
 
         Performance optimizations:
         - Batch fetches all prices upfront using get_all_tickers
-        - Processes orders in parallel using asyncio.gather with semaphore
+        - Each position group is a unit of work with its own short-lived session,
+          so groups are processed in parallel (bounded per exchange) without
+          sharing an AsyncSession
+        - Users are processed concurrently
         - Uses eager-loaded pyramid relationships
         """
         if not self.encryption_service:
             logger.error("EncryptionService not available. Skipping order checks.")
             return
 
+        # Read-only discovery; the session is closed before any unit of work starts,
+        # which detaches the loaded orders so each unit can attach its own
         async with self.session_factory() as session:
             try:
                 user_repo = UserRepository(session)
@@ -503,6 +617,8 @@ class OrderFillMonitorService:
                 logger.debug(f"OrderFillMonitor: Found {len(active_users)} active users.")
 
                 users_with_keys = [u for u in active_users if u.encrypted_api_keys]
+                if self.shard_coordinator is not None:
+                    users_with_keys = self.shard_coordinator.filter_owned(users_with_keys, lambda u: u.id)
                 if not users_with_keys:
                     logger.debug("OrderFillMonitor: No users with API keys, skipping.")
                     return
@@ -513,145 +629,334 @@ class OrderFillMonitorService:
                 orders_by_user = await dca_order_repo.get_all_open_orders_for_all_users(user_ids)
                 logger.debug(f"OrderFillMonitor: Batch loaded orders for {len(orders_by_user)} users.")
 
-                # Create semaphore for limiting concurrent order processing
-                semaphore = asyncio.Semaphore(MAX_CONCURRENT_ORDERS)
+            except Exception as e:
+                error_msg = str(e).lower()
+                if "deadlock" in error_msg or "rollback" in error_msg:
+                    logger.warning(f"Deadlock in OrderFillMonitor check loop - will retry next cycle")
+                else:
+                    logger.error(f"Error in OrderFillMonitor check loop: {e}")
+                    import traceback
+                    traceback.print_exc()
+                await session.rollback()
+                return
+
+        await asyncio.gather(
+            *(self._check_user_orders(user, orders_by_user.get(str(user.id), [])) for user in users_with_keys),
+            return_exceptions=True
+        )
+
+    def _get_exchange_semaphore(self, exchange_name: str) -> asyncio.Semaphore:
+        """Limits concurrent units of work per exchange to what its rate limit allows."""
+        semaphore = self._exchange_semaphores.get(exchange_name)
+        if semaphore is None:
+            limit = self.exchange_concurrency.get(exchange_name, MAX_CONCURRENT_ORDERS)
+            semaphore = asyncio.Semaphore(limit)
+            self._exchange_semaphores[exchange_name] = semaphore
+        return semaphore
+
+    async def _check_user_orders(self, user, all_orders: List[DCAOrder]):
+        """
+        Checks one user's open orders exchange by exchange, then the TP conditions of
+        positions without open orders.
+        """
+        try:
+            logger.info(f"OrderFillMonitor: User {user.id} - Found {len(all_orders)} open/partially filled orders.")
 
-                for user in users_with_keys:
-                    try:
-                        all_orders = orders_by_user.get(str(user.id), [])
-                        logger.info(f"OrderFillMonitor: User {user.id} - Found {len(all_orders)} open/partially filled orders.")
-
-                        if not all_orders:
-                            # Even with no open orders, check TP for idle positions
-                            logger.info(f"OrderFillMonitor: No open orders for user {user.id}, checking idle position TPs...")
-                            await self._check_aggregate_tp_for_idle_positions(session, user)
-                            await self._check_pyramid_aggregate_tp_for_idle_positions(session, user)
-                            await self._check_per_leg_positions_all_tps_hit(session, user)
-                            try:
-                                await session.commit()
-                                logger.debug(f"OrderFillMonitor: Committed changes for user {user.id} (idle check only)")
-                            except Exception as commit_err:
-                                error_msg = str(commit_err).lower()
-                                if "deadlock" in error_msg or "rollback" in error_msg:
-                                    await session.rollback()
+            # Group orders by exchange
+            orders_by_exchange: Dict[str, List[DCAOrder]] = {}
+            for order in all_orders:
+                if not order.group:
+                    logger.error(f"Order {order.id} has no position group attached. Skipping.")
+                    continue
+                ex = order.group.exchange
+                if ex not in orders_by_exchange:
+                    orders_by_exchange[ex] = []
+                orders_by_exchange[ex].append(order)
+
+            if orders_by_exchange:
+                logger.info(f"OrderFillMonitor: Exchanges found: {list(orders_by_exchange.keys())}")
+
+            # Process each exchange
+            for raw_exchange_name, orders_to_check in orders_by_exchange.items():
+                exchange_name = raw_exchange_name.lower()
+                logger.info(f"OrderFillMonitor: Processing {len(orders_to_check)} orders for exchange '{exchange_name}'")
+
+                try:
+                    # Setup connector
+                    if exchange_name == "mock":
+                        exchange_keys_data = {
+                            "api_key": "mock_api_key_12345",
+                            "api_secret": "mock_api_secret_67890"
+                        }
+                    else:
+                        exchange_keys_data = user.encrypted_api_keys.get(exchange_name)
+                        if not exchange_keys_data:
+                            logger.warning(f"No API keys for {exchange_name} for user {user.id}, skipping.")
                             continue
+                        api_key, secret_key = self.encryption_service.decrypt_keys(exchange_keys_data)
 
-                        # Group orders by exchange
-                        orders_by_exchange: Dict[str, List[DCAOrder]] = {}
-                        for order in all_orders:
-                            if not order.group:
-                                logger.error(f"Order {order.id} has no position group attached. Skipping.")
-                                continue
-                            ex = order.group.exchange
-                            if ex not in orders_by_exchange:
-                                orders_by_exchange[ex] = []
-                            orders_by_exchange[ex].append(order)
-
-                        logger.info(f"OrderFillMonitor: Exchanges found: {list(orders_by_exchange.keys())}")
-
-                        # Process each exchange
-                        for raw_exchange_name, orders_to_check in orders_by_exchange.items():
-                            exchange_name = raw_exchange_name.lower()
-                            logger.info(f"OrderFillMonitor: Processing {len(orders_to_check)} orders for exchange '{exchange_name}'")
-
-                            try:
-                                # Setup connector
-                                if exchange_name == "mock":
-                                    exchange_keys_data = {
-                                        "api_key": "mock_api_key_12345",
-                                        "api_secret": "mock_api_secret_67890"
-                                    }
-                                else:
-                                    exchange_keys_data = user.encrypted_api_keys.get(exchange_name)
-                                    if not exchange_keys_data:
-                                        logger.warning(f"No API keys for {exchange_name} for user {user.id}, skipping.")
-                                        continue
-                                    api_key, secret_key = self.encryption_service.decrypt_keys(exchange_keys_data)
-
-                                connector = get_exchange_connector(exchange_name, exchange_config=exchange_keys_data)
-                            except Exception as e:
-                                logger.error(f"Failed to setup connector for {exchange_name}: {e}")
-                                continue
-
-                            try:
-                                # Create services ONCE per exchange
-                                order_service = self.order_service_class(
-                                    session=session,
-                                    user=user,
-                                    exchange_connector=connector
-                                )
+                    connector = await self.connector_pool.acquire(
+                        user.id, exchange_name, exchange_keys_data, connector_factory=get_exchange_connector
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to setup connector for {exchange_name}: {e}")
+                    continue
 
-                                position_manager = self.position_manager_service_class(
-                                    session_factory=self.session_factory,
-                                    user=user,
-                                    position_group_repository_class=self.position_group_repository_class,
-                                    grid_calculator_service=None,
-                                    order_service_class=None
-                                )
+                try:
+                    # Batch fetch all prices for all symbols in this exchange
+                    symbols = list(set(order.symbol for order in orders_to_check))
+                    prices_cache = await self._fetch_all_prices(connector, symbols, exchange_name)
+                    logger.debug(f"Batch fetched prices for {len(prices_cache)} symbols")
+
+                    check_exchange_status = self._should_reconcile(str(user.id), exchange_name)
+                    order_snapshots = {}
+                    if check_exchange_status:
+                        order_snapshots = await self._reconcile_orders(connector, orders_to_check)
+
+                    # One unit of work per position group; orders of a group stay sequential
+                    orders_by_group: Dict[Any, List[DCAOrder]] = {}
+                    for order in orders_to_check:
+                        orders_by_group.setdefault(order.group_id, []).append(order)
+
+                    semaphore = self._get_exchange_semaphore(exchange_name)
+                    await asyncio.gather(
+                        *(
+                            self._process_group_orders(
+                                orders=group_orders,
+                                connector=connector,
+                                user=user,
+                                prices_cache=prices_cache,
+                                semaphore=semaphore,
+                                check_exchange_status=check_exchange_status,
+                                order_snapshots=order_snapshots
+                            )
+                            for group_orders in orders_by_group.values()
+                        ),
+                        return_exceptions=True
+                    )
 
-                                # Batch fetch all prices for all symbols in this exchange
-                                symbols = list(set(order.symbol for order in orders_to_check))
-                                prices_cache = await self._fetch_all_prices(connector, symbols)
-                                logger.debug(f"Batch fetched prices for {len(prices_cache)} symbols")
-
-                                # Process all orders in parallel with semaphore
-                                tasks = [
-                                    self._process_single_order(
-                                        order=order,
-                                        order_service=order_service,
-                                        position_manager=position_manager,
-                                        connector=connector,
-                                        session=session,
-                                        user=user,
-                                        prices_cache=prices_cache,
-                                        semaphore=semaphore
-                                    )
-                                    for order in orders_to_check
-                                ]
-
-                                # Execute all order processing in parallel
-                                await asyncio.gather(*tasks, return_exceptions=True)
-
-                            finally:
-                                await connector.close()
-
-                        # Check TP for positions without open orders
-                        await self._check_aggregate_tp_for_idle_positions(session, user)
-                        await self._check_pyramid_aggregate_tp_for_idle_positions(session, user)
-                        await self._check_per_leg_positions_all_tps_hit(session, user)
-
-                        # Try to commit, but handle deadlock/rollback errors gracefully
-                        try:
-                            await session.commit()
-                            logger.debug(f"OrderFillMonitor: Committed changes for user {user.id}")
-                        except Exception as commit_err:
-                            error_msg = str(commit_err).lower()
-                            if "deadlock" in error_msg or "rollback" in error_msg:
-                                logger.warning(f"Deadlock during commit for user {user.id} - rolling back and retrying next cycle")
-                                await session.rollback()
-                            else:
-                                raise
-
-                    except Exception as e:
-                        error_msg = str(e).lower()
-                        if "deadlock" in error_msg or "rollback" in error_msg:
-                            logger.warning(f"Deadlock detected for user {user.username} - will retry next cycle")
-                        else:
-                            logger.error(f"Error checking orders for user {user.username}: {e}")
-                            import traceback
-                            traceback.print_exc()
-                        await session.rollback()
+                finally:
+                    await self.connector_pool.release(connector)
+
+            # Check TP for positions without open orders
+            await self._check_idle_positions(user)
 
+        except Exception as e:
+            logger.error(f"Error checking orders for user {user.username}: {e}")
+            import traceback
+            traceback.print_exc()
+
+    async def _reconcile_orders(
+        self,
+        connector: ExchangeInterface,
+        orders: List[DCAOrder]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk snapshots of the entry and TP orders due for a status check, from one
+        reconcile_orders() call per symbol instead of one fetch per order.
+        """
+        ids_by_symbol: Dict[str, set] = {}
+        for order in orders:
+            if order.status in (OrderStatus.OPEN.value, OrderStatus.PARTIALLY_FILLED.value) and order.exchange_order_id:
+                ids_by_symbol.setdefault(order.symbol, set()).add(order.exchange_order_id)
+            elif order.status == OrderStatus.FILLED.value and order.tp_order_id and not order.tp_hit:
+                ids_by_symbol.setdefault(order.symbol, set()).add(order.tp_order_id)
+
+        async def reconcile_symbol(symbol: str, order_ids: set) -> Dict[str, Dict[str, Any]]:
+            try:
+                return await connector.reconcile_orders(symbol, order_ids)
+            except Exception as e:
+                logger.warning(f"Bulk reconciliation failed for {symbol}: {e} - checking orders individually")
+                return {}
+
+        results = await asyncio.gather(
+            *(reconcile_symbol(symbol, order_ids) for symbol, order_ids in ids_by_symbol.items())
+        )
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            if isinstance(result, dict):
+                snapshots.update(result)
+        if ids_by_symbol:
+            total = sum(len(ids) for ids in ids_by_symbol.values())
+            logger.debug(f"Bulk reconciliation resolved {len(snapshots)}/{total} orders over {len(ids_by_symbol)} symbols")
+        return snapshots
+
+    async def _process_group_orders(
+        self,
+        orders: List[DCAOrder],
+        connector: ExchangeInterface,
+        user,
+        prices_cache: Dict[str, Decimal],
+        semaphore: asyncio.Semaphore,
+        check_exchange_status: bool = True,
+        order_snapshots: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Unit of work for one position group: its orders are processed in a dedicated
+        session and committed together. A deadlock or failed flush only rolls back
+        this group; it is retried next cycle.
+        """
+        async with semaphore:
+            async with self.session_factory() as session:
+                try:
+                    for order in orders:
+                        session.add(order)
+                    before = [self._order_state(order) for order in orders]
+
+                    order_service = self.order_service_class(
+                        session=session,
+                        user=user,
+                        exchange_connector=connector
+                    )
+                    position_manager = self.position_manager_service_class(
+                        session_factory=self.session_factory,
+                        user=user,
+                        position_group_repository_class=self.position_group_repository_class,
+                        grid_calculator_service=None,
+                        order_service_class=None
+                    )
+
+                    for order in orders:
+                        await self._process_single_order(
+                            order=order,
+                            order_service=order_service,
+                            position_manager=position_manager,
+                            connector=connector,
+                            session=session,
+                            user=user,
+                            prices_cache=prices_cache,
+                            check_exchange_status=check_exchange_status,
+                            order_snapshots=order_snapshots
+                        )
+
+                    changed = before != [self._order_state(order) for order in orders]
+                    await session.commit()
+                    if changed:
+                        await publish_user_update(user.id, TOPIC_POSITIONS)
+
+                except Exception as e:
+                    error_msg = str(e).lower()
+                    if "deadlock" in error_msg or "rollback" in error_msg:
+                        logger.warning(f"Deadlock for position group {orders[0].group_id} - rolling back and retrying next cycle")
+                    else:
+                        logger.error(f"Error processing orders of position group {orders[0].group_id}: {e}")
+                    await session.rollback()
+
+    @staticmethod
+    def _order_state(order: DCAOrder) -> tuple:
+        """Fields whose change is worth pushing to the dashboard."""
+        return (order.status, order.filled_quantity, order.tp_hit)
+
+    async def _check_idle_positions(self, user):
+        """Aggregate, pyramid and per-leg TP checks for positions without open orders, in their own session."""
+        async with self.session_factory() as session:
+            try:
+                await self._check_aggregate_tp_for_idle_positions(session, user)
+                await self._check_pyramid_aggregate_tp_for_idle_positions(session, user)
+                await self._check_per_leg_positions_all_tps_hit(session, user)
+                await session.commit()
+                logger.debug(f"OrderFillMonitor: Committed idle position checks for user {user.id}")
             except Exception as e:
                 error_msg = str(e).lower()
                 if "deadlock" in error_msg or "rollback" in error_msg:
-                    logger.warning(f"Deadlock in OrderFillMonitor check loop - will retry next cycle")
+                    logger.warning(f"Deadlock during idle position checks for user {user.id} - will retry next cycle")
                 else:
-                    logger.error(f"Error in OrderFillMonitor check loop: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.error(f"Error checking idle positions for user {user.id}: {e}")
                 await session.rollback()
 
+    def _should_reconcile(self, user_id: str, exchange_name: str) -> bool:
+        """
+        Decide whether this cycle should check order status over REST.
+        Always true without a live order stream; otherwise once per reconciliation interval.
+        """
+        if self.fill_stream is None or not self.fill_stream.is_stream_live(user_id, exchange_name):
+            return True
+
+        key = (user_id, exchange_name)
+        now = time.monotonic()
+        if now - self._last_reconciliation.get(key, 0.0) < self.reconciliation_interval_seconds:
+            return False
+
+        self._last_reconciliation[key] = now
+        return True
+
+    async def process_order_update(
+        self,
+        user,
+        exchange_name: str,
+        connector: ExchangeInterface,
+        exchange_order_data: Dict[str, Any]
+    ) -> bool:
+        """
+        Applies a pushed exchange order update (user-data stream event) to the matching
+        DCA order and runs the same fill handling as the polling path.
+
+        Returns True if the update referred to an order tracked by the engine.
+        """
+        exchange_order_id = str(exchange_order_data.get("id") or "")
+        if not exchange_order_id:
+            return False
+
+        async with self.session_factory() as session:
+            try:
+                dca_order_repo = self.dca_order_repository_class(session)
+                order = await dca_order_repo.get_by_exchange_order_id_for_user(exchange_order_id, str(user.id))
+                if not order or not order.group:
+                    return False
+
+                # Closed/closing positions are handled by the exit path
+                if order.group.status in ['closed', 'closing']:
+                    return True
+
+                order_service = self.order_service_class(
+                    session=session,
+                    user=user,
+                    exchange_connector=connector
+                )
+                position_manager = self.position_manager_service_class(
+                    session_factory=self.session_factory,
+                    user=user,
+                    position_group_repository_class=self.position_group_repository_class,
+                    grid_calculator_service=None,
+                    order_service_class=None
+                )
+
+                if order.tp_order_id == exchange_order_id:
+                    if order.tp_hit:
+                        return True
+                    order_group = order.group
+                    order_pyramid_id = order.pyramid_id
+                    updated_order = await order_service.apply_tp_order_update(order, exchange_order_data)
+                    updated_order.group = order_group
+                    if updated_order.tp_hit:
+                        logger.info(f"OrderFillStream: TP hit for order {order.id} ({exchange_name}). Updating position stats.")
+                        await session.flush()
+                        await self._handle_tp_hit(updated_order, order_pyramid_id, position_manager, session, user)
+                else:
+                    if order.status not in [OrderStatus.OPEN.value, OrderStatus.PARTIALLY_FILLED.value]:
+                        return True
+                    # Preserve eager-loaded relationships (repository update refreshes the instance)
+                    order_group = order.group
+                    order_pyramid = order.pyramid
+                    updated_order = await order_service.apply_order_update(order, exchange_order_data)
+                    updated_order.group = order_group
+                    updated_order.pyramid = order_pyramid
+                    logger.info(f"OrderFillStream: Order {order.id} ({exchange_name}) status is now {updated_order.status}")
+                    await self._handle_order_status_update(updated_order, order_service, position_manager, session, user)
+
+                await session.commit()
+                await publish_user_update(user.id, TOPIC_POSITIONS)
+                return True
+
+            except Exception as e:
+                error_msg = str(e).lower()
+                if "deadlock" in error_msg or "rollback" in error_msg:
+                    logger.warning(f"Deadlock applying pushed update for order {exchange_order_id} - reconciliation will pick it up")
+                else:
+                    logger.error(f"Error applying pushed update for order {exchange_order_id}: {e}")
+                await session.rollback()
+                return False
+
     async def start_monitoring_task(self):
         """
         Starts the background task for Order Fill Monitoring.
@@ -672,6 +977,7 @@ class OrderFillMonitorService:
         while self._running:
             try:
                 await self._check_orders()
+                await self.connector_pool.evict_idle()
                 cycle_count += 1
 
                 # Report health metrics
@@ -680,7 +986,9 @@ class OrderFillMonitorService:
                     metrics={
                         "cycle_count": cycle_count,
                         "error_count": error_count,
-                        "last_error": last_error
+                        "last_error": last_error,
+                        "connector_pool": self.connector_pool.get_metrics(),
+                        "market_data": self.market_data.get_metrics()
                     }
                 )
 
@@ -790,7 +1098,9 @@ class OrderFillMonitorService:
                         if not exchange_keys_data:
                             continue
 
-                    connector = get_exchange_connector(exchange_name, exchange_config=exchange_keys_data)
+                    connector = await self.connector_pool.acquire(
+                        user.id, exchange_name, exchange_keys_data, connector_factory=get_exchange_connector
+                    )
 
                     try:
                         for pos in positions_to_check:
@@ -798,7 +1108,7 @@ class OrderFillMonitorService:
                                 session, user, pos, connector, position_group_repo
                             )
                     finally:
-                        await connector.close()
+                        await self.connector_pool.release(connector)
 
                 except Exception as e:
                     logger.error(f"OrderFillMonitor: Error checking aggregate TP for {exchange_name}: {e}")
@@ -816,7 +1126,7 @@ class OrderFillMonitorService:
     ):
         """Check aggregate TP for a single position and execute if triggered."""
         try:
-            current_price = Decimal(str(await connector.get_current_price(position_group.symbol)))
+            current_price = await self._get_current_price(connector, position_group.exchange, position_group.symbol)
             current_avg_price = position_group.weighted_avg_entry
             current_qty = position_group.total_filled_quantity
 
@@ -1055,7 +1365,9 @@ class OrderFillMonitorService:
                         if not exchange_keys_data:
                             continue
 
-                    connector = get_exchange_connector(exchange_name, exchange_config=exchange_keys_data)
+                    connector = await self.connector_pool.acquire(
+                        user.id, exchange_name, exchange_keys_data, connector_factory=get_exchange_connector
+                    )
 
                     try:
                         for pos in positions_to_check:
@@ -1063,7 +1375,7 @@ class OrderFillMonitorService:
                                 session, user, pos, connector, position_group_repo
                             )
                     finally:
-                        await connector.close()
+                        await self.connector_pool.release(connector)
 
                 except Exception as e:
                     logger.error(f"OrderFillMonitor: Error checking pyramid_aggregate TP for {exchange_name}: {e}")
@@ -1085,7 +1397,7 @@ class OrderFillMonitorService:
             from app.services.telegram_signal_helper import broadcast_tp_hit
             from app.models.pyramid import Pyramid
 
-            current_price = Decimal(str(await connector.get_current_price(position_group.symbol)))
+            current_price = await self._get_current_price(connector, position_group.exchange, position_group.symbol)
 
             # Get all pyramids for this position
             result = await session.execute(
@@ -0,0 +1,255 @@
+"""
+Service for event-driven order fill detection.
+
+Keeps one private order stream (exchange user-data WebSocket) open per user/exchange
+account that has live positions, and hands every pushed order update to
+OrderFillMonitorService.process_order_update. While a stream is live the fill monitor
+only checks order status over REST as a slow reconciliation pass, so fills are
+detected in milliseconds instead of on the next polling cycle.
+
+Streams are supervised: accounts without live positions are closed, dropped
+connections are reopened with exponential backoff, and connectors that do not
+support order streams stay on REST polling.
+"""
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+from app.repositories.position_group import PositionGroupRepository
+from app.repositories.user import UserRepository
+from app.services.exchange_abstraction.factory import get_exchange_connector
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff bounds (seconds)
+INITIAL_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+StreamKey = Tuple[str, str]
+
+
+class OrderFillStreamService:
+    def __init__(
+        self,
+        session_factory,
+        order_fill_monitor,
+        refresh_interval_seconds: int = 30,
+        position_group_repository_class=PositionGroupRepository,
+        shard_coordinator=None
+    ):
+        self.session_factory = session_factory
+        self.order_fill_monitor = order_fill_monitor
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.position_group_repository_class = position_group_repository_class
+        # Only accounts of users this worker owns are streamed; None streams everyone
+        self.shard_coordinator = shard_coordinator
+
+        self._streams: Dict[StreamKey, asyncio.Task] = {}
+        self._users: Dict[str, object] = {}
+        self._live: Set[StreamKey] = set()
+        self._unsupported: Set[StreamKey] = set()
+        self._events_processed = 0
+        self._reconnects = 0
+
+        self._running = False
+        self._supervisor_task = None
+
+    def is_stream_live(self, user_id: str, exchange_name: str) -> bool:
+        """True if the order stream for this account is currently connected."""
+        return (str(user_id), exchange_name.lower()) in self._live
+
+    def _get_exchange_config(self, user, exchange_name: str) -> Optional[dict]:
+        if exchange_name == "mock":
+            return {
+                "api_key": "mock_api_key_12345",
+                "api_secret": "mock_api_secret_67890"
+            }
+        if not user.encrypted_api_keys:
+            return None
+        return user.encrypted_api_keys.get(exchange_name)
+
+    async def _refresh_streams(self):
+        """
+        Opens streams for accounts with live positions and closes the rest,
+        including accounts whose user moved to another worker.
+        """
+        async with self.session_factory() as session:
+            position_group_repo = self.position_group_repository_class(session)
+            active_pairs = await position_group_repo.get_active_user_exchanges()
+
+            user_repo = UserRepository(session)
+            active_users = {str(u.id): u for u in await user_repo.get_all_active_users()}
+
+        wanted: Set[StreamKey] = set()
+        for user_id, exchange_name in active_pairs:
+            user_id = str(user_id)
+            user = active_users.get(user_id)
+            if not user:
+                continue
+            if self.shard_coordinator is not None and not self.shard_coordinator.owns(user_id):
+                continue
+            key = (user_id, exchange_name)
+            if key in self._unsupported:
+                continue
+            if self._get_exchange_config(user, exchange_name) is None:
+                continue
+            wanted.add(key)
+            # Keep the latest user snapshot for handlers of running streams
+            self._users[user_id] = user
+
+        for key in list(self._streams):
+            if key not in wanted:
+                await self._stop_stream(key)
+
+        for key in wanted:
+            task = self._streams.get(key)
+            if task is None or task.done():
+                self._streams[key] = asyncio.create_task(self._stream_loop(key))
+                logger.info(f"OrderFillStream: Started order stream for user {key[0]} on {key[1]}")
+
+    async def _stop_stream(self, key: StreamKey):
+        task = self._streams.pop(key, None)
+        self._live.discard(key)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        logger.info(f"OrderFillStream: Stopped order stream for user {key[0]} on {key[1]}")
+
+    async def _stream_loop(self, key: StreamKey):
+        """
+        Consumes one account's order stream until cancelled, reconnecting on errors.
+        """
+        user_id, exchange_name = key
+        backoff = INITIAL_BACKOFF_SECONDS
+
+        while self._running:
+            connector = None
+            try:
+                user = self._users[user_id]
+                exchange_config = self._get_exchange_config(user, exchange_name)
+                # Dedicated connector: the stream owns its socket for the lifetime of the loop
+                connector = get_exchange_connector(exchange_name, exchange_config=exchange_config, use_cache=False)
+
+                if not connector.supports_order_stream():
+                    logger.info(f"OrderFillStream: {exchange_name} has no order stream - using REST polling only")
+                    self._unsupported.add(key)
+                    return
+
+                self._live.add(key)
+                while self._running:
+                    orders = await connector.watch_orders()
+                    backoff = INITIAL_BACKOFF_SECONDS
+                    if self.shard_coordinator is not None and not self.shard_coordinator.owns(user_id):
+                        # User moved to another worker; its REST polling picks these up
+                        logger.info(f"OrderFillStream: User {user_id} moved to another worker, closing stream on {exchange_name}")
+                        self._streams.pop(key, None)
+                        return
+                    for order_data in orders:
+                        handled = await self.order_fill_monitor.process_order_update(
+                            self._users[user_id], exchange_name, connector, order_data
+                        )
+                        if handled:
+                            self._events_processed += 1
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._reconnects += 1
+                logger.warning(
+                    f"OrderFillStream: Stream for user {user_id} on {exchange_name} failed: {e}. "
+                    f"Reconnecting in {backoff:.0f}s (REST polling covers the gap)."
+                )
+            finally:
+                self._live.discard(key)
+                if connector:
+                    try:
+                        await connector.close()
+                    except Exception as close_err:
+                        logger.debug(f"OrderFillStream: Error closing connector: {close_err}")
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    async def start_monitoring_task(self):
+        """
+        Starts the stream supervisor task.
+        """
+        if not self._running:
+            self._running = True
+            self._supervisor_task = asyncio.create_task(self._supervisor_loop())
+            logger.info("OrderFillStreamService supervisor task started.")
+
+    async def _supervisor_loop(self):
+        """
+        Periodically reconciles the set of open streams with accounts that have live positions.
+        """
+        cycle_count = 0
+        error_count = 0
+        last_error = None
+
+        while self._running:
+            try:
+                await self._refresh_streams()
+                cycle_count += 1
+
+                await self._report_health(
+                    status="running",
+                    metrics={
+                        "cycle_count": cycle_count,
+                        "error_count": error_count,
+                        "last_error": last_error,
+                        "streams": len(self._streams),
+                        "live_streams": len(self._live),
+                        "events_processed": self._events_processed,
+                        "reconnects": self._reconnects
+                    }
+                )
+
+                await asyncio.sleep(self.refresh_interval_seconds)
+            except asyncio.CancelledError:
+                await self._report_health(status="stopped", metrics={"cycle_count": cycle_count})
+                break
+            except Exception as e:
+                error_count += 1
+                last_error = str(e)
+                logger.error(f"Error in OrderFillStream supervisor loop: {e}")
+
+                await self._report_health(
+                    status="error",
+                    metrics={
+                        "cycle_count": cycle_count,
+                        "error_count": error_count,
+                        "last_error": last_error
+                    }
+                )
+
+                await asyncio.sleep(self.refresh_interval_seconds)
+
+    async def _report_health(self, status: str, metrics: dict = None):
+        """Report service health to cache."""
+        try:
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            await cache.update_service_health("order_fill_stream", status, metrics)
+        except Exception as e:
+            logger.debug(f"Failed to report health: {e}")
+
+    async def stop_monitoring_task(self):
+        """
+        Stops the supervisor and closes every open stream.
+        """
+        if self._running and self._supervisor_task:
+            self._running = False
+            self._supervisor_task.cancel()
+            try:
+                await self._supervisor_task
+            except asyncio.CancelledError:
+                pass
+
+            for key in list(self._streams):
+                await self._stop_stream(key)
+            self._unsupported.clear()
+            logger.info("OrderFillStreamService supervisor task stopped.")
@@ -12,11 +12,37 @@ import ccxt # Added for exchange exceptions
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.exchange_abstraction.interface import ExchangeInterface
+from app.services.exchange_abstraction.order_reconciliation import is_conclusive
 from app.repositories.dca_order import DCAOrderRepository
 from app.repositories.position_group import PositionGroupRepository
 from app.models.dca_order import DCAOrder, OrderStatus, OrderType
 from app.models.position_group import PositionGroup, PositionGroupStatus
-from app.exceptions import APIError, ExchangeConnectionError, SlippageExceededError
+from app.exceptions import (
+    APIError,
+    ExchangeConnectionError,
+    GenericExchangeError,
+    InsufficientFundsError,
+    InvalidCredentialsError,
+    OrderValidationError,
+    RateLimitError,
+    SlippageExceededError,
+)
+
+
+# Errors the exchange answers a placement with, so the order certainly does not exist.
+# Anything else (timeouts, dropped connections) leaves the outcome unknown.
+PLACEMENT_REJECTIONS = (
+    OrderValidationError,
+    InsufficientFundsError,
+    InvalidCredentialsError,
+    RateLimitError,
+    GenericExchangeError,
+)
+
+
+def trigger_client_order_id(dca_order: DCAOrder) -> str:
+    """Client order ID of a leg's native trigger order (36 characters, the Binance/Bybit limit)."""
+    return f"trg-{dca_order.id.hex}"
 
 
 class CancellationStatus(Enum):
@@ -73,6 +99,52 @@ class OrderService:
         self.dca_order_repository = DCAOrderRepository(self.session)
         self.position_group_repository = PositionGroupRepository(self.session) # New repository instance
 
+    def _order_request(self, dca_order: DCAOrder) -> Dict[str, Any]:
+        """
+        place_order() arguments of a DCA order.
+
+        For market orders with quote_amount set, uses quote-based ordering (spend exact USDT).
+        For limit orders or orders without quote_amount, uses base-based ordering.
+        """
+        # Ensure Enums are converted to their values and uppercase
+        order_type_value = (dca_order.order_type.value if hasattr(dca_order.order_type, 'value') else str(dca_order.order_type)).upper()
+        side_value = (dca_order.side.value if hasattr(dca_order.side, 'value') else str(dca_order.side)).upper()
+
+        # Determine amount_type based on order type and quote_amount availability
+        # For market orders with quote_amount, use quote-based ordering
+        is_market = order_type_value == "MARKET"
+        has_quote_amount = dca_order.quote_amount is not None and dca_order.quote_amount > 0
+
+        if is_market and has_quote_amount:
+            # Use quote amount directly for market orders
+            amount_type = "quote"
+            quantity_to_send = dca_order.quote_amount
+            logger.info(f"Submitting market order with quote amount: {quantity_to_send} USDT")
+        else:
+            # Use base quantity for limit orders or when no quote_amount
+            amount_type = "base"
+            quantity_to_send = dca_order.quantity
+
+        return dict(
+            symbol=dca_order.symbol,
+            order_type=order_type_value,
+            side=side_value,
+            quantity=quantity_to_send,
+            price=dca_order.price,
+            amount_type=amount_type
+        )
+
+    async def _invalidate_precision_on_error(self, error: Exception):
+        """Drops the cached precision rules when an order was rejected for its precision."""
+        error_str = str(error).lower()
+        if any(keyword in error_str for keyword in ['precision', 'lot size', 'step size', 'tick size', 'quantity', 'notional', 'min_qty']):
+            logger.warning(f"Precision-related error detected, invalidating precision cache")
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            # Extract exchange name from connector class name
+            exchange_name = self.exchange_connector.__class__.__name__.replace('Connector', '').lower()
+            await cache.invalidate_precision_rules(exchange_name)
+
     async def submit_order(self, dca_order: DCAOrder) -> DCAOrder:
         """
         Submits a DCA order to the exchange and updates its status in the database.
@@ -89,33 +161,7 @@ class OrderService:
 
         for attempt in range(max_retries):
             try:
-                # Ensure Enums are converted to their values and uppercase
-                order_type_value = (dca_order.order_type.value if hasattr(dca_order.order_type, 'value') else str(dca_order.order_type)).upper()
-                side_value = (dca_order.side.value if hasattr(dca_order.side, 'value') else str(dca_order.side)).upper()
-
-                # Determine amount_type based on order type and quote_amount availability
-                # For market orders with quote_amount, use quote-based ordering
-                is_market = order_type_value == "MARKET"
-                has_quote_amount = dca_order.quote_amount is not None and dca_order.quote_amount > 0
-
-                if is_market and has_quote_amount:
-                    # Use quote amount directly for market orders
-                    amount_type = "quote"
-                    quantity_to_send = dca_order.quote_amount
-                    logger.info(f"Submitting market order with quote amount: {quantity_to_send} USDT")
-                else:
-                    # Use base quantity for limit orders or when no quote_amount
-                    amount_type = "base"
-                    quantity_to_send = dca_order.quantity
-
-                exchange_order_data = await self.exchange_connector.place_order(
-                    symbol=dca_order.symbol,
-                    order_type=order_type_value,
-                    side=side_value,
-                    quantity=quantity_to_send,
-                    price=dca_order.price,
-                    amount_type=amount_type
-                )
+                exchange_order_data = await self.exchange_connector.place_order(**self._order_request(dca_order))
 
                 dca_order.exchange_order_id = exchange_order_data["id"]
                 dca_order.status = OrderStatus.OPEN.value
@@ -140,30 +186,197 @@ class OrderService:
                     raise APIError(f"Failed to submit order after {max_retries} attempts: {e}") from e
             except APIError as e:
                 # Check for precision-related errors and invalidate cache
-                error_str = str(e).lower()
-                if any(keyword in error_str for keyword in ['precision', 'lot size', 'step size', 'tick size', 'quantity', 'notional', 'min_qty']):
-                    logger.warning(f"Precision-related error detected, invalidating precision cache")
-                    from app.core.cache import get_cache
-                    cache = await get_cache()
-                    # Extract exchange name from connector class name
-                    exchange_name = self.exchange_connector.__class__.__name__.replace('Connector', '').lower()
-                    await cache.invalidate_precision_rules(exchange_name)
+                await self._invalidate_precision_on_error(e)
                 dca_order.status = OrderStatus.FAILED.value
                 await self.dca_order_repository.update(dca_order)
                 raise e
             except Exception as e:
                 # Check for precision-related errors and invalidate cache
-                error_str = str(e).lower()
-                if any(keyword in error_str for keyword in ['precision', 'lot size', 'step size', 'tick size', 'quantity', 'notional', 'min_qty']):
-                    logger.warning(f"Precision-related error detected, invalidating precision cache")
-                    from app.core.cache import get_cache
-                    cache = await get_cache()
-                    exchange_name = self.exchange_connector.__class__.__name__.replace('Connector', '').lower()
-                    await cache.invalidate_precision_rules(exchange_name)
+                await self._invalidate_precision_on_error(e)
                 dca_order.status = OrderStatus.FAILED.value
                 await self.dca_order_repository.update(dca_order)
                 raise APIError(f"Failed to submit order: {e}") from e
 
+    async def submit_orders(self, dca_orders: List[DCAOrder]) -> List[DCAOrder]:
+        """
+        Submits the legs of a grid together through the connector's batch
+        placement (see ExchangeInterface.place_orders) and records every leg's
+        outcome with one flush, so the latency does not grow with the leg count.
+
+        Legs that failed on a connection error are resubmitted through
+        submit_order and its retries. Failed legs are marked FAILED. If any leg
+        failed, the legs the exchange accepted are cancelled (see
+        _withdraw_legs) before the first failure is raised like submit_order
+        does, so a failed grid does not leave orders resting on the exchange.
+
+        Raises:
+            APIError: If any leg could not be placed
+        """
+        if not dca_orders:
+            return []
+
+        results = await self.exchange_connector.place_orders(
+            [self._order_request(dca_order) for dca_order in dca_orders]
+        )
+
+        submitted_at = datetime.utcnow()
+        to_retry = []
+        first_error = None
+        for dca_order, result in zip(dca_orders, results):
+            if isinstance(result, ExchangeConnectionError):
+                to_retry.append(dca_order)
+            elif isinstance(result, Exception):
+                logger.error(f"Order leg {dca_order.leg_index} for {dca_order.symbol} was rejected: {result}")
+                dca_order.status = OrderStatus.FAILED.value
+                first_error = first_error or result
+            else:
+                dca_order.exchange_order_id = result["id"]
+                dca_order.status = OrderStatus.OPEN.value
+                dca_order.submitted_at = submitted_at
+        await self.dca_order_repository.update_all(dca_orders)
+        if first_error is not None:
+            await self._invalidate_precision_on_error(first_error)
+
+        for dca_order in to_retry:
+            logger.warning(f"Order leg {dca_order.leg_index} for {dca_order.symbol} failed to connect. Retrying alone.")
+            try:
+                await self.submit_order(dca_order)
+            except APIError as e:
+                first_error = first_error or e
+
+        if first_error is not None:
+            await self._withdraw_legs([o for o in dca_orders if o.status == OrderStatus.OPEN.value])
+            if isinstance(first_error, APIError):
+                raise first_error
+            raise APIError(f"Failed to submit order: {first_error}") from first_error
+        return dca_orders
+
+    async def _withdraw_legs(self, dca_orders: List[DCAOrder]):
+        """
+        Cancels the placed legs of a grid that failed, recording them with one
+        flush. Legs that filled meanwhile, or whose cancellation could not be
+        confirmed, stay OPEN for the fill monitor to settle.
+        """
+        if not dca_orders:
+            return
+        results = await asyncio.gather(
+            *[self.cancel_order_verified(dca_order) for dca_order in dca_orders],
+            return_exceptions=True,
+        )
+        cancelled_at = datetime.utcnow()
+        for dca_order, result in zip(dca_orders, results):
+            if isinstance(result, Exception) or not result.is_terminal:
+                logger.error(f"Order leg {dca_order.leg_index} for {dca_order.symbol} could not be withdrawn: {result}")
+            elif result.status == CancellationStatus.ALREADY_FILLED:
+                logger.warning(f"Order leg {dca_order.leg_index} for {dca_order.symbol} filled before it could be withdrawn")
+            else:
+                dca_order.status = OrderStatus.CANCELLED.value
+                dca_order.cancelled_at = cancelled_at
+        await self.dca_order_repository.update_all(dca_orders)
+
+    async def submit_trigger_orders(self, dca_orders: List[DCAOrder]) -> List[DCAOrder]:
+        """
+        Rests TRIGGER_PENDING legs on the exchange as native conditional market
+        orders (see ExchangeInterface.place_trigger_order), so they execute at
+        exchange latency instead of when the fill monitor next compares prices.
+
+        Placed legs become OPEN and are tracked like any other open order. Legs
+        the exchange rejects (e.g. the trigger price was already passed) stay
+        TRIGGER_PENDING for the fill monitor to trigger. A placement that failed
+        without an answer (timeout, dropped connection) may still have rested,
+        so it is looked up by its client order ID; if the lookup fails too, the
+        fill monitor repeats it before triggering the leg (see
+        adopt_trigger_order). Connectors without trigger orders place nothing.
+
+        Returns:
+            The legs that were placed
+        """
+        if not dca_orders or not self.exchange_connector.supports_trigger_orders():
+            return []
+
+        results = await asyncio.gather(
+            *(
+                self.exchange_connector.place_trigger_order(
+                    symbol=dca_order.symbol,
+                    side=(dca_order.side.value if hasattr(dca_order.side, 'value') else str(dca_order.side)).upper(),
+                    quantity=dca_order.quantity,
+                    trigger_price=dca_order.price,
+                    clientOrderId=trigger_client_order_id(dca_order)
+                )
+                for dca_order in dca_orders
+            ),
+            return_exceptions=True
+        )
+
+        submitted_at = datetime.utcnow()
+        placed = []
+        for dca_order, result in zip(dca_orders, results):
+            if isinstance(result, Exception) and not isinstance(result, PLACEMENT_REJECTIONS):
+                logger.warning(
+                    f"Trigger order for leg {dca_order.leg_index} of {dca_order.symbol} failed without an answer, "
+                    f"looking it up: {result}"
+                )
+                try:
+                    result = await self._find_trigger_order(dca_order) or result
+                except APIError as e:
+                    result = e
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Trigger order for leg {dca_order.leg_index} of {dca_order.symbol} was not placed, "
+                    f"falling back to engine-side triggering: {result}"
+                )
+                continue
+            dca_order.exchange_order_id = result["id"]
+            dca_order.status = OrderStatus.OPEN.value
+            dca_order.submitted_at = submitted_at
+            placed.append(dca_order)
+
+        if placed:
+            await self.dca_order_repository.update_all(placed)
+        return placed
+
+    async def adopt_trigger_order(self, dca_order: DCAOrder) -> bool:
+        """
+        Checks, before a TRIGGER_PENDING leg is triggered engine-side, whether a
+        native trigger order for it rested although its placement failed without
+        an answer. Such a leg becomes OPEN and is tracked through that order
+        instead of being placed a second time.
+
+        Returns:
+            True if the leg was adopted, False if it can be triggered
+
+        Raises:
+            APIError: If the exchange could not be asked; the leg must not be triggered yet
+        """
+        if not self.exchange_connector.supports_trigger_orders():
+            return False
+        exchange_order = await self._find_trigger_order(dca_order)
+        if exchange_order is None:
+            return False
+        logger.warning(f"Leg {dca_order.leg_index} of {dca_order.symbol} has a resting trigger order, adopting it")
+        dca_order.exchange_order_id = exchange_order["id"]
+        dca_order.status = OrderStatus.OPEN.value
+        dca_order.submitted_at = datetime.utcnow()
+        await self.dca_order_repository.update(dca_order)
+        return True
+
+    async def _find_trigger_order(self, dca_order: DCAOrder, max_attempts: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        The trigger order placed for a leg, looked up by its client order ID with
+        retries; None when the exchange has none.
+
+        Raises:
+            APIError: If the lookup keeps failing
+        """
+        client_order_id = trigger_client_order_id(dca_order)
+        for attempt in range(max_attempts):
+            try:
+                return await self.exchange_connector.get_order_by_client_id(dca_order.symbol, client_order_id)
+            except ExchangeConnectionError as e:
+                if attempt == max_attempts - 1:
+                    raise APIError(f"Trigger order {client_order_id} could not be looked up: {e}") from e
+                await asyncio.sleep(2 ** attempt)
+
     async def cancel_order(self, dca_order: DCAOrder) -> DCAOrder:
         """
         Cancels a DCA order on the exchange and updates its status in the database.
@@ -599,14 +812,20 @@ class OrderService:
             logger.error(f"Failed to place partial TP order for {dca_order.id}: {e}")
             return dca_order
 
-    async def check_order_status(self, dca_order: DCAOrder) -> DCAOrder:
+    async def check_order_status(self, dca_order: DCAOrder, snapshot: Optional[Dict[str, Any]] = None) -> DCAOrder:
         """
         Fetches the latest status of a DCA order from the exchange and updates the database.
         Includes a workaround for Bybit testnet 'Order not found' issues.
+
+        A snapshot from ExchangeInterface.reconcile_orders() is applied without a fetch
+        when it settles the order; trades that do not cover its quantity are verified.
         """
         if not dca_order.exchange_order_id:
             raise APIError("Cannot check status for order without an exchange_order_id.")
 
+        if snapshot is not None and is_conclusive(snapshot, dca_order.quantity):
+            return await self.apply_order_update(dca_order, snapshot)
+
         exchange_order_data = None
         try:
             logger.debug(f"Checking order {dca_order.id} on exchange. Exchange Order ID: {dca_order.exchange_order_id}, Symbol: {dca_order.symbol}")
@@ -624,7 +843,13 @@ class OrderService:
             logger.error(f"Failed to retrieve order status for {dca_order.id}: {e}")
             raise APIError(f"Failed to retrieve order status: {e}") from e
 
-        # If we reached here, exchange_order_data was successfully fetched
+        return await self.apply_order_update(dca_order, exchange_order_data)
+
+    async def apply_order_update(self, dca_order: DCAOrder, exchange_order_data: Dict[str, Any]) -> DCAOrder:
+        """
+        Applies an exchange order snapshot (from a REST fetch or a user-data stream event)
+        to the DCA order: status, filled quantity, average price and fees.
+        """
         exchange_status = exchange_order_data["status"]
         
         # Map specific exchange statuses if necessary, but CCXT usually standardizes to lowercase 'open', 'closed', 'canceled'
@@ -766,6 +991,10 @@ class OrderService:
         if changed:
             logger.info(f"Order {dca_order.id}: Saving changes to database (status={dca_order.status})")
             await self.dca_order_repository.update(dca_order)
+            if dca_order.ledger_applied is True:
+                # The position ledger already counted this fill with the old values
+                from app.services.position.position_ledger import invalidate_ledger
+                await invalidate_ledger(self.session, dca_order.group_id)
             logger.info(f"Order {dca_order.id}: Repository update completed")
         else:
             logger.info(f"Order {dca_order.id}: No changes detected, skipping update")
@@ -901,19 +1130,37 @@ class OrderService:
             logger.error(f"Failed to handle stale TP for order {dca_order.id}: {e}")
             return dca_order
 
-    async def check_tp_status(self, dca_order: DCAOrder) -> DCAOrder:
+    async def check_tp_status(self, dca_order: DCAOrder, snapshot: Optional[Dict[str, Any]] = None) -> DCAOrder:
         """
         Checks the status of the TP order associated with this DCA order.
+        A bulk snapshot only settles a TP that is still open; a filled one is fetched.
         """
         if not dca_order.tp_order_id:
             return dca_order
 
+        if snapshot is not None and is_conclusive(snapshot):
+            return await self.apply_tp_order_update(dca_order, snapshot)
+
         try:
             exchange_order_data = await self.exchange_connector.get_order_status(
                 order_id=dca_order.tp_order_id,
                 symbol=dca_order.symbol
             )
+            return await self.apply_tp_order_update(dca_order, exchange_order_data)
+        except Exception as e:
+            logger.error(f"Failed to check TP status for order {dca_order.id}: {e}")
+            return dca_order
 
+    async def apply_tp_order_update(self, dca_order: DCAOrder, exchange_order_data: Dict[str, Any]) -> DCAOrder:
+        """
+        Applies an exchange snapshot of this DCA order's TP order.
+        When the TP is filled, marks tp_hit and records a TP fill (leg_index=999).
+        """
+        # Already applied (e.g. stream event followed by REST reconciliation)
+        if dca_order.tp_hit:
+            return dca_order
+
+        try:
             status = exchange_order_data["status"].lower()
 
             if status == "closed" or status == "filled":
@@ -0,0 +1,363 @@
+"""
+Incrementally maintained performance aggregates for the analytics dashboard.
+
+/dashboard/analytics used to load every closed PositionGroup of the user and
+loop over the whole trade history on each request. The running totals of that
+loop are now stored per user:
+
+- PerformanceSummary holds all-time counts and sums (enough for win rate,
+  averages, profit factor and Sharpe/Sortino), PnL per pair and timeframe, the
+  best and worst trades, and the running equity/peak/max drawdown
+- PerformanceDaily holds one row per UTC day with closes (today/week/month PnL
+  and the equity curve)
+- Closed groups are folded in exactly once (PositionGroup.analytics_applied)
+  by the risk engine's full sweep (fold_pending), so none of the many close
+  paths has to know about analytics. Reads apply the closes still pending in
+  memory, without locking or writing anything
+- Reads cost O(days with closes) plus the closes since the last sweep
+
+rebuild() replays the full history; scripts/rebuild_performance_aggregates.py
+runs it for existing installations and after manual PnL corrections.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.performance_aggregate import PerformanceDaily, PerformanceSummary
+from app.models.position_group import PositionGroup
+from app.repositories.performance_aggregate import PerformanceDailyRepository, PerformanceSummaryRepository
+from app.repositories.position_group import PositionGroupRepository
+
+logger = logging.getLogger(__name__)
+
+# Best/worst trades kept for the trade distribution
+TOP_TRADES = 10
+# Pending closes applied per query while catching up
+CATCH_UP_BATCH_SIZE = 1000
+
+STATE_VERSION = 1
+
+
+@dataclass
+class DayTotals:
+    trades: int = 0
+    wins: int = 0
+    losses: int = 0
+    realized_pnl: float = 0.0
+    closing_equity: float = 0.0
+
+
+class PerformanceAggregate:
+    """Running performance totals; apply() each closed group once, in close order."""
+
+    def __init__(self):
+        self.total_trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.breakeven = 0
+        self.realized_pnl = 0.0
+        self.gross_win = 0.0
+        self.gross_loss = 0.0
+        self.sum_sq = 0.0
+        self.downside_count = 0
+        self.downside_sum = 0.0
+        self.downside_sum_sq = 0.0
+        self.pnl_by_pair: Dict[str, float] = {}
+        self.pnl_by_timeframe: Dict[str, float] = {}
+        self.best_trades: List[list] = []
+        self.worst_trades: List[list] = []
+        self.equity = 0.0
+        self.peak_equity = 0.0
+        self.max_drawdown = 0.0
+        self.last_closed_at: Optional[datetime] = None
+
+        self.daily: Dict[date, DayTotals] = {}
+        # Days changed since loading, written back by PerformanceStore
+        self.touched_days: Set[date] = set()
+
+    # ==================== Updates ====================
+
+    def apply(self, symbol: Optional[str], timeframe, pnl: float, closed_at: Optional[datetime]):
+        self.total_trades += 1
+        self.realized_pnl += pnl
+        self.sum_sq += pnl * pnl
+
+        if pnl > 0:
+            self.wins += 1
+            self.gross_win += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.gross_loss += abs(pnl)
+            self.downside_count += 1
+            self.downside_sum += pnl
+            self.downside_sum_sq += pnl * pnl
+        else:
+            self.breakeven += 1
+
+        if symbol:
+            self.pnl_by_pair[symbol] = self.pnl_by_pair.get(symbol, 0.0) + pnl
+        if timeframe:
+            key = str(timeframe)
+            self.pnl_by_timeframe[key] = self.pnl_by_timeframe.get(key, 0.0) + pnl
+
+        trade = [symbol, pnl]
+        self.best_trades = sorted(self.best_trades + [trade], key=lambda t: t[1], reverse=True)[:TOP_TRADES]
+        self.worst_trades = sorted(self.worst_trades + [trade], key=lambda t: t[1])[:TOP_TRADES]
+
+        self.equity += pnl
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        self.max_drawdown = max(self.max_drawdown, self.peak_equity - self.equity)
+
+        if closed_at is not None:
+            if self.last_closed_at is None or closed_at > self.last_closed_at:
+                self.last_closed_at = closed_at
+            day = closed_at.date()
+            totals = self.daily.setdefault(day, DayTotals())
+            totals.trades += 1
+            if pnl > 0:
+                totals.wins += 1
+            elif pnl < 0:
+                totals.losses += 1
+            totals.realized_pnl += pnl
+            totals.closing_equity = self.equity
+            self.touched_days.add(day)
+
+    def apply_position(self, group: PositionGroup):
+        pnl = float(group.realized_pnl_usd) if group.realized_pnl_usd else 0.0
+        closed_at = group.closed_at if isinstance(group.closed_at, datetime) else None
+        symbol = group.symbol if isinstance(group.symbol, str) else None
+        self.apply(symbol, group.timeframe, pnl, closed_at)
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[PositionGroup]) -> "PerformanceAggregate":
+        """Full replay of a trade history, in close order."""
+        aggregate = cls()
+        for group in sorted(positions, key=lambda g: g.closed_at if isinstance(g.closed_at, datetime) else datetime.min):
+            aggregate.apply_position(group)
+        return aggregate
+
+    # ==================== Derived metrics ====================
+
+    @property
+    def current_drawdown(self) -> float:
+        return self.peak_equity - self.equity if self.peak_equity > 0 else 0.0
+
+    def pnl_since(self, first_day: date) -> float:
+        return sum(totals.realized_pnl for day, totals in self.daily.items() if day >= first_day)
+
+    def pnl_today(self, now: Optional[datetime] = None) -> float:
+        return self.pnl_since((now or datetime.utcnow()).date())
+
+    def pnl_last_days(self, days: int, now: Optional[datetime] = None) -> float:
+        """PnL of the last `days` UTC days, today included."""
+        return self.pnl_since((now or datetime.utcnow()).date() - timedelta(days=days - 1))
+
+    def equity_curve(self) -> List[dict]:
+        """Equity after the last close of each day."""
+        return [
+            {"timestamp": datetime.combine(day, datetime.min.time()).isoformat(), "equity": totals.closing_equity}
+            for day, totals in sorted(self.daily.items())
+        ]
+
+    def daily_returns(self) -> List[float]:
+        return [totals.realized_pnl for _, totals in sorted(self.daily.items())]
+
+    def sharpe_sortino(self) -> tuple:
+        """Per-trade Sharpe and Sortino ratios (not annualized)."""
+        if not self.total_trades:
+            return 0.0, 0.0
+
+        avg_return = self.realized_pnl / self.total_trades
+        variance = max(self.sum_sq / self.total_trades - avg_return ** 2, 0.0)
+        std_dev = variance ** 0.5
+        sharpe_ratio = avg_return / std_dev if std_dev > 0 else 0.0
+
+        sortino_ratio = 0.0
+        if self.downside_count:
+            # Mean squared deviation of the negative returns from the overall mean
+            downside_variance = (
+                self.downside_sum_sq
+                - 2 * avg_return * self.downside_sum
+                + self.downside_count * avg_return ** 2
+            ) / self.downside_count
+            downside_dev = max(downside_variance, 0.0) ** 0.5
+            sortino_ratio = avg_return / downside_dev if downside_dev > 0 else 0.0
+
+        return sharpe_ratio, sortino_ratio
+
+    # ==================== Persistence ====================
+
+    def to_state(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "total_trades": self.total_trades,
+            "wins": self.wins,
+            "losses": self.losses,
+            "breakeven": self.breakeven,
+            "realized_pnl": self.realized_pnl,
+            "gross_win": self.gross_win,
+            "gross_loss": self.gross_loss,
+            "sum_sq": self.sum_sq,
+            "downside_count": self.downside_count,
+            "downside_sum": self.downside_sum,
+            "downside_sum_sq": self.downside_sum_sq,
+            "pnl_by_pair": dict(self.pnl_by_pair),
+            "pnl_by_timeframe": dict(self.pnl_by_timeframe),
+            "best_trades": list(self.best_trades),
+            "worst_trades": list(self.worst_trades),
+            "equity": self.equity,
+            "peak_equity": self.peak_equity,
+            "max_drawdown": self.max_drawdown,
+            "last_closed_at": self.last_closed_at.isoformat() if self.last_closed_at else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, daily_rows: Iterable[PerformanceDaily] = ()) -> "PerformanceAggregate":
+        aggregate = cls()
+        for name in (
+            "total_trades", "wins", "losses", "breakeven", "downside_count",
+        ):
+            setattr(aggregate, name, int(state.get(name, 0)))
+        for name in (
+            "realized_pnl", "gross_win", "gross_loss", "sum_sq", "downside_sum", "downside_sum_sq",
+            "equity", "peak_equity", "max_drawdown",
+        ):
+            setattr(aggregate, name, float(state.get(name, 0.0)))
+        aggregate.pnl_by_pair = dict(state.get("pnl_by_pair") or {})
+        aggregate.pnl_by_timeframe = dict(state.get("pnl_by_timeframe") or {})
+        aggregate.best_trades = [list(t) for t in state.get("best_trades") or []]
+        aggregate.worst_trades = [list(t) for t in state.get("worst_trades") or []]
+        if state.get("last_closed_at"):
+            aggregate.last_closed_at = datetime.fromisoformat(state["last_closed_at"])
+
+        for row in daily_rows:
+            aggregate.daily[row.day] = DayTotals(
+                trades=row.trades,
+                wins=row.wins,
+                losses=row.losses,
+                realized_pnl=float(row.realized_pnl_usd),
+                closing_equity=float(row.closing_equity_usd),
+            )
+        return aggregate
+
+
+class PerformanceStore:
+    """Loads, catches up and saves a user's PerformanceAggregate."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.summary_repo = PerformanceSummaryRepository(session)
+        self.daily_repo = PerformanceDailyRepository(session)
+        self.position_repo = PositionGroupRepository(session)
+
+    async def load(self, user_id) -> PerformanceAggregate:
+        """
+        The user's aggregates including every group closed so far. Read-only:
+        closes not folded in yet are applied to the returned aggregate only.
+        """
+        aggregate = await self._load_stored(user_id)
+        pending = await self.position_repo.get_closed_pending_analytics(user_id, limit=None)
+        for group in pending:
+            aggregate.apply_position(group)
+        return aggregate
+
+    async def catch_up(self, user_id) -> PerformanceAggregate:
+        """
+        Folds the user's pending closes into the stored aggregates.
+        Locks the summary row while they are applied; the caller commits.
+        """
+        summary = await self.summary_repo.get_for_user(user_id, for_update=True)
+        if summary is not None:
+            aggregate = PerformanceAggregate.from_state(summary.state, await self.daily_repo.get_for_user(user_id))
+        else:
+            aggregate = PerformanceAggregate()
+
+        applied = 0
+        while True:
+            pending = await self.position_repo.get_closed_pending_analytics(user_id, limit=CATCH_UP_BATCH_SIZE)
+            for group in pending:
+                aggregate.apply_position(group)
+            await self.position_repo.mark_analytics_applied([group.id for group in pending])
+            applied += len(pending)
+            if len(pending) < CATCH_UP_BATCH_SIZE:
+                break
+
+        if not applied:
+            return aggregate
+
+        try:
+            await self._save(user_id, aggregate, summary)
+        except IntegrityError:
+            # A concurrent first catch-up created the summary; use its result
+            await self.session.rollback()
+            summary = await self.summary_repo.get_for_user(user_id)
+            if summary is None:
+                raise
+            return PerformanceAggregate.from_state(summary.state, await self.daily_repo.get_for_user(user_id))
+
+        logger.debug(f"PerformanceStore: Applied {applied} closed groups for user {user_id}")
+        return aggregate
+
+    async def fold_pending(self, owns: Optional[Callable[[object], bool]] = None) -> int:
+        """
+        Catches up every user with pending closes (those `owns` accepts),
+        committing per user so each summary row is locked briefly.
+
+        Returns:
+            The number of users caught up
+        """
+        folded = 0
+        for user_id in await self.position_repo.get_user_ids_pending_analytics():
+            if owns is not None and not owns(user_id):
+                continue
+            try:
+                await self.catch_up(user_id)
+                await self.session.commit()
+                folded += 1
+            except Exception as e:
+                logger.error(f"PerformanceStore: Failed to fold closed groups for user {user_id}: {e}")
+                await self.session.rollback()
+        return folded
+
+    async def rebuild(self, user_id) -> PerformanceAggregate:
+        """Discard the stored aggregates and replay every closed group of the user."""
+        await self.summary_repo.delete_for_user(user_id)
+        await self.daily_repo.delete_for_user(user_id)
+        await self.position_repo.reset_analytics_applied(user_id)
+        await self.session.flush()
+        return await self.catch_up(user_id)
+
+    async def _load_stored(self, user_id) -> PerformanceAggregate:
+        summary = await self.summary_repo.get_for_user(user_id)
+        if summary is None:
+            return PerformanceAggregate()
+        return PerformanceAggregate.from_state(summary.state, await self.daily_repo.get_for_user(user_id))
+
+    async def _save(self, user_id, aggregate: PerformanceAggregate, summary: Optional[PerformanceSummary]):
+        if summary is None:
+            self.session.add(PerformanceSummary(user_id=user_id, state=aggregate.to_state()))
+        else:
+            summary.state = aggregate.to_state()
+
+        days = sorted(aggregate.touched_days)
+        existing = {row.day: row for row in await self.daily_repo.get_days(user_id, days)}
+        for day in days:
+            totals = aggregate.daily[day]
+            row = existing.get(day)
+            if row is None:
+                row = PerformanceDaily(user_id=user_id, day=day)
+                self.session.add(row)
+            row.trades = totals.trades
+            row.wins = totals.wins
+            row.losses = totals.losses
+            row.realized_pnl_usd = Decimal(str(totals.realized_pnl))
+            row.closing_equity_usd = Decimal(str(totals.closing_equity))
+
+        await self.session.flush()
+        aggregate.touched_days.clear()
@@ -11,6 +11,7 @@ from typing import Callable
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.dca_order import DCAOrder, OrderStatus
 from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.models.pyramid import Pyramid, PyramidStatus
@@ -206,6 +207,7 @@ async def create_position_group_from_signal(
 
     # 7. Create DCAOrder objects
     orders_to_submit = []
+    trigger_orders = []
     order_side = "buy" if signal.side == "long" else "sell"
 
     entry_type = dca_grid_config.entry_order_type
@@ -248,25 +250,24 @@ async def create_position_group_from_signal(
         if current_status == OrderStatus.PENDING:
             orders_to_submit.append(dca_order)
         else:
+            trigger_orders.append(dca_order)
             logger.info(f"Order leg {i} set to {current_status} (Market Watch). Not submitting yet.")
 
     logger.debug(f"About to submit {len(orders_to_submit)} orders")
 
-    # 8. Submit orders sequentially to avoid SQLAlchemy session conflicts
-    # Note: Parallel submission causes "Session is already flushing" errors
-    # because multiple coroutines try to update the shared session concurrently
+    # 8. Submit the grid in one batch; the legs are recorded with a single flush
+    # (submitting legs concurrently through submit_order would flush the shared session concurrently)
     try:
         if orders_to_submit:
-            logger.debug(f"Submitting {len(orders_to_submit)} orders sequentially")
-            for order in orders_to_submit:
-                try:
-                    await order_service.submit_order(order)
-                except Exception as e:
-                    logger.error(f"Order {order.leg_index} failed: {e}")
-                    raise e
+            logger.debug(f"Submitting {len(orders_to_submit)} orders as a batch")
+            await order_service.submit_orders(orders_to_submit)
+        if trigger_orders and settings.NATIVE_TRIGGER_ORDERS:
+            await order_service.submit_trigger_orders(trigger_orders)
     except Exception as e:
         logger.error(f"Failed to submit orders for PositionGroup {new_position_group.id}: {e}")
-        new_position_group.status = PositionGroupStatus.FAILED
+        # Legs that filled or could not be withdrawn still need the group to be managed
+        if not any(order.status == OrderStatus.OPEN.value for order in orders_to_submit):
+            new_position_group.status = PositionGroupStatus.FAILED
         await broadcast_failure(
             position_group=new_position_group,
             error_type="order_failed",
@@ -390,6 +391,7 @@ async def handle_pyramid_continuation(
 
     # 7. Create DCAOrder objects
     orders_to_submit = []
+    trigger_orders = []
     order_side = "buy" if signal.side == "long" else "sell"
 
     # Use entry_order_type from DCA config (same logic as initial pyramid creation)
@@ -431,17 +433,19 @@ async def handle_pyramid_continuation(
         if current_status == OrderStatus.PENDING:
             orders_to_submit.append(dca_order)
         else:
+            trigger_orders.append(dca_order)
             logger.info(f"Pyramid order leg {i} set to {current_status} (Market Watch). Not submitting yet.")
 
-    # Submit orders sequentially to avoid SQLAlchemy session conflicts
+    # Submit the pyramid's legs in one batch
     if orders_to_submit:
-        logger.debug(f"Submitting {len(orders_to_submit)} pyramid orders sequentially")
-        for order in orders_to_submit:
-            try:
-                await order_service.submit_order(order)
-            except Exception as e:
-                logger.error(f"Pyramid order {order.leg_index} failed: {e}")
-                raise e
+        logger.debug(f"Submitting {len(orders_to_submit)} pyramid orders as a batch")
+        try:
+            await order_service.submit_orders(orders_to_submit)
+        except Exception as e:
+            logger.error(f"Pyramid orders failed: {e}")
+            raise e
+    if trigger_orders and settings.NATIVE_TRIGGER_ORDERS:
+        await order_service.submit_trigger_orders(trigger_orders)
 
     logger.info(f"Handled pyramid continuation for PositionGroup {existing_position_group.id} from signal {signal.id}. Created {len(orders_to_submit)} new orders.")
 
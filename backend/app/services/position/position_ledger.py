@@ -0,0 +1,311 @@
+"""
+Incremental position accounting.
+
+update_position_stats used to reload every DCAOrder of a group and replay the
+whole fill history on each fill or TP hit. PositionLedger keeps the running
+aggregates of that replay (quantity, cost basis, realized PnL, fees, the
+not-yet-TP'd entry value used by hybrid/per_leg modes and per-pyramid totals
+for pyramid_aggregate mode) in PositionGroup.ledger_state, so each event only
+applies the fills that have not been applied yet:
+
+- apply_fill() applies one filled order, apply_tp_hit() removes an entry whose
+  per-leg TP was hit from the open-entry aggregates
+- DCAOrder.ledger_applied / ledger_tp_applied mark what the ledger has seen
+- A fill that sorts before the last applied one (late detection) cannot be
+  applied incrementally, and an amended fill (fee or quantity corrected after it
+  was applied) invalidates the ledger; both are rebuilt with replay() instead
+- replay() is the old full recompute expressed with the same primitives and
+  serves as the verifier: diff() reports fields where both paths disagree
+"""
+import logging
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dca_order import DCAOrder, OrderStatus
+from app.models.position_group import PositionGroup
+
+logger = logging.getLogger(__name__)
+
+# Fees in these currencies are part of the cost basis / PnL; other fees are already
+# reflected in the received quantity
+QUOTE_CURRENCIES = {"USDT", "BUSD", "USDC", "USD", "TUSD", "DAI"}
+
+# leg_index of TP fill records (not entry legs)
+TP_FILL_LEG_INDEX = 999
+
+LEDGER_VERSION = 1
+
+# Precision of the Numeric(20, 10) amount columns
+AMOUNT_TOLERANCE = Decimal("1e-10")
+
+
+def fill_sort_key(order: DCAOrder) -> datetime:
+    return order.filled_at or order.created_at or datetime.min
+
+
+@dataclass
+class PyramidLedger:
+    """Running totals for one pyramid's entry legs (pyramid_aggregate TP)."""
+    filled_legs: int = 0
+    tp_hit_legs: int = 0
+    open_quantity: Decimal = Decimal("0")
+    open_value: Decimal = Decimal("0")
+
+    @property
+    def open_avg_entry(self) -> Optional[Decimal]:
+        if self.open_quantity <= 0:
+            return None
+        return self.open_value / self.open_quantity
+
+
+@dataclass
+class PositionLedger:
+    quantity: Decimal = Decimal("0")
+    invested_usd: Decimal = Decimal("0")
+    avg_entry: Decimal = Decimal("0")
+    realized_pnl_usd: Decimal = Decimal("0")
+    entry_fees_usd: Decimal = Decimal("0")
+    exit_fees_usd: Decimal = Decimal("0")
+    # Filled entries whose per-leg TP has not been hit (hybrid/per_leg average)
+    open_entry_quantity: Decimal = Decimal("0")
+    open_entry_value: Decimal = Decimal("0")
+    filled_orders: int = 0
+    filled_entry_legs: int = 0
+    last_fill_at: Optional[datetime] = None
+    pyramids: Dict[str, PyramidLedger] = field(default_factory=dict)
+
+    # ==================== Deltas ====================
+
+    def accepts(self, order: DCAOrder) -> bool:
+        """Whether a new fill can be applied without changing the replay order."""
+        return self.last_fill_at is None or fill_sort_key(order) >= self.last_fill_at
+
+    def apply_fill(self, order: DCAOrder) -> None:
+        """Apply one filled order, exactly as the full replay does."""
+        qty = order.filled_quantity
+        price = order.avg_fill_price or order.price
+        order_fee = order.fee or Decimal("0")
+        fee_in_quote = (order.fee_currency or "").upper() in QUOTE_CURRENCIES
+
+        # Fees paid in base currency are tracked in USD at the fill price
+        if fee_in_quote:
+            fee_usd = order_fee
+        else:
+            fee_usd = order_fee * price if price and price > 0 else order_fee
+
+        # For SPOT trading all positions are long: buys are entries, sells are exits
+        if order.side.lower() == "buy":
+            new_invested = self.invested_usd + (qty * price)
+            if fee_in_quote:
+                new_invested += order_fee
+            new_qty = self.quantity + qty
+            self.entry_fees_usd += fee_usd
+
+            if new_qty > 0:
+                self.avg_entry = new_invested / new_qty
+
+            self.quantity = new_qty
+            self.invested_usd = new_invested
+            self.open_entry_quantity += qty
+            self.open_entry_value += qty * price
+        else:
+            trade_pnl = (price - self.avg_entry) * qty
+            if fee_in_quote:
+                trade_pnl -= order_fee
+            self.realized_pnl_usd += trade_pnl
+            self.exit_fees_usd += fee_usd
+            self.quantity -= qty
+
+            if self.quantity <= 0:
+                # Invested and avg entry are kept for the record once the position is flat
+                self.quantity = Decimal("0")
+            else:
+                self.invested_usd = self.quantity * self.avg_entry
+
+        self.filled_orders += 1
+        if order.leg_index != TP_FILL_LEG_INDEX:
+            self.filled_entry_legs += 1
+            if order.pyramid_id:
+                pyramid = self.pyramids.setdefault(str(order.pyramid_id), PyramidLedger())
+                pyramid_qty = order.filled_quantity or order.quantity
+                pyramid.filled_legs += 1
+                pyramid.open_quantity += pyramid_qty
+                pyramid.open_value += pyramid_qty * price
+
+        sort_key = fill_sort_key(order)
+        if self.last_fill_at is None or sort_key > self.last_fill_at:
+            self.last_fill_at = sort_key
+
+    def apply_tp_hit(self, order: DCAOrder) -> None:
+        """Remove a filled entry whose per-leg TP was hit from the open-entry totals."""
+        price = order.avg_fill_price or order.price
+        if order.side.lower() == "buy":
+            self.open_entry_quantity -= order.filled_quantity
+            self.open_entry_value -= order.filled_quantity * price
+
+        if order.leg_index != TP_FILL_LEG_INDEX and order.pyramid_id:
+            pyramid = self.pyramids.setdefault(str(order.pyramid_id), PyramidLedger())
+            pyramid_qty = order.filled_quantity or order.quantity
+            pyramid.tp_hit_legs += 1
+            pyramid.open_quantity -= pyramid_qty
+            pyramid.open_value -= pyramid_qty * price
+
+    @classmethod
+    def replay(cls, filled_orders: Iterable[DCAOrder]) -> "PositionLedger":
+        """Full recompute from a group's filled orders."""
+        ledger = cls()
+        for order in sorted(filled_orders, key=fill_sort_key):
+            ledger.apply_fill(order)
+            if order.tp_hit:
+                ledger.apply_tp_hit(order)
+        return ledger
+
+    # ==================== Derived stats ====================
+
+    def position_averages(self, tp_mode: str) -> tuple:
+        """
+        (weighted_avg_entry, total_invested_usd) as stored on the group. Hybrid and
+        per_leg modes average only the entries whose leg TP has not been hit.
+        """
+        if tp_mode in ["hybrid", "per_leg"] and self.quantity > 0 and self.open_entry_quantity > 0:
+            avg_entry = self.open_entry_value / self.open_entry_quantity
+            return avg_entry, self.quantity * avg_entry
+        return self.avg_entry, self.invested_usd
+
+    # ==================== Persistence ====================
+
+    def to_dict(self) -> dict:
+        data = {"version": LEDGER_VERSION}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name == "pyramids":
+                value = {
+                    pyramid_id: {k: str(v) for k, v in vars(p).items()}
+                    for pyramid_id, p in value.items()
+                }
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            elif value is not None:
+                value = str(value)
+            data[f.name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["PositionLedger"]:
+        """Load a stored ledger; None when missing or from another version (rebuild)."""
+        if not isinstance(data, dict) or data.get("version") != LEDGER_VERSION:
+            return None
+        try:
+            ledger = cls(
+                quantity=Decimal(data["quantity"]),
+                invested_usd=Decimal(data["invested_usd"]),
+                avg_entry=Decimal(data["avg_entry"]),
+                realized_pnl_usd=Decimal(data["realized_pnl_usd"]),
+                entry_fees_usd=Decimal(data["entry_fees_usd"]),
+                exit_fees_usd=Decimal(data["exit_fees_usd"]),
+                open_entry_quantity=Decimal(data["open_entry_quantity"]),
+                open_entry_value=Decimal(data["open_entry_value"]),
+                filled_orders=int(data["filled_orders"]),
+                filled_entry_legs=int(data["filled_entry_legs"]),
+                last_fill_at=datetime.fromisoformat(data["last_fill_at"]) if data.get("last_fill_at") else None,
+                pyramids={
+                    pyramid_id: PyramidLedger(
+                        filled_legs=int(p["filled_legs"]),
+                        tp_hit_legs=int(p["tp_hit_legs"]),
+                        open_quantity=Decimal(p["open_quantity"]),
+                        open_value=Decimal(p["open_value"]),
+                    )
+                    for pyramid_id, p in (data.get("pyramids") or {}).items()
+                }
+            )
+        except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+            logger.warning(f"Discarding unreadable position ledger: {e}")
+            return None
+        return ledger
+
+    # ==================== Verification ====================
+
+    def diff(self, other: "PositionLedger") -> List[str]:
+        """
+        Names of the fields where two ledgers disagree. Amounts are compared at the
+        precision of the stored columns, since adding and later subtracting a TP'd
+        leg can round differently in the last digit than never adding it.
+        """
+        mismatches = [
+            f.name for f in fields(self)
+            if f.name != "pyramids" and not _same(getattr(self, f.name), getattr(other, f.name))
+        ]
+        for pyramid_id in sorted(set(self.pyramids) | set(other.pyramids)):
+            mine, theirs = self.pyramids.get(pyramid_id), other.pyramids.get(pyramid_id)
+            if mine is None or theirs is None or not all(
+                _same(getattr(mine, f.name), getattr(theirs, f.name)) for f in fields(PyramidLedger)
+            ):
+                mismatches.append(f"pyramids.{pyramid_id}")
+        return mismatches
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, Decimal) and isinstance(b, Decimal):
+        return abs(a - b) <= AMOUNT_TOLERANCE
+    return a == b
+
+
+# ==================== Order queries ====================
+
+async def load_filled_orders(session: AsyncSession, group_id) -> List[DCAOrder]:
+    result = await session.execute(
+        select(DCAOrder).where(DCAOrder.group_id == group_id, DCAOrder.status == OrderStatus.FILLED)
+    )
+    return list(result.scalars().all())
+
+
+async def load_unapplied_orders(session: AsyncSession, group_id) -> List[DCAOrder]:
+    """Filled orders the ledger has not applied yet, plus entries whose TP hit is new."""
+    result = await session.execute(
+        select(DCAOrder).where(
+            DCAOrder.group_id == group_id,
+            DCAOrder.status == OrderStatus.FILLED,
+            or_(
+                DCAOrder.ledger_applied.is_not(True),
+                and_(DCAOrder.tp_hit.is_(True), DCAOrder.ledger_tp_applied.is_not(True))
+            )
+        )
+    )
+    return list(result.scalars().all())
+
+
+def mark_applied(orders: Iterable[DCAOrder]) -> None:
+    for order in orders:
+        order.ledger_applied = True
+        order.ledger_tp_applied = bool(order.tp_hit)
+
+
+async def invalidate_ledger(session: AsyncSession, group_id) -> None:
+    """An applied fill was amended; rebuild the group's ledger on the next stats update."""
+    await session.execute(
+        update(PositionGroup).where(PositionGroup.id == group_id).values(ledger_state=None)
+    )
+
+
+async def verify_ledger(session: AsyncSession, position_group, repair: bool = False) -> List[str]:
+    """
+    Replay the group's full fill history and compare it with the stored ledger.
+
+    Returns:
+        Mismatched field names (empty when the incremental ledger is exact).
+        With repair=True a diverged or missing ledger is replaced by the replay.
+    """
+    filled_orders = await load_filled_orders(session, position_group.id)
+    replayed = PositionLedger.replay(filled_orders)
+    stored = PositionLedger.from_dict(position_group.ledger_state)
+
+    mismatches = ["ledger_state"] if stored is None else stored.diff(replayed)
+    if mismatches and repair:
+        position_group.ledger_state = replayed.to_dict()
+        mark_applied(filled_orders)
+    return mismatches
@@ -23,6 +23,15 @@ from app.services.exchange_abstraction.factory import get_exchange_connector
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.services.grid_calculator import GridCalculatorService
 from app.services.order_management import OrderService
+from app.services.position.position_ledger import (
+    PositionLedger,
+    fill_sort_key,
+    load_filled_orders,
+    load_unapplied_orders,
+    mark_applied,
+    verify_ledger,
+)
+from app.core.config import settings
 from app.services.telegram_signal_helper import (
     broadcast_entry_signal,
     broadcast_exit_signal,
@@ -221,19 +230,18 @@ class PositionManagerService:
         except Exception:
             pass  # Object not in session, will load fresh
 
-        position_group = await position_group_repo.get_with_orders(group_id, refresh=True)
+        # Orders are not loaded with the group; only new fills are read below
+        position_group = await position_group_repo.get_with_orders(group_id, refresh=True, load_orders=False)
         if not position_group:
             logger.error(f"PositionGroup {group_id} not found for stats update.")
             return None
 
-        # Get all orders via direct query to avoid relationship caching issues
-        orders_query = select(DCAOrder).where(DCAOrder.group_id == group_id)
-        orders_result = await session.execute(orders_query)
-        all_orders = list(orders_result.scalars().all())
+        # --- 1. Apply new fills to the position ledger ---
+        ledger, filled_orders, status_orders = await self._apply_fills_to_ledger(session, position_group)
 
-        # --- 1. Update Pyramid Statuses ---
+        # --- 2. Update Pyramid Statuses ---
         pyramid_orders = {}
-        for order in all_orders:
+        for order in status_orders:
             if order.pyramid_id:
                 pyramid_orders.setdefault(order.pyramid_id, []).append(order)
 
@@ -257,123 +265,16 @@ class PositionManagerService:
                 pyramid.status = PyramidStatus.SUBMITTED
                 logger.info(f"Pyramid {pyramid.id} status updated to SUBMITTED.")
 
-        # --- 2. Calculate Stats from Filled Orders ---
-        filled_orders = [o for o in all_orders if o.status == OrderStatus.FILLED]
-        filled_orders.sort(key=lambda x: x.filled_at or x.created_at or datetime.min)
-
-        # Log order details for debugging
-        buy_orders = [o for o in filled_orders if o.side.lower() == 'buy']
-        sell_orders = [o for o in filled_orders if o.side.lower() == 'sell']
-        logger.debug(
-            f"Stats calculation for {group_id}: {len(filled_orders)} filled orders "
-            f"({len(buy_orders)} buys, {len(sell_orders)} sells)"
-        )
-
-        current_qty = Decimal("0")
-        current_invested_usd = Decimal("0")
-        total_realized_pnl = Decimal("0")
-        current_avg_price = Decimal("0")
-        total_entry_fees = Decimal("0")
-        total_exit_fees = Decimal("0")
-
-        for o in filled_orders:
-            order_side = o.side.lower()
-            group_side = position_group.side.lower()
-
-            qty = o.filled_quantity
-            price = o.avg_fill_price or o.price
-            order_fee = o.fee or Decimal("0")
-            fee_currency = (o.fee_currency or "").upper()
-
-            # Determine if fee is in quote currency (USDT/BUSD/USDC)
-            # Only add fee to investment/PnL if it's in quote currency
-            # If fee is in base currency (e.g., BTC) or BNB, it's already deducted from qty/separate
-            quote_currencies = {"USDT", "BUSD", "USDC", "USD", "TUSD", "DAI"}
-            fee_in_quote = fee_currency in quote_currencies
-
-            # Convert fee to USD for tracking purposes
-            # If fee is in base currency, multiply by price to get USD value
-            if fee_in_quote:
-                fee_usd = order_fee
-            else:
-                # Fee is in base currency (e.g., BTC) - convert to USD
-                fee_usd = order_fee * price if price and price > 0 else order_fee
-
-            # For SPOT trading: All positions are "long"
-            # "buy" orders are entries, "sell" orders are exits
-            is_entry = (order_side == "buy")
-
-            if is_entry:
-                # Investment = qty * price
-                # Only add fee if it was paid in quote currency (USDT)
-                # If fee was in base currency, qty already reflects net received
-                if fee_in_quote:
-                    new_invested = current_invested_usd + (qty * price) + order_fee
-                else:
-                    # Fee was in base currency or BNB - don't add to investment
-                    # But we still track the USD value of the fee
-                    new_invested = current_invested_usd + (qty * price)
-                new_qty = current_qty + qty
-                total_entry_fees += fee_usd  # Always store in USD
-
-                if new_qty > 0:
-                    current_avg_price = new_invested / new_qty
-
-                current_qty = new_qty
-                current_invested_usd = new_invested
-            else:
-                # For SPOT trading: All positions are "long"
-                # PnL = (sell_price - avg_entry_price) * quantity
-                # Only subtract fee if it was paid in quote currency
-                if fee_in_quote:
-                    trade_pnl = (price - current_avg_price) * qty - order_fee
-                else:
-                    # Fee was in base currency or BNB - don't subtract from PnL
-                    # (it's already reflected in the received amount)
-                    trade_pnl = (price - current_avg_price) * qty
-                total_realized_pnl += trade_pnl
-                total_exit_fees += fee_usd  # Always store in USD
-                current_qty -= qty
-
-                if current_qty <= 0:
-                    current_qty = Decimal("0")
-                    # Note: Do NOT zero out current_invested_usd and current_avg_price here
-                    # These values are preserved for historical record when position is closed
-                    # The invested amount represents what was put in, and avg_price is the entry
-                else:
-                    # Only recalculate invested when position still open
-                    current_invested_usd = current_qty * current_avg_price
-
         # --- 3. Update Position Group Stats ---
-        # For hybrid/per_leg modes: recalculate weighted_avg_entry based only on entries
-        # that haven't hit their per-leg TP yet (tp_hit = false)
-        if position_group.tp_mode in ["hybrid", "per_leg"] and current_qty > 0:
-            remaining_qty = Decimal("0")
-            remaining_value = Decimal("0")
-
-            for o in filled_orders:
-                if o.side.lower() == "buy" and not o.tp_hit:
-                    qty = o.filled_quantity
-                    price = o.avg_fill_price or o.price
-                    remaining_qty += qty
-                    remaining_value += qty * price
-
-            if remaining_qty > 0:
-                # Use the remaining position's weighted average for aggregate TP calculation
-                current_avg_price = remaining_value / remaining_qty
-                # Use actual position quantity for invested calculation
-                current_invested_usd = current_qty * current_avg_price
-                logger.debug(
-                    f"Hybrid/Per-leg mode: Recalculated avg entry from remaining orders. "
-                    f"Remaining qty: {remaining_qty}, Current qty: {current_qty}, Avg price: {current_avg_price}"
-                )
+        current_qty = ledger.quantity
+        current_avg_price, current_invested_usd = ledger.position_averages(position_group.tp_mode)
 
         position_group.weighted_avg_entry = current_avg_price
         position_group.total_invested_usd = current_invested_usd
         position_group.total_filled_quantity = current_qty
-        position_group.realized_pnl_usd = total_realized_pnl
-        position_group.total_entry_fees_usd = total_entry_fees
-        position_group.total_exit_fees_usd = total_exit_fees
+        position_group.realized_pnl_usd = ledger.realized_pnl_usd
+        position_group.total_entry_fees_usd = ledger.entry_fees_usd
+        position_group.total_exit_fees_usd = ledger.exit_fees_usd
 
         # Get user for exchange connector
         user = await session.get(User, position_group.user_id)
@@ -411,7 +312,7 @@ class PositionManagerService:
 
             # Update Legs Count - count all filled entry orders (excluding TP fill records with leg_index=999)
             # Note: tp_hit flag should NOT affect this count - filled_dca_legs means "entry orders that filled"
-            filled_entry_legs = sum(1 for o in filled_orders if o.leg_index != 999)
+            filled_entry_legs = ledger.filled_entry_legs
             position_group.filled_dca_legs = filled_entry_legs
 
             # Status Transition Logic
@@ -444,10 +345,10 @@ class PositionManagerService:
             # Auto-close check - when all filled legs have been TP'd (qty = 0)
             logger.debug(
                 f"Auto-close check for {group_id}: current_qty={current_qty}, "
-                f"filled_orders={len(filled_orders)}, status={position_group.status}"
+                f"filled_orders={ledger.filled_orders}, status={position_group.status}"
             )
-            if current_qty <= 0 and len(filled_orders) > 0 and position_group.status not in [PositionGroupStatus.CLOSED, PositionGroupStatus.CLOSING]:
-                logger.info(f"Position {group_id} auto-closing: all TPs hit (qty=0, {len(filled_orders)} filled orders)")
+            if current_qty <= 0 and ledger.filled_orders > 0 and position_group.status not in [PositionGroupStatus.CLOSED, PositionGroupStatus.CLOSING]:
+                logger.info(f"Position {group_id} auto-closing: all TPs hit (qty=0, {ledger.filled_orders} filled orders)")
                 position_group.status = PositionGroupStatus.CLOSED
                 position_group.closed_at = datetime.utcnow()
 
@@ -532,20 +433,114 @@ class PositionManagerService:
 
                 # --- 5. Pyramid Aggregate TP Execution Logic ---
                 elif position_group.tp_mode == "pyramid_aggregate" and position_group.tp_aggregate_percent > 0:
-                    await self._check_pyramid_aggregate_tp(
-                        session=session,
-                        position_group=position_group,
-                        filled_orders=filled_orders,
-                        current_price=current_price,
-                        user=user,
-                        exchange_connector=exchange_connector,
-                        position_group_repo=position_group_repo
-                    )
+                    # The ledger's per-pyramid totals tell whether any pyramid can trigger;
+                    # the orders are only needed to execute a TP
+                    if filled_orders is None and self._pyramid_tp_reached(position_group, ledger, current_price):
+                        filled_orders = await load_filled_orders(session, group_id)
+                    if filled_orders is not None:
+                        await self._check_pyramid_aggregate_tp(
+                            session=session,
+                            position_group=position_group,
+                            filled_orders=filled_orders,
+                            current_price=current_price,
+                            user=user,
+                            exchange_connector=exchange_connector,
+                            position_group_repo=position_group_repo
+                        )
         finally:
             await exchange_connector.close()
 
         return position_group
 
+    async def _apply_fills_to_ledger(self, session: AsyncSession, position_group: PositionGroup):
+        """
+        Bring the group's ledger up to date.
+
+        Returns:
+            (ledger, filled_orders, status_orders). filled_orders is the full list of
+            filled orders when the ledger had to be rebuilt, else None. status_orders
+            are the orders whose pyramids need a status check: all orders of the
+            group on a rebuild, else the orders of its pyramids not yet FILLED.
+        """
+        group_id = position_group.id
+        ledger = PositionLedger.from_dict(position_group.ledger_state)
+
+        if ledger is not None:
+            new_orders = await load_unapplied_orders(session, group_id)
+            new_fills = sorted((o for o in new_orders if not o.ledger_applied), key=fill_sort_key)
+
+            if all(ledger.accepts(o) for o in new_fills):
+                for order in new_fills:
+                    ledger.apply_fill(order)
+                for order in new_orders:
+                    if order.tp_hit:
+                        ledger.apply_tp_hit(order)
+                mark_applied(new_orders)
+                position_group.ledger_state = ledger.to_dict()
+
+                if settings.POSITION_LEDGER_SHADOW_VERIFY:
+                    mismatches = await verify_ledger(session, position_group, repair=True)
+                    if mismatches:
+                        logger.error(
+                            f"Position ledger for {group_id} diverged from full replay in {mismatches}; "
+                            f"using the replayed values"
+                        )
+                        ledger = PositionLedger.from_dict(position_group.ledger_state)
+
+                # Legs can go OPEN without filling (PENDING -> SUBMITTED), so every
+                # pyramid that is not FILLED yet is checked, not only those with new fills
+                result = await session.execute(
+                    select(DCAOrder)
+                    .join(Pyramid, DCAOrder.pyramid_id == Pyramid.id)
+                    .where(Pyramid.group_id == group_id, Pyramid.status != PyramidStatus.FILLED)
+                )
+                return ledger, None, list(result.scalars().all())
+
+            logger.info(f"Fill detected out of order for {group_id}; rebuilding position ledger")
+
+        # No usable ledger (new or pre-ledger group, late fill): replay the full history
+        # Get all orders via direct query to avoid relationship caching issues
+        orders_result = await session.execute(select(DCAOrder).where(DCAOrder.group_id == group_id))
+        all_orders = list(orders_result.scalars().all())
+        filled_orders = [o for o in all_orders if o.status == OrderStatus.FILLED]
+
+        ledger = PositionLedger.replay(filled_orders)
+        mark_applied(filled_orders)
+        position_group.ledger_state = ledger.to_dict()
+        return ledger, filled_orders, all_orders
+
+    def _pyramid_tp_reached(self, position_group: PositionGroup, ledger: PositionLedger, current_price: Decimal) -> bool:
+        """Whether any pyramid's open entries reached their TP, judged from the ledger totals."""
+        for pyramid in position_group.pyramids:
+            totals = ledger.pyramids.get(str(pyramid.id))
+            if not totals or totals.open_avg_entry is None or totals.tp_hit_legs >= totals.filled_legs:
+                continue
+
+            pyramid_tp_percents = (pyramid.dca_config or {}).get("pyramid_tp_percents", {})
+            tp_percent = pyramid_tp_percents.get(str(pyramid.pyramid_index))
+            tp_percent = Decimal(str(tp_percent)) if tp_percent is not None else position_group.tp_aggregate_percent
+
+            if current_price >= totals.open_avg_entry * (Decimal("1") + tp_percent / Decimal("100")):
+                return True
+        return False
+
+    async def verify_position_ledger(self, group_id: uuid.UUID, repair: bool = False) -> List[str]:
+        """
+        Compare a group's incremental ledger with a full replay of its fills.
+
+        Returns:
+            Mismatched fields (empty when both agree)
+        """
+        async with self.session_factory() as session:
+            position_group = await session.get(PositionGroup, group_id)
+            if not position_group:
+                raise ValueError(f"PositionGroup {group_id} not found")
+
+            mismatches = await verify_ledger(session, position_group, repair=repair)
+            if mismatches and repair:
+                await session.commit()
+            return mismatches
+
     async def _check_pyramid_aggregate_tp(
         self,
         session: AsyncSession,
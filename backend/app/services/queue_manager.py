@@ -10,26 +10,31 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.queued_signal import QueuedSignal, QueueStatus
 from app.models.user import User
-from app.models.position_group import PositionGroup
+from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.repositories.queued_signal import QueuedSignalRepository
 from app.repositories.position_group import PositionGroupRepository
 from app.repositories.dca_configuration import DCAConfigurationRepository
 from app.services.execution_pool_manager import ExecutionPoolManager
 from app.schemas.webhook_payloads import WebhookPayload
 from app.services.exchange_abstraction.factory import get_exchange_connector
+from app.services.market_data import MarketDataService
 from app.core.security import EncryptionService
 from app.schemas.grid_config import RiskEngineConfig, DCAGridConfig
 from app.services.position_manager import PositionManagerService
 from app.services.order_management import OrderService
 from app.services.grid_calculator import GridCalculatorService
 from app.services.queue_priority import calculate_queue_priority, explain_priority
+from app.services.queue_priority_index import QueuePriorityIndex, active_key, active_keys
 from app.schemas.grid_config import PriorityRulesConfig
+from app.services.realtime_updates import publish_user_update, TOPIC_POSITIONS, TOPIC_QUEUE
 from app.services.risk.risk_engine import RiskEngineService
 from app.repositories.risk_action import RiskActionRepository
 from app.repositories.dca_order import DCAOrderRepository
 
 logger = logging.getLogger(__name__)
 
+# Scale of QueuedSignal.current_loss_percent; smaller moves are not written back
+LOSS_PERCENT_QUANTUM = Decimal("0.0001")
 
 
 class QueueManagerService:
@@ -43,7 +48,9 @@ class QueueManagerService:
         execution_pool_manager: Optional[ExecutionPoolManager] = None,
         # Dependencies for promotion execution (optional/stub for now)
         position_manager_service=None,
-        polling_interval_seconds=10
+        polling_interval_seconds=10,
+        market_data: Optional[MarketDataService] = None,
+        shard_coordinator=None
     ):
         self.session_factory = session_factory
         self.user = user
@@ -52,11 +59,16 @@ class QueueManagerService:
         self.exchange_connector = exchange_connector
         self.execution_pool_manager = execution_pool_manager
         self.position_manager_service = position_manager_service
+        self.market_data = market_data or MarketDataService()
+        # Restricts promotion to the users this worker owns; None promotes for everyone
+        self.shard_coordinator = shard_coordinator
         
         self.polling_interval_seconds = polling_interval_seconds
         self._running = False
         self._promotion_task = None
         self._encryption_service = EncryptionService()
+        # Per-user priority heaps, kept across promotion cycles
+        self._priority_indexes: Dict[uuid.UUID, QueuePriorityIndex] = {}
 
     def _is_within_same_timeframe_period(self, existing_queued_at: datetime, timeframe_minutes: int) -> bool:
         """
@@ -150,6 +162,7 @@ class QueueManagerService:
 
                     await repo.update(existing_signal)
                     await session.commit()
+                    await publish_user_update(self.user.id, TOPIC_QUEUE)
                     logger.info(f"Replaced queued signal for {existing_signal.symbol}, count: {existing_signal.replacement_count}")
                     return existing_signal
             else:
@@ -167,6 +180,7 @@ class QueueManagerService:
                 )
                 await repo.create(new_signal)
                 await session.commit()
+                await publish_user_update(self.user.id, TOPIC_QUEUE)
                 logger.info(f"Added new signal to queue: {new_signal.symbol}")
                 return new_signal
 
@@ -184,6 +198,7 @@ class QueueManagerService:
             result = await repo.delete(signal_id)
             if result:
                 await session.commit()
+                await publish_user_update(signal.user_id, TOPIC_QUEUE)
             return result
 
     async def cancel_queued_signals_on_exit(
@@ -221,6 +236,7 @@ class QueueManagerService:
             )
             if cancelled_count > 0:
                 await session.commit()
+                await publish_user_update(user_id, TOPIC_QUEUE)
                 logger.info(
                     f"Cancelled {cancelled_count} queued signal(s) for {symbol} {timeframe}m {side} "
                     f"on exit signal (user: {user_id})"
@@ -289,6 +305,7 @@ class QueueManagerService:
                 signal.promoted_at = datetime.utcnow()
                 await repo.update(signal)
                 await session.commit()
+                await publish_user_update(signal.user_id, TOPIC_QUEUE)
                 return signal
             return None
     
@@ -345,9 +362,12 @@ class QueueManagerService:
                 else:
                     if is_pyramid and not pyramid_rule_enabled:
                         logger.info(f"Signal {signal.symbol} matches active group, but 'same_pair_timeframe' rule is DISABLED. Competing for slot.")
-                    slot_granted = await self.execution_pool_manager.request_slot(
-                        max_open_groups_override=user_max_groups
+                    slot = await self.execution_pool_manager.request_slot(
+                        signal.user_id, max_open_groups_override=user_max_groups
                     )
+                    # Promotion here only changes the status; nothing holds the slot yet
+                    await self.execution_pool_manager.release_slot(slot)
+                    slot_granted = bool(slot)
 
                 if not slot_granted:
                     return None
@@ -362,17 +382,22 @@ class QueueManagerService:
             signal.promoted_at = datetime.utcnow()
             await repo.update(signal)
             await session.commit()
+            await publish_user_update(signal.user_id, TOPIC_QUEUE)
             return signal
 
     async def promote_highest_priority_signal(self, session: AsyncSession):
         """
-        Scans the queue, updates priorities, and attempts to promote the best signal.
+        Refreshes the loss of queued signals, re-ranks the ones whose priority
+        inputs changed, and attempts to promote each user's best signal.
         """
         queue_repo = self.queued_signal_repository_class(session)
         pos_group_repo = self.position_group_repository_class(session)
             
         queued_signals = await queue_repo.get_all_queued_signals(for_update=False)
+        if self.shard_coordinator is not None:
+            queued_signals = self.shard_coordinator.filter_owned(queued_signals, lambda signal: signal.user_id)
         if not queued_signals:
+            self._priority_indexes.clear()
             return
 
         # Group by user
@@ -381,6 +406,8 @@ class QueueManagerService:
             if s.user_id not in signals_by_user:
                 signals_by_user[s.user_id] = []
             signals_by_user[s.user_id].append(s)
+        for user_id in set(self._priority_indexes) - set(signals_by_user):
+            del self._priority_indexes[user_id]
 
         for user_id, user_signals in signals_by_user.items():
             user = await session.get(User, user_id)
@@ -392,6 +419,7 @@ class QueueManagerService:
             logger.debug(f"Processing {len(user_signals)} signals for user {user.username}. Active groups: {len(active_groups)}")
 
             # Group signals by exchange for efficient price fetching
+            changed_rows = 0
             signals_by_exchange = {}
             for s in user_signals:
                 if s.exchange not in signals_by_exchange:
@@ -431,17 +459,29 @@ class QueueManagerService:
                              exchange = get_exchange_connector(ex_name, exchange_config)
 
                     if exchange:
+                        # One batched ticker refresh for all queued symbols on this exchange
+                        prices = await self.market_data.get_prices(
+                            ex_name, [signal.symbol for signal in signals], exchange,
+                            max_age_seconds=self.polling_interval_seconds
+                        )
                         for signal in signals:
                             try:
-                                current_price = await exchange.get_current_price(signal.symbol)
-                                current_price_dec = Decimal(str(current_price))
+                                current_price_dec = prices.get(signal.symbol)
+                                if current_price_dec is None:
+                                    current_price = await exchange.get_current_price(signal.symbol)
+                                    current_price_dec = Decimal(str(current_price))
                                 if signal.side == "long":
                                     pnl_pct = (current_price_dec - signal.entry_price) / signal.entry_price * Decimal("100")
                                 else:
                                     pnl_pct = (signal.entry_price - current_price_dec) / signal.entry_price * Decimal("100")
-                                
+
+                                # Only rows whose stored loss actually moves are written
+                                pnl_pct = pnl_pct.quantize(LOSS_PERCENT_QUANTUM)
+                                if signal.current_loss_percent is not None and pnl_pct == signal.current_loss_percent:
+                                    continue
                                 signal.current_loss_percent = pnl_pct
                                 await queue_repo.update(signal)
+                                changed_rows += 1
                             except Exception as e:
                                 logger.warning(f"Failed to update price for {signal.symbol}: {e}")
                                 pass
@@ -449,7 +489,9 @@ class QueueManagerService:
                     logger.error(f"Failed to process signals for exchange {ex_name}: {e}")
 
             # Commit updates to signal priorities/loss percent
-            await session.commit()
+            if changed_rows:
+                await session.commit()
+                await publish_user_update(user_id, TOPIC_QUEUE)
             
             # Load user's priority configuration
             try:
@@ -466,22 +508,23 @@ class QueueManagerService:
             logger.info(f"Active priority rules: {enabled_rules}")
             logger.info(f"Rule execution order: {priority_config.priority_order}")
 
-            # Calculate Priorities with configuration
-            sorted_signals = sorted(
-                user_signals,
-                key=lambda s: calculate_queue_priority(s, active_groups, priority_config),
-                reverse=True
-            )
-            
+            # Re-rank only the signals whose priority inputs changed
+            index = self._priority_indexes.get(user_id)
+            if index is None or index.priority_config != priority_config:
+                index = self._priority_indexes[user_id] = QueuePriorityIndex(priority_config)
+            reranked = index.sync(user_signals, active_keys(active_groups))
+            logger.debug(f"Priority index for user {user.username}: {reranked}/{len(index)} signals re-ranked")
+
             # Log top candidates with priority explanations
-            for idx, signal in enumerate(sorted_signals[:3]):  # Log top 3
+            top_signals = index.top(3)
+            for idx, signal in enumerate(top_signals):  # Log top 3
                 priority_explanation = explain_priority(signal, active_groups, priority_config)
                 logger.info(f"  #{idx+1} candidate: {priority_explanation}")
 
-            if not sorted_signals:
+            if not top_signals:
                 continue
 
-            best_signal = sorted_signals[0]
+            best_signal = top_signals[0]
             
             # Attempt Promotion
             if not self.execution_pool_manager:
@@ -547,13 +590,7 @@ class QueueManagerService:
                 logger.error(f"Failed to load DCA config for signal {best_signal.symbol}: {e}")
                 continue
 
-            is_pyramid = any(
-                g.symbol == best_signal.symbol and
-                g.exchange == best_signal.exchange and
-                g.timeframe == best_signal.timeframe and
-                g.side == best_signal.side
-                for g in active_groups
-            )
+            is_pyramid = index.is_pyramid(best_signal)
 
             # --- Pre-Trade Risk Validation ---
             # Create RiskEngineService and validate before promotion
@@ -576,7 +613,7 @@ class QueueManagerService:
             position_size_type = execution_intent.get("position_size_type", "contracts")
 
             # Determine the pyramid index for capital calculation
-            target_group = next((g for g in active_groups if g.symbol == best_signal.symbol and g.exchange == best_signal.exchange and g.timeframe == best_signal.timeframe and g.side == best_signal.side), None)
+            target_group = next((g for g in active_groups if active_key(g) == active_key(best_signal)), None)
             if target_group:
                 pyramid_index = target_group.pyramid_count + 1
             else:
@@ -618,6 +655,7 @@ class QueueManagerService:
                 best_signal.rejection_reason = rejection_reason
                 await queue_repo.update(best_signal)
                 await session.commit()
+                await publish_user_update(user_id, TOPIC_QUEUE)
                 continue  # Try next user's signals
 
             # Retrieve already loaded config (or default)
@@ -625,15 +663,17 @@ class QueueManagerService:
 
             # Only treat as pyramid (bypass max groups) if the rule is ENABLED
             user_max_groups = risk_config.max_open_positions_global
+            slot = None
             if is_pyramid and pyramid_rule_enabled:
                 logger.info(f"Signal {best_signal.symbol} matches active group and 'same_pair_timeframe' rule is ENABLED. Bypassing pool limit for pyramid.")
                 slot_granted = True
             else:
                 if is_pyramid and not pyramid_rule_enabled:
                     logger.info(f"Signal {best_signal.symbol} matches active group, but 'same_pair_timeframe' rule is DISABLED. Competing for slot.")
-                slot_granted = await self.execution_pool_manager.request_slot(
-                    max_open_groups_override=user_max_groups
+                slot = await self.execution_pool_manager.request_slot(
+                    user_id, max_open_groups_override=user_max_groups
                 )
+                slot_granted = bool(slot)
             
             if slot_granted:
                 # Ensure priority metrics are saved to history
@@ -645,7 +685,8 @@ class QueueManagerService:
                 best_signal.promoted_at = datetime.utcnow()
                 await queue_repo.update(best_signal)
                 await session.commit() 
-                
+
+                new_group = None
                 try:
                     # Instantiate PositionManager locally
                     grid_calc = GridCalculatorService()
@@ -670,7 +711,7 @@ class QueueManagerService:
                     # Determine the pyramid index for this signal
                     # For new positions: pyramid_index = 0
                     # For pyramids: pyramid_index = target_group.pyramid_count + 1
-                    target_group = next((g for g in active_groups if g.symbol == best_signal.symbol and g.exchange == best_signal.exchange and g.timeframe == best_signal.timeframe and g.side == best_signal.side), None)
+                    target_group = next((g for g in active_groups if active_key(g) == active_key(best_signal)), None)
                     if target_group:
                         pyramid_index = target_group.pyramid_count + 1
                     else:
@@ -719,7 +760,7 @@ class QueueManagerService:
                         if target_group:
                              logger.info(f"Signal {best_signal.symbol} matches active group {target_group.id} but max pyramids reached. Executing as NEW Position if allowed (or will fail/warn).")
 
-                        await pos_manager.create_position_group_from_signal(
+                        new_group = await pos_manager.create_position_group_from_signal(
                             session=session,
                             user_id=user.id,
                             signal=best_signal,
@@ -732,7 +773,13 @@ class QueueManagerService:
 
                 except Exception as e:
                     logger.error(f"Execution failed for promoted signal {best_signal.id}: {e}")
-                    pass
+                    new_group = None
+                finally:
+                    await self.execution_pool_manager.release_slot(
+                        slot,
+                        occupied=new_group is not None and new_group.status != PositionGroupStatus.FAILED
+                    )
+                    await publish_user_update(user_id, TOPIC_QUEUE, TOPIC_POSITIONS)
             else:
                 logger.debug(f"No slot granted for signal {best_signal.symbol}.")
 
@@ -34,31 +34,46 @@ def calculate_queue_priority(
     if priority_config is None:
         priority_config = PriorityRulesConfig()
     
-    # Calculate sub-components that can be used across tiers for tie-breaking
     time_in_queue_score = Decimal("0.0")
     if signal.queued_at:
         time_in_queue = (datetime.utcnow() - signal.queued_at).total_seconds()
         time_in_queue_score = Decimal(time_in_queue) * Decimal("0.001")
 
+    is_pyramid = any(
+        g.symbol == signal.symbol and
+        g.exchange == signal.exchange and
+        g.timeframe == signal.timeframe and
+        g.side == signal.side and
+        g.user_id == signal.user_id
+        for g in active_groups
+    )
+    return rule_priority_score(signal, is_pyramid, priority_config) + time_in_queue_score
+
+
+def rule_priority_score(
+    signal: QueuedSignal,
+    is_pyramid: bool,
+    priority_config: PriorityRulesConfig
+) -> Decimal:
+    """
+    The priority score without its time-in-queue component.
+
+    Time in queue grows at the same rate for every signal, so comparing these
+    scores minus 0.001 per second of queued_at orders signals exactly like
+    calculate_queue_priority, and the order only changes when a rule input
+    (loss, replacements, pyramid match, configuration) changes.
+
+    Args:
+        signal: The queued signal to score
+        is_pyramid: Whether the signal continues one of the user's active groups
+        priority_config: PriorityRulesConfig object
+    """
     replacement_count_score = Decimal(signal.replacement_count) * Decimal("100.0")
 
     loss_percent_score = Decimal("0.0")
     if signal.current_loss_percent is not None and signal.current_loss_percent < Decimal("0"):
         loss_percent_score = abs(signal.current_loss_percent) * Decimal("10000.0")
 
-    # Rule implementations
-    def check_same_pair_timeframe():
-        """Check if this is a pyramid continuation of an active position"""
-        is_pyramid = any(
-            g.symbol == signal.symbol and
-            g.exchange == signal.exchange and
-            g.timeframe == signal.timeframe and
-            g.side == signal.side and
-            g.user_id == signal.user_id
-            for g in active_groups
-        )
-        return is_pyramid
-
     def check_deepest_loss_percent():
         """Check if signal has a current loss (negative PnL)"""
         return signal.current_loss_percent is not None and signal.current_loss_percent < Decimal("0")
@@ -69,7 +84,7 @@ def calculate_queue_priority(
 
     # Rule checkers mapping
     rule_checkers = {
-        "same_pair_timeframe": check_same_pair_timeframe,
+        "same_pair_timeframe": lambda: is_pyramid,
         "deepest_loss_percent": check_deepest_loss_percent,
         "highest_replacement": check_highest_replacement,
         "fifo_fallback": lambda: True  # FIFO always applies
@@ -96,22 +111,20 @@ def calculate_queue_priority(
             # This rule applies - calculate score for this tier
             base_score = tier_base_scores[tier_index]
             
-            # Add tie-breakers based on lower-priority factors
+            # Add tie-breakers based on lower-priority factors (FIFO is added by the caller)
             if rule_name == "same_pair_timeframe":
-                # Pyramid continuation: add loss, replacement, and FIFO as tie-breakers
-                return base_score + loss_percent_score + replacement_count_score + time_in_queue_score
+                # Pyramid continuation: add loss and replacement as tie-breakers
+                return base_score + loss_percent_score + replacement_count_score
             elif rule_name == "deepest_loss_percent":
-                # Deepest loss: add replacement and FIFO as tie-breakers
-                return base_score + loss_percent_score + replacement_count_score + time_in_queue_score
+                # Deepest loss: add replacement as tie-breaker
+                return base_score + loss_percent_score + replacement_count_score
             elif rule_name == "highest_replacement":
-                # Replacement count: add FIFO as tie-breaker
-                return base_score + replacement_count_score + time_in_queue_score
+                return base_score + replacement_count_score
             else:  # fifo_fallback
-                # FIFO: just use time in queue
-                return base_score + time_in_queue_score
+                return base_score
     
     # Fallback: if no rules apply (shouldn't happen), use FIFO
-    return Decimal("1000.0") + time_in_queue_score
+    return Decimal("1000.0")
 
 
 def explain_priority(
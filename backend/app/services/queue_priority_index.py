@@ -0,0 +1,115 @@
+"""
+Incremental priority index of queued signals.
+
+The promotion loop used to re-sort every queued signal of a user on every
+poll, recomputing the Decimal priority of each signal at every comparison and
+scanning all active position groups for each pyramid check.
+
+The index keeps one heap per user, ordered like calculate_queue_priority but
+on a time-invariant rank (see rule_priority_score). Each cycle only re-keys
+the signals whose rule inputs changed; the best candidate is read from the
+top of the heap. Entries of signals that left the queue are dropped lazily
+when they surface.
+"""
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.queued_signal import QueuedSignal
+from app.schemas.grid_config import PriorityRulesConfig
+from app.services.queue_priority import rule_priority_score
+
+ActiveKey = Tuple[str, str, int, str]
+
+_EPOCH = datetime(1970, 1, 1)
+# Rebuild the heap once stale entries outnumber live ones by this factor
+_COMPACT_RATIO = 2
+
+
+def active_key(item) -> ActiveKey:
+    """(symbol, exchange, timeframe, side) of a queued signal or position group."""
+    return (item.symbol, item.exchange, item.timeframe, item.side)
+
+
+def active_keys(active_groups: Iterable) -> Set[ActiveKey]:
+    """Indexed set of active group keys for O(1) pyramid checks."""
+    return {active_key(group) for group in active_groups}
+
+
+class QueuePriorityIndex:
+    """Queued signals of one user, ordered by promotion priority."""
+
+    def __init__(self, priority_config: PriorityRulesConfig):
+        self.priority_config = priority_config
+        # (-rank, queued_at seconds, sequence, signal id); sequence keeps ids out of comparisons
+        self._heap: List[tuple] = []
+        self._entries: Dict[object, tuple] = {}
+        self._inputs: Dict[object, tuple] = {}
+        self._signals: Dict[object, QueuedSignal] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync(self, signals: List[QueuedSignal], active: Set[ActiveKey]) -> int:
+        """
+        Brings the index in line with the user's queued signals and active
+        groups. Returns the number of signals that were (re)ranked.
+        """
+        queued_ids = set()
+        reranked = 0
+        for signal in signals:
+            queued_ids.add(signal.id)
+            self._signals[signal.id] = signal
+            is_pyramid = active_key(signal) in active
+            inputs = (is_pyramid, signal.current_loss_percent, signal.replacement_count, signal.queued_at)
+            if self._inputs.get(signal.id) == inputs:
+                continue
+            self._inputs[signal.id] = inputs
+            self._push(signal, is_pyramid)
+            reranked += 1
+
+        for signal_id in [signal_id for signal_id in self._entries if signal_id not in queued_ids]:
+            del self._entries[signal_id]
+            del self._inputs[signal_id]
+            del self._signals[signal_id]
+
+        if len(self._heap) > _COMPACT_RATIO * len(self._entries) + 16:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+        return reranked
+
+    def best(self) -> Optional[QueuedSignal]:
+        """The highest priority signal, or None when the queue is empty."""
+        self._drop_stale()
+        return self._signals[self._heap[0][3]] if self._heap else None
+
+    def top(self, limit: int) -> List[QueuedSignal]:
+        """The `limit` highest priority signals, best first."""
+        popped = []
+        while self._heap and len(popped) < limit:
+            self._drop_stale()
+            if self._heap:
+                popped.append(heapq.heappop(self._heap))
+        for item in popped:
+            heapq.heappush(self._heap, item)
+        return [self._signals[item[3]] for item in popped]
+
+    def is_pyramid(self, signal: QueuedSignal) -> bool:
+        inputs = self._inputs.get(signal.id)
+        return bool(inputs and inputs[0])
+
+    def _push(self, signal: QueuedSignal, is_pyramid: bool):
+        # A signal without queued_at has no time-in-queue score, like one queued just now
+        queued_seconds = ((signal.queued_at or datetime.utcnow()) - _EPOCH).total_seconds()
+        # calculate_queue_priority adds 0.001 per second in queue; subtracting
+        # it per second of queued_at gives the same order at any point in time
+        rank = float(rule_priority_score(signal, is_pyramid, self.priority_config)) - queued_seconds * 0.001
+        item = (-rank, queued_seconds, next(self._sequence), signal.id)
+        self._entries[signal.id] = item
+        heapq.heappush(self._heap, item)
+
+    def _drop_stale(self):
+        while self._heap and self._entries.get(self._heap[0][3]) is not self._heap[0]:
+            heapq.heappop(self._heap)
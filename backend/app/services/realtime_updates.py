@@ -0,0 +1,304 @@
+"""
+Realtime position and queue updates for the dashboard.
+
+The dashboard used to poll /positions/active, /dashboard/* and /queue from every
+open tab, and each poll recomputed PnL. Instead, services that change a user's
+positions or queue publish a small change event, and every worker serving
+WebSockets pushes fresh snapshots to the sockets it holds:
+
+- Events go through Redis pub/sub, so the worker that changed the data does not
+  need to be the one holding the user's sockets. Without Redis, events are
+  delivered to this process only
+- Events carry a user ID and topics ("positions", "queue"). Price refreshes
+  carry no user and mark the positions of every connected user stale
+- Bursts are coalesced per user: at most one push per min_push_interval_seconds
+  (price-only refreshes: price_push_interval_seconds). Each snapshot is built once
+  per user and shared by all of that user's tabs
+- A topic is only sent when its snapshot differs from the last one pushed to the
+  user. The frontend replaces the whole list on every message, so the diff is per
+  topic rather than per item
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.cache import get_cache, DecimalEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "realtime_updates"
+
+TOPIC_POSITIONS = "positions"
+TOPIC_QUEUE = "queue"
+ALL_TOPICS = (TOPIC_POSITIONS, TOPIC_QUEUE)
+
+# Message types parsed by frontend/src/services/websocket.ts
+MESSAGE_TYPES = {
+    TOPIC_POSITIONS: "position_groups_update",
+    TOPIC_QUEUE: "queued_signals_update",
+}
+
+DEFAULT_MIN_PUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_PRICE_PUSH_INTERVAL_SECONDS = 5.0
+RESUBSCRIBE_INTERVAL_SECONDS = 5.0
+
+# (user_id, topic) -> JSON-serializable list
+SnapshotLoader = Callable[[str, str], Awaitable[List[Any]]]
+
+
+async def publish_user_update(user_id, *topics: str) -> bool:
+    """
+    Tell every worker that a user's positions and/or queue changed.
+    Never raises; a lost event only delays the next push.
+    """
+    return await _publish({"user_id": str(user_id), "topics": list(topics or ALL_TOPICS)})
+
+
+async def publish_price_update(feed: str, prices: Optional[dict] = None) -> bool:
+    """
+    Tell every worker that prices of a feed were refreshed.
+    Matches the MarketDataService listener signature.
+    """
+    return await _publish({"feed": feed, "topics": [TOPIC_POSITIONS]})
+
+
+async def _publish(event: dict) -> bool:
+    try:
+        cache = await get_cache()
+        if await cache.publish(CHANNEL, event):
+            return True
+    except Exception as e:
+        logger.debug(f"Realtime: Failed to publish {event}: {e}")
+
+    # Redis is down: sockets held by this process can still be served
+    hub = get_realtime_hub()
+    if hub is not None:
+        hub.handle_event(event)
+    return False
+
+
+class RealtimeHub:
+    """Holds this worker's dashboard sockets and pushes snapshots to them."""
+
+    def __init__(
+        self,
+        snapshot_loader: SnapshotLoader,
+        min_push_interval_seconds: float = DEFAULT_MIN_PUSH_INTERVAL_SECONDS,
+        price_push_interval_seconds: float = DEFAULT_PRICE_PUSH_INTERVAL_SECONDS,
+        cache=None
+    ):
+        self.snapshot_loader = snapshot_loader
+        self.min_push_interval_seconds = min_push_interval_seconds
+        self.price_push_interval_seconds = price_push_interval_seconds
+        self.cache = cache
+
+        # user_id -> open sockets
+        self._connections: Dict[str, Set[Any]] = {}
+        # user_id -> topic -> True while only price refreshes asked for it
+        self._pending: Dict[str, Dict[str, bool]] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self._last_push: Dict[str, float] = {}
+        self._last_sent: Dict[Tuple[str, str], str] = {}
+
+        self._running = False
+        self._listen_task: Optional[asyncio.Task] = None
+
+        self._events = 0
+        self._pushes = 0
+        self._skipped_unchanged = 0
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        self._running = True
+        self._listen_task = asyncio.create_task(self._listen_loop())
+        logger.info("Realtime hub started")
+
+    async def stop(self):
+        self._running = False
+        tasks = list(self._flush_tasks.values())
+        if self._listen_task:
+            tasks.append(self._listen_task)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._flush_tasks.clear()
+        self._listen_task = None
+        logger.info("Realtime hub stopped")
+
+    # ==================== Connections ====================
+
+    async def connect(self, user_id, websocket):
+        """Register a socket and send it the current snapshots."""
+        user_id = str(user_id)
+        self._connections.setdefault(user_id, set()).add(websocket)
+
+        for topic in ALL_TOPICS:
+            if websocket not in self._connections.get(user_id, ()):
+                return
+            payload = await self._load(user_id, topic)
+            if payload is None:
+                continue
+            self._last_sent[(user_id, topic)] = payload
+            await self._send(user_id, websocket, topic, payload)
+
+    def disconnect(self, user_id, websocket):
+        user_id = str(user_id)
+        sockets = self._connections.get(user_id)
+        if not sockets:
+            return
+        sockets.discard(websocket)
+        if sockets:
+            return
+
+        # Last tab closed: forget everything about the user
+        del self._connections[user_id]
+        self._pending.pop(user_id, None)
+        self._last_push.pop(user_id, None)
+        for topic in ALL_TOPICS:
+            self._last_sent.pop((user_id, topic), None)
+        task = self._flush_tasks.pop(user_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    # ==================== Events ====================
+
+    def handle_event(self, event: dict):
+        """Mark the event's topics stale for the affected connected users."""
+        self._events += 1
+        topics = [topic for topic in event.get("topics") or ALL_TOPICS if topic in MESSAGE_TYPES]
+        user_id = event.get("user_id")
+        if user_id is not None:
+            self.notify(str(user_id), topics)
+        else:
+            for connected_user_id in list(self._connections):
+                self.notify(connected_user_id, topics, price_only=True)
+
+    def notify(self, user_id: str, topics: Iterable[str], price_only: bool = False):
+        if user_id not in self._connections:
+            return
+
+        pending = self._pending.setdefault(user_id, {})
+        for topic in topics:
+            # A real change upgrades a price-only refresh to the fast interval
+            pending[topic] = pending.get(topic, True) and price_only
+
+        if user_id not in self._flush_tasks:
+            self._flush_tasks[user_id] = asyncio.create_task(self._flush_loop(user_id))
+
+    async def _flush_loop(self, user_id: str):
+        try:
+            while self._pending.get(user_id):
+                price_only = all(self._pending[user_id].values())
+                interval = self.price_push_interval_seconds if price_only else self.min_push_interval_seconds
+                delay = self._last_push.get(user_id, 0.0) + interval - time.monotonic()
+                if delay > 0:
+                    # Re-check periodically in case a real change shortens the interval
+                    await asyncio.sleep(min(delay, self.min_push_interval_seconds))
+                    continue
+
+                topics = list(self._pending.pop(user_id))
+                self._last_push[user_id] = time.monotonic()
+                await self._push(user_id, topics)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Realtime: Push to user {user_id} failed: {e}")
+        finally:
+            if self._flush_tasks.get(user_id) is asyncio.current_task():
+                del self._flush_tasks[user_id]
+
+    async def _push(self, user_id: str, topics: List[str]):
+        for topic in topics:
+            if user_id not in self._connections:
+                return
+            payload = await self._load(user_id, topic)
+            if payload is None:
+                continue
+            if self._last_sent.get((user_id, topic)) == payload:
+                self._skipped_unchanged += 1
+                continue
+            self._last_sent[(user_id, topic)] = payload
+
+            for websocket in list(self._connections.get(user_id, ())):
+                await self._send(user_id, websocket, topic, payload)
+            self._pushes += 1
+
+    async def _load(self, user_id: str, topic: str) -> Optional[str]:
+        """Serialized snapshot, or None if it could not be built."""
+        try:
+            snapshot = await self.snapshot_loader(user_id, topic)
+            return json.dumps(snapshot, cls=DecimalEncoder, sort_keys=True)
+        except Exception as e:
+            logger.warning(f"Realtime: Could not load {topic} snapshot for user {user_id}: {e}")
+            return None
+
+    async def _send(self, user_id: str, websocket, topic: str, payload: str):
+        message = f'{{"type": "{MESSAGE_TYPES[topic]}", "payload": {payload}}}'
+        try:
+            await websocket.send_text(message)
+        except Exception as e:
+            logger.debug(f"Realtime: Dropping socket of user {user_id}: {e}")
+            self.disconnect(user_id, websocket)
+
+    # ==================== Subscription ====================
+
+    async def _listen_loop(self):
+        while self._running:
+            pubsub = None
+            try:
+                cache = self.cache or await get_cache()
+                pubsub = await cache.subscribe(CHANNEL)
+                if pubsub is None:
+                    await asyncio.sleep(RESUBSCRIBE_INTERVAL_SECONDS)
+                    continue
+
+                while self._running:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if not message or message.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        logger.warning("Realtime: Ignoring malformed event")
+                        continue
+                    self.handle_event(event)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Realtime: Subscription lost, resubscribing: {e}")
+                await asyncio.sleep(RESUBSCRIBE_INTERVAL_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def get_metrics(self) -> dict:
+        return {
+            "connected_users": len(self._connections),
+            "connections": sum(len(sockets) for sockets in self._connections.values()),
+            "events": self._events,
+            "pushes": self._pushes,
+            "skipped_unchanged": self._skipped_unchanged,
+        }
+
+
+_realtime_hub: Optional[RealtimeHub] = None
+
+
+def get_realtime_hub() -> Optional[RealtimeHub]:
+    return _realtime_hub
+
+
+def set_realtime_hub(hub: Optional[RealtimeHub]):
+    global _realtime_hub
+    _realtime_hub = hub
@@ -0,0 +1,182 @@
+"""
+Batch evaluation for the Risk Engine.
+
+The periodic evaluation used to go through users one at a time. Each user
+cost two queries, a PnL refresh, a timer pass over ORM objects and a commit.
+
+The batch path loads the active groups of every evaluated user into one
+columnar PositionSnapshot. It then runs each stage as a single pass over the
+columns for all users: PnL from the shared price table, timer transitions,
+and offset candidates. Only rows whose values changed are copied back to
+their ORM objects. The offset itself (selection, locks, orders) still runs
+per user, and only for users that have a candidate.
+"""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models.position_group import PositionGroup, PositionGroupStatus
+from app.schemas.grid_config import RiskEngineConfig
+from app.services.risk.risk_selector import _check_pyramids_complete
+from app.services.risk.risk_timer import next_timer_state
+
+# Scales of PositionGroup.unrealized_pnl_usd / unrealized_pnl_percent; smaller moves are not written
+PNL_USD_QUANTUM = Decimal("0.0000000001")
+PNL_PERCENT_QUANTUM = Decimal("0.0001")
+
+WINNER_STATUSES = (
+    PositionGroupStatus.LIVE.value,
+    PositionGroupStatus.PARTIALLY_FILLED.value,
+    PositionGroupStatus.ACTIVE.value,
+)
+
+
+def _changed(new: Decimal, stored: Optional[Decimal], quantum: Decimal) -> bool:
+    return stored is None or new.quantize(quantum) != Decimal(stored).quantize(quantum)
+
+
+class PositionSnapshot:
+    """
+    Column-per-field view of the active position groups of many users.
+    Row i of every column describes groups[i].
+    """
+
+    def __init__(self, groups: List[PositionGroup]):
+        self.groups = list(groups)
+        self.user_ids = [g.user_id for g in self.groups]
+        self.exchanges = [g.exchange.lower() for g in self.groups]
+        # Price feed of each row; the exchange name unless the owner trades on testnet
+        self.feeds = list(self.exchanges)
+        self.symbols = [g.symbol for g in self.groups]
+        self.statuses = [g.status for g in self.groups]
+        self.entries = [g.weighted_avg_entry for g in self.groups]
+        self.quantities = [g.total_filled_quantity for g in self.groups]
+        self.pnl_usd = [g.unrealized_pnl_usd for g in self.groups]
+        self.pnl_percent = [g.unrealized_pnl_percent for g in self.groups]
+        self.timer_starts = [g.risk_timer_start for g in self.groups]
+        self.timer_expires = [g.risk_timer_expires for g in self.groups]
+        self.eligible = [g.risk_eligible for g in self.groups]
+        self.excluded = [bool(g.risk_blocked or g.risk_skip_once) for g in self.groups]
+
+        self.rows_by_user: Dict[uuid.UUID, List[int]] = {}
+        for row, user_id in enumerate(self.user_ids):
+            self.rows_by_user.setdefault(user_id, []).append(row)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def symbols_by_feed(self) -> Dict[str, Set[str]]:
+        symbols: Dict[str, Set[str]] = {}
+        for feed, symbol in zip(self.feeds, self.symbols):
+            symbols.setdefault(feed, set()).add(symbol)
+        return symbols
+
+    def user_groups(self, user_id: uuid.UUID) -> List[PositionGroup]:
+        return [self.groups[row] for row in self.rows_by_user.get(user_id, [])]
+
+    def write_back(self, rows: Set[int]) -> None:
+        """Copies the computed columns of the given rows to their ORM objects."""
+        for row in rows:
+            pg = self.groups[row]
+            pg.unrealized_pnl_usd = self.pnl_usd[row]
+            pg.unrealized_pnl_percent = self.pnl_percent[row]
+            pg.risk_timer_start = self.timer_starts[row]
+            pg.risk_timer_expires = self.timer_expires[row]
+            pg.risk_eligible = self.eligible[row]
+
+
+def apply_prices(snapshot: PositionSnapshot, prices: Dict[str, Dict[str, Decimal]]) -> Set[int]:
+    """
+    Recomputes unrealized PnL of every row with a price (long/spot: (price - entry) * qty).
+
+    Args:
+        snapshot: The positions to update
+        prices: Price by symbol, by price feed (see snapshot.feeds)
+
+    Returns:
+        Rows whose stored PnL changed at column precision
+    """
+    changed = set()
+    for row in range(len(snapshot)):
+        price = prices.get(snapshot.feeds[row], {}).get(snapshot.symbols[row])
+        # CLOSING rows keep updated_at untouched for stuck-position recovery
+        if price is None or snapshot.statuses[row] == PositionGroupStatus.CLOSING.value:
+            continue
+        avg_entry = snapshot.entries[row]
+        qty = snapshot.quantities[row]
+        if not (avg_entry and avg_entry > 0 and qty and qty > 0):
+            continue
+
+        pnl_usd = (price - avg_entry) * qty
+        pnl_percent = ((price - avg_entry) / avg_entry) * Decimal("100")
+        if _changed(pnl_usd, snapshot.pnl_usd[row], PNL_USD_QUANTUM) \
+                or _changed(pnl_percent, snapshot.pnl_percent[row], PNL_PERCENT_QUANTUM):
+            changed.add(row)
+        snapshot.pnl_usd[row] = pnl_usd
+        snapshot.pnl_percent[row] = pnl_percent
+    return changed
+
+
+def plan_timer_transitions(
+    snapshot: PositionSnapshot,
+    configs: Dict[uuid.UUID, RiskEngineConfig],
+    now: datetime
+) -> List[Tuple[int, Optional[str], bool]]:
+    """
+    Applies next_timer_state to every ACTIVE row.
+
+    Returns:
+        (row, event, pyramids_complete) for each row whose timer state changed;
+        event is None when a state was cleared without a running timer
+    """
+    transitions = []
+    for row in range(len(snapshot)):
+        if snapshot.statuses[row] != PositionGroupStatus.ACTIVE.value:
+            continue
+        config = configs[snapshot.user_ids[row]]
+        pyramids_complete = _check_pyramids_complete(snapshot.groups[row], config.required_pyramids_for_timer)
+        current = (snapshot.timer_starts[row], snapshot.timer_expires[row], snapshot.eligible[row])
+        event, *state = next_timer_state(
+            pyramids_complete, snapshot.pnl_percent[row], *current, config, now
+        )
+        if tuple(state) == current:
+            continue
+        snapshot.timer_starts[row], snapshot.timer_expires[row], snapshot.eligible[row] = state
+        transitions.append((row, event, pyramids_complete))
+    return transitions
+
+
+def offset_candidates(
+    snapshot: PositionSnapshot,
+    configs: Dict[uuid.UUID, RiskEngineConfig],
+    now: datetime
+) -> List[uuid.UUID]:
+    """
+    Users with an eligible loser and at least one other profitable position.
+
+    The filter mirrors _filter_eligible_losers and _select_top_winners; the
+    exact selection (ranking, combined profit check) is left to
+    select_loser_and_winners on the candidate users only.
+    """
+    has_loser: Set[uuid.UUID] = set()
+    winners: Dict[uuid.UUID, int] = {}
+    for row in range(len(snapshot)):
+        user_id = snapshot.user_ids[row]
+        status = snapshot.statuses[row]
+        pnl_usd = snapshot.pnl_usd[row]
+        if status in WINNER_STATUSES and pnl_usd is not None and pnl_usd > 0 \
+                and snapshot.quantities[row] and snapshot.quantities[row] > 0:
+            winners[user_id] = winners.get(user_id, 0) + 1
+
+        if status != PositionGroupStatus.ACTIVE.value or snapshot.excluded[row]:
+            continue
+        config = configs[user_id]
+        expires = snapshot.timer_expires[row]
+        if expires is None or expires > now:
+            continue
+        if snapshot.pnl_percent[row] <= config.loss_threshold_percent \
+                and _check_pyramids_complete(snapshot.groups[row], config.required_pyramids_for_timer):
+            has_loser.add(user_id)
+
+    return [user_id for user_id in has_loser if winners.get(user_id)]
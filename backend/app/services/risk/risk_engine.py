@@ -4,15 +4,18 @@ Coordinates timer management, loser/winner selection, and offset execution.
 """
 import asyncio
 import logging
+import time
 import uuid
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import get_cache
+from app.core.deadline_scheduler import DeadlineScheduler, get_deadline_scheduler
+from app.db.session_scope import session_scope
 from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.models.pyramid import Pyramid
 from app.models.queued_signal import QueuedSignal
@@ -24,9 +27,13 @@ from app.repositories.risk_action import RiskActionRepository
 from app.repositories.user import UserRepository
 from app.schemas.grid_config import RiskEngineConfig
 from app.services.exchange_abstraction.factory import get_exchange_connector
+from app.services.exchange_abstraction.connector_pool import ConnectorPool, get_connector_pool
+from app.services.market_data import MarketDataService, feed_key
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.services.order_management import OrderService
+from app.services.performance_aggregates import PerformanceStore
 from app.services.telegram_signal_helper import broadcast_risk_event, broadcast_exit_signal
+from app.services.realtime_updates import publish_user_update, TOPIC_POSITIONS
 
 # Import from split modules
 from app.services.risk.risk_selector import (
@@ -34,8 +41,19 @@ from app.services.risk.risk_selector import (
     _filter_eligible_losers,
     select_loser_and_winners,
 )
-from app.services.risk.risk_timer import update_risk_timers, recover_stuck_closing_positions
+from app.services.risk.risk_timer import (
+    CLOSING_RECOVERY_DEADLINE,
+    RISK_TIMER_DEADLINE,
+    announce_timer_event,
+    closing_recovery_due,
+    deadline_member,
+    deadline_user_id,
+    recover_stuck_closing_positions,
+    update_risk_timers,
+)
+from app.services.risk.risk_batch import PositionSnapshot, apply_prices, plan_timer_transitions, offset_candidates
 from app.services.risk.risk_executor import calculate_partial_close_quantities
+from app.services.risk.risk_triggers import RiskTriggerIndex
 from app.core.distributed_lock import get_lock_manager
 
 from fastapi import HTTPException, status
@@ -45,6 +63,10 @@ OFFSET_LOCK_TTL = 60
 # Position lock settings (must match OrderFillMonitor for deadlock prevention)
 POSITION_LOCK_TTL = 30
 POSITION_LOCK_TIMEOUT = 10
+# Maximum ticker age accepted for the periodic PnL refresh (seconds)
+PNL_PRICE_MAX_AGE_SECONDS = 5
+# Longest idle wait between triggers; keeps the health heartbeat within the watchdog timeout
+HEALTH_REPORT_INTERVAL_SECONDS = 30
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +81,11 @@ class RiskEngineService:
         order_service_class: type[OrderService],
         risk_engine_config: RiskEngineConfig,
         polling_interval_seconds: int = None,
-        user: Optional[User] = None
+        user: Optional[User] = None,
+        connector_pool: Optional[ConnectorPool] = None,
+        market_data: Optional[MarketDataService] = None,
+        shard_coordinator=None,
+        deadline_scheduler: Optional[DeadlineScheduler] = None
     ):
         self.session_factory = session_factory
         self.position_group_repository_class = position_group_repository_class
@@ -70,8 +96,23 @@ class RiskEngineService:
         self.polling_interval_seconds = polling_interval_seconds if polling_interval_seconds is not None else risk_engine_config.evaluate_interval_seconds
         self.config = risk_engine_config
         self.user = user
+        # Long-lived connectors for the PnL refresh; short-lived instances (per fill,
+        # per request) borrow from the process-wide pool instead of opening their own
+        self.connector_pool = connector_pool or get_connector_pool()
+        # Shared ticker table; PnL refresh tolerates prices a few seconds old
+        self.market_data = market_data or MarketDataService()
+        # Restricts the background evaluation to the users this worker owns
+        self.shard_coordinator = shard_coordinator
         self._running = False
         self._monitor_task = None
+        # Between full sweeps, only users whose price levels were crossed or timers expired are evaluated
+        self.trigger_index = RiskTriggerIndex()
+        self._triggered_users: Set[uuid.UUID] = set()
+        # Users with a CLOSING position past its recovery deadline
+        self._closing_due: Set[uuid.UUID] = set()
+        self._trigger_event = asyncio.Event()
+        # Wakes the loop when risk timers expire and closing positions time out
+        self.deadline_scheduler = deadline_scheduler or get_deadline_scheduler()
 
     def _get_exchange_connector_for_user(self, user: User, exchange_name: str) -> ExchangeInterface:
         encrypted_data = user.encrypted_api_keys
@@ -177,30 +218,9 @@ class RiskEngineService:
             positions_by_exchange[ex].append(pos)
 
         for exchange_name, exchange_positions in positions_by_exchange.items():
-            connector = None
             try:
-                # Get exchange connector
-                if exchange_name == "mock":
-                    exchange_keys_data = {
-                        "api_key": "mock_api_key_12345",
-                        "api_secret": "mock_api_secret_67890"
-                    }
-                else:
-                    exchange_keys_data = user.encrypted_api_keys.get(exchange_name)
-                    if not exchange_keys_data:
-                        logger.warning(f"Risk Engine: No API keys for {exchange_name}, skipping PnL refresh")
-                        continue
-
-                connector = get_exchange_connector(exchange_name, exchange_config=exchange_keys_data)
-
-                # Batch fetch prices for all symbols
-                symbols = list(set(pos.symbol for pos in exchange_positions))
-                prices = {}
-                for symbol in symbols:
-                    try:
-                        prices[symbol] = Decimal(str(await connector.get_current_price(symbol)))
-                    except Exception as e:
-                        logger.warning(f"Risk Engine: Failed to get price for {symbol}: {e}")
+                symbols = set(pos.symbol for pos in exchange_positions)
+                prices = await self._fetch_exchange_prices(exchange_name, symbols, [user])
 
                 # Update PnL for each position
                 for pos in exchange_positions:
@@ -234,33 +254,78 @@ class RiskEngineService:
 
             except Exception as e:
                 logger.error(f"Risk Engine: Error refreshing PnL for {exchange_name}: {e}")
-            finally:
-                if connector:
-                    try:
-                        await connector.close()
-                    except Exception:
-                        pass
+
+    @staticmethod
+    def _user_feed(user: User, exchange_name: str) -> str:
+        """Price feed a user's connector for an exchange reads, from the testnet flag of their keys."""
+        encrypted_keys = user.encrypted_api_keys
+        exchange_config = encrypted_keys.get(exchange_name) if isinstance(encrypted_keys, dict) else None
+        testnet = isinstance(exchange_config, dict) and exchange_config.get("testnet", False) is True
+        return feed_key(exchange_name, testnet=testnet)
+
+    async def _fetch_exchange_prices(
+        self,
+        exchange_name: str,
+        symbols: set,
+        users: List[User]
+    ) -> Dict[str, Decimal]:
+        """
+        Current prices of symbols on one price feed from the shared ticker table,
+        read through the pooled connector of the first user with keys for it.
+        The users must all be on that feed (see _user_feed). Symbols missing
+        from the table are fetched one by one.
+        """
+        for user in users:
+            # Get exchange connector
+            if exchange_name == "mock":
+                exchange_keys_data = {
+                    "api_key": "mock_api_key_12345",
+                    "api_secret": "mock_api_secret_67890"
+                }
+            else:
+                encrypted_keys = user.encrypted_api_keys
+                exchange_keys_data = encrypted_keys.get(exchange_name) if isinstance(encrypted_keys, dict) else None
+            if exchange_keys_data:
+                break
+        else:
+            logger.warning(f"Risk Engine: No API keys for {exchange_name}, skipping PnL refresh")
+            return {}
+
+        connector = await self.connector_pool.acquire(
+            user.id, exchange_name, exchange_keys_data, connector_factory=get_exchange_connector
+        )
+        try:
+            # Batch fetch prices for all symbols from the shared ticker table
+            symbols = list(symbols)
+            prices = await self.market_data.get_prices(
+                exchange_name, symbols, connector, max_age_seconds=PNL_PRICE_MAX_AGE_SECONDS
+            )
+            for symbol in symbols:
+                if symbol in prices:
+                    continue
+                try:
+                    prices[symbol] = Decimal(str(await connector.get_current_price(symbol)))
+                except Exception as e:
+                    logger.warning(f"Risk Engine: Failed to get price for {symbol}: {e}")
+            return prices
+        finally:
+            await self.connector_pool.release(connector)
 
     async def _evaluate_positions(self):
         """
         Evaluates all active positions for risk management and initiates offset if conditions are met.
-        Iterates through all active users to ensure isolation.
+        Covers all active users (or this worker's shard of them) in one batch per cycle.
         """
         async for session in self.session_factory():
             try:
                 user_repo = UserRepository(session)
                 active_users = await user_repo.get_all_active_users()
-
-                for user in active_users:
-                    try:
-                        await self._evaluate_user_positions(session, user)
-                    except Exception as e:
-                        logger.error(f"Risk Engine: Error processing user {user.id}: {e}")
-                        # Ensure session is clean after any error (including deadlocks)
-                        try:
-                            await session.rollback()
-                        except Exception:
-                            pass
+                if self.shard_coordinator is not None:
+                    active_users = self.shard_coordinator.filter_owned(active_users, lambda u: u.id)
+                # A full sweep re-indexes every user; drop users that left
+                self.trigger_index.clear()
+                if active_users:
+                    await self._evaluate_users_batch(session, active_users)
             except Exception as e:
                 logger.error(f"Risk Engine: Critical error in evaluation loop: {e}")
                 # Ensure session is rolled back on critical errors
@@ -268,8 +333,215 @@ class RiskEngineService:
                     await session.rollback()
                 except Exception:
                     pass
+        await self._fold_closed_positions()
+
+    async def _fold_closed_positions(self):
+        """Folds the groups closed since the last sweep into the owners' performance aggregates."""
+        owns = self.shard_coordinator.owns if self.shard_coordinator is not None else None
+        try:
+            async for session in self.session_factory():
+                folded = await PerformanceStore(session).fold_pending(owns)
+                if folded:
+                    logger.debug(f"Risk Engine: Folded closed positions into the analytics of {folded} users")
+        except Exception as e:
+            logger.error(f"Risk Engine: Failed to fold closed positions into analytics: {e}")
 
-    async def _evaluate_user_positions(self, session: AsyncSession, user: User):
+    async def _evaluate_users_batch(
+        self,
+        session: AsyncSession,
+        users: List[User],
+        recover_closing_for: Optional[Set[uuid.UUID]] = None
+    ):
+        """
+        Batch counterpart of steps 0-4 of _evaluate_user_positions for many users:
+        two queries, one price read per feed, one pass over a columnar
+        snapshot for PnL and timers, and one commit of the rows that changed.
+        Offsets then run per user, for the users with a candidate loser.
+
+        Args:
+            recover_closing_for: Users whose closing positions are checked for
+                recovery; None checks every user (full sweep)
+        """
+        users_by_id = {user.id: user for user in users}
+        user_ids = list(users_by_id)
+        position_group_repo = self.position_group_repository_class(session)
+
+        # 0. Recover stuck closing positions before loading the active ones
+        closing_user_ids = user_ids if recover_closing_for is None else [
+            user_id for user_id in user_ids if user_id in recover_closing_for
+        ]
+        if closing_user_ids:
+            closing_positions = await position_group_repo.get_closing_for_users(closing_user_ids)
+            if closing_positions:
+                recovered = await recover_stuck_closing_positions(closing_positions, session)
+                if recovered:
+                    await session.commit()
+                # Positions still closing are checked again when their timeout passes
+                await self._schedule_closing_recovery([pg for pg in closing_positions if pg not in recovered])
+
+        # 1. All open positions of all users in one query
+        snapshot = PositionSnapshot(await position_group_repo.get_all_active_for_users(user_ids))
+        if not len(snapshot):
+            self.trigger_index.replace_users(set(user_ids), snapshot, {})
+            return
+        configs = {user_id: self._get_user_config(users_by_id[user_id]) for user_id in snapshot.rows_by_user}
+
+        # 2. PnL from one price read per feed; testnet users are priced from the testnet feed
+        prices: Dict[str, Dict[str, Decimal]] = {}
+        exchange_by_feed: Dict[str, str] = {}
+        users_by_feed: Dict[str, Dict[uuid.UUID, User]] = {}
+        for row, (exchange_name, user_id) in enumerate(zip(snapshot.exchanges, snapshot.user_ids)):
+            feed = self._user_feed(users_by_id[user_id], exchange_name)
+            snapshot.feeds[row] = feed
+            exchange_by_feed[feed] = exchange_name
+            users_by_feed.setdefault(feed, {})[user_id] = users_by_id[user_id]
+        for feed, symbols in snapshot.symbols_by_feed().items():
+            try:
+                prices[feed] = await self._fetch_exchange_prices(
+                    exchange_by_feed[feed], symbols, list(users_by_feed[feed].values())
+                )
+            except Exception as e:
+                logger.error(f"Risk Engine: Error refreshing PnL for {feed}: {e}")
+        changed_rows = apply_prices(snapshot, prices)
+
+        # 3. Timer transitions for every user at once
+        transitions = plan_timer_transitions(snapshot, configs, datetime.utcnow())
+        changed_rows.update(row for row, _, _ in transitions)
+
+        # 4. Write back only the rows that changed
+        snapshot.write_back(changed_rows)
+        for row, event, pyramids_complete in transitions:
+            if event:
+                pg = snapshot.groups[row]
+                await announce_timer_event(pg, event, pyramids_complete, configs[pg.user_id], session)
+        if changed_rows:
+            await session.commit()
+        logger.debug(
+            f"Risk Engine: Batch evaluated {len(snapshot)} positions of {len(configs)} users, "
+            f"{len(changed_rows)} rows changed, {len(transitions)} timer transitions"
+        )
+        updated_users = {snapshot.user_ids[row] for row in changed_rows}
+
+        # Price levels and timer expiries that trigger the next evaluation of these users
+        for feed, feed_prices in prices.items():
+            self.trigger_index.record_prices(feed, feed_prices)
+        self.trigger_index.replace_users(set(user_ids), snapshot, configs)
+        await self._schedule_risk_timers(snapshot, transitions)
+
+        # 5. Offsets stay per user
+        for user_id in offset_candidates(snapshot, configs, datetime.utcnow()):
+            user = users_by_id[user_id]
+            try:
+                await self._evaluate_user_positions(session, user, prepared_positions=snapshot.user_groups(user_id))
+                updated_users.add(user_id)
+            except Exception as e:
+                logger.error(f"Risk Engine: Error processing user {user.id}: {e}")
+                # Ensure session is clean after any error (including deadlocks)
+                try:
+                    await session.rollback()
+                except Exception:
+                    pass
+
+        # Refreshed PnL, timers and any offset are committed by now
+        for user_id in updated_users:
+            await publish_user_update(user_id, TOPIC_POSITIONS)
+
+    async def _schedule_risk_timers(self, snapshot: PositionSnapshot, transitions: List[Tuple[int, Optional[str], bool]]):
+        """Registers running timers with the deadline scheduler and cancels those that stopped or expired."""
+        running, stopped = {}, []
+        for row in range(len(snapshot)):
+            if snapshot.statuses[row] == PositionGroupStatus.ACTIVE.value \
+                    and snapshot.timer_expires[row] is not None and not snapshot.eligible[row]:
+                running[deadline_member(snapshot.groups[row])] = snapshot.timer_expires[row]
+        for row, _, _ in transitions:
+            member = deadline_member(snapshot.groups[row])
+            if member not in running:
+                stopped.append(member)
+        try:
+            await self.deadline_scheduler.schedule(RISK_TIMER_DEADLINE, running)
+            await self.deadline_scheduler.cancel(RISK_TIMER_DEADLINE, stopped)
+        except Exception as e:
+            logger.warning(f"Risk Engine: Failed to schedule risk timer deadlines: {e}")
+
+    async def _schedule_closing_recovery(self, closing_positions: List[PositionGroup]):
+        deadlines = {}
+        for pg in closing_positions:
+            due = closing_recovery_due(pg)
+            if due is not None:
+                deadlines[deadline_member(pg)] = due
+        try:
+            await self.deadline_scheduler.schedule(CLOSING_RECOVERY_DEADLINE, deadlines)
+        except Exception as e:
+            logger.warning(f"Risk Engine: Failed to schedule closing recovery deadlines: {e}")
+
+    def _owns_deadline(self, member: str) -> bool:
+        """Deadlines of users in another worker's shard are fired there."""
+        return self.shard_coordinator.owns(deadline_user_id(member))
+
+    async def _on_risk_timer_deadlines(self, members: List[str]):
+        for member in members:
+            self.request_evaluation(deadline_user_id(member))
+
+    async def _on_closing_recovery_deadlines(self, members: List[str]):
+        for member in members:
+            user_id = deadline_user_id(member)
+            self._closing_due.add(user_id)
+            self.request_evaluation(user_id)
+
+    def _get_user_config(self, user: User) -> RiskEngineConfig:
+        """Determine Risk Config (User > Global)"""
+        config = self.config
+        if user.risk_config:
+            try:
+                if isinstance(user.risk_config, dict):
+                    config = RiskEngineConfig(**user.risk_config)
+            except Exception as e:
+                logger.warning(f"Risk Engine: Invalid config for user {user.id}, using default. Error: {e}")
+        return config
+
+    async def _execute_close_orders(
+        self,
+        user: User,
+        exchange_connector: ExchangeInterface,
+        close_orders: List[dict]
+    ) -> list:
+        """
+        Places an offset's close orders concurrently. Each order is its own unit of
+        work (session, OrderService and commit of the recorded fill), so the orders
+        no longer contend on the evaluation session.
+
+        Returns:
+            One entry per order, in order: the exchange result or the exception raised.
+        """
+        async def place(task_idx: int, order_kwargs: dict):
+            async with session_scope(self.session_factory) as order_session:
+                try:
+                    order_service = self.order_service_class(
+                        session=order_session,
+                        user=user,
+                        exchange_connector=exchange_connector
+                    )
+                    logger.info(f"Risk Engine: Executing close task {task_idx}...")
+                    result = await order_service.place_market_order(**order_kwargs)
+                    await order_session.commit()
+                    logger.info(f"Risk Engine: Close task {task_idx} succeeded: {result}")
+                    return result
+                except Exception as e:
+                    logger.error(f"Risk Engine: Close task {task_idx} FAILED with exception: {type(e).__name__}: {e}")
+                    try:
+                        await order_session.rollback()
+                    except Exception:
+                        pass
+                    return e
+
+        return await asyncio.gather(*(place(idx, kwargs) for idx, kwargs in enumerate(close_orders)))
+
+    async def _evaluate_user_positions(
+        self,
+        session: AsyncSession,
+        user: User,
+        prepared_positions: Optional[List[PositionGroup]] = None
+    ):
         """
         Evaluates positions for a single user.
 
@@ -278,40 +550,38 @@ class RiskEngineService:
         2. Update timers for all positions based on current conditions
         3. Select eligible loser and winners
         4. Execute offset (close loser and partial close winners SIMULTANEOUSLY)
+
+        prepared_positions: positions whose PnL and timers the batch evaluation
+        already brought up to date; only steps 3 and 4 run.
         """
         try:
             position_group_repo = self.position_group_repository_class(session)
             risk_action_repo = self.risk_action_repository_class(session)
+            config = self._get_user_config(user)
 
-            # 0. Check for and recover stuck closing positions
-            closing_positions = await position_group_repo.get_closing_by_user(user.id)
-            if closing_positions:
-                recovered = await recover_stuck_closing_positions(closing_positions, session)
-                if recovered:
-                    await session.commit()
-
-            # 1. Get User Positions
-            all_positions = await position_group_repo.get_all_active_by_user(user.id)
+            if prepared_positions is not None:
+                all_positions = prepared_positions
+            else:
+                # 0. Check for and recover stuck closing positions
+                closing_positions = await position_group_repo.get_closing_by_user(user.id)
+                if closing_positions:
+                    recovered = await recover_stuck_closing_positions(closing_positions, session)
+                    if recovered:
+                        await session.commit()
 
-            if not all_positions:
-                return
+                # 1. Get User Positions
+                all_positions = await position_group_repo.get_all_active_by_user(user.id)
 
-            # 2. Refresh unrealized PnL for all positions based on current prices
-            # This ensures risk timer decisions use fresh data, not stale values
-            await self._refresh_positions_pnl(session, user, all_positions)
+                if not all_positions:
+                    return
 
-            # 3. Determine Risk Config (User > Global)
-            config = self.config
-            if user.risk_config:
-                try:
-                    if isinstance(user.risk_config, dict):
-                        config = RiskEngineConfig(**user.risk_config)
-                except Exception as e:
-                    logger.warning(f"Risk Engine: Invalid config for user {user.id}, using default. Error: {e}")
+                # 2. Refresh unrealized PnL for all positions based on current prices
+                # This ensures risk timer decisions use fresh data, not stale values
+                await self._refresh_positions_pnl(session, user, all_positions)
 
-            # 4. Update risk timers for all positions (now with fresh PnL data)
-            await update_risk_timers(all_positions, config, session)
-            await session.commit()
+                # 3. Update risk timers for all positions (now with fresh PnL data)
+                await update_risk_timers(all_positions, config, session)
+                await session.commit()
 
             # 4. Select Loser and Winners
             loser, winners, required_usd = select_loser_and_winners(all_positions, config)
@@ -470,6 +740,7 @@ class RiskEngineService:
                 loser.closing_started_at = datetime.utcnow()  # Track when closing started for recovery timeout
                 await position_group_repo.update(loser)
                 await session.commit()
+                await self._schedule_closing_recovery([loser])
                 logger.info(f"Risk Engine: Loser {loser.symbol} marked as CLOSING and committed to prevent re-selection")
 
                 # Cancel pending orders on loser before closing
@@ -480,21 +751,19 @@ class RiskEngineService:
                     logger.warning(f"Risk Engine: Failed to cancel orders for loser {loser.symbol}: {cancel_err}")
 
                 # Prepare all close orders for SIMULTANEOUS execution
-                close_tasks = []
-
-                # Add loser close task
-                close_tasks.append(
-                    order_service.place_market_order(
-                        user_id=loser.user_id,
-                        exchange=loser.exchange,
-                        symbol=loser.symbol,
-                        side="sell" if loser.side == "long" else "buy",
-                        quantity=loser.total_filled_quantity,
-                        position_group_id=loser.id,
-                        pyramid_id=loser_pyramid.id,
-                        record_in_db=True
-                    )
-                )
+                close_orders = []
+
+                # Add loser close order
+                close_orders.append(dict(
+                    user_id=loser.user_id,
+                    exchange=loser.exchange,
+                    symbol=loser.symbol,
+                    side="sell" if loser.side == "long" else "buy",
+                    quantity=loser.total_filled_quantity,
+                    position_group_id=loser.id,
+                    pyramid_id=loser_pyramid.id,
+                    record_in_db=True
+                ))
 
                 # Prepare winner close tasks
                 winner_details = []
@@ -518,22 +787,20 @@ class RiskEngineService:
                         logger.warning(f"Risk Engine: Failed to cancel orders for winner {winner_pg.symbol}: {cancel_err}")
 
                     # Track task index (loser is at index 0, winners start at 1)
-                    task_index = len(close_tasks)
+                    task_index = len(close_orders)
                     winner_close_info.append((winner_pg, quantity_to_close, task_index))
 
-                    # Add winner close task
-                    close_tasks.append(
-                        order_service.place_market_order(
-                            user_id=winner_pg.user_id,
-                            exchange=winner_pg.exchange,
-                            symbol=winner_pg.symbol,
-                            side="sell" if winner_pg.side == "long" else "buy",
-                            quantity=quantity_to_close,
-                            position_group_id=winner_pg.id,
-                            pyramid_id=winner_pyramid.id,
-                            record_in_db=True
-                        )
-                    )
+                    # Add winner close order
+                    close_orders.append(dict(
+                        user_id=winner_pg.user_id,
+                        exchange=winner_pg.exchange,
+                        symbol=winner_pg.symbol,
+                        side="sell" if winner_pg.side == "long" else "buy",
+                        quantity=quantity_to_close,
+                        position_group_id=winner_pg.id,
+                        pyramid_id=winner_pyramid.id,
+                        record_in_db=True
+                    ))
                     winner_details.append({
                         "group_id": str(winner_pg.id),
                         "symbol": winner_pg.symbol,
@@ -541,20 +808,10 @@ class RiskEngineService:
                         "quantity_closed": str(quantity_to_close)
                     })
 
-                # Execute close orders SEQUENTIALLY to avoid session contention
-                # (asyncio.gather with shared session causes "Session is already flushing" errors)
-                logger.info(f"Risk Engine: Executing {len(close_tasks)} close orders sequentially for {loser.symbol}...")
+                # Execute close orders SIMULTANEOUSLY, each in its own session
+                logger.info(f"Risk Engine: Executing {len(close_orders)} close orders concurrently for {loser.symbol}...")
                 logger.info(f"Risk Engine: Loser {loser.symbol} qty={loser.total_filled_quantity}, side={loser.side}")
-                results = []
-                for task_idx, task in enumerate(close_tasks):
-                    try:
-                        logger.info(f"Risk Engine: Executing close task {task_idx}...")
-                        result = await task
-                        logger.info(f"Risk Engine: Close task {task_idx} succeeded: {result}")
-                        results.append(result)
-                    except Exception as e:
-                        logger.error(f"Risk Engine: Close task {task_idx} FAILED with exception: {type(e).__name__}: {e}")
-                        results.append(e)
+                results = await self._execute_close_orders(user, exchange_connector, close_orders)
 
                 # Check results
                 success_count = 0
@@ -570,7 +827,7 @@ class RiskEngineService:
                         if idx == 0:
                             loser_close_success = True
 
-                logger.info(f"Risk Engine: Sequential execution completed. Success: {success_count}, Errors: {error_count}")
+                logger.info(f"Risk Engine: Concurrent execution completed. Success: {success_count}, Errors: {error_count}")
 
                 # Update loser status based on execution result
                 if loser_close_success:
@@ -781,33 +1038,97 @@ class RiskEngineService:
         """Starts the background task for the Risk Engine."""
         if not self._running:
             self._running = True
+            self.market_data.add_listener(self._on_price_update)
+            owns = self._owns_deadline if self.shard_coordinator is not None else None
+            self.deadline_scheduler.register(RISK_TIMER_DEADLINE, self._on_risk_timer_deadlines, owns=owns)
+            self.deadline_scheduler.register(CLOSING_RECOVERY_DEADLINE, self._on_closing_recovery_deadlines, owns=owns)
+            await self.deadline_scheduler.start()
             self._monitor_task = asyncio.create_task(self._monitoring_loop())
             logger.info("RiskEngineService monitoring task started.")
 
+    async def _on_price_update(self, feed: str, prices: Dict[str, Decimal]):
+        """Market data listener: wakes the loop for users whose price levels were crossed."""
+        triggered = self.trigger_index.check_prices(feed, prices)
+        if triggered:
+            self._triggered_users.update(triggered)
+            self._trigger_event.set()
+
+    def request_evaluation(self, user_id: uuid.UUID):
+        """Evaluates (and re-indexes) a user on the next loop iteration, e.g. after a fill moved their entry."""
+        self._triggered_users.add(user_id)
+        self._trigger_event.set()
+
+    async def _evaluate_triggered_users(self, user_ids: Set[uuid.UUID], recover_closing_for: Set[uuid.UUID]):
+        """Batch evaluation of the given users only."""
+        async for session in self.session_factory():
+            try:
+                users = await UserRepository(session).get_active_by_ids(user_ids)
+                if self.shard_coordinator is not None:
+                    users = self.shard_coordinator.filter_owned(users, lambda u: u.id)
+                if users:
+                    await self._evaluate_users_batch(session, users, recover_closing_for=recover_closing_for)
+            except Exception as e:
+                logger.error(f"Risk Engine: Error in triggered evaluation: {e}")
+                try:
+                    await session.rollback()
+                except Exception:
+                    pass
+
+    async def _wait_for_trigger(self, next_sweep: float):
+        """Sleeps until a trigger or deadline fires, or the next full sweep is due."""
+        timeout = min(next_sweep - time.monotonic(), HEALTH_REPORT_INTERVAL_SECONDS)
+        if timeout > 0 and not self._trigger_event.is_set():
+            try:
+                await asyncio.wait_for(self._trigger_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._trigger_event.clear()
+
     async def _monitoring_loop(self):
-        """The main loop for the Risk Engine monitoring task."""
+        """
+        The main loop for the Risk Engine monitoring task.
+
+        Every polling_interval_seconds all users are evaluated (full sweep). In
+        between, a user is only evaluated when a price update crosses one of the
+        levels of their positions, a deadline of theirs passes (risk timer
+        expiry, closing recovery timeout), or a fill requests it.
+        """
         cycle_count = 0
+        triggered_count = 0
         error_count = 0
         last_error = None
         actions_count = 0
+        next_sweep = time.monotonic()
 
         while self._running:
             try:
-                await self._evaluate_positions()
-                cycle_count += 1
+                if time.monotonic() >= next_sweep:
+                    next_sweep = time.monotonic() + self.polling_interval_seconds
+                    self._triggered_users.clear()
+                    self._closing_due.clear()
+                    await self._evaluate_positions()
+                    cycle_count += 1
+                else:
+                    user_ids, self._triggered_users = self._triggered_users, set()
+                    closing_due, self._closing_due = self._closing_due, set()
+                    if user_ids:
+                        await self._evaluate_triggered_users(user_ids, closing_due)
+                        triggered_count += len(user_ids)
 
                 # Report health metrics
                 await self._report_health(
                     status="running",
                     metrics={
                         "cycle_count": cycle_count,
+                        "triggered_evaluations": triggered_count,
+                        "trigger_levels": len(self.trigger_index),
                         "actions_count": actions_count,
                         "error_count": error_count,
                         "last_error": last_error
                     }
                 )
 
-                await asyncio.sleep(self.polling_interval_seconds)
+                await self._wait_for_trigger(next_sweep)
             except asyncio.CancelledError:
                 await self._report_health(status="stopped", metrics={"cycle_count": cycle_count})
                 break
@@ -841,6 +1162,9 @@ class RiskEngineService:
         """Stops the background Risk Engine monitoring task."""
         if self._running and self._monitor_task:
             self._running = False
+            self.market_data.remove_listener(self._on_price_update)
+            self.deadline_scheduler.unregister(RISK_TIMER_DEADLINE)
+            self.deadline_scheduler.unregister(CLOSING_RECOVERY_DEADLINE)
             self._monitor_task.cancel()
             try:
                 await self._monitor_task
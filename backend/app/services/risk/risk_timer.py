@@ -4,8 +4,10 @@ Handles starting, resetting, and expiring risk timers for positions.
 Also handles recovery of stuck positions.
 """
 import logging
+import uuid
 from datetime import datetime, timedelta
-from typing import List
+from decimal import Decimal
+from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,6 +22,110 @@ logger = logging.getLogger(__name__)
 # Reduced from 5 minutes to 2 minutes for faster recovery of stuck positions
 CLOSING_TIMEOUT_MINUTES = 2
 
+# Deadline kinds registered with the deadline scheduler; members are "<user_id>:<group_id>"
+RISK_TIMER_DEADLINE = "risk_timer"
+CLOSING_RECOVERY_DEADLINE = "closing_recovery"
+
+
+def deadline_member(pg: PositionGroup) -> str:
+    return f"{pg.user_id}:{pg.id}"
+
+
+def deadline_user_id(member: str) -> uuid.UUID:
+    return uuid.UUID(member.split(":", 1)[0])
+
+
+def closing_recovery_due(pg: PositionGroup) -> Optional[datetime]:
+    """When a CLOSING position counts as stuck, or None without a closing timestamp."""
+    closing_timestamp = pg.closing_started_at or pg.updated_at
+    if not closing_timestamp:
+        return None
+    return closing_timestamp + timedelta(minutes=CLOSING_TIMEOUT_MINUTES)
+
+
+def next_timer_state(
+    pyramids_complete: bool,
+    unrealized_pnl_percent: Decimal,
+    timer_start: Optional[datetime],
+    timer_expires: Optional[datetime],
+    eligible: bool,
+    config: RiskEngineConfig,
+    now: datetime
+) -> Tuple[Optional[str], Optional[datetime], Optional[datetime], bool]:
+    """
+    Pure timer transition of one ACTIVE position (see update_risk_timers for the rules).
+
+    Returns:
+        (event, timer_start, timer_expires, eligible) where event is
+        "timer_started", "timer_expired", "timer_reset" or None
+    """
+    # For timer START: both pyramids complete AND loss exceeds threshold
+    # For timer CONTINUE: pyramids complete AND loss is still negative (< 0)
+    # Timer only resets on loss improvement if PnL becomes positive
+    loss_exceeded = unrealized_pnl_percent <= config.loss_threshold_percent
+    loss_still_negative = unrealized_pnl_percent < 0
+
+    should_start_timer = pyramids_complete and loss_exceeded
+    should_continue_timer = pyramids_complete and loss_still_negative
+
+    if should_start_timer or (timer_start is not None and should_continue_timer):
+        if timer_start is None:
+            return "timer_started", now, now + timedelta(minutes=config.post_pyramids_wait_minutes), False
+        # Only report expiry once, when first becoming eligible
+        if timer_expires and now >= timer_expires and not eligible:
+            return "timer_expired", timer_start, timer_expires, True
+        return None, timer_start, timer_expires, eligible
+
+    # Conditions not met - reset timer if it was running
+    return ("timer_reset" if timer_start is not None else None), None, None, False
+
+
+async def announce_timer_event(
+    pg: PositionGroup,
+    event: str,
+    pyramids_complete: bool,
+    config: RiskEngineConfig,
+    session: AsyncSession
+) -> None:
+    """Logs a timer transition and broadcasts it as a risk event."""
+    if event == "timer_started":
+        logger.info(
+            f"Risk timer STARTED for {pg.symbol} (ID: {pg.id}). "
+            f"Pyramids: {pg.pyramid_count}/{config.required_pyramids_for_timer}, "
+            f"Loss: {pg.unrealized_pnl_percent}% <= {config.loss_threshold_percent}%. "
+            f"Expires: {pg.risk_timer_expires}"
+        )
+    elif event == "timer_expired":
+        logger.info(f"Risk timer EXPIRED for {pg.symbol} (ID: {pg.id}). Now eligible for offset.")
+    else:
+        reason = []
+        if not pyramids_complete:
+            reason.append(f"pyramids incomplete ({pg.pyramid_count}/{config.required_pyramids_for_timer})")
+        if not pg.unrealized_pnl_percent < 0:
+            reason.append(f"position became profitable ({pg.unrealized_pnl_percent}% >= 0%)")
+        logger.info(
+            f"Risk timer RESET for {pg.symbol} (ID: {pg.id}). "
+            f"Reason: {', '.join(reason)}"
+        )
+
+    if event == "timer_reset":
+        await broadcast_risk_event(
+            position_group=pg,
+            event_type=event,
+            session=session,
+            loss_percent=pg.unrealized_pnl_percent,
+            loss_usd=pg.unrealized_pnl_usd
+        )
+    else:
+        await broadcast_risk_event(
+            position_group=pg,
+            event_type=event,
+            session=session,
+            loss_percent=pg.unrealized_pnl_percent,
+            loss_usd=pg.unrealized_pnl_usd,
+            timer_minutes=config.post_pyramids_wait_minutes
+        )
+
 
 async def update_risk_timers(
     position_groups: List[PositionGroup],
@@ -53,79 +159,17 @@ async def update_risk_timers(
         if pg.status != PositionGroupStatus.ACTIVE.value:
             continue
 
-        # Check current conditions
         pyramids_complete = _check_pyramids_complete(pg, config.required_pyramids_for_timer)
-        loss_exceeded = pg.unrealized_pnl_percent <= config.loss_threshold_percent
-
-        # For timer START: both pyramids complete AND loss exceeds threshold
-        # For timer CONTINUE: pyramids complete AND loss is still negative (< 0)
-        # Timer only resets on loss improvement if PnL becomes positive
-        loss_still_negative = pg.unrealized_pnl_percent < 0
-
-        should_start_timer = pyramids_complete and loss_exceeded
-        should_continue_timer = pyramids_complete and loss_still_negative
-
-        if should_start_timer or (pg.risk_timer_start is not None and should_continue_timer):
-            # Start timer if not already started
-            if pg.risk_timer_start is None:
-                pg.risk_timer_start = now
-                pg.risk_timer_expires = now + timedelta(minutes=config.post_pyramids_wait_minutes)
-                pg.risk_eligible = False
-                logger.info(
-                    f"Risk timer STARTED for {pg.symbol} (ID: {pg.id}). "
-                    f"Pyramids: {pg.pyramid_count}/{config.required_pyramids_for_timer}, "
-                    f"Loss: {pg.unrealized_pnl_percent}% <= {config.loss_threshold_percent}%. "
-                    f"Expires: {pg.risk_timer_expires}"
-                )
-                # Broadcast timer started event
-                await broadcast_risk_event(
-                    position_group=pg,
-                    event_type="timer_started",
-                    session=session,
-                    loss_percent=pg.unrealized_pnl_percent,
-                    loss_usd=pg.unrealized_pnl_usd,
-                    timer_minutes=config.post_pyramids_wait_minutes
-                )
-            # Check if timer expired
-            elif pg.risk_timer_expires and now >= pg.risk_timer_expires:
-                if not pg.risk_eligible:  # Only broadcast once when first becoming eligible
-                    pg.risk_eligible = True
-                    logger.info(f"Risk timer EXPIRED for {pg.symbol} (ID: {pg.id}). Now eligible for offset.")
-                    # Broadcast timer expired event
-                    await broadcast_risk_event(
-                        position_group=pg,
-                        event_type="timer_expired",
-                        session=session,
-                        loss_percent=pg.unrealized_pnl_percent,
-                        loss_usd=pg.unrealized_pnl_usd,
-                        timer_minutes=config.post_pyramids_wait_minutes
-                    )
-        else:
-            # Conditions not met - reset timer if it was running
-            if pg.risk_timer_start is not None:
-                reason = []
-                if not pyramids_complete:
-                    reason.append(f"pyramids incomplete ({pg.pyramid_count}/{config.required_pyramids_for_timer})")
-                if not loss_still_negative:
-                    reason.append(f"position became profitable ({pg.unrealized_pnl_percent}% >= 0%)")
-
-                logger.info(
-                    f"Risk timer RESET for {pg.symbol} (ID: {pg.id}). "
-                    f"Reason: {', '.join(reason)}"
-                )
-
-                # Broadcast timer reset event
-                await broadcast_risk_event(
-                    position_group=pg,
-                    event_type="timer_reset",
-                    session=session,
-                    loss_percent=pg.unrealized_pnl_percent,
-                    loss_usd=pg.unrealized_pnl_usd
-                )
-
-            pg.risk_timer_start = None
-            pg.risk_timer_expires = None
-            pg.risk_eligible = False
+        event, timer_start, timer_expires, eligible = next_timer_state(
+            pyramids_complete, pg.unrealized_pnl_percent,
+            pg.risk_timer_start, pg.risk_timer_expires, pg.risk_eligible,
+            config, now
+        )
+        pg.risk_timer_start = timer_start
+        pg.risk_timer_expires = timer_expires
+        pg.risk_eligible = eligible
+        if event:
+            await announce_timer_event(pg, event, pyramids_complete, config, session)
 
 
 async def recover_stuck_closing_positions(
@@ -0,0 +1,111 @@
+"""
+Price triggers for the Risk Engine.
+
+Between full sweeps, the outcome of a user's evaluation only changes when a
+price crosses one of a few known levels of their positions, or when a timer
+expires (see the deadline scheduler):
+- the loss threshold price, entry * (1 + loss_threshold_percent / 100), where
+  an ACTIVE position's timer starts;
+- the entry price, where PnL flips sign. That resets a running timer and
+  turns a position into (or out of) an offset winner.
+
+RiskTriggerIndex keeps these levels in one sorted list per (feed, symbol),
+with symbols normalized (feeds quote BTC/USDT, positions may hold BTCUSDT). A
+price update finds the crossed levels by bisecting the interval between the
+previous and the new price.
+"""
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from typing import Dict, List, Set, Tuple
+
+from app.core.cache import normalize_symbol
+from app.models.position_group import PositionGroupStatus
+from app.schemas.grid_config import RiskEngineConfig
+from app.services.risk.risk_batch import WINNER_STATUSES, PositionSnapshot
+
+FeedSymbol = Tuple[str, str]
+
+# Upper bound for the user_id half of a level, for bisecting on the price alone
+_MAX_UUID = uuid.UUID(int=(1 << 128) - 1)
+
+
+class RiskTriggerIndex:
+    """Threshold prices of the evaluated users' positions."""
+
+    def __init__(self):
+        # (feed, symbol) -> sorted [(price, user_id)]
+        self._levels: Dict[FeedSymbol, List[Tuple[Decimal, uuid.UUID]]] = {}
+        self._keys_by_user: Dict[uuid.UUID, Set[FeedSymbol]] = {}
+        self._last_prices: Dict[FeedSymbol, Decimal] = {}
+
+    def __len__(self) -> int:
+        return sum(len(levels) for levels in self._levels.values())
+
+    def clear(self):
+        self._levels.clear()
+        self._keys_by_user.clear()
+
+    def replace_users(
+        self,
+        user_ids: Set[uuid.UUID],
+        snapshot: PositionSnapshot,
+        configs: Dict[uuid.UUID, RiskEngineConfig]
+    ):
+        """
+        Re-indexes the given users from their freshly evaluated positions, under
+        the price feed of each row (see PositionSnapshot.feeds).
+        Users without rows in the snapshot end up with no triggers.
+        """
+        for user_id in user_ids:
+            for key in self._keys_by_user.pop(user_id, ()):
+                levels = [level for level in self._levels[key] if level[1] != user_id]
+                if levels:
+                    self._levels[key] = levels
+                else:
+                    del self._levels[key]
+
+        for row in range(len(snapshot)):
+            user_id = snapshot.user_ids[row]
+            if user_id not in user_ids:
+                continue
+            status = snapshot.statuses[row]
+            entry = snapshot.entries[row]
+            if status not in WINNER_STATUSES or not (entry and entry > 0):
+                continue
+
+            key = (snapshot.feeds[row], normalize_symbol(snapshot.symbols[row]))
+            prices = [Decimal(entry)]
+            if status == PositionGroupStatus.ACTIVE.value:
+                loss_threshold = configs[user_id].loss_threshold_percent
+                prices.append(Decimal(entry) * (Decimal("1") + Decimal(loss_threshold) / Decimal("100")))
+            levels = self._levels.setdefault(key, [])
+            for price in prices:
+                insort(levels, (price, user_id))
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+
+    def record_prices(self, feed: str, prices: Dict[str, Decimal]):
+        """Sets the reference prices that later updates are compared against."""
+        for symbol, price in prices.items():
+            self._last_prices[(feed, normalize_symbol(symbol))] = price
+
+    def check_prices(self, feed: str, prices: Dict[str, Decimal]) -> Set[uuid.UUID]:
+        """
+        Users with a level between the previous and the new price of any symbol
+        of the update. O(log n) per indexed symbol plus the crossed levels.
+        """
+        triggered: Set[uuid.UUID] = set()
+        for symbol, price in prices.items():
+            key = (feed, normalize_symbol(symbol))
+            levels = self._levels.get(key)
+            if not levels:
+                continue
+            previous = self._last_prices.get(key)
+            self._last_prices[key] = price
+            if previous is None or previous == price:
+                continue
+            low, high = min(previous, price), max(previous, price)
+            start = bisect_left(levels, (low,))
+            end = bisect_right(levels, (high, _MAX_UUID))
+            triggered.update(user_id for _, user_id in levels[start:end])
+        return triggered
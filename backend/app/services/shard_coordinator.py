@@ -0,0 +1,211 @@
+"""
+Sharding of background work across uvicorn workers.
+
+Fill monitoring, order streams, risk evaluation and queue promotion used to run
+only on the elected leader, so one event loop handled every user while the
+other workers idled. Each worker now runs those loops for the users it owns:
+
+- Users are hashed onto a fixed number of slots; slots are assigned to the live
+  workers by rendezvous hashing, so a worker joining or leaving only moves the
+  slots it gains or loses
+- Membership is a Redis key per worker refreshed every heartbeat; a worker that
+  dies drops out when its key expires
+- A worker only owns a slot while it holds that slot's lease. On a rebalance the
+  previous owner releases the lease on its next heartbeat (or it expires), so a
+  user is never processed by two workers at once
+- Without Redis every worker sees only itself and owns every slot, the same
+  fallback the leader election uses
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_SLOT_COUNT = 64
+HEARTBEAT_INTERVAL_SECONDS = 10
+# Membership and leases outlive a few missed heartbeats
+MEMBER_TTL_SECONDS = 30
+LEASE_TTL_SECONDS = 30
+
+
+def _hash(value: str) -> int:
+    return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+
+def slot_for(user_id, slot_count: int = DEFAULT_SLOT_COUNT) -> int:
+    """Slot of a user; stable across processes and restarts."""
+    return _hash(str(user_id)) % slot_count
+
+
+def assign_slots(members: Iterable[str], slot_count: int = DEFAULT_SLOT_COUNT) -> Dict[int, str]:
+    """Rendezvous assignment of every slot to one of the members."""
+    members = sorted(set(members))
+    if not members:
+        return {}
+    return {
+        slot: max(members, key=lambda member: _hash(f"{member}:{slot}"))
+        for slot in range(slot_count)
+    }
+
+
+def lease_resource(slot: int) -> str:
+    return f"shard_slot:{slot}"
+
+
+class ShardCoordinator:
+    def __init__(
+        self,
+        worker_id: str,
+        slot_count: int = DEFAULT_SLOT_COUNT,
+        heartbeat_interval_seconds: float = HEARTBEAT_INTERVAL_SECONDS,
+        member_ttl_seconds: int = MEMBER_TTL_SECONDS,
+        lease_ttl_seconds: int = LEASE_TTL_SECONDS,
+        cache=None
+    ):
+        self.worker_id = worker_id
+        self.slot_count = slot_count
+        self.heartbeat_interval_seconds = heartbeat_interval_seconds
+        self.member_ttl_seconds = member_ttl_seconds
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self._cache = cache
+
+        self._members: List[str] = []
+        self._assigned: Set[int] = set()
+        self._owned: Set[int] = set()
+        self._rebalances = 0
+        self._lease_waits = 0
+
+        self._running = False
+        self._heartbeat_task = None
+
+    async def _get_cache(self):
+        if self._cache is None:
+            from app.core.cache import get_cache
+            self._cache = await get_cache()
+        return self._cache
+
+    # ==================== Ownership ====================
+
+    def owns(self, user_id) -> bool:
+        """True if this worker currently runs background work for the user."""
+        return slot_for(user_id, self.slot_count) in self._owned
+
+    def filter_owned(self, items: Iterable[T], user_id_of: Callable[[T], object] = lambda item: item) -> List[T]:
+        return [item for item in items if self.owns(user_id_of(item))]
+
+    # ==================== Membership ====================
+
+    async def refresh(self):
+        """
+        Heartbeat the membership, recompute the assignment and reconcile leases.
+        """
+        cache = await self._get_cache()
+        await cache.register_shard_member(self.worker_id, ttl_seconds=self.member_ttl_seconds)
+
+        members = await cache.get_shard_members()
+        if not members:
+            # Redis unavailable: fall back to owning everything
+            members = [self.worker_id]
+        elif self.worker_id not in members:
+            members = sorted(members + [self.worker_id])
+
+        if members != self._members:
+            logger.info(f"ShardCoordinator: Worker {self.worker_id} sees members {members}")
+            self._members = members
+            self._rebalances += 1
+
+        assignment = assign_slots(members, self.slot_count)
+        assigned = {slot for slot, member in assignment.items() if member == self.worker_id}
+
+        # Hand back slots that moved to another worker before taking new ones
+        for slot in sorted(self._owned - assigned):
+            await cache.release_lock(lease_resource(slot), self.worker_id)
+            self._owned.discard(slot)
+
+        for slot in sorted(assigned):
+            resource = lease_resource(slot)
+            if slot in self._owned:
+                held = await cache.extend_lock(resource, self.worker_id, ttl_seconds=self.lease_ttl_seconds)
+            else:
+                held = await cache.acquire_lock(resource, self.worker_id, ttl_seconds=self.lease_ttl_seconds)
+                if not held:
+                    # Slot restarted on this worker before its lease expired
+                    held = await cache.extend_lock(resource, self.worker_id, ttl_seconds=self.lease_ttl_seconds)
+            if held:
+                self._owned.add(slot)
+            else:
+                # Previous owner has not released it yet
+                self._owned.discard(slot)
+                self._lease_waits += 1
+
+        self._assigned = assigned
+
+    async def start(self):
+        self._running = True
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"ShardCoordinator: Initial refresh failed: {e}")
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(
+            f"ShardCoordinator: Worker {self.worker_id} started with "
+            f"{len(self._owned)}/{self.slot_count} slots"
+        )
+
+    async def stop(self):
+        """Leave the membership and release leases so other workers take over at once."""
+        self._running = False
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+        try:
+            cache = await self._get_cache()
+            for slot in sorted(self._owned):
+                await cache.release_lock(lease_resource(slot), self.worker_id)
+            await cache.remove_shard_member(self.worker_id)
+        except Exception as e:
+            logger.warning(f"ShardCoordinator: Failed to leave membership: {e}")
+        self._owned.clear()
+        self._assigned.clear()
+        logger.info(f"ShardCoordinator: Worker {self.worker_id} stopped")
+
+    async def _heartbeat_loop(self):
+        while self._running:
+            await asyncio.sleep(self.heartbeat_interval_seconds)
+            try:
+                await self.refresh()
+                await self._report_health("running", self.get_metrics())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ShardCoordinator: Heartbeat failed: {e}")
+                await self._report_health("error", {**self.get_metrics(), "last_error": str(e)})
+
+    def get_metrics(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "members": len(self._members),
+            "assigned_slots": len(self._assigned),
+            "owned_slots": len(self._owned),
+            "slot_count": self.slot_count,
+            "rebalances": self._rebalances,
+            "lease_waits": self._lease_waits,
+        }
+
+    async def _report_health(self, status: str, metrics: dict = None):
+        """Report this worker's shard state to cache."""
+        try:
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            await cache.update_service_health(f"shard_coordinator_{self.worker_id}", status, metrics)
+        except Exception as e:
+            logger.debug(f"Failed to report health: {e}")
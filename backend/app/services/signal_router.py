@@ -51,7 +51,7 @@ def is_within_same_candle_period(timestamp: datetime, timeframe_minutes: int) ->
     return timestamp >= current_period_start
 
 from app.services.position_manager import PositionManagerService, DuplicatePositionException
-from app.services.execution_pool_manager import ExecutionPoolManager
+from app.services.execution_pool_manager import ExecutionPoolManager, get_execution_pool_manager
 from app.services.exchange_config_service import ExchangeConfigService, ExchangeConfigError
 from app.services.precision_validator import PrecisionValidator
 
@@ -170,7 +170,8 @@ class SignalRouterService:
 
         # Initialize Dependencies
         pg_repo = PositionGroupRepository(db_session)
-        exec_pool = ExecutionPoolManager(AsyncSessionLocal, PositionGroupRepository, max_open_groups=risk_config.max_open_positions_global)
+        exec_pool = get_execution_pool_manager() or ExecutionPoolManager(AsyncSessionLocal, PositionGroupRepository)
+        max_open_groups = risk_config.max_open_positions_global
         queue_service = QueueManagerService(AsyncSessionLocal, user=self.user, execution_pool_manager=exec_pool)
 
         # Initialize Exchange Connector (target_exchange already defined above)
@@ -195,7 +196,9 @@ class SignalRouterService:
             }
 
             try:
-                precision_rules = await exchange.get_precision_rules()
+                # Only the signal's symbol is needed, not the rules of the whole exchange
+                symbol_rule = await exchange.get_symbol_precision(signal.tv.symbol)
+                precision_rules = {signal.tv.symbol: symbol_rule} if symbol_rule else {}
                 validator = PrecisionValidator(
                     precision_rules=precision_rules,
                     fallback_rules=fallback_rules,
@@ -342,6 +345,9 @@ class SignalRouterService:
                         total_capital = max_exposure
 
                 # Define Helper for New Position Execution
+                # Filled by execute_new_position so the pool slot is kept only for a live group
+                created_groups = []
+
                 async def execute_new_position():
                     try:
                         qs = QueuedSignal(
@@ -363,6 +369,7 @@ class SignalRouterService:
                             total_capital_usd=total_capital
                         )
                         await db_session.commit()
+                        created_groups.append(new_position_group)
 
                         if new_position_group.status == PositionGroupStatus.FAILED:
                             logger.warning(f"New position created for {signal.tv.symbol}, but order submission failed. Status: FAILED.")
@@ -502,7 +509,10 @@ class SignalRouterService:
                         else:
                             # Rule DISABLED: Must compete for a standard slot
                             logger.info(f"Pyramid bypass rule DISABLED. Requesting standard slot for {signal.tv.symbol}")
-                            slot_available = await exec_pool.request_slot()
+                            slot = await exec_pool.request_slot(self.user.id, max_open_groups_override=max_open_groups)
+                            slot_available = bool(slot)
+                            # The group already holds its slot; the lease only gated admission
+                            await exec_pool.release_slot(slot)
 
                         if slot_available:
                             response_message = await execute_pyramid(existing_group)
@@ -514,9 +524,15 @@ class SignalRouterService:
 
                 else:
                     # New Position Logic
-                    slot_available = await exec_pool.request_slot()
-                    if slot_available:
-                        response_message = await execute_new_position()
+                    slot = await exec_pool.request_slot(self.user.id, max_open_groups_override=max_open_groups)
+                    if slot:
+                        try:
+                            response_message = await execute_new_position()
+                        finally:
+                            await exec_pool.release_slot(
+                                slot,
+                                occupied=any(g.status != PositionGroupStatus.FAILED for g in created_groups)
+                            )
                     else:
                         response_message = await queue_signal("Pool full.")
         finally:
@@ -15,6 +15,7 @@ from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.models.pyramid import Pyramid
 from app.models.dca_order import DCAOrder
 from app.schemas.telegram_config import TelegramConfig
+from app.services.telegram_dispatcher import TelegramDispatcher, get_telegram_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +23,17 @@ logger = logging.getLogger(__name__)
 class TelegramBroadcaster:
     """Service for broadcasting trading signals to Telegram with smart formatting"""
 
-    def __init__(self, config: TelegramConfig):
+    def __init__(
+        self,
+        config: TelegramConfig,
+        dispatcher: Optional[TelegramDispatcher] = None,
+        deliver_inline: bool = False
+    ):
         self.config = config
         self.base_url = f"https://api.telegram.org/bot{config.bot_token}"
+        # Deliveries go through the background dispatcher when one is running;
+        # deliver_inline is for callers that need the API result (e.g. test messages)
+        self.dispatcher = None if deliver_inline else (dispatcher or get_telegram_dispatcher())
 
     # ═══════════════════════════════════════════════════════════════════════════
     # HELPER METHODS
@@ -675,7 +684,11 @@ class TelegramBroadcaster:
             message_id = await self._update_message(position_group.telegram_message_id, message)
             return message_id
         else:
-            message_id = await self._send_message(message)
+            message_id = await self._send_message(
+                message,
+                on_message_id=self._message_id_saver(position_group) if session else None,
+                coalesce_key=position_group.id
+            )
             if message_id and session:
                 await self._save_message_id(position_group, message_id, session)
             return message_id
@@ -745,7 +758,11 @@ class TelegramBroadcaster:
         if position_group.telegram_message_id and self.config.update_existing_message:
             return await self._update_message(position_group.telegram_message_id, message)
         else:
-            message_id = await self._send_message(message)
+            message_id = await self._send_message(
+                message,
+                on_message_id=self._message_id_saver(position_group) if session else None,
+                coalesce_key=position_group.id
+            )
             if message_id and session:
                 await self._save_message_id(position_group, message_id, session)
             return message_id
@@ -920,13 +937,58 @@ class TelegramBroadcaster:
         except Exception as e:
             logger.error(f"Failed to save Telegram message ID: {e}")
 
-    async def _send_message(self, text: str) -> Optional[int]:
-        """Send a new message to the Telegram channel with short timeout"""
+    def _message_id_saver(self, position_group: PositionGroup):
+        """
+        Callback persisting the id of a message sent by the dispatcher. The caller's
+        session is gone by then, so the id is written with a session of its own.
+        """
+        position_group_id = position_group.id
+
+        async def save(message_id: int) -> None:
+            from sqlalchemy import update
+            from app.db.database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(PositionGroup)
+                    .where(
+                        PositionGroup.id == position_group_id,
+                        PositionGroup.telegram_message_id.is_(None)
+                    )
+                    .values(telegram_message_id=message_id)
+                )
+                await session.commit()
+            logger.debug(f"Saved Telegram message ID {message_id} to position {position_group_id}")
+
+        return save
+
+    async def _send_message(
+        self,
+        text: str,
+        on_message_id=None,
+        coalesce_key=None
+    ) -> Optional[int]:
+        """
+        Send a new message to the Telegram channel with short timeout.
+
+        With a dispatcher the message is queued and None is returned; the message
+        id is passed to on_message_id once it has been sent.
+        """
 
         if self.config.test_mode:
             logger.info(f"[TEST MODE] Would send Telegram message:\n{text}")
             return 999999  # Fake message ID for testing
 
+        if self.dispatcher is not None:
+            self.dispatcher.enqueue_send(
+                self.config.bot_token,
+                self.config.channel_id,
+                text,
+                on_message_id=on_message_id,
+                coalesce_key=coalesce_key
+            )
+            return None
+
         try:
             # Use 5-second timeout to avoid blocking webhook responses
             timeout = aiohttp.ClientTimeout(total=5)
@@ -963,6 +1025,10 @@ class TelegramBroadcaster:
             logger.info(f"[TEST MODE] Would update Telegram message {message_id}:\n{text}")
             return message_id
 
+        if self.dispatcher is not None:
+            self.dispatcher.enqueue_edit(self.config.bot_token, self.config.channel_id, message_id, text)
+            return message_id
+
         try:
             # Use 5-second timeout to avoid blocking webhook responses
             timeout = aiohttp.ClientTimeout(total=5)
@@ -0,0 +1,391 @@
+"""
+Out-of-band Telegram delivery.
+
+TelegramBroadcaster used to open a fresh aiohttp session per message and was
+awaited inline from fill handling, position updates and risk timers, so a slow
+Telegram API (or a 429) added seconds to order handling.
+
+TelegramDispatcher takes deliveries off the hot path:
+- Broadcasts are enqueued on a bounded queue and sent by background workers;
+  when the queue is full new deliveries are dropped rather than blocking callers
+- One persistent HTTP session per bot token
+- Per-chat and per-bot send slots keep us under Telegram's rate limits; a 429
+  pushes the chat's next slot back by the advertised retry_after
+- Edits of the same message and repeated sends for the same position that are
+  still queued are coalesced, so only the latest text is delivered
+- Transient failures (timeouts, 5xx, 429) are retried with exponential backoff
+- A sent message's id is handed to an optional callback (e.g. to persist
+  PositionGroup.telegram_message_id)
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_WORKER_COUNT = 4
+# Telegram allows roughly one message per second per chat and 30 per second per bot
+PER_CHAT_INTERVAL_SECONDS = 1.0
+PER_BOT_INTERVAL_SECONDS = 1.0 / 30
+DEFAULT_MAX_RETRIES = 3
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+REQUEST_TIMEOUT_SECONDS = 10
+HEALTH_REPORT_INTERVAL_SECONDS = 30
+
+MessageIdCallback = Callable[[int], Awaitable[None]]
+
+
+@dataclass
+class TelegramDelivery:
+    """One sendMessage (message_id is None) or editMessageText call."""
+    bot_token: str
+    chat_id: str
+    text: str
+    message_id: Optional[int] = None
+    on_message_id: Optional[MessageIdCallback] = None
+    coalesce_key: Optional[Hashable] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def is_edit(self) -> bool:
+        return self.message_id is not None
+
+
+class TelegramDispatcher:
+    def __init__(
+        self,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        worker_count: int = DEFAULT_WORKER_COUNT,
+        per_chat_interval_seconds: float = PER_CHAT_INTERVAL_SECONDS,
+        per_bot_interval_seconds: float = PER_BOT_INTERVAL_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_backoff_seconds: float = BASE_BACKOFF_SECONDS,
+        report_health: bool = False
+    ):
+        self.max_queue_size = max_queue_size
+        self.worker_count = worker_count
+        self.per_chat_interval_seconds = per_chat_interval_seconds
+        self.per_bot_interval_seconds = per_bot_interval_seconds
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.report_health = report_health
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+        # coalesce_key -> queued delivery whose text may still be replaced
+        self._queued: Dict[Hashable, TelegramDelivery] = {}
+        # coalesce_key of sends in flight -> text of an update that arrived meanwhile
+        self._in_flight: Dict[Hashable, Optional[str]] = {}
+        # rate-limit key -> monotonic time of the next free send slot
+        self._next_slot: Dict[Tuple[str, ...], float] = {}
+
+        self._enqueued = 0
+        self._sent = 0
+        self._edited = 0
+        self._coalesced = 0
+        self._retried = 0
+        self._failed = 0
+        self._dropped = 0
+        self._last_health_report = 0.0
+
+    # ==================== Producers ====================
+
+    def enqueue_send(
+        self,
+        bot_token: str,
+        chat_id: str,
+        text: str,
+        on_message_id: Optional[MessageIdCallback] = None,
+        coalesce_key: Optional[Hashable] = None
+    ) -> bool:
+        """
+        Queue a new message. Sends sharing a coalesce_key (e.g. one position's
+        signal message) collapse into the latest text while still queued; an
+        update arriving while the send is in flight becomes an edit of it.
+
+        Returns:
+            False if the delivery was dropped because the queue is full
+        """
+        if coalesce_key is not None:
+            key = ("send", bot_token, chat_id, coalesce_key)
+            if self._replace_queued(key, text):
+                return True
+            if key in self._in_flight:
+                self._in_flight[key] = text
+                self._coalesced += 1
+                return True
+            coalesce_key = key
+
+        return self._put(TelegramDelivery(
+            bot_token=bot_token,
+            chat_id=chat_id,
+            text=text,
+            on_message_id=on_message_id,
+            coalesce_key=coalesce_key
+        ))
+
+    def enqueue_edit(self, bot_token: str, chat_id: str, message_id: int, text: str) -> bool:
+        """
+        Queue an edit of an existing message. Queued edits of the same message
+        are coalesced into the latest text.
+        """
+        key = ("edit", bot_token, chat_id, message_id)
+        if self._replace_queued(key, text):
+            return True
+
+        return self._put(TelegramDelivery(
+            bot_token=bot_token,
+            chat_id=chat_id,
+            text=text,
+            message_id=message_id,
+            coalesce_key=key
+        ))
+
+    def _replace_queued(self, key: Hashable, text: str) -> bool:
+        queued = self._queued.get(key)
+        if queued is None:
+            return False
+        queued.text = text
+        self._coalesced += 1
+        return True
+
+    def _put(self, delivery: TelegramDelivery) -> bool:
+        try:
+            self._queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            logger.warning(f"Telegram queue full ({self.max_queue_size}) - dropping message for chat {delivery.chat_id}")
+            return False
+
+        if delivery.coalesce_key is not None:
+            self._queued[delivery.coalesce_key] = delivery
+        self._enqueued += 1
+        return True
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        """Starts the delivery workers."""
+        if self._running:
+            return
+        self._running = True
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.worker_count)]
+        logger.info(f"TelegramDispatcher started with {self.worker_count} workers.")
+
+    async def stop(self, drain_timeout_seconds: float = 5.0):
+        """
+        Stops the workers after giving queued deliveries drain_timeout_seconds
+        to go out, then closes the HTTP sessions.
+        """
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"TelegramDispatcher: {self._queue.qsize()} messages not delivered before shutdown")
+
+        self._running = False
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+        for session in self._sessions.values():
+            try:
+                await session.close()
+            except Exception as e:
+                logger.debug(f"TelegramDispatcher: Error closing session: {e}")
+        self._sessions = {}
+        await self._report_health("stopped", self.get_metrics())
+        logger.info("TelegramDispatcher stopped.")
+
+    def _get_session(self, bot_token: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(bot_token)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS))
+            self._sessions[bot_token] = session
+        return session
+
+    # ==================== Workers ====================
+
+    async def _worker_loop(self):
+        while True:
+            delivery = await self._queue.get()
+            try:
+                await self._process(delivery)
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"TelegramDispatcher: Unexpected error delivering to chat {delivery.chat_id}: {e}")
+            finally:
+                self._queue.task_done()
+            await self._maybe_report_health()
+
+    async def _process(self, delivery: TelegramDelivery):
+        key = delivery.coalesce_key
+        if key is not None and self._queued.get(key) is delivery:
+            del self._queued[key]
+
+        if delivery.is_edit:
+            await self._deliver(delivery)
+            return
+
+        if key is not None:
+            self._in_flight[key] = None
+        try:
+            message_id = await self._deliver(delivery)
+        finally:
+            followup_text = self._in_flight.pop(key, None) if key is not None else None
+
+        if message_id is None:
+            return
+
+        if delivery.on_message_id is not None:
+            try:
+                await delivery.on_message_id(message_id)
+            except Exception as e:
+                logger.error(f"TelegramDispatcher: Message id callback failed for {message_id}: {e}")
+
+        # The position changed while its message was being sent; bring it up to date
+        if followup_text is not None and followup_text != delivery.text:
+            self.enqueue_edit(delivery.bot_token, delivery.chat_id, message_id, followup_text)
+
+    async def _deliver(self, delivery: TelegramDelivery) -> Optional[int]:
+        """
+        Perform the API call with rate limiting and retries.
+
+        Returns:
+            The message id on success, None on permanent failure
+        """
+        method = "editMessageText" if delivery.is_edit else "sendMessage"
+        url = f"{TELEGRAM_API_URL}/bot{delivery.bot_token}/{method}"
+        data = {
+            "chat_id": delivery.chat_id,
+            "text": delivery.text,
+            "disable_web_page_preview": True
+        }
+        if delivery.is_edit:
+            data["message_id"] = delivery.message_id
+
+        chat_key = (delivery.bot_token, delivery.chat_id)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._retried += 1
+
+            await self._wait_for_slot(chat_key, self.per_chat_interval_seconds)
+            await self._wait_for_slot((delivery.bot_token,), self.per_bot_interval_seconds)
+
+            retry_delay = min(MAX_BACKOFF_SECONDS, self.base_backoff_seconds * (2 ** attempt))
+            try:
+                session = self._get_session(delivery.bot_token)
+                async with session.post(url, json=data) as response:
+                    try:
+                        result = await response.json(content_type=None)
+                    except Exception:
+                        result = {}
+                    result = result if isinstance(result, dict) else {}
+
+                    if response.status == 200:
+                        if delivery.is_edit:
+                            self._edited += 1
+                            return delivery.message_id
+                        self._sent += 1
+                        return result.get("result", {}).get("message_id")
+
+                    description = result.get("description") or ""
+                    if response.status == 429:
+                        retry_after = (result.get("parameters") or {}).get("retry_after") or retry_delay
+                        self._defer_slot(chat_key, float(retry_after))
+                        logger.warning(f"Telegram rate limited chat {delivery.chat_id}, retrying after {retry_after}s")
+                        continue
+
+                    if delivery.is_edit and "message is not modified" in description:
+                        # Coalesced edits can end up repeating the text already shown
+                        return delivery.message_id
+
+                    if response.status < 500:
+                        self._failed += 1
+                        logger.error(f"Telegram {method} failed: {response.status} - {description}")
+                        return None
+
+                    logger.warning(f"Telegram {method} returned {response.status}, retrying in {retry_delay}s")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Telegram {method} error ({type(e).__name__}), retrying in {retry_delay}s")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(retry_delay)
+
+        self._failed += 1
+        logger.error(f"Telegram {method} to chat {delivery.chat_id} failed after {self.max_retries + 1} attempts")
+        return None
+
+    async def _wait_for_slot(self, key: Tuple[str, ...], interval: float):
+        """Reserve the next send slot for key and sleep until it comes up."""
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(key, 0.0))
+        self._next_slot[key] = slot + interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _defer_slot(self, key: Tuple[str, ...], seconds: float):
+        self._next_slot[key] = max(self._next_slot.get(key, 0.0), time.monotonic() + seconds)
+
+    # ==================== Metrics ====================
+
+    def get_metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self._enqueued,
+            "sent": self._sent,
+            "edited": self._edited,
+            "coalesced": self._coalesced,
+            "retried": self._retried,
+            "failed": self._failed,
+            "dropped": self._dropped,
+            "open_sessions": len(self._sessions),
+        }
+
+    async def _maybe_report_health(self):
+        now = time.monotonic()
+        if now - self._last_health_report < HEALTH_REPORT_INTERVAL_SECONDS:
+            return
+        self._last_health_report = now
+        await self._report_health("running", self.get_metrics())
+
+    async def _report_health(self, status: str, metrics: dict = None):
+        """Report service health to cache."""
+        if not self.report_health:
+            return
+        try:
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            await cache.update_service_health("telegram_dispatcher", status, metrics)
+        except Exception as e:
+            logger.debug(f"Failed to report health: {e}")
+
+
+# Process-wide dispatcher; None until started at startup (messages are then sent inline)
+_telegram_dispatcher: Optional[TelegramDispatcher] = None
+
+
+def get_telegram_dispatcher() -> Optional[TelegramDispatcher]:
+    return _telegram_dispatcher
+
+
+def set_telegram_dispatcher(dispatcher: Optional[TelegramDispatcher]):
+    global _telegram_dispatcher
+    _telegram_dispatcher = dispatcher
@@ -0,0 +1,405 @@
+"""
+Asynchronous webhook intake.
+
+The TradingView endpoint used to run SignalRouterService.route inline (config load,
+connector setup, precision rules, order placement, Telegram) while holding a Redis
+lock and a DB session, so bursts of alerts blocked HTTP workers on exchange latency
+and concurrent alerts for the same symbol got 409s.
+
+With intake enabled the endpoint only validates and persists the payload
+(WebhookIntake row) and returns 202. The leader runs a dispatcher plus a pool of
+router workers, started and stopped as leadership moves between workers:
+- Pending intakes are read in arrival order and sharded by ordering key
+  (user, symbol, timeframe), so signals for one position are routed strictly
+  in order while different positions are routed in parallel
+- Duplicate deliveries (same strategy_info.trade_id, action and intent inside the
+  dedup window) are acknowledged but not routed again
+- Intakes are claimed atomically (UPDATE ... RETURNING over SKIP LOCKED rows),
+  so two dispatchers, e.g. during a leadership hand-over, never claim the same one
+- A stopping leader lets in-flight intakes finish and requeues the ones it had
+  not started; intakes whose routing outlived the processing lease (the leader
+  died mid-route) are requeued when the next leader starts
+- Queue depth and receive-to-routed latency are reported as service health
+"""
+import asyncio
+import logging
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.webhook_intake import WebhookIntake, WebhookIntakeStatus
+from app.repositories.user import UserRepository
+from app.repositories.webhook_intake import WebhookIntakeRepository
+from app.schemas.webhook_payloads import WebhookPayload
+from app.services.signal_router import SignalRouterService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKER_COUNT = 4
+# Window in which a repeated trade_id/action/intent is treated as a redelivery
+DEDUP_WINDOW_SECONDS = 600
+DISPATCH_BATCH_SIZE = 100
+# An intake routing for longer than this is assumed abandoned by a dead leader
+PROCESSING_LEASE_SECONDS = 600
+# How long a stopping leader waits for in-flight intakes before cancelling them
+DRAIN_TIMEOUT_SECONDS = 60
+HEALTH_REPORT_INTERVAL_SECONDS = 5
+LATENCY_SAMPLE_SIZE = 500
+
+
+def build_ordering_key(user_id, payload: WebhookPayload) -> str:
+    """Signals for the same user/symbol/timeframe must be routed in arrival order."""
+    return f"{user_id}:{payload.tv.symbol}:{payload.tv.timeframe}"
+
+
+def build_idempotency_key(payload: WebhookPayload) -> str:
+    """
+    Key identifying one alert delivery. Entry and exit alerts of a trade may share
+    a trade_id, so the action and intent are part of the key.
+    """
+    intent_type = payload.execution_intent.type.lower() if payload.execution_intent else "signal"
+    return f"{payload.strategy_info.trade_id}:{payload.tv.action.lower()}:{intent_type}"
+
+
+class WebhookIntakeService:
+    def __init__(
+        self,
+        session_factory,
+        worker_count: int = DEFAULT_WORKER_COUNT,
+        poll_interval_seconds: float = 0.25,
+        dedup_window_seconds: int = DEDUP_WINDOW_SECONDS,
+        processing_lease_seconds: int = PROCESSING_LEASE_SECONDS,
+        drain_timeout_seconds: float = DRAIN_TIMEOUT_SECONDS,
+        signal_router_class=SignalRouterService,
+        intake_repository_class=WebhookIntakeRepository
+    ):
+        self.session_factory = session_factory
+        self.worker_count = worker_count
+        self.poll_interval_seconds = poll_interval_seconds
+        self.dedup_window_seconds = dedup_window_seconds
+        self.processing_lease_seconds = processing_lease_seconds
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.signal_router_class = signal_router_class
+        self.intake_repository_class = intake_repository_class
+
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._dispatch_task = None
+        self._running = False
+        self._wakeup = asyncio.Event()
+
+        self._accepted = 0
+        self._duplicates = 0
+        self._processed = 0
+        self._failed = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self._last_health_report = 0.0
+
+    # ==================== Intake (any worker) ====================
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        user: User,
+        webhook_payload: WebhookPayload,
+        raw_payload: dict
+    ) -> Tuple[Optional[WebhookIntake], bool]:
+        """
+        Persist a validated webhook for asynchronous routing.
+
+        Returns:
+            (intake, is_duplicate). For duplicates the intake is the earlier delivery
+            when it is visible, else None.
+        """
+        from app.core.cache import get_cache
+
+        idempotency_key = build_idempotency_key(webhook_payload)
+        intake_id = uuid.uuid4()
+
+        # Atomic across HTTP workers; the DB lookup below covers Redis being unavailable
+        cache = await get_cache()
+        claimed = await cache.acquire_lock(
+            self._dedup_resource(user.id, idempotency_key), str(intake_id), self.dedup_window_seconds
+        )
+
+        repo = self.intake_repository_class(db)
+        since = datetime.utcnow() - timedelta(seconds=self.dedup_window_seconds)
+        existing = await repo.find_recent_duplicate(user.id, idempotency_key, since)
+        if existing or not claimed:
+            self._duplicates += 1
+            logger.info(f"Duplicate webhook {idempotency_key} for user {user.id} - not routed again")
+            return existing, True
+
+        intake = WebhookIntake(
+            id=intake_id,
+            user_id=user.id,
+            ordering_key=build_ordering_key(user.id, webhook_payload),
+            idempotency_key=idempotency_key,
+            payload=raw_payload,
+            status=WebhookIntakeStatus.PENDING.value,
+            attempts=0,
+            received_at=datetime.utcnow()
+        )
+        try:
+            await repo.create(intake)
+            await db.commit()
+        except Exception:
+            # The delivery was not persisted; a retry must not be taken for a duplicate
+            await self._release_dedup(intake)
+            raise
+
+        self._accepted += 1
+        # Wake the dispatcher immediately when it runs in this process
+        self._wakeup.set()
+        return intake, False
+
+    @staticmethod
+    def _dedup_resource(user_id, idempotency_key: str) -> str:
+        return f"webhook_dedup:{user_id}:{idempotency_key}"
+
+    # ==================== Routing (leader) ====================
+
+    async def start_processing_task(self):
+        """
+        Starts the dispatcher and router workers.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._queues = [asyncio.Queue() for _ in range(self.worker_count)]
+        self._workers = [
+            asyncio.create_task(self._worker_loop(queue)) for queue in self._queues
+        ]
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"WebhookIntakeService started with {self.worker_count} router workers.")
+
+    async def stop_processing_task(self):
+        """
+        Stops the dispatcher and workers. Intakes being routed are allowed to
+        finish (up to the drain timeout), since cancelling route() could leave
+        orders placed without the intake recording it; intakes still queued
+        locally are returned to PENDING.
+        """
+        if not self._running:
+            return
+        self._running = False
+        if self._dispatch_task:
+            self._dispatch_task.cancel()
+            try:
+                await self._dispatch_task
+            except asyncio.CancelledError:
+                pass
+
+        unstarted = []
+        for queue in self._queues:
+            while not queue.empty():
+                unstarted.append(queue.get_nowait())
+                queue.task_done()
+            # Each worker exits after its current intake
+            queue.put_nowait(None)
+        if unstarted:
+            try:
+                await self._requeue(unstarted)
+            except Exception as e:
+                logger.error(f"WebhookIntake: Failed to requeue {len(unstarted)} queued intakes: {e}")
+
+        if self._workers:
+            _, stragglers = await asyncio.wait(self._workers, timeout=self.drain_timeout_seconds)
+            for task in stragglers:
+                logger.warning("WebhookIntake: Router worker did not drain in time - cancelling")
+                task.cancel()
+            for task in stragglers:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._workers = []
+        self._queues = []
+        self._dispatch_task = None
+        logger.info("WebhookIntakeService stopped.")
+
+    async def _dispatch_loop(self):
+        """
+        Moves pending intakes from the database onto the worker shards.
+        """
+        error_count = 0
+        last_error = None
+
+        try:
+            await self._requeue_interrupted()
+        except Exception as e:
+            logger.error(f"WebhookIntake: Failed to requeue interrupted intakes: {e}")
+
+        while self._running:
+            try:
+                dispatched = await self._dispatch_pending()
+                await self._maybe_report_health("running", error_count, last_error)
+
+                if not dispatched:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+            except asyncio.CancelledError:
+                await self._report_health("stopped", self.get_metrics())
+                break
+            except Exception as e:
+                error_count += 1
+                last_error = str(e)
+                logger.error(f"Error in WebhookIntake dispatch loop: {e}")
+                await self._report_health("error", {**self.get_metrics(), "error_count": error_count, "last_error": last_error})
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _requeue_interrupted(self):
+        # Rows inside the lease may still be routed by a previous leader that is draining
+        started_before = datetime.utcnow() - timedelta(seconds=self.processing_lease_seconds)
+        async with self.session_factory() as session:
+            repo = self.intake_repository_class(session)
+            count = await repo.requeue_processing(started_before)
+            await session.commit()
+        if count:
+            logger.warning(f"WebhookIntake: Requeued {count} intakes interrupted by a previous leader")
+
+    async def _requeue(self, intake_ids: list):
+        async with self.session_factory() as session:
+            count = await self.intake_repository_class(session).requeue(intake_ids)
+            await session.commit()
+        logger.info(f"WebhookIntake: Requeued {count} intakes not started before stopping")
+
+    async def _dispatch_pending(self) -> int:
+        async with self.session_factory() as session:
+            repo = self.intake_repository_class(session)
+            pending = await repo.claim_pending(limit=DISPATCH_BATCH_SIZE)
+            if not pending:
+                return 0
+            await session.commit()
+
+        for intake in pending:
+            self._queues[self._shard_for(intake.ordering_key)].put_nowait(intake.id)
+        return len(pending)
+
+    def _shard_for(self, ordering_key: str) -> int:
+        # Stable hash so one ordering key always maps to the same worker
+        return zlib.crc32(ordering_key.encode()) % len(self._queues)
+
+    async def _worker_loop(self, queue: asyncio.Queue):
+        while True:
+            intake_id = await queue.get()
+            if intake_id is None:
+                queue.task_done()
+                return
+            try:
+                await self._process(intake_id)
+            except Exception as e:
+                logger.error(f"WebhookIntake: Unexpected error processing intake {intake_id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _process(self, intake_id):
+        """Route one intake and record the outcome."""
+        async with self.session_factory() as session:
+            repo = self.intake_repository_class(session)
+            intake = await repo.get(intake_id)
+            if not intake or intake.status != WebhookIntakeStatus.PROCESSING.value:
+                return
+            # The processing lease runs from here, not from the claim, so time spent
+            # queued behind other intakes of the shard does not count against it
+            intake.started_at = datetime.utcnow()
+            await session.commit()
+
+            try:
+                user = await UserRepository(session).get_by_id(intake.user_id)
+                if not user or not user.is_active:
+                    raise ValueError(f"User {intake.user_id} not found or inactive")
+
+                webhook_payload = WebhookPayload(**intake.payload)
+                signal_router = self.signal_router_class(user=user)
+                result = await signal_router.route(webhook_payload, session)
+
+                intake.status = WebhookIntakeStatus.DONE.value
+                intake.result = str(result)[:2000] if result is not None else None
+                self._processed += 1
+            except Exception as e:
+                logger.error(f"WebhookIntake: Routing failed for intake {intake_id}: {e}")
+                await session.rollback()
+                intake = await repo.get(intake_id)
+                if not intake:
+                    return
+                intake.status = WebhookIntakeStatus.FAILED.value
+                intake.error = str(e)[:2000]
+                self._failed += 1
+                await self._release_dedup(intake)
+
+            intake.finished_at = datetime.utcnow()
+            await session.commit()
+            self._latencies.append((intake.finished_at - intake.received_at).total_seconds())
+
+    async def _release_dedup(self, intake: WebhookIntake):
+        """A failed intake must not block a corrected redelivery."""
+        try:
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            await cache.release_lock(self._dedup_resource(intake.user_id, intake.idempotency_key), str(intake.id))
+        except Exception as e:
+            logger.debug(f"WebhookIntake: Failed to release dedup key: {e}")
+
+    # ==================== Metrics ====================
+
+    def get_metrics(self) -> dict:
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else None
+        return {
+            "local_queue_depth": sum(queue.qsize() for queue in self._queues),
+            "accepted": self._accepted,
+            "duplicates": self._duplicates,
+            "processed": self._processed,
+            "failed": self._failed,
+            "latency_avg_seconds": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "latency_p95_seconds": round(p95, 3) if p95 is not None else None,
+            "latency_max_seconds": round(latencies[-1], 3) if latencies else None,
+        }
+
+    async def _maybe_report_health(self, status: str, error_count: int, last_error: Optional[str]):
+        now = time.monotonic()
+        if now - self._last_health_report < HEALTH_REPORT_INTERVAL_SECONDS:
+            return
+        self._last_health_report = now
+
+        metrics = self.get_metrics()
+        try:
+            async with self.session_factory() as session:
+                metrics["queue_depth"] = await self.intake_repository_class(session).count_pending()
+        except Exception as e:
+            logger.debug(f"WebhookIntake: Failed to count pending intakes: {e}")
+        metrics["error_count"] = error_count
+        metrics["last_error"] = last_error
+        await self._report_health(status, metrics)
+
+    async def _report_health(self, status: str, metrics: dict = None):
+        """Report service health to cache."""
+        try:
+            from app.core.cache import get_cache
+            cache = await get_cache()
+            await cache.update_service_health("webhook_intake", status, metrics)
+        except Exception as e:
+            logger.debug(f"Failed to report health: {e}")
+
+
+# Process-wide intake service; None until configured at startup (webhooks are then routed inline)
+_webhook_intake: Optional[WebhookIntakeService] = None
+
+
+def get_webhook_intake() -> Optional[WebhookIntakeService]:
+    return _webhook_intake
+
+
+def set_webhook_intake(service: Optional[WebhookIntakeService]):
+    global _webhook_intake
+    _webhook_intake = service
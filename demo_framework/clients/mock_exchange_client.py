@@ -65,6 +65,55 @@ class MockExchangeClient(BaseClient):
             results[symbol] = await self.set_price(symbol, price)
         return results
 
+    # -------------------------------------------------------------------------
+    # Market Simulation
+    # -------------------------------------------------------------------------
+
+    async def start_simulation(
+        self,
+        mode: str = "gbm",
+        symbols: Optional[List[str]] = None,
+        speed: float = 1.0,
+        tick_interval_ms: int = 100,
+        volatility: float = 0.8,
+        drift: float = 0.0,
+        seed: Optional[int] = None,
+        file: Optional[str] = None,
+        symbol: Optional[str] = None,
+        duration_seconds: Optional[float] = None,
+    ) -> Dict:
+        """
+        Start moving prices on the exchange.
+
+        Args:
+            mode: "gbm" (random walk from current prices) or "replay" (CSV file)
+            speed: Simulated seconds per second (replay: 0 plays unpaced)
+            seed: Makes a gbm path reproducible
+            file: CSV path on the exchange host (replay)
+            symbol: Symbol of a CSV without a symbol column (replay)
+        """
+        payload = {
+            "mode": mode,
+            "symbols": symbols,
+            "speed": speed,
+            "tickIntervalMs": tick_interval_ms,
+            "volatility": volatility,
+            "drift": drift,
+            "seed": seed,
+            "file": file,
+            "symbol": symbol,
+            "durationSeconds": duration_seconds,
+        }
+        return await self.post("/admin/simulator/start", json=payload)
+
+    async def stop_simulation(self) -> Dict:
+        """Stop the running simulation."""
+        return await self.post("/admin/simulator/stop")
+
+    async def get_simulation(self) -> Dict:
+        """Get the status of the current or last simulation."""
+        return await self.get("/admin/simulator")
+
     # -------------------------------------------------------------------------
     # Order Operations
     # -------------------------------------------------------------------------
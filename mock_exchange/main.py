@@ -5,11 +5,12 @@ A full-featured mock exchange for testing the trading engine.
 import os
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from decimal import Decimal, ROUND_DOWN
 
-from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header
+from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
@@ -19,7 +20,20 @@ import httpx
 
 from database import init_db, get_db, get_db_session
 from models import Symbol, Order, Balance, Position, Trade, APIKey, PriceHistory, WebhookLog
-from order_matching import OrderMatchingEngine
+from order_book import market_state
+from order_matching import (
+    STOP_ORDER_TYPES,
+    OPEN_ORDER_STATUSES,
+    OrderMatchingEngine,
+    apply_prices,
+    load_market_state,
+    match_resting_orders,
+    price_writer,
+    stop_would_trigger,
+)
+from order_events import order_event_hub
+from price_events import price_event_hub
+from market_simulator import gbm_steps, load_replay, market_simulator, replay_steps
 from auth import get_api_key_from_request
 
 # Setup logging
@@ -33,6 +47,24 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Requests per endpoint, for calls-per-fill benchmarks (scripts/benchmark_pipeline.py)
+request_counts: Dict[str, int] = defaultdict(int)
+
+
+class RequestCounter:
+    """ASGI middleware counting HTTP requests by method and path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            request_counts[f"{scope['method']} {scope['path']}"] += 1
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(RequestCounter)
+
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -83,6 +115,23 @@ class PriceUpdateRequest(BaseModel):
     price: float
 
 
+class PriceBatchRequest(BaseModel):
+    prices: Dict[str, float]
+
+
+class SimulationRequest(BaseModel):
+    mode: str = "gbm"  # gbm/replay
+    symbols: Optional[List[str]] = None  # gbm: defaults to all symbols
+    tickIntervalMs: int = 100  # gbm: wall time between steps
+    speed: float = 1.0  # simulated seconds per wall second (replay: 0 = unpaced)
+    drift: float = 0.0  # gbm: annualised
+    volatility: float = 0.8  # gbm: annualised
+    seed: Optional[int] = None
+    file: Optional[str] = None  # replay: CSV path on the exchange host
+    symbol: Optional[str] = None  # replay: symbol of a CSV without a symbol column
+    durationSeconds: Optional[float] = None
+
+
 class WebhookPayload(BaseModel):
     user_id: str
     secret: str
@@ -105,12 +154,27 @@ class APIKeyCreate(BaseModel):
 
 @app.on_event("startup")
 async def startup():
-    """Initialize database on startup."""
+    """Initialize database and order books on startup."""
     logger.info("Initializing Mock Exchange database...")
     init_db()
+    load_market_state()
+    await price_writer.start()
     logger.info("Mock Exchange ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the market simulator and persist the prices that moved since the last flush."""
+    await market_simulator.stop()
+    await price_writer.stop()
+
+
+def live_price(sym: Symbol) -> float:
+    """Last price of a symbol from the order books; the persisted one until they are loaded."""
+    price = market_state.price(sym.symbol)
+    return sym.current_price if price is None else price
+
+
 # ============================================================================
 # Public Endpoints (No Auth Required) - Binance /fapi/v1 style
 # ============================================================================
@@ -189,7 +253,7 @@ async def get_ticker_price(
             raise HTTPException(status_code=400, detail=f"Symbol {symbol} not found")
         return {
             "symbol": sym.symbol,
-            "price": str(sym.current_price),
+            "price": str(live_price(sym)),
             "time": int(datetime.utcnow().timestamp() * 1000)
         }
     else:
@@ -197,7 +261,7 @@ async def get_ticker_price(
         return [
             {
                 "symbol": s.symbol,
-                "price": str(s.current_price),
+                "price": str(live_price(s)),
                 "time": int(datetime.utcnow().timestamp() * 1000)
             }
             for s in symbols
@@ -216,8 +280,8 @@ async def get_premium_index(
             raise HTTPException(status_code=400, detail=f"Symbol {symbol} not found")
         return {
             "symbol": sym.symbol,
-            "markPrice": str(sym.mark_price),
-            "indexPrice": str(sym.index_price),
+            "markPrice": str(live_price(sym)),
+            "indexPrice": str(live_price(sym)),
             "lastFundingRate": "0.00010000",
             "nextFundingTime": int(datetime.utcnow().timestamp() * 1000) + 28800000,
             "time": int(datetime.utcnow().timestamp() * 1000)
@@ -227,8 +291,8 @@ async def get_premium_index(
         return [
             {
                 "symbol": s.symbol,
-                "markPrice": str(s.mark_price),
-                "indexPrice": str(s.index_price),
+                "markPrice": str(live_price(s)),
+                "indexPrice": str(live_price(s)),
                 "lastFundingRate": "0.00010000",
                 "nextFundingTime": int(datetime.utcnow().timestamp() * 1000) + 28800000,
                 "time": int(datetime.utcnow().timestamp() * 1000)
@@ -249,7 +313,7 @@ async def get_order_book(
         raise HTTPException(status_code=400, detail=f"Symbol {symbol} not found")
 
     # Generate fake order book around current price
-    price = sym.current_price
+    price = live_price(sym)
     tick = sym.tick_size
 
     bids = [[str(price - tick * (i + 1)), str(1.0 * (i + 1))] for i in range(min(limit, 20))]
@@ -318,6 +382,10 @@ async def get_account(
     """Get account information including positions."""
     api_key = await get_api_key_from_request(request, db)
 
+    # Price ticks no longer write PnL; bring it up to date first
+    engine = OrderMatchingEngine(db)
+    engine.update_unrealized_pnl()
+
     balances = db.query(Balance).filter(Balance.api_key_id == api_key.id).all()
     positions = db.query(Position).filter(Position.api_key_id == api_key.id).all()
 
@@ -411,7 +479,7 @@ async def create_order(
 
     if is_quote_order:
         # Quote-based order: calculate base quantity from quote amount / current price
-        current_price = symbol.current_price
+        current_price = live_price(symbol)
         if current_price <= 0:
             raise HTTPException(status_code=400, detail={
                 "code": -1000,
@@ -442,6 +510,19 @@ async def create_order(
             "msg": f"Quantity {quantity} less than minimum {symbol.min_qty}"
         })
 
+    # Conditional orders need a stop price that is not already reached (Binance -2021)
+    if order_req.type.upper() in STOP_ORDER_TYPES:
+        if not order_req.stopPrice or order_req.stopPrice <= 0:
+            raise HTTPException(status_code=400, detail={
+                "code": -1102,
+                "msg": f"stopPrice is required for {order_req.type.upper()} orders"
+            })
+        if stop_would_trigger(order_req.type, order_req.side, order_req.stopPrice, live_price(symbol)):
+            raise HTTPException(status_code=400, detail={
+                "code": -2021,
+                "msg": "Order would immediately trigger."
+            })
+
     # Create order with generated order_id
     order = Order(
         api_key_id=api_key.id,
@@ -470,6 +551,12 @@ async def create_order(
 
     db.commit()
 
+    if order.status == "NEW":
+        order_event_hub.publish(order)
+        # Rest it on the book; a limit already crossed by the price fills right away
+        if market_state.add_order(order):
+            await match_resting_orders(order.symbol)
+
     return {
         "orderId": order.order_id,
         "symbol": order.symbol,
@@ -639,15 +726,21 @@ async def cancel_order(
             "msg": "Order does not exist"
         })
 
-    if order.status not in ["NEW", "PARTIALLY_FILLED"]:
+    # Conditional, so an order the matching engine fills meanwhile is not also cancelled
+    cancelled = (
+        db.query(Order)
+        .filter(Order.id == order.id, Order.status.in_(OPEN_ORDER_STATUSES))
+        .update({Order.status: "CANCELED", Order.updated_at: datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+    db.refresh(order)
+    if not cancelled:
         raise HTTPException(status_code=400, detail={
             "code": -2011,
             "msg": f"Order status is {order.status}, cannot cancel"
         })
-
-    order.status = "CANCELED"
-    order.updated_at = datetime.utcnow()
-    db.commit()
+    market_state.remove_order(order.id)
+    order_event_hub.publish(order)
 
     return {
         "orderId": order.order_id,
@@ -701,7 +794,7 @@ async def get_position_risk(
             "symbol": p.symbol,
             "positionAmt": str(p.quantity),
             "entryPrice": str(p.entry_price),
-            "markPrice": str(db.query(Symbol).filter(Symbol.symbol == p.symbol).first().current_price if db.query(Symbol).filter(Symbol.symbol == p.symbol).first() else 0),
+            "markPrice": str(market_state.price(p.symbol) or 0),
             "unRealizedProfit": str(p.unrealized_pnl),
             "liquidationPrice": str(p.liquidation_price),
             "leverage": str(p.leverage),
@@ -718,6 +811,64 @@ async def get_position_risk(
     ]
 
 
+# ============================================================================
+# User Data Stream (WebSocket)
+# ============================================================================
+
+@app.websocket("/ws/orders")
+async def order_stream(websocket: WebSocket):
+    """
+    Push order updates for an API key as Binance-style ORDER_TRADE_UPDATE events.
+    The API key is taken from the X-MBX-APIKEY header or the apiKey query parameter.
+    """
+    api_key = websocket.headers.get("X-MBX-APIKEY") or websocket.query_params.get("apiKey")
+
+    with get_db_session() as db:
+        key_obj = None
+        if api_key:
+            key_obj = db.query(APIKey).filter(
+                APIKey.api_key == api_key,
+                APIKey.is_active == True
+            ).first()
+        api_key_id = key_obj.id if key_obj else None
+
+    if not api_key_id:
+        await websocket.close(code=4001)
+        return
+
+    await websocket.accept()
+    queue = order_event_hub.subscribe(api_key_id)
+    try:
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        order_event_hub.unsubscribe(api_key_id, queue)
+
+
+@app.websocket("/ws/prices")
+async def price_stream(websocket: WebSocket):
+    """
+    Push price changes as Binance-style markPriceUpdate events.
+    The optional symbols query parameter (comma-separated) filters the symbols.
+    """
+    symbols = websocket.query_params.get("symbols")
+    symbol_set = {s.strip() for s in symbols.split(",") if s.strip()} if symbols else None
+
+    await websocket.accept()
+    queue = price_event_hub.subscribe(symbol_set)
+    try:
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        price_event_hub.unsubscribe(queue)
+
+
 # ============================================================================
 # Admin Endpoints (For UI Control)
 # ============================================================================
@@ -731,8 +882,8 @@ async def admin_get_symbols(db: Session = Depends(get_db)):
             "symbol": s.symbol,
             "baseAsset": s.base_asset,
             "quoteAsset": s.quote_asset,
-            "currentPrice": s.current_price,
-            "markPrice": s.mark_price,
+            "currentPrice": live_price(s),
+            "markPrice": live_price(s),
             "tickSize": s.tick_size,
             "stepSize": s.step_size,
             "minQty": s.min_qty,
@@ -746,41 +897,106 @@ async def admin_get_symbols(db: Session = Depends(get_db)):
 @app.put("/admin/symbols/{symbol}/price")
 async def admin_set_price(
     symbol: str,
-    price_req: PriceUpdateRequest,
-    db: Session = Depends(get_db)
+    price_req: PriceUpdateRequest
 ):
     """Set price for a symbol and trigger order matching."""
-    sym = db.query(Symbol).filter(Symbol.symbol == symbol).first()
-    if not sym:
+    old_price = market_state.price(symbol)
+    if old_price is None:
         raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
 
-    old_price = sym.current_price
-    sym.current_price = price_req.price
-    sym.mark_price = price_req.price
-    sym.index_price = price_req.price
-    sym.last_updated = datetime.utcnow()
+    # Matched in memory; the price and history are persisted by the price writer
+    filled_orders = await apply_prices({symbol: price_req.price})
 
-    # Record price history
-    history = PriceHistory(symbol=symbol, price=price_req.price)
-    db.add(history)
+    return {
+        "symbol": symbol,
+        "oldPrice": old_price,
+        "newPrice": price_req.price,
+        "filledOrders": filled_orders
+    }
 
-    db.commit()
 
-    # Check if any orders should fill at this new price
-    engine = OrderMatchingEngine(db)
-    filled_orders = engine.check_all_pending_orders()
+@app.put("/admin/prices")
+async def admin_set_prices(batch: PriceBatchRequest):
+    """Set the prices of several symbols at once (one tick each) and trigger order matching."""
+    unknown = [symbol for symbol in batch.prices if market_state.price(symbol) is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Symbols not found: {', '.join(unknown)}")
 
-    # Update unrealized PnL
-    engine.update_unrealized_pnl()
+    filled_orders = await apply_prices(batch.prices)
 
     return {
-        "symbol": symbol,
-        "oldPrice": old_price,
-        "newPrice": price_req.price,
+        "updated": len(batch.prices),
         "filledOrders": filled_orders
     }
 
 
+@app.post("/admin/simulator/start")
+async def admin_start_simulation(
+    sim_req: SimulationRequest,
+    db: Session = Depends(get_db)
+):
+    """Start moving prices along a GBM path or a recorded CSV, replacing a running simulation."""
+    mode = sim_req.mode.lower()
+    if mode == "gbm":
+        if sim_req.tickIntervalMs <= 0 or sim_req.speed <= 0:
+            raise HTTPException(status_code=400, detail="tickIntervalMs and speed must be positive for gbm")
+        symbols = sim_req.symbols or list(market_state.prices)
+        tick_sizes = {
+            s.symbol: s.tick_size for s in db.query(Symbol).filter(Symbol.symbol.in_(symbols)).all()
+        }
+        steps = gbm_steps(
+            {symbol: market_state.price(symbol) or 0.0 for symbol in symbols},
+            sim_req.tickIntervalMs / 1000,
+            speed=sim_req.speed,
+            drift=sim_req.drift,
+            volatility=sim_req.volatility,
+            seed=sim_req.seed,
+            tick_sizes=tick_sizes,
+        )
+    elif mode == "replay":
+        if not sim_req.file:
+            raise HTTPException(status_code=400, detail="file is required for replay")
+        try:
+            rows = load_replay(sim_req.file, sim_req.symbol)
+        except (OSError, ValueError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Cannot read {sim_req.file}: {e}")
+        symbols = sorted({symbol for _, symbol, _ in rows})
+        steps = replay_steps(rows)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown simulation mode {sim_req.mode}")
+
+    try:
+        await market_simulator.start(steps, sim_req.speed, symbols, mode, sim_req.durationSeconds)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return market_simulator.get_status()
+
+
+@app.post("/admin/simulator/stop")
+async def admin_stop_simulation():
+    """Stop the running simulation; prices stay where it left them."""
+    await market_simulator.stop()
+    return market_simulator.get_status()
+
+
+@app.get("/admin/simulator")
+async def admin_get_simulation():
+    """Status of the current or last simulation."""
+    return market_simulator.get_status()
+
+
+@app.get("/admin/stats")
+async def admin_get_stats():
+    """Request counts per endpoint and matching activity since startup."""
+    return {
+        "requests": dict(request_counts),
+        "priceTicks": market_state.ticks,
+        "restingOrders": market_state.resting_count(),
+        "simulator": market_simulator.get_status()
+    }
+
+
 @app.get("/admin/orders")
 async def admin_get_all_orders(
     status: Optional[str] = None,
@@ -840,12 +1056,13 @@ async def admin_fill_order(
             fill_price = order.price
         else:
             sym = db.query(Symbol).filter(Symbol.symbol == order.symbol).first()
-            fill_price = sym.current_price if sym else 0
+            fill_price = live_price(sym) if sym else 0
 
+    market_state.remove_order(order.id)
     engine = OrderMatchingEngine(db)
     success, message = engine._fill_order(order, fill_price, order.quantity - order.executed_qty)
-
     if not success:
+        market_state.add_order(order)
         raise HTTPException(status_code=400, detail=message)
 
     return {
@@ -1004,6 +1221,7 @@ async def admin_reset(db: Session = Depends(get_db)):
         b.total = 100000.0
 
     db.commit()
+    market_state.clear_orders()
 
     return {"message": "Exchange reset complete", "timestamp": datetime.utcnow().isoformat()}
 
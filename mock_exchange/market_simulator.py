@@ -0,0 +1,243 @@
+"""
+Market simulator for the mock exchange.
+
+Moves the prices of many symbols at once, as if the market was live, so the
+engine's fill monitoring, risk timers and take-profit logic can be soak-tested
+against reproducible price movement:
+
+- gbm: geometric Brownian motion from the current prices. Drift and volatility
+  are annualised; `speed` compresses simulated time (speed=3600 plays an hour
+  per second), and a seed makes the path reproducible.
+- replay: recorded trades or OHLCV candles from a CSV file, played back at
+  `speed` times their recorded pace (speed=0 plays them as fast as possible).
+
+A path is a sequence of steps (simulated seconds since its start, prices).
+Each step goes through order_matching.apply_prices, i.e. the same matching,
+persistence and subscriber push as a price set through the admin API.
+"""
+import asyncio
+import csv
+import logging
+import math
+import random
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from order_book import market_state
+from order_matching import apply_prices
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+# Steps played back to back between yields to the event loop
+YIELD_EVERY_STEPS = 100
+
+# (simulated seconds since the start of the path, prices of the symbols that moved)
+PriceStep = Tuple[float, Dict[str, float]]
+
+_TIME_COLUMNS = ["timestamp", "time", "open_time", "ts", "date"]
+
+
+def round_to_tick(price: float, tick_size: Optional[float]) -> float:
+    if not tick_size:
+        return price
+    return round(round(price / tick_size) * tick_size, 12)
+
+
+def gbm_steps(
+    start_prices: Dict[str, float],
+    tick_interval_seconds: float,
+    speed: float = 1.0,
+    drift: float = 0.0,
+    volatility: float = 0.8,
+    seed: Optional[int] = None,
+    tick_sizes: Optional[Dict[str, float]] = None,
+) -> Iterator[PriceStep]:
+    """Endless geometric Brownian motion of every symbol, one step per tick interval."""
+    rng = random.Random(seed)
+    tick_sizes = tick_sizes or {}
+    dt_seconds = tick_interval_seconds * speed
+    dt = dt_seconds / SECONDS_PER_YEAR
+    mean = (drift - volatility ** 2 / 2) * dt
+    scale = volatility * math.sqrt(dt)
+    # Unrounded paths, so prices below a tick do not get stuck on it
+    prices = dict(start_prices)
+    step = 0
+    while True:
+        step += 1
+        for symbol, price in prices.items():
+            prices[symbol] = price * math.exp(mean + scale * rng.gauss(0.0, 1.0))
+        yield step * dt_seconds, {
+            symbol: round_to_tick(price, tick_sizes.get(symbol)) for symbol, price in prices.items()
+        }
+
+
+def _parse_time(value: str) -> float:
+    """Unix seconds of a CSV time: epoch seconds or milliseconds, or ISO 8601."""
+    try:
+        number = float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    return number / 1000 if number > 1e11 else number
+
+
+def load_replay(path: str, symbol: Optional[str] = None) -> List[Tuple[float, str, float]]:
+    """
+    Read a trade or candle CSV into (time, symbol, price) rows, sorted by time.
+
+    Columns (case-insensitive): a time column (timestamp/time/open_time/ts/date),
+    an optional `symbol` column (else every row is for `symbol`), and either
+    `price` (trades) or `open,high,low,close` (candles). A candle is played as
+    open, then the extreme on the far side of the close, the other extreme and
+    the close, spread over the candle's duration.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames:
+            raise ValueError(f"{path} is empty")
+        columns = {name.strip().lower(): name for name in reader.fieldnames}
+        time_column = next((columns[name] for name in _TIME_COLUMNS if name in columns), None)
+        if time_column is None:
+            raise ValueError(f"{path} has no time column (one of {', '.join(_TIME_COLUMNS)})")
+        if "symbol" not in columns and not symbol:
+            raise ValueError(f"{path} has no symbol column; pass the symbol to replay it for")
+        candles = all(name in columns for name in ("open", "high", "low", "close"))
+        if not candles and "price" not in columns:
+            raise ValueError(f"{path} needs a price column or open/high/low/close columns")
+
+        records = []
+        for row in reader:
+            row_symbol = row[columns["symbol"]].strip() if "symbol" in columns else symbol
+            timestamp = _parse_time(row[time_column].strip())
+            if candles:
+                records.append((timestamp, row_symbol, tuple(
+                    float(row[columns[name]]) for name in ("open", "high", "low", "close")
+                )))
+            else:
+                records.append((timestamp, row_symbol, float(row[columns["price"]])))
+
+    records.sort(key=lambda record: record[0])
+    if not candles:
+        return records
+
+    # Spread each candle over the time to the symbol's next candle; the last one over the previous interval
+    by_symbol: Dict[str, list] = {}
+    for record in records:
+        by_symbol.setdefault(record[1], []).append(record)
+    rows = []
+    for candles_of_symbol in by_symbol.values():
+        for index, (timestamp, row_symbol, (open_, high, low, close)) in enumerate(candles_of_symbol):
+            if index + 1 < len(candles_of_symbol):
+                duration = candles_of_symbol[index + 1][0] - timestamp
+            elif index > 0:
+                duration = timestamp - candles_of_symbol[index - 1][0]
+            else:
+                duration = 60.0
+            path = [open_, low, high, close] if close >= open_ else [open_, high, low, close]
+            rows.extend((timestamp + duration * i / 4, row_symbol, price) for i, price in enumerate(path))
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def replay_steps(rows: Iterable[Tuple[float, str, float]]) -> Iterator[PriceStep]:
+    """Group replay rows into steps of the prices recorded at the same time."""
+    start = None
+    step_time = None
+    prices: Dict[str, float] = {}
+    for timestamp, symbol, price in rows:
+        if start is None:
+            start = timestamp
+        if step_time is not None and timestamp != step_time:
+            yield step_time - start, prices
+            prices = {}
+        step_time = timestamp
+        prices[symbol] = price
+    if prices:
+        yield step_time - start, prices
+
+
+class MarketSimulator:
+    """Plays one price path at a time against the exchange."""
+
+    def __init__(self):
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._status: dict = {"running": False}
+
+    async def start(
+        self,
+        steps: Iterable[PriceStep],
+        speed: float,
+        symbols: List[str],
+        mode: str,
+        duration_seconds: Optional[float] = None,
+    ):
+        """Start playing a path, replacing the one being played."""
+        unknown = [symbol for symbol in symbols if market_state.price(symbol) is None]
+        if unknown:
+            raise ValueError(f"Symbols not found: {', '.join(unknown)}")
+        await self.stop()
+        self._running = True
+        self._status = {
+            "running": True,
+            "mode": mode,
+            "symbols": symbols,
+            "speed": speed,
+            "startedAt": datetime.utcnow().isoformat(),
+            "steps": 0,
+            "filledOrders": 0,
+            "lagSeconds": 0.0,
+        }
+        self._task = asyncio.create_task(self._run(steps, speed, duration_seconds))
+        logger.info(f"MarketSimulator: Started {mode} on {len(symbols)} symbols at speed {speed}")
+
+    async def stop(self):
+        if self._running and self._task:
+            self._running = False
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("MarketSimulator: Stopped.")
+        self._status["running"] = False
+
+    def get_status(self) -> dict:
+        return dict(self._status)
+
+    async def _run(self, steps: Iterable[PriceStep], speed: float, duration_seconds: Optional[float]):
+        started = time.monotonic()
+        try:
+            for simulated_seconds, prices in steps:
+                if not self._running:
+                    break
+                if speed > 0:
+                    # Behind schedule (slow fills), steps are played back to back until caught up
+                    delay = started + simulated_seconds / speed - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    elif self._status["steps"] % YIELD_EVERY_STEPS == 0:
+                        # Catching up still lets the API serve requests
+                        await asyncio.sleep(0)
+                    self._status["lagSeconds"] = round(max(0.0, -delay), 3)
+                elif self._status["steps"] % YIELD_EVERY_STEPS == 0:
+                    # Unpaced replay still lets the API serve requests
+                    await asyncio.sleep(0)
+                if duration_seconds is not None and time.monotonic() - started >= duration_seconds:
+                    break
+                filled = await apply_prices(prices)
+                self._status["steps"] += 1
+                self._status["filledOrders"] += len(filled)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"MarketSimulator: Error playing price path: {e}")
+            self._status["error"] = str(e)
+        finally:
+            self._running = False
+            self._status["running"] = False
+            self._status["finishedAt"] = datetime.utcnow().isoformat()
+
+
+market_simulator = MarketSimulator()
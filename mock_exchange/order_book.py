@@ -0,0 +1,208 @@
+"""
+In-memory order books for the mock exchange.
+
+A price tick used to load every open order of every symbol from SQLite and
+re-check each one. The books keep the resting orders of each symbol in sorted
+price ladders instead, so a tick only touches the orders its price crossed:
+
+- bids: limit BUYs, filled once the price falls to their limit
+- asks: limit SELLs, filled once the price rises to their limit
+- stops_below / stops_above: conditional orders, triggered once the price
+  falls / rises to their stop price (see order_matching.stop_would_trigger)
+
+The books and the last price of each symbol are the live state of the
+exchange. SQLite remains the record of orders, fills and balances; it is
+written off the event loop by the matching engine, and prices are persisted
+in batches (see order_matching.PriceWriter).
+"""
+import itertools
+import math
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Conditional types whose stop fires when the price moves in the order's favour
+_TAKE_PROFIT_PREFIX = "TAKE_PROFIT"
+
+
+@dataclass(frozen=True)
+class RestingOrder:
+    """The fields of an order the books match on."""
+    id: str
+    symbol: str
+    side: str
+    type: str
+    price: float
+    stop_price: float
+
+    @classmethod
+    def of(cls, order) -> "RestingOrder":
+        return cls(
+            id=order.id,
+            symbol=order.symbol,
+            side=order.side.upper(),
+            type=order.type.upper(),
+            price=order.price or 0.0,
+            stop_price=order.stop_price or 0.0,
+        )
+
+
+class PriceLadder:
+    """
+    Orders sorted by the price level at which they fire.
+    A falling ladder fires levels at or above the price (the price fell to
+    them), a rising ladder levels at or below it.
+    """
+
+    def __init__(self, falling: bool):
+        self.falling = falling
+        self._levels: List[Tuple[float, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def add(self, entry: Tuple[float, int, str]):
+        insort(self._levels, entry)
+
+    def remove(self, entry: Tuple[float, int, str]) -> bool:
+        index = bisect_left(self._levels, entry)
+        if index < len(self._levels) and self._levels[index] == entry:
+            del self._levels[index]
+            return True
+        return False
+
+    def pop_crossed(self, price: float) -> List[str]:
+        """Removes and returns the order IDs that fire at this price, O(log n + crossed)."""
+        if self.falling:
+            start = bisect_left(self._levels, (price,))
+            crossed = self._levels[start:]
+            del self._levels[start:]
+        else:
+            end = bisect_right(self._levels, (price, math.inf))
+            crossed = self._levels[:end]
+            del self._levels[:end]
+        return [order_id for _, _, order_id in crossed]
+
+    def levels(self) -> List[float]:
+        return [level for level, _, _ in self._levels]
+
+
+class OrderBook:
+    """Resting orders of one symbol."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = PriceLadder(falling=True)
+        self.asks = PriceLadder(falling=False)
+        self.stops_below = PriceLadder(falling=True)
+        self.stops_above = PriceLadder(falling=False)
+
+    def __len__(self) -> int:
+        return len(self.bids) + len(self.asks) + len(self.stops_below) + len(self.stops_above)
+
+    def ladder_for(self, order: RestingOrder) -> Optional[Tuple[PriceLadder, float]]:
+        """Ladder and level of an order, None for orders that never rest (MARKET)."""
+        buy = order.side == "BUY"
+        if order.type == "LIMIT":
+            return (self.bids if buy else self.asks), order.price
+        if order.stop_price > 0:
+            # Stops fire against the order, take-profits in its favour
+            falls = not buy
+            if order.type.startswith(_TAKE_PROFIT_PREFIX):
+                falls = not falls
+            return (self.stops_below if falls else self.stops_above), order.stop_price
+        return None
+
+    def pop_crossed(self, price: float) -> List[str]:
+        return (
+            self.bids.pop_crossed(price)
+            + self.asks.pop_crossed(price)
+            + self.stops_below.pop_crossed(price)
+            + self.stops_above.pop_crossed(price)
+        )
+
+
+class MarketState:
+    """Last prices and order books of every symbol."""
+
+    def __init__(self):
+        self.prices: Dict[str, float] = {}
+        self._books: Dict[str, OrderBook] = {}
+        # order ID -> (order, ladder, ladder entry)
+        self._resting: Dict[str, Tuple[RestingOrder, PriceLadder, Tuple[float, int, str]]] = {}
+        self._dirty_prices: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self.ticks = 0
+
+    def load(self, prices: Dict[str, float], open_orders: Iterable):
+        """Replaces the state with the persisted prices and open orders (startup)."""
+        self.prices = dict(prices)
+        self._books.clear()
+        self._resting.clear()
+        self._dirty_prices.clear()
+        for order in open_orders:
+            self.add_order(order)
+
+    def price(self, symbol: str) -> Optional[float]:
+        return self.prices.get(symbol)
+
+    def book(self, symbol: str) -> OrderBook:
+        if symbol not in self._books:
+            self._books[symbol] = OrderBook(symbol)
+        return self._books[symbol]
+
+    def add_order(self, order) -> bool:
+        """Rests an order (ORM row or RestingOrder); returns False for orders that never rest."""
+        resting = order if isinstance(order, RestingOrder) else RestingOrder.of(order)
+        self.remove_order(resting.id)
+        placement = self.book(resting.symbol).ladder_for(resting)
+        if placement is None:
+            return False
+        ladder, level = placement
+        entry = (level, next(self._sequence), resting.id)
+        ladder.add(entry)
+        self._resting[resting.id] = (resting, ladder, entry)
+        return True
+
+    def remove_order(self, order_id: str) -> Optional[RestingOrder]:
+        """Takes an order off its book (cancelled or filled elsewhere)."""
+        item = self._resting.pop(order_id, None)
+        if item is None:
+            return None
+        resting, ladder, entry = item
+        ladder.remove(entry)
+        return resting
+
+    def clear_orders(self):
+        self._books.clear()
+        self._resting.clear()
+
+    def set_price(self, symbol: str, price: float) -> List[RestingOrder]:
+        """Moves a symbol's price; returns the orders it crossed, taken off the book."""
+        self.prices[symbol] = price
+        self._dirty_prices[symbol] = price
+        self.ticks += 1
+        return self.match(symbol)
+
+    def match(self, symbol: str) -> List[RestingOrder]:
+        """Takes the orders crossed at the symbol's current price off its book."""
+        price = self.prices.get(symbol)
+        book = self._books.get(symbol)
+        if price is None or not book:
+            return []
+        crossed = []
+        for order_id in book.pop_crossed(price):
+            resting, _, _ = self._resting.pop(order_id)
+            crossed.append(resting)
+        return crossed
+
+    def take_dirty_prices(self) -> Dict[str, float]:
+        """Prices moved since the last call, for batched persistence."""
+        dirty, self._dirty_prices = self._dirty_prices, {}
+        return dirty
+
+    def resting_count(self) -> int:
+        return len(self._resting)
+
+
+market_state = MarketState()
@@ -0,0 +1,91 @@
+"""
+Order event fan-out for the mock exchange.
+Pushes order updates to WebSocket subscribers, mimicking Binance's
+user data stream (ORDER_TRADE_UPDATE events).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Set
+
+from models import Order
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber buffer; slow consumers drop events and rely on REST reconciliation
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def build_order_event(order: Order) -> dict:
+    """Build a Binance-style ORDER_TRADE_UPDATE event for an order."""
+    now_ms = int(datetime.utcnow().timestamp() * 1000)
+    return {
+        "e": "ORDER_TRADE_UPDATE",
+        "E": now_ms,
+        "o": {
+            "s": order.symbol,
+            "c": order.client_order_id,
+            "S": order.side,
+            "o": order.type,
+            "q": str(order.quantity),
+            "p": str(order.price or 0),
+            "ap": str(order.avg_price or 0),
+            "sp": str(order.stop_price or 0),
+            "X": order.status,
+            "i": order.order_id,
+            "z": str(order.executed_qty or 0),
+            "n": str(order.cumulative_fee or 0),
+            "N": order.fee_currency or "USDT",
+            "T": now_ms,
+        },
+    }
+
+
+class OrderEventHub:
+    """
+    In-process pub/sub of order updates keyed by API key.
+    Publishing is synchronous so it can be called from the matching engine;
+    it must happen on the event loop thread (asyncio queues are not thread-safe).
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, api_key_id: str) -> asyncio.Queue:
+        """Register a new subscriber queue for an API key."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[api_key_id].add(queue)
+        return queue
+
+    def unsubscribe(self, api_key_id: str, queue: asyncio.Queue):
+        """Remove a subscriber queue."""
+        queues = self._subscribers.get(api_key_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(api_key_id, None)
+
+    def publish(self, order: Order):
+        """Publish an order update to every subscriber of the order's API key."""
+        if self._subscribers.get(order.api_key_id):
+            self.publish_event(order.api_key_id, build_order_event(order))
+
+    def publish_event(self, api_key_id: str, event: dict):
+        """Publish an already built event (e.g. built on the matching engine's database thread)."""
+        queues = self._subscribers.get(api_key_id)
+        if not queues:
+            return
+
+        for queue in list(queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Order event queue full for API key {api_key_id} - dropping event")
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+order_event_hub = OrderEventHub()
@@ -1,16 +1,63 @@
 """
 Order matching engine for the mock exchange.
 Handles limit order fills when prices change.
+
+Price ticks are matched against the in-memory books (order_book.market_state);
+only the orders a tick crossed are loaded and filled, in one transaction on a
+dedicated database thread so the event loop keeps serving requests. Prices
+themselves reach SQLite in batches through the PriceWriter.
 """
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
-from models import Order, Symbol, Balance, Position, Trade
+from database import get_db_session
+from models import Order, Symbol, Balance, Position, Trade, PriceHistory
+from order_book import RestingOrder, market_state
+from order_events import build_order_event, order_event_hub
+from price_events import price_event_hub
 
 logger = logging.getLogger(__name__)
 
+OPEN_ORDER_STATUSES = ["NEW", "PARTIALLY_FILLED"]
+
+# How often moved prices are written to the symbols table and price history
+PRICE_FLUSH_INTERVAL_SECONDS = float(os.getenv("MOCK_EXCHANGE_PRICE_FLUSH_SECONDS", "0.5"))
+
+# Database writes of the tick path run on one thread: off the event loop, in order,
+# and without SQLite writers contending with each other
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mock-exchange-db")
+
+# Spot (STOP_LOSS*, TAKE_PROFIT*) and futures (STOP*, TAKE_PROFIT_MARKET) conditional types
+STOP_ORDER_TYPES = [
+    "STOP_LOSS",
+    "STOP_LOSS_LIMIT",
+    "TAKE_PROFIT",
+    "TAKE_PROFIT_LIMIT",
+    "STOP",
+    "STOP_MARKET",
+    "TAKE_PROFIT_MARKET",
+]
+
+
+def stop_would_trigger(order_type: str, side: str, stop_price: float, current_price: float) -> bool:
+    """
+    Whether a conditional order triggers at the current price.
+    Stop orders trigger against the order: a BUY when the price rises to the
+    stop, a SELL when it falls to it. Take-profit orders trigger in its favour:
+    a BUY when the price falls to the stop, a SELL when it rises to it.
+    """
+    rising = side.upper() == "BUY"
+    if order_type.upper().startswith("TAKE_PROFIT"):
+        rising = not rising
+    if rising:
+        return current_price >= stop_price
+    return current_price <= stop_price
+
 
 class OrderMatchingEngine:
     """
@@ -23,16 +70,38 @@ class OrderMatchingEngine:
     def __init__(self, db: Session):
         self.db = db
 
+    def _current_price(self, symbol: str) -> Optional[float]:
+        """Live price of a symbol; the persisted one if the market has not loaded it."""
+        price = market_state.price(symbol)
+        if price is not None:
+            return price
+        row = self.db.query(Symbol).filter(Symbol.symbol == symbol).first()
+        return row.current_price if row else None
+
+    def _current_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Live prices of several symbols, with one query for those not in memory."""
+        prices = {}
+        missing = []
+        for symbol in set(symbols):
+            price = market_state.price(symbol)
+            if price is None:
+                missing.append(symbol)
+            else:
+                prices[symbol] = price
+        if missing:
+            for row in self.db.query(Symbol).filter(Symbol.symbol.in_(missing)).all():
+                prices[row.symbol] = row.current_price
+        return prices
+
     def process_market_order(self, order: Order) -> Tuple[bool, str]:
         """
         Process a market order - fills immediately at current price.
         Returns (success, message)
         """
-        symbol = self.db.query(Symbol).filter(Symbol.symbol == order.symbol).first()
-        if not symbol:
+        current_price = self._current_price(order.symbol)
+        if current_price is None:
             return False, f"Symbol {order.symbol} not found"
 
-        current_price = symbol.current_price
         if current_price <= 0:
             return False, f"Invalid price for {order.symbol}"
 
@@ -44,11 +113,10 @@ class OrderMatchingEngine:
         Check if a limit order should be filled based on current price.
         Returns (success, message)
         """
-        symbol = self.db.query(Symbol).filter(Symbol.symbol == order.symbol).first()
-        if not symbol:
+        current_price = self._current_price(order.symbol)
+        if current_price is None:
             return False, f"Symbol {order.symbol} not found"
 
-        current_price = symbol.current_price
         order_price = order.price
 
         # Check if limit order should fill
@@ -69,31 +137,19 @@ class OrderMatchingEngine:
         """
         Check if a stop order should be triggered.
         """
-        symbol = self.db.query(Symbol).filter(Symbol.symbol == order.symbol).first()
-        if not symbol:
+        current_price = self._current_price(order.symbol)
+        if current_price is None:
             return False, f"Symbol {order.symbol} not found"
 
-        current_price = symbol.current_price
-        stop_price = order.stop_price
-
-        # Check if stop should trigger
-        should_trigger = False
-        if order.side.upper() == "BUY":
-            # Buy stop triggers when price >= stop price
-            should_trigger = current_price >= stop_price
-        else:  # SELL
-            # Sell stop triggers when price <= stop price
-            should_trigger = current_price <= stop_price
-
-        if should_trigger:
-            # For STOP_LOSS/TAKE_PROFIT market, fill at current price
-            if "LIMIT" not in order.type.upper():
-                return self._fill_order(order, current_price, order.quantity)
-            else:
-                # For stop-limit, fill at the limit price
-                return self._fill_order(order, order.price, order.quantity)
+        if not stop_would_trigger(order.type, order.side, order.stop_price, current_price):
+            return False, "Stop price not reached"
 
-        return False, "Stop price not reached"
+        # For STOP_LOSS/TAKE_PROFIT market, fill at current price
+        if "LIMIT" not in order.type.upper():
+            return self._fill_order(order, current_price, order.quantity)
+        else:
+            # For stop-limit, fill at the limit price
+            return self._fill_order(order, order.price, order.quantity)
 
     def _fill_order(
         self, order: Order, fill_price: float, fill_qty: float
@@ -102,72 +158,12 @@ class OrderMatchingEngine:
         Fill an order and update balances/positions.
         """
         try:
-            # Update order status
-            order.executed_qty = fill_qty
-            order.avg_price = fill_price
-            order.status = "FILLED"
-            order.updated_at = datetime.utcnow()
-
-            # Calculate trade value
-            trade_value = fill_price * fill_qty
-
-            # Get API key balance
-            balance = (
-                self.db.query(Balance)
-                .filter(
-                    Balance.api_key_id == order.api_key_id, Balance.asset == "USDT"
-                )
-                .first()
-            )
-
-            if not balance:
-                # Create balance if not exists
-                balance = Balance(
-                    api_key_id=order.api_key_id,
-                    asset="USDT",
-                    free=100000.0,
-                    locked=0.0,
-                    total=100000.0,
-                )
-                self.db.add(balance)
-
-            # Update balance based on side
-            if order.side.upper() == "BUY":
-                # Buying: deduct USDT
-                balance.free -= trade_value
-                balance.locked = max(0, balance.locked - trade_value)
-            else:
-                # Selling: add USDT (closing position)
-                balance.free += trade_value
-
-            balance.total = balance.free + balance.locked
-
-            # Update or create position
-            self._update_position(order, fill_price, fill_qty)
-
-            # Calculate fee (0.1% for all orders, matching real exchanges)
-            fee_rate = 0.001
-            trade_fee = trade_value * fee_rate
-
-            # Accumulate fee on order
-            order.cumulative_fee = (order.cumulative_fee or 0) + trade_fee
-            order.fee_currency = "USDT"
-
-            # Record trade
-            trade = Trade(
-                order_id=order.id,
-                symbol=order.symbol,
-                side=order.side,
-                price=fill_price,
-                quantity=fill_qty,
-                quote_qty=trade_value,
-                commission=trade_fee,
-                commission_asset="USDT",
-                is_maker=order.type.upper() == "LIMIT",
-            )
-            self.db.add(trade)
+            self._apply_fill(order, fill_price, fill_qty)
             self.db.commit()
 
+            # Push the fill to user data stream subscribers
+            order_event_hub.publish(order)
+
             logger.info(
                 f"Filled order {order.id}: {order.side} {fill_qty} {order.symbol} @ {fill_price}"
             )
@@ -178,6 +174,75 @@ class OrderMatchingEngine:
             self.db.rollback()
             return False, str(e)
 
+    def _apply_fill(self, order: Order, fill_price: float, fill_qty: float):
+        """Stage a fill (order, balance, position, trade) in the session without committing."""
+        # Update order status
+        order.executed_qty = fill_qty
+        order.avg_price = fill_price
+        order.status = "FILLED"
+        order.updated_at = datetime.utcnow()
+
+        # Calculate trade value
+        trade_value = fill_price * fill_qty
+
+        # Get API key balance
+        balance = (
+            self.db.query(Balance)
+            .filter(
+                Balance.api_key_id == order.api_key_id, Balance.asset == "USDT"
+            )
+            .first()
+        )
+
+        if not balance:
+            # Create balance if not exists
+            balance = Balance(
+                api_key_id=order.api_key_id,
+                asset="USDT",
+                free=100000.0,
+                locked=0.0,
+                total=100000.0,
+            )
+            self.db.add(balance)
+
+        # Update balance based on side
+        if order.side.upper() == "BUY":
+            # Buying: deduct USDT
+            balance.free -= trade_value
+            balance.locked = max(0, balance.locked - trade_value)
+        else:
+            # Selling: add USDT (closing position)
+            balance.free += trade_value
+
+        balance.total = balance.free + balance.locked
+
+        # Update or create position
+        self._update_position(order, fill_price, fill_qty)
+
+        # Calculate fee (0.1% for all orders, matching real exchanges)
+        fee_rate = 0.001
+        trade_fee = trade_value * fee_rate
+
+        # Accumulate fee on order
+        order.cumulative_fee = (order.cumulative_fee or 0) + trade_fee
+        order.fee_currency = "USDT"
+
+        # Record trade
+        trade = Trade(
+            order_id=order.id,
+            symbol=order.symbol,
+            side=order.side,
+            price=fill_price,
+            quantity=fill_qty,
+            quote_qty=trade_value,
+            commission=trade_fee,
+            commission_asset="USDT",
+            is_maker=order.type.upper() == "LIMIT",
+        )
+        self.db.add(trade)
+        # Later fills of the same batch must see this one's balance and position rows
+        self.db.flush()
+
     def _update_position(self, order: Order, fill_price: float, fill_qty: float):
         """Update position after order fill."""
         position = (
@@ -256,61 +321,100 @@ class OrderMatchingEngine:
             )
             self.db.add(position)
 
-    def check_all_pending_orders(self) -> List[dict]:
+    def fill_crossed_orders(
+        self, crossed: List[Tuple[RestingOrder, float]]
+    ) -> Tuple[List[dict], List[Tuple[str, dict]], List[RestingOrder]]:
         """
-        Check all pending orders and fill those that meet conditions.
-        Called when prices change.
-        Returns list of filled order info.
+        Fill the orders price ticks took off the books, in a single commit.
+        `crossed` pairs each order with the price that crossed it: limit and
+        stop-limit orders fill at their limit price, stop-market orders at that price.
+
+        Runs on the database thread, so nothing is published here. Returns the
+        filled order info, the (api_key_id, event) pairs to publish and the
+        orders that could not be filled and go back on the books.
         """
-        filled_orders = []
+        ids = [resting.id for resting, _ in crossed]
+        orders = {
+            order.id: order
+            for order in self.db.query(Order)
+            .filter(Order.id.in_(ids), Order.status.in_(OPEN_ORDER_STATUSES))
+            .all()
+        }
+        # Orders no longer open were cancelled or filled since they were crossed
+        fills = []
+        for resting, price in crossed:
+            order = orders.get(resting.id)
+            if order is not None:
+                fill_price = order.price if "LIMIT" in order.type.upper() else price
+                fills.append((order, fill_price, order.quantity - (order.executed_qty or 0)))
+
+        filled = []
+        unfilled = []
+        try:
+            for order, fill_price, fill_qty in fills:
+                if self._claim_open(order):
+                    self._apply_fill(order, fill_price, fill_qty)
+                    filled.append(order)
+            self.db.commit()
+        except Exception as e:
+            # One bad fill must not hold back the batch: retry each on its own
+            logger.error(f"Error filling {len(fills)} crossed orders, retrying one by one: {e}")
+            self.db.rollback()
+            filled = []
+            for order, fill_price, fill_qty in fills:
+                try:
+                    if self._claim_open(order):
+                        self._apply_fill(order, fill_price, fill_qty)
+                        self.db.commit()
+                        filled.append(order)
+                except Exception as e:
+                    logger.error(f"Error filling order {order.id}: {e}")
+                    self.db.rollback()
+                    unfilled.append(RestingOrder.of(order))
+
+        filled_info = []
+        events = []
+        for order in filled:
+            logger.info(
+                f"Filled order {order.id}: {order.side} {order.executed_qty} {order.symbol} @ {order.avg_price}"
+            )
+            filled_info.append(
+                {
+                    "order_id": order.id,
+                    "symbol": order.symbol,
+                    "side": order.side,
+                    "price": order.avg_price,
+                    "quantity": order.executed_qty,
+                    "message": f"Order filled at {order.avg_price}",
+                }
+            )
+            events.append((order.api_key_id, build_order_event(order)))
+        return filled_info, events, unfilled
 
-        # Get all open orders
-        open_orders = (
+    def _claim_open(self, order: Order) -> bool:
+        """
+        Marks a crossed order FILLED in the fill's transaction unless it is no
+        longer open. cancel_order runs on a request thread while the order is
+        off the books; the status read above may predate its commit, and the
+        conditional UPDATE holds SQLite's write lock until the fill commits.
+        """
+        claimed = (
             self.db.query(Order)
-            .filter(Order.status.in_(["NEW", "PARTIALLY_FILLED"]))
-            .all()
+            .filter(Order.id == order.id, Order.status.in_(OPEN_ORDER_STATUSES))
+            .update({Order.status: "FILLED"}, synchronize_session=False)
         )
-
-        for order in open_orders:
-            success = False
-            message = ""
-
-            if order.type.upper() == "MARKET":
-                success, message = self.process_market_order(order)
-            elif order.type.upper() == "LIMIT":
-                success, message = self.process_limit_order(order)
-            elif order.type.upper() in [
-                "STOP_LOSS",
-                "STOP_LOSS_LIMIT",
-                "TAKE_PROFIT",
-                "TAKE_PROFIT_LIMIT",
-            ]:
-                success, message = self.process_stop_order(order)
-
-            if success:
-                filled_orders.append(
-                    {
-                        "order_id": order.id,
-                        "symbol": order.symbol,
-                        "side": order.side,
-                        "price": order.avg_price,
-                        "quantity": order.executed_qty,
-                        "message": message,
-                    }
-                )
-
-        return filled_orders
+        if not claimed:
+            logger.info(f"Order {order.id} was cancelled before its fill, skipping it")
+        return claimed == 1
 
     def update_unrealized_pnl(self):
         """Update unrealized PnL for all positions based on current prices."""
         positions = self.db.query(Position).filter(Position.quantity != 0).all()
+        prices = self._current_prices(position.symbol for position in positions)
 
         for position in positions:
-            symbol = (
-                self.db.query(Symbol).filter(Symbol.symbol == position.symbol).first()
-            )
-            if symbol:
-                current_price = symbol.current_price
+            current_price = prices.get(position.symbol)
+            if current_price is not None:
                 if position.quantity > 0:  # Long
                     position.unrealized_pnl = (
                         current_price - position.entry_price
@@ -321,3 +425,113 @@ class OrderMatchingEngine:
                     ) * abs(position.quantity)
 
         self.db.commit()
+
+
+def load_market_state():
+    """Load the persisted prices and open orders into the in-memory books (startup)."""
+    with get_db_session() as db:
+        prices = {row.symbol: row.current_price for row in db.query(Symbol).all()}
+        open_orders = db.query(Order).filter(Order.status.in_(OPEN_ORDER_STATUSES)).all()
+        market_state.load(prices, open_orders)
+    logger.info(
+        f"Loaded {len(prices)} symbols and {market_state.resting_count()} resting orders into the order books"
+    )
+
+
+def _fill_crossed_in_session(crossed: List[Tuple[RestingOrder, float]]):
+    with get_db_session() as db:
+        return OrderMatchingEngine(db).fill_crossed_orders(crossed)
+
+
+async def fill_crossed(crossed: List[Tuple[RestingOrder, float]]) -> List[dict]:
+    """Fill crossed orders on the database thread and publish their fills."""
+    if not crossed:
+        return []
+    loop = asyncio.get_running_loop()
+    filled, events, unfilled = await loop.run_in_executor(
+        _db_executor, _fill_crossed_in_session, crossed
+    )
+    for resting in unfilled:
+        market_state.add_order(resting)
+    for api_key_id, event in events:
+        order_event_hub.publish_event(api_key_id, event)
+    return filled
+
+
+async def apply_prices(prices: Dict[str, float]) -> List[dict]:
+    """
+    Move symbol prices and fill the orders they crossed.
+    Matching is in memory; only crossed orders touch the database.
+    Returns the filled order info.
+    """
+    crossed = []
+    for symbol, price in prices.items():
+        crossed.extend((order, price) for order in market_state.set_price(symbol, price))
+    price_event_hub.publish(prices)
+    return await fill_crossed(crossed)
+
+
+async def match_resting_orders(symbol: str) -> List[dict]:
+    """Fill the orders of a symbol already crossed at its current price (e.g. a newly placed one)."""
+    price = market_state.price(symbol)
+    return await fill_crossed([(order, price) for order in market_state.match(symbol)])
+
+
+def _write_prices(prices: Dict[str, float]):
+    now = datetime.utcnow()
+    with get_db_session() as db:
+        for sym in db.query(Symbol).filter(Symbol.symbol.in_(list(prices))).all():
+            price = prices[sym.symbol]
+            sym.current_price = price
+            sym.mark_price = price
+            sym.index_price = price
+            sym.last_updated = now
+            db.add(PriceHistory(symbol=sym.symbol, price=price))
+
+
+class PriceWriter:
+    """
+    Persists moved prices in batches: every interval, the last price of each
+    symbol that moved is written to the symbols table and the price history,
+    in one transaction on the database thread. Price history therefore holds
+    at most one row per symbol per interval.
+    """
+
+    def __init__(self, interval_seconds: float = PRICE_FLUSH_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if not self._running:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._running and self._task:
+            self._running = False
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    async def flush(self):
+        prices = market_state.take_dirty_prices()
+        if prices:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(_db_executor, _write_prices, prices)
+
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.sleep(self.interval_seconds)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"PriceWriter: Error persisting prices: {e}")
+
+
+price_writer = PriceWriter()
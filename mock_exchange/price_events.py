@@ -0,0 +1,69 @@
+"""
+Price event fan-out for the mock exchange.
+Pushes price changes to WebSocket subscribers, mimicking Binance's
+mark price stream (markPriceUpdate events).
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber buffer; slow consumers drop ticks and catch up on the next one
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def build_price_event(symbol: str, price: float, now_ms: int) -> dict:
+    """Build a Binance-style markPriceUpdate event for a symbol."""
+    return {
+        "e": "markPriceUpdate",
+        "E": now_ms,
+        "s": symbol,
+        "p": str(price),
+        "i": str(price),
+    }
+
+
+class PriceEventHub:
+    """
+    In-process pub/sub of price changes, optionally filtered by symbol.
+    Publishing is synchronous and must happen on the event loop thread.
+    """
+
+    def __init__(self):
+        # queue -> symbols of interest, None for all symbols
+        self._subscribers: Dict[asyncio.Queue, Optional[Set[str]]] = {}
+
+    def subscribe(self, symbols: Optional[Set[str]] = None) -> asyncio.Queue:
+        """Register a new subscriber queue for some symbols (all when None)."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[queue] = set(symbols) if symbols else None
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber queue."""
+        self._subscribers.pop(queue, None)
+
+    def publish(self, prices: Dict[str, float]):
+        """Publish one event per moved symbol to the subscribers interested in it."""
+        if not self._subscribers:
+            return
+
+        now_ms = int(datetime.utcnow().timestamp() * 1000)
+        events = {symbol: build_price_event(symbol, price, now_ms) for symbol, price in prices.items()}
+        for queue, symbols in list(self._subscribers.items()):
+            for symbol, event in events.items():
+                if symbols is not None and symbol not in symbols:
+                    continue
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning("Price event queue full - dropping ticks")
+                    break
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+price_event_hub = PriceEventHub()
@@ -0,0 +1,14 @@
+"""
+The mock exchange imports its modules flat (it runs from its own directory),
+so its tests put that directory on the path. The database module binds its
+engine at import; tests point it at a scratch file.
+"""
+import os
+import sys
+import tempfile
+
+MOCK_EXCHANGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("MOCK_EXCHANGE_DB", os.path.join(tempfile.mkdtemp(), "mock_exchange_test.db"))
+if MOCK_EXCHANGE_DIR not in sys.path:
+    sys.path.insert(0, MOCK_EXCHANGE_DIR)
@@ -0,0 +1,135 @@
+"""
+Tests for the market simulator: reproducible GBM paths, trade and candle CSV
+replay, grouping rows into steps, and pacing and stopping a played path.
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import market_simulator
+from market_simulator import MarketSimulator, gbm_steps, load_replay, replay_steps
+from order_book import MarketState
+
+
+def _take(steps, count):
+    return [next(steps) for _ in range(count)]
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "prices.csv"
+    path.write_text(text)
+    return str(path)
+
+
+class TestGbm:
+    def test_same_seed_same_path(self):
+        start = {"BTCUSDT": 50000.0, "ETHUSDT": 3000.0}
+        first = _take(gbm_steps(start, 1.0, speed=3600, seed=7), 50)
+        second = _take(gbm_steps(start, 1.0, speed=3600, seed=7), 50)
+        other = _take(gbm_steps(start, 1.0, speed=3600, seed=8), 50)
+
+        assert first == second
+        assert first != other
+        # Simulated time advances by tick interval * speed
+        assert [seconds for seconds, _ in first[:3]] == [3600, 7200, 10800]
+
+    def test_prices_rounded_to_tick(self):
+        steps = _take(gbm_steps({"BTCUSDT": 50000.0}, 1.0, speed=3600, seed=1, tick_sizes={"BTCUSDT": 0.5}), 100)
+
+        prices = [prices["BTCUSDT"] for _, prices in steps]
+        assert all(price * 2 == int(price * 2) for price in prices)
+        assert len(set(prices)) > 1
+
+
+class TestReplay:
+    def test_trades_sorted_with_millisecond_times(self, tmp_path):
+        path = _write(tmp_path, (
+            "timestamp,symbol,price\n"
+            "1700000001000,BTCUSDT,50010\n"
+            "1700000000000,BTCUSDT,50000\n"
+            "1700000000000,ETHUSDT,3000\n"
+        ))
+
+        rows = load_replay(path)
+
+        assert [row[0] for row in rows] == [1700000000.0, 1700000000.0, 1700000001.0]
+        assert rows[-1] == (1700000001.0, "BTCUSDT", 50010.0)
+
+    def test_candle_played_open_low_high_close(self, tmp_path):
+        path = _write(tmp_path, (
+            "open_time,open,high,low,close\n"
+            "1700000000,100,110,95,105\n"
+            "1700000060,105,106,90,92\n"
+        ))
+
+        rows = load_replay(path, symbol="BTCUSDT")
+
+        # Up candle: dips to the low before the high; down candle: the other way round
+        assert [price for _, _, price in rows] == [100, 95, 110, 105, 105, 106, 90, 92]
+        # Spread over the candle's duration
+        assert [row[0] - 1700000000 for row in rows[:4]] == [0, 15, 30, 45]
+        assert all(symbol == "BTCUSDT" for _, symbol, _ in rows)
+
+    def test_csv_without_time_column_rejected(self, tmp_path):
+        path = _write(tmp_path, "symbol,price\nBTCUSDT,50000\n")
+
+        with pytest.raises(ValueError, match="no time column"):
+            load_replay(path)
+
+    def test_rows_at_same_time_form_one_step(self):
+        rows = [(100.0, "BTCUSDT", 1.0), (100.0, "ETHUSDT", 2.0), (101.5, "BTCUSDT", 3.0)]
+
+        assert list(replay_steps(rows)) == [
+            (0.0, {"BTCUSDT": 1.0, "ETHUSDT": 2.0}),
+            (1.5, {"BTCUSDT": 3.0}),
+        ]
+
+
+class TestMarketSimulator:
+    @pytest.fixture
+    def state(self):
+        state = MarketState()
+        state.prices = {"BTCUSDT": 50000.0}
+        with patch.object(market_simulator, "market_state", state):
+            yield state
+
+    @pytest.mark.asyncio
+    async def test_plays_every_step_then_finishes(self, state):
+        apply_prices = AsyncMock(return_value=["filled"])
+        simulator = MarketSimulator()
+        steps = [(0.0, {"BTCUSDT": 1.0}), (0.0, {"BTCUSDT": 2.0}), (0.0, {"BTCUSDT": 3.0})]
+
+        with patch.object(market_simulator, "apply_prices", apply_prices):
+            await simulator.start(steps, speed=0, symbols=["BTCUSDT"], mode="replay")
+            await simulator._task
+
+        assert [call.args[0] for call in apply_prices.await_args_list] == [prices for _, prices in steps]
+        status = simulator.get_status()
+        assert status["running"] is False
+        assert status["steps"] == 3
+        assert status["filledOrders"] == 3
+
+    @pytest.mark.asyncio
+    async def test_paced_path_waits_and_stops(self, state):
+        apply_prices = AsyncMock(return_value=[])
+        simulator = MarketSimulator()
+        # One step now, the next an hour of simulated time later at speed 1
+        steps = [(0.0, {"BTCUSDT": 1.0}), (3600.0, {"BTCUSDT": 2.0})]
+
+        with patch.object(market_simulator, "apply_prices", apply_prices):
+            await simulator.start(steps, speed=1, symbols=["BTCUSDT"], mode="replay")
+            await asyncio.sleep(0.05)
+            assert simulator.get_status()["running"] is True
+            await simulator.stop()
+
+        apply_prices.assert_awaited_once_with({"BTCUSDT": 1.0})
+        assert simulator.get_status()["running"] is False
+
+    @pytest.mark.asyncio
+    async def test_unknown_symbol_rejected(self, state):
+        simulator = MarketSimulator()
+
+        with pytest.raises(ValueError, match="DOGEUSDT"):
+            await simulator.start([], speed=1, symbols=["DOGEUSDT"], mode="gbm")
+        assert simulator.get_status()["running"] is False
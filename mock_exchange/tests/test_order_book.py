@@ -0,0 +1,96 @@
+"""
+Tests for the in-memory order books: ladder crossing in both directions,
+which ladder each order type rests on, and the market state around them.
+"""
+from types import SimpleNamespace
+
+from order_book import MarketState, OrderBook, PriceLadder, RestingOrder
+
+
+def _order(order_id, side="BUY", type="LIMIT", price=0.0, stop_price=0.0, symbol="BTCUSDT"):
+    return RestingOrder(id=order_id, symbol=symbol, side=side, type=type, price=price, stop_price=stop_price)
+
+
+class TestPriceLadder:
+    def test_falling_ladder_pops_levels_at_or_above_the_price(self):
+        ladder = PriceLadder(falling=True)
+        for sequence, level in enumerate([100.0, 99.0, 98.0, 99.0]):
+            ladder.add((level, sequence, f"o{sequence}"))
+
+        assert ladder.pop_crossed(101.0) == []
+        assert ladder.pop_crossed(99.0) == ["o1", "o3", "o0"]
+        assert ladder.levels() == [98.0]
+
+    def test_rising_ladder_pops_levels_at_or_below_the_price(self):
+        ladder = PriceLadder(falling=False)
+        for sequence, level in enumerate([100.0, 101.0, 102.0]):
+            ladder.add((level, sequence, f"o{sequence}"))
+
+        assert ladder.pop_crossed(99.0) == []
+        assert ladder.pop_crossed(101.0) == ["o0", "o1"]
+        assert len(ladder) == 1
+
+    def test_remove_only_takes_the_exact_entry(self):
+        ladder = PriceLadder(falling=True)
+        ladder.add((100.0, 0, "o0"))
+        ladder.add((100.0, 1, "o1"))
+
+        assert ladder.remove((100.0, 1, "o1"))
+        assert not ladder.remove((100.0, 1, "o1"))
+        assert ladder.pop_crossed(100.0) == ["o0"]
+
+
+class TestOrderBook:
+    def test_orders_rest_on_the_ladder_they_fire_from(self):
+        book = OrderBook("BTCUSDT")
+
+        assert book.ladder_for(_order("a", "BUY", "LIMIT", price=99.0)) == (book.bids, 99.0)
+        assert book.ladder_for(_order("b", "SELL", "LIMIT", price=101.0)) == (book.asks, 101.0)
+        # A long's stop-loss sells as the price falls, its take-profit as it rises
+        assert book.ladder_for(_order("c", "SELL", "STOP_MARKET", stop_price=95.0)) == (book.stops_below, 95.0)
+        assert book.ladder_for(_order("d", "SELL", "TAKE_PROFIT_MARKET", stop_price=110.0)) == (book.stops_above, 110.0)
+        assert book.ladder_for(_order("e", "BUY", "MARKET")) is None
+
+
+class TestMarketState:
+    def test_price_move_returns_crossed_orders_once(self):
+        state = MarketState()
+        state.load({"BTCUSDT": 100.0}, [])
+        state.add_order(_order("bid", "BUY", price=99.0))
+        state.add_order(_order("ask", "SELL", price=101.0))
+        state.add_order(_order("stop", "SELL", "STOP_MARKET", stop_price=97.0))
+
+        assert [o.id for o in state.set_price("BTCUSDT", 96.0)] == ["bid", "stop"]
+        assert state.set_price("BTCUSDT", 96.0) == []
+        assert state.resting_count() == 1
+        assert state.take_dirty_prices() == {"BTCUSDT": 96.0}
+        assert state.take_dirty_prices() == {}
+
+    def test_readding_an_order_replaces_its_level(self):
+        state = MarketState()
+        state.load({"BTCUSDT": 100.0}, [])
+        state.add_order(_order("bid", "BUY", price=90.0))
+        state.add_order(_order("bid", "BUY", price=99.0))
+
+        assert state.resting_count() == 1
+        assert [o.id for o in state.set_price("BTCUSDT", 99.0)] == ["bid"]
+
+    def test_removed_and_market_orders_never_match(self):
+        state = MarketState()
+        state.load({"BTCUSDT": 100.0}, [])
+        state.add_order(_order("bid", "BUY", price=99.0))
+
+        assert state.remove_order("bid").price == 99.0
+        assert state.remove_order("bid") is None
+        assert not state.add_order(_order("market", "BUY", "MARKET"))
+        assert state.set_price("BTCUSDT", 50.0) == []
+
+    def test_load_rests_persisted_orders(self):
+        row = SimpleNamespace(
+            id="row", symbol="ETHUSDT", side="sell", type="limit", price=2100.0, stop_price=None
+        )
+        state = MarketState()
+        state.load({"ETHUSDT": 2000.0}, [row])
+
+        assert state.price("ETHUSDT") == 2000.0
+        assert [o.id for o in state.set_price("ETHUSDT", 2100.0)] == ["row"]
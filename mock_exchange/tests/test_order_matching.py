@@ -0,0 +1,69 @@
+"""
+Tests for filling crossed orders against SQLite: an order cancelled on a
+request thread after the matching engine read it is not filled as well.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import APIKey, Balance, Base, Order
+from order_book import RestingOrder
+from order_matching import OrderMatchingEngine
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'exchange.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        db.add(APIKey(id="key", api_key="k", api_secret="s"))
+        db.add(Balance(api_key_id="key", asset="USDT", free=1000.0, locked=0.0, total=1000.0))
+        db.add(Order(id="bid", order_id=1, api_key_id="key", symbol="BTCUSDT", side="BUY", type="LIMIT",
+                     price=100.0, quantity=1.0, status="NEW"))
+        db.commit()
+    yield Session
+    engine.dispose()
+
+
+def _cancel(Session, order_id):
+    """cancel_order's conditional update, as committed by a request thread."""
+    with Session() as db:
+        cancelled = (
+            db.query(Order)
+            .filter(Order.id == order_id, Order.status.in_(["NEW", "PARTIALLY_FILLED"]))
+            .update({Order.status: "CANCELED"}, synchronize_session=False)
+        )
+        db.commit()
+        return cancelled
+
+
+def test_crossed_order_fills(sessions):
+    with sessions() as db:
+        filled, events, unfilled = OrderMatchingEngine(db).fill_crossed_orders(
+            [(RestingOrder("bid", "BTCUSDT", "BUY", "LIMIT", 100.0, 0.0), 99.0)]
+        )
+
+    assert [info["order_id"] for info in filled] == ["bid"]
+    assert _cancel(sessions, "bid") == 0
+
+
+def test_order_cancelled_after_it_was_read_is_not_filled(sessions):
+    with sessions() as db:
+        engine = OrderMatchingEngine(db)
+        claim = engine._claim_open
+
+        def cancel_then_claim(order):
+            # The order was read as NEW; the cancel commits before the fill writes
+            assert _cancel(sessions, order.id) == 1
+            return claim(order)
+
+        engine._claim_open = cancel_then_claim
+        filled, events, unfilled = engine.fill_crossed_orders(
+            [(RestingOrder("bid", "BTCUSDT", "BUY", "LIMIT", 100.0, 0.0), 99.0)]
+        )
+
+    assert filled == [] and events == [] and unfilled == []
+    with sessions() as db:
+        assert db.get(Order, "bid").status == "CANCELED"
+        assert db.query(Balance).one().free == 1000.0
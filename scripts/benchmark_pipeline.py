@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark of the webhook -> order -> fill -> TP pipeline.
+
+Drives a running stack (the API and the mock exchange). It sends TradingView
+webhooks for the users' DCA configurations at a fixed rate while the mock
+exchange's market simulator moves prices. Then it measures each stage:
+
+  webhook_ack       webhook POST until the API accepts it
+  webhook_to_order  webhook POST until the signal's first order reaches the exchange
+  fill_detection    exchange fill of a leg until the engine records it (filled_at)
+  tp_placement      exchange fill of a leg until its TP order reaches the exchange
+
+It also counts the exchange calls per fill (from the mock exchange's
+/admin/stats). Exchange events are timed when the benchmark receives them
+from the order stream. The engine's times come from the database, so both
+must run on the same host clock. Signals are matched to the pyramids they
+created in order, per user and symbol.
+
+Results are written as JSON, with p50/p95/p99 in ms per stage. With
+--baseline they are compared against a stored result, and the exit code is
+1 when a stage regresses by more than --tolerance.
+
+Usage (inside the app container, like simulate_signals.py):
+    python scripts/benchmark_pipeline.py --users 5 --signals 100 --rate 5 --output benchmark.json
+    python scripts/benchmark_pipeline.py --save-baseline benchmark_baseline.json
+    python scripts/benchmark_pipeline.py --baseline benchmark_baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import aiohttp
+import httpx
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.models.dca_configuration import DCAConfiguration
+from app.models.dca_order import DCAOrder
+from app.models.position_group import PositionGroup
+from app.models.user import User
+from simulate_signals import build_webhook_payload, send_signal
+
+MOCK_EXCHANGE_URL = os.getenv("MOCK_EXCHANGE_URL", "http://127.0.0.1:9000")
+
+STAGES = ["webhook_ack", "webhook_to_order", "fill_detection", "tp_placement"]
+PERCENTILES = [50, 95, 99]
+
+# Mock exchange endpoints that are not the engine trading
+NON_ENGINE_PATHS = ("/admin", "/ws", "/health", "/static")
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentile with linear interpolation between closest ranks."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: List[float]) -> dict:
+    """Count, mean, percentiles and max of latencies in seconds, reported in ms."""
+    summary = {"count": len(samples)}
+    for name, value in [("mean", sum(samples) / len(samples) if samples else None)] + [
+        (f"p{q}", percentile(samples, q)) for q in PERCENTILES
+    ] + [("max", max(samples) if samples else None)]:
+        summary[name] = None if value is None else round(value * 1000, 2)
+    return summary
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions of results against a baseline result: a stage percentile above
+    the baseline by more than tolerance (and min_delta_ms, the noise floor),
+    or more exchange calls per fill.
+    """
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = results.get("stages", {}).get(stage, {})
+        for name in (f"p{q}" for q in PERCENTILES):
+            before, after = base.get(name), current.get(name)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + tolerance) and after - before >= min_delta_ms:
+                regressions.append(f"{stage} {name}: {before} ms -> {after} ms")
+
+    before, after = baseline.get("exchange_calls_per_fill"), results.get("exchange_calls_per_fill")
+    if before is not None and after is not None and after > before * (1 + tolerance):
+        regressions.append(f"exchange_calls_per_fill: {before} -> {after}")
+    return regressions
+
+
+def engine_calls(before: Dict[str, int], after: Dict[str, int]) -> int:
+    """Requests the engine made to the exchange between two /admin/stats snapshots."""
+    calls = 0
+    for endpoint, count in after.items():
+        path = endpoint.split(" ", 1)[-1]
+        if not path.startswith(NON_ENGINE_PATHS):
+            calls += count - before.get(endpoint, 0)
+    return calls
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Unix time of a naive UTC datetime (datetime.utcnow() columns)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def normalize_symbol(symbol: str) -> str:
+    return symbol.replace("/", "").upper()
+
+
+class OrderStreamRecorder:
+    """Records when each order event of the mock exchange's order stream is received."""
+
+    def __init__(self, base_url: str, api_keys: List[str]):
+        self.ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://") + "/ws/orders"
+        self.api_keys = api_keys
+        # exchange order id -> receive time
+        self.new_times: Dict[str, float] = {}
+        self.fill_times: Dict[str, float] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._session = aiohttp.ClientSession()
+        for api_key in self.api_keys:
+            ws = await self._session.ws_connect(self.ws_url, headers={"X-MBX-APIKEY": api_key}, heartbeat=30)
+            self._tasks.append(asyncio.create_task(self._listen(ws)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+
+    def record(self, event: dict, received: float):
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+        order = event.get("o", {})
+        order_id = str(order.get("i"))
+        status = order.get("X")
+        if status == "NEW":
+            self.new_times.setdefault(order_id, received)
+        elif status == "FILLED":
+            self.fill_times.setdefault(order_id, received)
+
+    async def _listen(self, ws):
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self.record(json.loads(msg.data), time.time())
+            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                break
+
+
+async def load_targets(username: Optional[str], users: int, exchange: str, symbols: Optional[List[str]]) -> list:
+    """(user, DCA configuration) pairs to send signals for."""
+    async with AsyncSessionLocal() as session:
+        query = select(User)
+        if username:
+            query = query.where(User.username == username)
+        user_rows = (await session.execute(query.limit(users))).scalars().all()
+
+        targets = []
+        for user in user_rows:
+            configs = (await session.execute(
+                select(DCAConfiguration).where(DCAConfiguration.user_id == user.id)
+            )).scalars().all()
+            for cfg in configs:
+                if cfg.exchange.lower() != exchange.lower():
+                    continue
+                if symbols and cfg.pair not in symbols:
+                    continue
+                targets.append((user, cfg))
+        return targets
+
+
+async def send_signals(targets: list, count: int, rate: float, capital: float) -> List[dict]:
+    """Send `count` entry signals round-robin over the targets at `rate` per second."""
+    signals = []
+
+    async def send(index: int, client: httpx.AsyncClient):
+        user, cfg = targets[index % len(targets)]
+        payload = build_webhook_payload(
+            user_id=str(user.id),
+            secret=user.webhook_secret,
+            symbol=cfg.pair,
+            timeframe=cfg.timeframe,
+            exchange=cfg.exchange,
+            action="buy",
+            capital_usd=capital
+        )
+        sent = time.time()
+        status_code, _ = await send_signal(client, str(user.id), payload)
+        signals.append({
+            "user_id": str(user.id),
+            "symbol": normalize_symbol(cfg.pair),
+            "sent": sent,
+            "acked": time.time(),
+            "status": status_code,
+        })
+
+    async with httpx.AsyncClient() as client:
+        started = time.monotonic()
+        tasks = []
+        for index in range(count):
+            delay = started + index / rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(index, client)))
+        await asyncio.gather(*tasks)
+    return signals
+
+
+async def load_orders(since: datetime) -> list:
+    """(DCA order, user id) of the orders created since the benchmark started."""
+    async with AsyncSessionLocal() as session:
+        rows = await session.execute(
+            select(DCAOrder, PositionGroup.user_id)
+            .join(PositionGroup, DCAOrder.group_id == PositionGroup.id)
+            .where(DCAOrder.created_at >= since)
+        )
+        return [(order, str(user_id)) for order, user_id in rows.all()]
+
+
+def measure(signals: List[dict], recorder: OrderStreamRecorder, orders: list) -> Dict[str, List[float]]:
+    """Latency samples (seconds) per stage."""
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    accepted = [s for s in signals if s["status"] == 202]
+    samples["webhook_ack"] = [s["acked"] - s["sent"] for s in signals if s["status"] is not None]
+
+    # First order of each pyramid to reach the exchange, per user and symbol
+    pyramid_arrivals: Dict[str, float] = {}
+    pyramid_keys: Dict[str, tuple] = {}
+    for order, user_id in orders:
+        arrived = recorder.new_times.get(str(order.exchange_order_id))
+        if arrived is None:
+            continue
+        pyramid = str(order.pyramid_id)
+        pyramid_keys[pyramid] = (user_id, normalize_symbol(order.symbol))
+        pyramid_arrivals[pyramid] = min(arrived, pyramid_arrivals.get(pyramid, arrived))
+
+    arrivals_by_key: Dict[tuple, List[float]] = defaultdict(list)
+    for pyramid, arrived in pyramid_arrivals.items():
+        arrivals_by_key[pyramid_keys[pyramid]].append(arrived)
+    signals_by_key: Dict[tuple, List[float]] = defaultdict(list)
+    for signal in accepted:
+        signals_by_key[(signal["user_id"], signal["symbol"])].append(signal["sent"])
+
+    for key, sent_times in signals_by_key.items():
+        arrivals = sorted(arrivals_by_key.get(key, []))
+        position = 0
+        for sent in sorted(sent_times):
+            while position < len(arrivals) and arrivals[position] < sent:
+                position += 1
+            if position == len(arrivals):
+                break
+            samples["webhook_to_order"].append(arrivals[position] - sent)
+            position += 1
+
+    for order, _ in orders:
+        filled = recorder.fill_times.get(str(order.exchange_order_id))
+        if filled is None:
+            continue
+        detected = to_timestamp(order.filled_at)
+        if detected is not None:
+            samples["fill_detection"].append(detected - filled)
+        tp_placed = recorder.new_times.get(str(order.tp_order_id)) if order.tp_order_id else None
+        if tp_placed is not None:
+            samples["tp_placement"].append(tp_placed - filled)
+    return samples
+
+
+async def run(args) -> dict:
+    targets = await load_targets(args.user, args.users, args.exchange, args.symbols)
+    if not targets:
+        raise SystemExit(f"No DCA configurations on {args.exchange} to send signals for")
+
+    started_at = datetime.utcnow()
+    started = time.time()
+    recorder = OrderStreamRecorder(MOCK_EXCHANGE_URL, args.exchange_api_keys)
+    await recorder.start()
+
+    async with httpx.AsyncClient(base_url=MOCK_EXCHANGE_URL, timeout=30.0) as exchange:
+        stats_before = (await exchange.get("/admin/stats")).json()["requests"]
+        if args.price_path != "none":
+            simulation = {
+                "mode": args.price_path,
+                "symbols": sorted({normalize_symbol(cfg.pair) for _, cfg in targets}),
+                "speed": args.speed,
+                "tickIntervalMs": args.tick_interval_ms,
+                "volatility": args.volatility,
+                "seed": args.seed,
+                "file": args.replay_file,
+            }
+            response = await exchange.post("/admin/simulator/start", json=simulation)
+            response.raise_for_status()
+
+        try:
+            signals = await send_signals(targets, args.signals, args.rate, args.capital)
+            # Let fills, fill detection and TP placement catch up
+            await asyncio.sleep(args.settle)
+        finally:
+            if args.price_path != "none":
+                await exchange.post("/admin/simulator/stop")
+            await recorder.stop()
+        stats_after = (await exchange.get("/admin/stats")).json()["requests"]
+
+    orders = await load_orders(started_at)
+    samples = measure(signals, recorder, orders)
+    fills = len(recorder.fill_times)
+    calls = engine_calls(stats_before, stats_after)
+
+    return {
+        "started_at": started_at.isoformat(),
+        "duration_seconds": round(time.time() - started, 1),
+        "config": {
+            "users": len({str(user.id) for user, _ in targets}),
+            "targets": len(targets),
+            "signals": args.signals,
+            "rate": args.rate,
+            "price_path": args.price_path,
+            "speed": args.speed,
+            "volatility": args.volatility,
+            "seed": args.seed,
+        },
+        "signals": {"sent": len(signals), "accepted": sum(1 for s in signals if s["status"] == 202)},
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "fills": fills,
+        "exchange_calls": calls,
+        "exchange_calls_per_fill": round(calls / fills, 2) if fills else None,
+    }
+
+
+def print_report(results: dict, regressions: Optional[List[str]]):
+    print(f"\n{'='*70}")
+    print(f"Pipeline benchmark - {results['signals']['accepted']}/{results['signals']['sent']} signals accepted, "
+          f"{results['fills']} fills")
+    print(f"{'='*70}")
+    print(f"{'Stage':<20} {'Count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    print("-" * 70)
+    for stage, summary in results["stages"].items():
+        cells = ["-" if summary[name] is None else f"{summary[name]:.1f}" for name in ("p50", "p95", "p99", "max")]
+        print(f"{stage:<20} {summary['count']:>7} " + " ".join(f"{cell:>10}" for cell in cells))
+    print(f"\nExchange calls per fill: {results['exchange_calls_per_fill']}")
+
+    if regressions is not None:
+        if regressions:
+            print("\nREGRESSIONS against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+        else:
+            print("\nNo regressions against baseline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end latency benchmark of the webhook -> fill -> TP pipeline')
+    parser.add_argument('--user', '-u', default=None, help='Only send signals for this username')
+    parser.add_argument('--users', type=int, default=1, help='Number of users to send signals for (default: 1)')
+    parser.add_argument('--exchange', '-e', default='mock', help='Exchange of the DCA configurations (default: mock)')
+    parser.add_argument('--symbols', '-s', nargs='+', default=None, help='Only these pairs (e.g., BTC/USDT ETH/USDT)')
+    parser.add_argument('--signals', '-n', type=int, default=20, help='Number of signals to send (default: 20)')
+    parser.add_argument('--rate', '-r', type=float, default=1.0, help='Signals per second (default: 1.0)')
+    parser.add_argument('--capital', '-c', type=float, default=200.0, help='Capital per signal in USD (default: 200.0)')
+    parser.add_argument(
+        '--exchange-api-keys', nargs='+', default=['mock_api_key_12345'],
+        help="Mock exchange API keys the users trade with, for the order stream (default: the seeded key)"
+    )
+    parser.add_argument('--price-path', choices=['gbm', 'replay', 'none'], default='gbm',
+                        help='Mock exchange market simulation during the run (default: gbm)')
+    parser.add_argument('--speed', type=float, default=600.0, help='Simulated seconds per second (default: 600)')
+    parser.add_argument('--tick-interval-ms', type=int, default=100, help='GBM step interval (default: 100)')
+    parser.add_argument('--volatility', type=float, default=0.8, help='GBM annualised volatility (default: 0.8)')
+    parser.add_argument('--seed', type=int, default=42, help='GBM seed, for reproducible paths (default: 42)')
+    parser.add_argument('--replay-file', default=None, help='CSV on the mock exchange host for --price-path replay')
+    parser.add_argument('--settle', type=float, default=30.0,
+                        help='Seconds to keep measuring after the last signal (default: 30)')
+    parser.add_argument('--output', '-o', default=None, help='Write the results JSON to this file')
+    parser.add_argument('--baseline', '-b', default=None, help='Compare against this results JSON')
+    parser.add_argument('--save-baseline', default=None, help='Also write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative regression against the baseline (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='Ignore latency regressions smaller than this (default: 5)')
+
+    args = parser.parse_args()
+    if args.price_path == 'replay' and not args.replay_file:
+        parser.error('--replay-file is required for --price-path replay')
+
+    results = asyncio.run(run(args))
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance, args.min_delta_ms)
+        results["regressions"] = regressions
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    print_report(results, regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
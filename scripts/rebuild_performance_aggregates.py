@@ -0,0 +1,52 @@
+"""
+Performance Aggregates Rebuild
+
+Discards the stored per-user performance aggregates (performance_summaries and
+performance_daily) and replays every closed position group. Run once after
+deploying the aggregates to precompute them for all users, or after realized
+PnL of closed positions was corrected by hand.
+
+Run with:
+    docker compose exec app python scripts/rebuild_performance_aggregates.py                 # All users
+    docker compose exec app python scripts/rebuild_performance_aggregates.py --user-id <UUID>
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+# Add backend to path
+sys.path.insert(0, '/app/backend')
+
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.performance_aggregates import PerformanceStore
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild performance aggregates from the closed position history")
+    parser.add_argument("--user-id", help="Only rebuild this user")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        query = select(User.id)
+        if args.user_id:
+            query = query.where(User.id == uuid.UUID(args.user_id))
+        user_ids = (await session.execute(query)).scalars().all()
+
+    for user_id in user_ids:
+        # One transaction per user keeps the summary row lock short
+        async with AsyncSessionLocal() as session:
+            aggregate = await PerformanceStore(session).rebuild(user_id)
+            await session.commit()
+        print(f"✅ {user_id}: {aggregate.total_trades} trades, realized PnL {aggregate.realized_pnl:.2f} USD")
+
+    print(f"\nRebuilt performance aggregates for {len(user_ids)} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
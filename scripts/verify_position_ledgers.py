@@ -0,0 +1,56 @@
+"""
+Position Ledger Verifier
+
+Replays the full fill history of position groups and compares it with the
+incrementally maintained ledger (PositionGroup.ledger_state) used by
+update_position_stats. Mismatches indicate a fill that was amended or applied
+out of order without the ledger noticing.
+
+Run with:
+    docker compose exec app python scripts/verify_position_ledgers.py            # Active positions
+    docker compose exec app python scripts/verify_position_ledgers.py --all      # Include closed positions
+    docker compose exec app python scripts/verify_position_ledgers.py --repair   # Replace diverged ledgers
+"""
+
+import argparse
+import asyncio
+import sys
+
+# Add backend to path
+sys.path.insert(0, '/app/backend')
+
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.models.position_group import PositionGroup, PositionGroupStatus
+from app.services.position.position_ledger import verify_ledger
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Verify incremental position ledgers against a full replay")
+    parser.add_argument("--all", action="store_true", help="Also verify closed and failed positions")
+    parser.add_argument("--repair", action="store_true", help="Replace diverged ledgers with the replayed values")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        query = select(PositionGroup).where(PositionGroup.ledger_state.is_not(None))
+        if not args.all:
+            query = query.where(PositionGroup.status.notin_([PositionGroupStatus.CLOSED, PositionGroupStatus.FAILED]))
+        groups = (await session.execute(query)).scalars().all()
+
+        diverged = 0
+        for group in groups:
+            mismatches = await verify_ledger(session, group, repair=args.repair)
+            if mismatches:
+                diverged += 1
+                print(f"❌ {group.symbol} ({group.id}): {', '.join(mismatches)}")
+
+        if args.repair and diverged:
+            await session.commit()
+
+    print(f"\nVerified {len(groups)} ledgers: {diverged} diverged" + (" (repaired)" if args.repair and diverged else ""))
+    return 1 if diverged and not args.repair else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 import asyncio
 import os
+import time
 import uuid
 from unittest import mock # Import the whole module
 
@@ -224,4 +225,76 @@ def mock_async_session():
     mock_session.close = mock.AsyncMock() # Ensure close is awaitable
     mock_session.rollback = mock.AsyncMock() # Ensure rollback is awaitable
 
-    return mock_session
\ No newline at end of file
+    return mock_session
+
+
+class InMemoryPoolCache:
+    """Mirrors the semantics of the CacheService execution pool scripts."""
+
+    def __init__(self):
+        self.pools = {}
+        self.health = {}
+
+    def _pool(self, pool):
+        return self.pools.setdefault(pool, {"occupied": None, "version": 0, "leases": {}})
+
+    def _purge(self, state):
+        now = time.time()
+        state["leases"] = {lease: expiry for lease, expiry in state["leases"].items() if expiry > now}
+
+    async def acquire_pool_slot(self, pool, lease_id, limit, lease_ttl_seconds=120):
+        state = self._pool(pool)
+        self._purge(state)
+        if state["occupied"] is None:
+            return -1, 0
+        used = state["occupied"] + len(state["leases"])
+        if used >= limit:
+            return 0, used
+        state["leases"][lease_id] = time.time() + lease_ttl_seconds
+        return 1, used + 1
+
+    async def release_pool_slot(self, pool, lease_id, occupied=False):
+        state = self._pool(pool)
+        removed = state["leases"].pop(lease_id, None) is not None
+        if occupied and state["occupied"] is not None:
+            state["occupied"] += 1
+            state["version"] += 1
+        return removed
+
+    async def get_pool_state(self, pool):
+        state = self._pool(pool)
+        self._purge(state)
+        return {"occupied": state["occupied"], "version": str(state["version"]), "leases": len(state["leases"])}
+
+    async def set_pool_occupied(self, pool, occupied, version):
+        state = self._pool(pool)
+        if str(state["version"]) != version:
+            return False
+        state["occupied"] = occupied
+        return True
+
+    async def update_service_health(self, service_name, status, metrics=None):
+        self.health[service_name] = {"status": status, "metrics": metrics}
+
+
+@pytest.fixture
+def pool_cache():
+    """In-memory stand-in for the CacheService execution pool slots."""
+    return InMemoryPoolCache()
+
+@pytest.fixture(autouse=True)
+def reset_process_services():
+    """Startup tests install process-wide services; don't leak them into later tests."""
+    yield
+    from app.services.telegram_dispatcher import set_telegram_dispatcher
+    from app.services.webhook_intake import set_webhook_intake
+    from app.services.realtime_updates import set_realtime_hub
+    from app.services.execution_pool_manager import set_execution_pool_manager
+    from app.services.exchange_abstraction.precision_index import reset_precision_index
+    from app.core.deadline_scheduler import reset_deadline_scheduler
+    set_telegram_dispatcher(None)
+    set_webhook_intake(None)
+    set_realtime_hub(None)
+    set_execution_pool_manager(None)
+    reset_precision_index()
+    reset_deadline_scheduler()
@@ -76,6 +76,9 @@ async def test_exchange_api_timeout_on_order_submission(
             "min_qty": Decimal("0.00001")
         }
     })
+    mock_exchange_connector.get_symbol_precision = AsyncMock(
+        return_value=mock_exchange_connector.get_precision_rules.return_value["BTCUSDT"]
+    )
     mock_exchange_connector.get_current_price = AsyncMock(return_value=Decimal("50000.00"))
     mock_exchange_connector.fetch_balance = AsyncMock(return_value={'total': {'USDT': 10000}})
     mock_exchange_connector.close = AsyncMock()  # Add close method
@@ -83,6 +86,7 @@ async def test_exchange_api_timeout_on_order_submission(
     # Mock ExecutionPoolManager.request_slot to return False in the API (SignalRouter)
     mock_exec_pool = MagicMock()
     mock_exec_pool.request_slot = AsyncMock(return_value=False)
+    mock_exec_pool.release_slot = AsyncMock()
     
     # Patch dependencies
     # Note: signal_router uses ExchangeConfigService, not get_exchange_connector directly
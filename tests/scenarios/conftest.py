@@ -155,6 +155,7 @@ def scenario_mock_order_service():
     """Create a mock order service for scenarios."""
     service = MagicMock(spec=OrderService)
     service.submit_order = AsyncMock()
+    service.submit_orders = AsyncMock()
     service.cancel_order = AsyncMock()
     service.cancel_open_orders_for_group = AsyncMock()
     service.close_position_market = AsyncMock()
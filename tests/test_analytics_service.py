@@ -8,6 +8,7 @@ from decimal import Decimal
 import uuid
 
 from app.services.analytics_service import AnalyticsService
+from app.services.performance_aggregates import PerformanceAggregate
 from app.models.position_group import PositionGroup, PositionGroupStatus
 
 
@@ -75,14 +76,14 @@ class TestFetchDatabaseMetrics:
 
         with patch.object(analytics_service.position_repo, 'get_active_position_groups_for_user',
                          return_value=[mock_position1, mock_position2]), \
-             patch.object(analytics_service.position_repo, 'get_closed_by_user_all',
-                         return_value=[]):
+             patch('app.services.analytics_service.PerformanceStore.load',
+                   AsyncMock(return_value=PerformanceAggregate())):
             # Mock queued signals count
             mock_result = MagicMock()
             mock_result.scalar.return_value = 5
             mock_session.execute.return_value = mock_result
 
-            active, closed, queued_count, last_time = await analytics_service._fetch_database_metrics()
+            active, performance, queued_count, last_time = await analytics_service._fetch_database_metrics()
 
             assert len(active) == 2
             assert queued_count == 5
@@ -93,13 +94,13 @@ class TestFetchDatabaseMetrics:
         """Test fetching metrics when no positions exist."""
         with patch.object(analytics_service.position_repo, 'get_active_position_groups_for_user',
                          return_value=[]), \
-             patch.object(analytics_service.position_repo, 'get_closed_by_user_all',
-                         return_value=[]):
+             patch('app.services.analytics_service.PerformanceStore.load',
+                   AsyncMock(return_value=PerformanceAggregate())):
             mock_result = MagicMock()
             mock_result.scalar.return_value = 0
             mock_session.execute.return_value = mock_result
 
-            active, closed, queued_count, last_time = await analytics_service._fetch_database_metrics()
+            active, performance, queued_count, last_time = await analytics_service._fetch_database_metrics()
 
             assert len(active) == 0
             assert queued_count == 0
@@ -243,7 +244,7 @@ class TestCalculateLiveDashboard:
         """Test live dashboard with no positions."""
         result = analytics_service._calculate_live_dashboard(
             active_positions=[],
-            closed_positions=[],
+            performance=PerformanceAggregate.from_positions([]),
             queued_signals_count=0,
             last_webhook_time=None,
             exchange_data={}
@@ -283,7 +284,7 @@ class TestCalculateLiveDashboard:
 
         result = analytics_service._calculate_live_dashboard(
             active_positions=[active],
-            closed_positions=[win, loss],
+            performance=PerformanceAggregate.from_positions([win, loss]),
             queued_signals_count=3,
             last_webhook_time=datetime.utcnow(),
             exchange_data=exchange_data
@@ -318,7 +319,7 @@ class TestCalculateLiveDashboard:
 
         result = analytics_service._calculate_live_dashboard(
             active_positions=[active],
-            closed_positions=[],
+            performance=PerformanceAggregate.from_positions([]),
             queued_signals_count=0,
             last_webhook_time=None,
             exchange_data=exchange_data
@@ -346,7 +347,7 @@ class TestCalculateLiveDashboard:
         # Should not raise
         result = analytics_service._calculate_live_dashboard(
             active_positions=[active],
-            closed_positions=[],
+            performance=PerformanceAggregate.from_positions([]),
             queued_signals_count=0,
             last_webhook_time=None,
             exchange_data=exchange_data
@@ -361,7 +362,7 @@ class TestCalculatePerformanceDashboard:
     def test_performance_no_trades(self, analytics_service):
         """Test performance dashboard with no trades."""
         result = analytics_service._calculate_performance_dashboard(
-            closed_positions=[],
+            performance=PerformanceAggregate.from_positions([]),
             active_positions=[],
             exchange_data={}
         )
@@ -385,7 +386,7 @@ class TestCalculatePerformanceDashboard:
             positions.append(pos)
 
         result = analytics_service._calculate_performance_dashboard(
-            closed_positions=positions,
+            performance=PerformanceAggregate.from_positions(positions),
             active_positions=[],
             exchange_data={}
         )
@@ -411,7 +412,7 @@ class TestCalculatePerformanceDashboard:
             positions.append(pos)
 
         result = analytics_service._calculate_performance_dashboard(
-            closed_positions=positions,
+            performance=PerformanceAggregate.from_positions(positions),
             active_positions=[],
             exchange_data={}
         )
@@ -447,7 +448,7 @@ class TestCalculatePerformanceDashboard:
         positions.append(pos3)
 
         result = analytics_service._calculate_performance_dashboard(
-            closed_positions=positions,
+            performance=PerformanceAggregate.from_positions(positions),
             active_positions=[],
             exchange_data={}
         )
@@ -469,7 +470,7 @@ class TestCalculatePerformanceDashboard:
             positions.append(pos)
 
         result = analytics_service._calculate_performance_dashboard(
-            closed_positions=positions,
+            performance=PerformanceAggregate.from_positions(positions),
             active_positions=[],
             exchange_data={}
         )
@@ -487,7 +488,7 @@ class TestGetComprehensiveDashboardData:
         """Test comprehensive dashboard data retrieval."""
         with patch.object(analytics_service, '_fetch_database_metrics') as mock_db, \
              patch.object(analytics_service, '_fetch_exchange_data_optimized') as mock_exchange:
-            mock_db.return_value = ([], [], 0, None)
+            mock_db.return_value = ([], PerformanceAggregate(), 0, None)
             mock_exchange.return_value = {}
 
             result = await analytics_service.get_comprehensive_dashboard_data()
@@ -60,7 +60,6 @@ class TestRenewLeaderLock:
     async def test_renew_lock_success(self):
         """Test successful lock renewal."""
         mock_cache = AsyncMock()
-        mock_cache.acquire_lock.return_value = True
 
         # Create a mock app state
         mock_app = MagicMock()
@@ -68,7 +67,7 @@ class TestRenewLeaderLock:
 
         renewal_count = 0
 
-        async def mock_acquire(*args, **kwargs):
+        async def mock_extend(*args, **kwargs):
             nonlocal renewal_count
             renewal_count += 1
             if renewal_count >= 2:
@@ -76,7 +75,7 @@ class TestRenewLeaderLock:
                 mock_app.state.is_leader = False
             return True
 
-        mock_cache.acquire_lock = mock_acquire
+        mock_cache.extend_lock = mock_extend
 
         with patch('app.main.get_cache', return_value=mock_cache):
             with patch('app.main.app', mock_app):
@@ -85,12 +84,14 @@ class TestRenewLeaderLock:
                     await renew_leader_lock()
 
                     assert renewal_count >= 1
+                    # The held key is extended, never set again with NX
+                    mock_cache.acquire_lock.assert_not_awaited()
 
     @pytest.mark.asyncio
     async def test_renew_lock_lost_leadership(self):
         """Test when lock renewal fails and leadership is lost."""
         mock_cache = AsyncMock()
-        mock_cache.acquire_lock.return_value = False  # Can't renew
+        mock_cache.extend_lock.return_value = False  # Key expired or taken over
 
         mock_app = MagicMock()
         mock_app.state.is_leader = True
@@ -126,7 +127,7 @@ class TestRenewLeaderLock:
     async def test_renew_lock_handles_exception(self):
         """Test that renewal task handles Redis exceptions gracefully."""
         mock_cache = AsyncMock()
-        mock_cache.acquire_lock.side_effect = Exception("Redis error")
+        mock_cache.extend_lock.side_effect = Exception("Redis error")
 
         mock_app = MagicMock()
         mock_app.state.is_leader = True
@@ -147,6 +148,79 @@ class TestRenewLeaderLock:
                     await renew_leader_lock()
 
 
+class TestLeaderElectionLoop:
+    """Test that webhook routing follows the leader lock."""
+
+    @staticmethod
+    def _sleep_cancelled_on(call):
+        calls = 0
+
+        async def mock_sleep(*args):
+            nonlocal calls
+            calls += 1
+            if calls >= call:
+                raise asyncio.CancelledError()
+        return mock_sleep
+
+    @pytest.mark.asyncio
+    async def test_leader_keeps_routing_across_renewals(self):
+        mock_cache = AsyncMock()
+        mock_cache.extend_lock.return_value = True
+        mock_app = MagicMock()
+        mock_app.state.is_leader = True
+        mock_app.state.webhook_intake = AsyncMock()
+
+        with patch('app.main.get_cache', return_value=mock_cache):
+            with patch('app.main.app', mock_app):
+                with patch('asyncio.sleep', self._sleep_cancelled_on(4)):
+                    from app.main import leader_election_loop
+                    await leader_election_loop()
+
+        assert mock_cache.extend_lock.await_count == 3
+        mock_cache.acquire_lock.assert_not_awaited()
+        mock_app.state.webhook_intake.start_processing_task.assert_awaited_once()
+        mock_app.state.webhook_intake.stop_processing_task.assert_not_awaited()
+        assert mock_app.state.is_leader is True
+
+    @pytest.mark.asyncio
+    async def test_lost_leadership_stops_routing_until_reelected(self):
+        mock_cache = AsyncMock()
+        mock_cache.extend_lock.side_effect = [True, False]  # second renewal finds the key gone
+        mock_cache.acquire_lock.return_value = True  # next contention wins
+        mock_app = MagicMock()
+        mock_app.state.is_leader = True
+        mock_app.state.webhook_intake = AsyncMock()
+
+        with patch('app.main.get_cache', return_value=mock_cache):
+            with patch('app.main.app', mock_app):
+                with patch('asyncio.sleep', self._sleep_cancelled_on(4)):
+                    from app.main import leader_election_loop
+                    await leader_election_loop()
+
+        assert mock_cache.extend_lock.await_count == 2
+        mock_cache.acquire_lock.assert_awaited_once()
+        assert mock_app.state.webhook_intake.start_processing_task.await_count == 2
+        mock_app.state.webhook_intake.stop_processing_task.assert_awaited_once()
+        assert mock_app.state.is_leader is True
+
+    @pytest.mark.asyncio
+    async def test_follower_does_not_route(self):
+        mock_cache = AsyncMock()
+        mock_cache.acquire_lock.return_value = False
+        mock_app = MagicMock()
+        mock_app.state.is_leader = False
+        mock_app.state.webhook_intake = AsyncMock()
+
+        with patch('app.main.get_cache', return_value=mock_cache):
+            with patch('app.main.app', mock_app):
+                with patch('asyncio.sleep', self._sleep_cancelled_on(2)):
+                    from app.main import leader_election_loop
+                    await leader_election_loop()
+
+        mock_app.state.webhook_intake.start_processing_task.assert_not_awaited()
+        assert mock_app.state.is_leader is False
+
+
 class TestCORSValidation:
     """Test CORS configuration validation for different environments."""
 
@@ -249,7 +323,7 @@ class TestStartupEvent:
 
     @pytest.mark.asyncio
     async def test_startup_as_follower_skips_background_services(self):
-        """When not elected leader, should skip background service initialization."""
+        """Without sharding, a worker that is not the leader should skip background services."""
         mock_cache = AsyncMock()
         mock_cache.acquire_lock.return_value = False  # Not leader
 
@@ -260,16 +334,59 @@ class TestStartupEvent:
             with patch('app.main.OrderFillMonitorService', return_value=mock_order_monitor):
                 with patch('app.main.setup_logging'):
                     with patch('app.main.AsyncSessionLocal'):
-                        from app.main import startup_event, app
+                        from app.main import startup_event, app, settings
 
-                        await startup_event()
+                        with patch.object(settings, 'BACKGROUND_SHARDING', False):
+                            await startup_event()
 
                         # Verify follower status
                         assert app.state.is_leader is False
+                        assert app.state.shard_coordinator is None
 
                         # Verify background services were NOT started
                         mock_order_monitor.start_monitoring_task.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_startup_as_follower_runs_sharded_services(self):
+        """With sharding, a follower runs the background loops for its shard but does not route webhooks."""
+        mock_cache = AsyncMock()
+        mock_cache.acquire_lock.return_value = False  # Not leader
+
+        mock_order_monitor = MagicMock()
+        mock_order_monitor.start_monitoring_task = AsyncMock()
+        mock_coordinator = MagicMock()
+        mock_coordinator.start = AsyncMock()
+        mock_coordinator.stop = AsyncMock()
+        mock_watchdog = MagicMock()
+        mock_watchdog.start = AsyncMock()
+
+        with patch('app.main.get_cache', return_value=mock_cache):
+            with patch('app.main.OrderFillMonitorService', return_value=mock_order_monitor):
+                with patch('app.main.ShardCoordinator', return_value=mock_coordinator):
+                    with patch('app.main.OrderFillStreamService') as mock_stream_cls:
+                        mock_stream_cls.return_value.start_monitoring_task = AsyncMock()
+                        with patch('app.main.QueueManagerService') as mock_queue_cls:
+                            mock_queue_cls.return_value.start_promotion_task = AsyncMock()
+                            with patch('app.main.RiskEngineService') as mock_risk_cls:
+                                mock_risk_cls.return_value.start_monitoring_task = AsyncMock()
+                                with patch('app.main.WebhookIntakeService') as mock_intake_cls:
+                                    mock_intake_cls.return_value.start_processing_task = AsyncMock()
+                                    with patch('app.main.setup_watchdog', new=AsyncMock(return_value=mock_watchdog)):
+                                        with patch('app.main.setup_logging'):
+                                            with patch('app.main.AsyncSessionLocal'):
+                                                from app.main import startup_event, app, settings
+
+                                                with patch.object(settings, 'BACKGROUND_SHARDING', True):
+                                                    await startup_event()
+
+                                                assert app.state.is_leader is False
+                                                mock_coordinator.start.assert_awaited_once()
+                                                mock_order_monitor.start_monitoring_task.assert_called_once()
+                                                mock_queue_cls.return_value.start_promotion_task.assert_called_once()
+                                                mock_risk_cls.return_value.start_monitoring_task.assert_called_once()
+                                                assert mock_risk_cls.call_args.kwargs["shard_coordinator"] is mock_coordinator
+                                                mock_intake_cls.return_value.start_processing_task.assert_not_called()
+
 
 class TestShutdownEvent:
     """Test application shutdown event cleanup."""
@@ -317,6 +434,30 @@ class TestShutdownEvent:
             mock_renewal_task.cancel.assert_called_once()
             mock_cache.release_lock.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_shutdown_as_sharded_follower_leaves_membership(self):
+        """A sharded follower stops its loops and hands its users back, but keeps the leader lock alone."""
+        mock_cache = AsyncMock()
+
+        mock_order_monitor = MagicMock()
+        mock_order_monitor.stop_monitoring_task = AsyncMock()
+        mock_coordinator = MagicMock()
+        mock_coordinator.stop = AsyncMock()
+
+        with patch('app.main.get_cache', new=AsyncMock(return_value=mock_cache)):
+            from app.main import shutdown_event, app
+
+            app.state.is_leader = False
+            app.state.shard_coordinator = mock_coordinator
+            app.state.order_fill_monitor = mock_order_monitor
+
+            await shutdown_event()
+
+            mock_order_monitor.stop_monitoring_task.assert_called_once()
+            mock_coordinator.stop.assert_awaited_once()
+            assert app.state.shard_coordinator is None
+            mock_cache.release_lock.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_shutdown_as_follower_skips_service_cleanup(self):
         """Follower should not try to stop services it never started."""
@@ -324,6 +465,7 @@ class TestShutdownEvent:
 
         # Set up app state as follower
         app.state.is_leader = False
+        app.state.shard_coordinator = None
 
         # Should not raise even though services don't exist
         await shutdown_event()
@@ -0,0 +1,98 @@
+"""
+Tests for batched grid placement: chunking to the batch limit, per-leg
+results in request order, and the connector fallbacks.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import ccxt
+import pytest
+
+from app.exceptions import InsufficientFundsError, OrderValidationError
+from app.services.exchange_abstraction.batch_orders import leg_result
+from app.services.exchange_abstraction.binance_connector import BinanceConnector
+from app.services.exchange_abstraction.request_scheduler import reset_request_schedulers
+
+
+def _leg(price, **kwargs):
+    return dict(symbol="BTC/USDT", order_type="LIMIT", side="BUY", quantity=0.001, price=price, amount_type="base", **kwargs)
+
+
+def _echo_batch(entries):
+    return [{"id": f"id_{entry['price']}", "info": {}} for entry in entries]
+
+
+class TestBinancePlaceOrders:
+    """Tests for BinanceConnector.place_orders."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_schedulers(self):
+        reset_request_schedulers()
+        yield
+        reset_request_schedulers()
+
+    def _connector(self, default_type="future"):
+        exchange = MagicMock()
+        exchange.options = {'defaultType': default_type}
+        exchange.exceptions = {'exact': {'-2019': ccxt.InsufficientFunds}}
+        exchange.create_orders = AsyncMock(side_effect=_echo_batch)
+        exchange.create_order = AsyncMock(return_value={"id": "single"})
+        with patch('ccxt.async_support.binance', return_value=exchange):
+            return BinanceConnector(api_key="key", secret_key="secret", default_type=default_type), exchange
+
+    @pytest.mark.asyncio
+    async def test_grid_is_chunked_to_the_batch_limit(self):
+        connector, exchange = self._connector()
+
+        results = await connector.place_orders([_leg(100 - i) for i in range(7)])
+
+        assert [r["id"] for r in results] == [f"id_{100 - i}" for i in range(7)]
+        assert sorted(len(call.args[0]) for call in exchange.create_orders.await_args_list) == [2, 5]
+        exchange.create_order.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rejected_and_unbatchable_legs_keep_their_position(self):
+        connector, exchange = self._connector()
+        exchange.create_orders = AsyncMock(return_value=[
+            {"id": "a", "info": {}},
+            {"id": None, "status": "rejected", "info": {"code": -2019, "msg": "Margin is insufficient."}},
+        ])
+        quote_market = dict(symbol="BTC/USDT", order_type="MARKET", side="BUY", quantity=100, price=None, amount_type="quote")
+
+        results = await connector.place_orders([_leg(100), quote_market, _leg(99)])
+
+        assert results[0]["id"] == "a"
+        assert results[1] == {"id": "single"}
+        assert isinstance(results[2], InsufficientFundsError)
+
+    @pytest.mark.asyncio
+    async def test_failed_request_fails_its_chunk_only(self):
+        connector, exchange = self._connector()
+
+        def create_orders(entries):
+            if len(entries) < 5:
+                raise ccxt.RequestTimeout("timed out")
+            return _echo_batch(entries)
+        exchange.create_orders = AsyncMock(side_effect=create_orders)
+
+        results = await connector.place_orders([_leg(100 - i) for i in range(6)])
+
+        assert [r["id"] for r in results[:5]] == [f"id_{100 - i}" for i in range(5)]
+        assert isinstance(results[5], Exception)
+
+    @pytest.mark.asyncio
+    async def test_spot_places_legs_individually(self):
+        connector, exchange = self._connector(default_type="spot")
+
+        results = await connector.place_orders([_leg(100), _leg(99)])
+
+        assert results == [{"id": "single"}, {"id": "single"}]
+        exchange.create_orders.assert_not_awaited()
+        assert exchange.create_order.await_count == 2
+
+
+def test_leg_result_without_a_known_code_is_a_validation_error():
+    exchange = MagicMock(exceptions={'exact': {}})
+
+    assert isinstance(leg_result(exchange, {"id": None, "info": {"code": 1, "msg": "bad"}}), OrderValidationError)
+    assert isinstance(leg_result(exchange, None), OrderValidationError)
+    assert leg_result(exchange, {"id": "1"}) == {"id": "1"}
@@ -94,13 +94,13 @@ async def test_get_precision_rules_success(mock_ccxt_binance):
     }
     mock_ccxt_binance.load_markets = AsyncMock(return_value=mock_markets_response)
 
-    # Mock the cache to return None (cache miss) so load_markets is called
+    # Nothing indexed in Redis yet, so load_markets is called
     mock_cache = AsyncMock()
-    mock_cache.get_precision_rules = AsyncMock(return_value=None)
-    mock_cache.set_precision_rules = AsyncMock()
+    mock_cache.add_invalidation_listener = MagicMock()
+    mock_cache.get_precision_index = AsyncMock(return_value=None)
 
     with patch('ccxt.async_support.binance', return_value=mock_ccxt_binance), \
-         patch('app.services.exchange_abstraction.binance_connector.get_cache', AsyncMock(return_value=mock_cache)):
+         patch('app.services.exchange_abstraction.precision_index.get_cache', AsyncMock(return_value=mock_cache)):
         connector = BinanceConnector(api_key="test_key", secret_key="test_secret")
 
         rules = await connector.get_precision_rules()
@@ -121,10 +121,8 @@ async def test_get_precision_rules_success(mock_ccxt_binance):
                 'min_notional': 5.0
             }
         }
-        # We expect keys for both symbol name and ID if they differ, but here they might overlap or be just one.
-        # The connector logic adds both 'symbol' and 'id' keys.
-        # In the mock, 'BTC/USDT' is the key. If 'id' is missing in the mock market value, it only adds the key.
-        # Let's verify the values for the known keys.
+        # One entry per symbol; lookups accept the unified symbol as well as the market id
+        assert rules['BTCUSDT'] is rules['BTC/USDT']
         assert rules['BTC/USDT'] == expected_rules['BTC/USDT']
         assert rules['ETH/USDT'] == expected_rules['ETH/USDT']
 
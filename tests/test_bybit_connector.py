@@ -121,12 +121,12 @@ class TestGetPrecisionRules:
         }
         mock_bybit_connector.exchange.load_markets.return_value = mock_markets
 
-        # Mock the cache to return None (cache miss) so load_markets is called
+        # Nothing indexed in Redis yet, so load_markets is called
         mock_cache = AsyncMock()
-        mock_cache.get_precision_rules = AsyncMock(return_value=None)
-        mock_cache.set_precision_rules = AsyncMock()
+        mock_cache.add_invalidation_listener = MagicMock()
+        mock_cache.get_precision_index = AsyncMock(return_value=None)
 
-        with patch('app.services.exchange_abstraction.bybit_connector.get_cache', AsyncMock(return_value=mock_cache)):
+        with patch('app.services.exchange_abstraction.precision_index.get_cache', AsyncMock(return_value=mock_cache)):
             rules = await mock_bybit_connector.get_precision_rules()
 
         assert 'BTC/USDT' in rules
@@ -148,12 +148,12 @@ class TestGetPrecisionRules:
         }
         mock_bybit_connector.exchange.load_markets.return_value = mock_markets
 
-        # Mock the cache to return None (cache miss) so load_markets is called
+        # Nothing indexed in Redis yet, so load_markets is called
         mock_cache = AsyncMock()
-        mock_cache.get_precision_rules = AsyncMock(return_value=None)
-        mock_cache.set_precision_rules = AsyncMock()
+        mock_cache.add_invalidation_listener = MagicMock()
+        mock_cache.get_precision_index = AsyncMock(return_value=None)
 
-        with patch('app.services.exchange_abstraction.bybit_connector.get_cache', AsyncMock(return_value=mock_cache)):
+        with patch('app.services.exchange_abstraction.precision_index.get_cache', AsyncMock(return_value=mock_cache)):
             rules = await mock_bybit_connector.get_precision_rules()
 
         assert rules['DOGE/USDT']['tick_size'] == 0.0001
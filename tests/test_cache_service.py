@@ -324,6 +324,16 @@ class TestCacheServiceDelete:
         assert result is False
 
 
+def _pipeline(redis):
+    """redis.asyncio pipelines are created synchronously and used as async context managers."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    redis.pipeline = MagicMock(return_value=pipe)
+    return pipe
+
+
 class TestCacheServicePrecision:
     """Tests for precision-related cache methods."""
 
@@ -366,14 +376,13 @@ class TestCacheServicePrecision:
         cache._connected = True
         cache._redis = AsyncMock()
 
-        rules = {
-            "BTCUSDT": {"price_precision": 2, "qty_precision": 6}
-        }
-        cache._redis.get.return_value = json.dumps(rules)
+        cache._redis.hget.return_value = json.dumps({"price_precision": 2, "qty_precision": 6})
 
         result = await cache.get_symbol_precision("binance", "BTCUSDT")
 
-        assert result is not None
+        assert result == {"price_precision": 2, "qty_precision": 6}
+        cache._redis.hget.assert_awaited_once_with("precision_index:binance", "BTCUSDT")
+        cache._redis.get.assert_not_awaited()
 
     @pytest.mark.asyncio
     async def test_invalidate_precision_rules(self):
@@ -393,20 +402,46 @@ class TestCacheServiceTickers:
 
     @pytest.mark.asyncio
     async def test_get_tickers(self):
-        """Test getting tickers from cache."""
+        """Test reading only the requested symbols from the ticker table."""
+        cache = CacheService()
+        cache._connected = True
+        cache._redis = AsyncMock()
+        cache._redis.hmget.return_value = [json.dumps([50000.0, 49999.5, 50000.5, 1700000000000]), None, "1700000000.0"]
+
+        result = await cache.get_tickers("binance", ["BTC/USDT", "DOGE/USDT"])
+
+        assert result == {"BTC/USDT": {"last": 50000.0, "bid": 49999.5, "ask": 50000.5, "timestamp": 1700000000000}}
+        cache._redis.hmget.assert_awaited_once_with(
+            "ticker_table:binance", ["BTCUSDT", "DOGEUSDT", "__updated_at__"]
+        )
+
+        # Served from the in-process tier on the next read
+        assert await cache.get_tickers("binance", ["BTCUSDT"]) == {"BTCUSDT": result["BTC/USDT"]}
+        cache._redis.hmget.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_get_tickers_table_not_cached(self):
+        """A missing table is a cache miss, not an empty result."""
         cache = CacheService()
         cache._connected = True
         cache._redis = AsyncMock()
+        cache._redis.hmget.return_value = [None, None]
+
+        assert await cache.get_tickers("binance", ["BTC/USDT"]) is None
 
-        expected_tickers = {
-            "BTCUSDT": {"last": "50000.00"},
-            "ETHUSDT": {"last": "3000.00"}
+    @pytest.mark.asyncio
+    async def test_get_whole_ticker_table(self):
+        cache = CacheService()
+        cache._connected = True
+        cache._redis = AsyncMock()
+        cache._redis.hgetall.return_value = {
+            "BTCUSDT": json.dumps([50000.0, None, None, None]),
+            "__updated_at__": "1700000000.0",
         }
-        cache._redis.get.return_value = json.dumps(expected_tickers)
 
         result = await cache.get_tickers("binance")
 
-        assert result is not None
+        assert result == {"BTCUSDT": {"last": 50000.0, "bid": None, "ask": None, "timestamp": None}}
 
     @pytest.mark.asyncio
     async def test_set_tickers(self):
@@ -414,16 +449,24 @@ class TestCacheServiceTickers:
         cache = CacheService()
         cache._connected = True
         cache._redis = AsyncMock()
-        cache._redis.setex = AsyncMock()
+        pipe = _pipeline(cache._redis)
 
         tickers = {
-            "BTCUSDT": {"last": "50000.00"},
-            "ETHUSDT": {"last": "3000.00"}
+            "BTC/USDT": {"last": 50000.0, "bid": 49999.5, "ask": 50000.5, "timestamp": 1, "info": {"raw": "payload"}},
+            "ETHUSDT": {"last": "3000.00"},
+            "NEW/USDT": {"last": None},
         }
 
         result = await cache.set_tickers("binance", tickers)
 
         assert result is True
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        assert set(mapping) == {"BTCUSDT", "ETHUSDT", "__updated_at__"}
+        assert json.loads(mapping["BTCUSDT"]) == [50000.0, 49999.5, 50000.5, 1]
+        # Symbols of an earlier payload are dropped, not kept alive by the new TTL
+        pipe.delete.assert_called_once_with("ticker_table:binance")
+        pipe.expire.assert_called_once_with("ticker_table:binance", CacheService.TTL_TICKERS)
+        pipe.execute.assert_awaited_once()
 
 
 class TestCacheServiceBalance:
@@ -0,0 +1,166 @@
+"""Tests for exchange_abstraction/connector_pool.py."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.exchange_abstraction.connector_pool import ConnectorPool
+
+
+def _make_factory():
+    """Factory returning a fresh mock connector per call."""
+    def factory(exchange_type, exchange_config=None, use_cache=True):
+        connector = MagicMock()
+        connector.close = AsyncMock()
+        return connector
+    return MagicMock(side_effect=factory)
+
+
+class TestAcquireRelease:
+    """Tests for borrowing and returning connectors."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_connector_across_borrows(self):
+        """Second borrow of the same account is a hit and returns the same instance."""
+        pool = ConnectorPool()
+        factory = _make_factory()
+        config = {"encrypted_data": "abc"}
+
+        c1 = await pool.acquire("u1", "binance", config, connector_factory=factory)
+        await pool.release(c1)
+        c2 = await pool.acquire("u1", "binance", config, connector_factory=factory)
+        await pool.release(c2)
+
+        assert c1 is c2
+        assert factory.call_count == 1
+        c1.close.assert_not_called()
+        metrics = pool.get_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["open_sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bypasses_factory_cache(self):
+        """The pool owns instances, so it asks the factory for uncached ones."""
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        await pool.acquire("u1", "binance", {"encrypted_data": "abc"}, connector_factory=factory)
+
+        factory.assert_called_once_with("binance", exchange_config={"encrypted_data": "abc"}, use_cache=False)
+
+    @pytest.mark.asyncio
+    async def test_accounts_are_isolated(self):
+        """Different users and exchanges get different connectors."""
+        pool = ConnectorPool()
+        factory = _make_factory()
+        config = {"encrypted_data": "abc"}
+
+        c1 = await pool.acquire("u1", "binance", config, connector_factory=factory)
+        c2 = await pool.acquire("u2", "binance", config, connector_factory=factory)
+        c3 = await pool.acquire("u1", "bybit", config, connector_factory=factory)
+
+        assert len({id(c1), id(c2), id(c3)}) == 3
+        assert pool.get_metrics()["borrowed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_release_unknown_connector_closes_it(self):
+        """Connectors not owned by the pool are closed on release."""
+        pool = ConnectorPool()
+        connector = MagicMock()
+        connector.close = AsyncMock()
+
+        await pool.release(connector)
+
+        connector.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_connection_context_manager(self):
+        """connection() releases the borrow on exit."""
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        async with pool.connection("u1", "mock", {}, connector_factory=factory) as connector:
+            assert pool.get_metrics()["borrowed"] == 1
+
+        assert pool.get_metrics()["borrowed"] == 0
+        connector.close.assert_not_called()
+
+
+class TestKeyRefresh:
+    """Tests for replacing connectors when stored keys change."""
+
+    @pytest.mark.asyncio
+    async def test_changed_keys_open_new_connector(self):
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        old = await pool.acquire("u1", "binance", {"encrypted_data": "old"}, connector_factory=factory)
+        await pool.release(old)
+        new = await pool.acquire("u1", "binance", {"encrypted_data": "new"}, connector_factory=factory)
+
+        assert new is not old
+        old.close.assert_awaited_once()
+        assert pool.get_metrics()["key_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retired_connector_closed_after_last_release(self):
+        """A borrowed connector is only closed once its borrower hands it back."""
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        old = await pool.acquire("u1", "binance", {"encrypted_data": "old"}, connector_factory=factory)
+        new = await pool.acquire("u1", "binance", {"encrypted_data": "new"}, connector_factory=factory)
+
+        old.close.assert_not_called()
+        assert pool.get_metrics()["open_sessions"] == 2
+
+        await pool.release(old)
+
+        old.close.assert_awaited_once()
+        assert pool.get_metrics()["open_sessions"] == 1
+        await pool.release(new)
+        new.close.assert_not_called()
+
+
+class TestEviction:
+    """Tests for idle eviction and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_idle_connectors(self):
+        pool = ConnectorPool(idle_ttl_seconds=0)
+        factory = _make_factory()
+
+        idle = await pool.acquire("u1", "binance", {}, connector_factory=factory)
+        await pool.release(idle)
+        busy = await pool.acquire("u2", "binance", {}, connector_factory=factory)
+
+        evicted = await pool.evict_idle()
+
+        assert evicted == 1
+        idle.close.assert_awaited_once()
+        busy.close.assert_not_called()
+        assert pool.get_metrics()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_all(self):
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        c1 = await pool.acquire("u1", "binance", {}, connector_factory=factory)
+        c2 = await pool.acquire("u2", "bybit", {}, connector_factory=factory)
+        await pool.release(c1)
+
+        await pool.close_all()
+
+        c1.close.assert_awaited_once()
+        c2.close.assert_awaited_once()
+        assert pool.get_metrics()["open_sessions"] == 0
+
+    @pytest.mark.asyncio
+    async def test_close_errors_are_swallowed(self):
+        pool = ConnectorPool()
+        factory = _make_factory()
+
+        connector = await pool.acquire("u1", "binance", {}, connector_factory=factory)
+        connector.close.side_effect = Exception("already closed")
+
+        await pool.close_all()
@@ -0,0 +1,129 @@
+"""
+Tests for the deadline scheduler: timer wheel firing, cascading and
+cancellation, and dispatch/resync through the Redis sorted set.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.deadline_scheduler import DeadlineScheduler, TimerWheel, to_timestamp
+
+START = 1_000_000.0
+
+
+class TestTimerWheel:
+    def test_fires_at_the_deadline_not_before(self):
+        wheel = TimerWheel(now=START)
+        wheel.add("a", START + 10.5)
+
+        assert wheel.advance(START + 10) == []
+        assert wheel.next_wakeup() == START + 11
+        assert wheel.advance(START + 11) == [("a", START + 10.5)]
+        assert len(wheel) == 0 and wheel.next_wakeup() is None
+
+    def test_far_deadlines_cascade_down_the_levels(self):
+        wheel = TimerWheel(levels=2, now=START)
+        due = {"minute": START + 70, "hour": START + 3600, "week": START + 7 * 86400}
+        for key, at in due.items():
+            wheel.add(key, at)
+
+        fired = []
+        for now in (START + 69, START + 70, START + 3599, START + 3600, START + 7 * 86400 - 1, START + 7 * 86400):
+            fired.append({key for key, _ in wheel.advance(now)})
+        assert fired == [set(), {"minute"}, set(), {"hour"}, set(), {"week"}]
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(now=START)
+        wheel.add("a", START + 5)
+        wheel.add("b", START + 5)
+        assert wheel.cancel("a") and not wheel.cancel("a")
+        wheel.add("b", START + 500)
+
+        assert wheel.advance(START + 100) == []
+        assert wheel.get("b") == START + 500
+        # Overdue deadlines fire on the next advance
+        wheel.add("c", START - 30)
+        assert [key for key, _ in wheel.advance(START + 100)] == ["c"]
+
+
+def _cache(deadlines=None):
+    cache = AsyncMock()
+    cache.get_deadlines.return_value = deadlines or {}
+    return cache
+
+
+class TestDeadlineScheduler:
+    @pytest.mark.asyncio
+    async def test_schedule_persists_and_dispatch_removes_only_due_members(self):
+        cache = _cache()
+        scheduler = DeadlineScheduler()
+        handler = AsyncMock()
+        scheduler.register("risk_timer", handler)
+        due = datetime.utcnow() - timedelta(seconds=5)
+
+        with patch("app.core.cache.get_cache", new=AsyncMock(return_value=cache)):
+            await scheduler.schedule("risk_timer", {"u1:g1": due})
+            now = to_timestamp(due) + 10
+            await scheduler._dispatch(scheduler._wheel.advance(now), now)
+
+        cache.add_deadlines.assert_awaited_once_with("risk_timer", {"u1:g1": to_timestamp(due)})
+        handler.assert_awaited_once_with(["u1:g1"])
+        cache.remove_due_deadlines.assert_awaited_once_with("risk_timer", ["u1:g1"], now)
+
+    @pytest.mark.asyncio
+    async def test_resync_loads_deadlines_of_registered_kinds(self):
+        due = to_timestamp(datetime.utcnow()) + 20
+        cache = _cache({"u2:g2": due})
+        scheduler = DeadlineScheduler()
+        scheduler.register("closing_recovery", AsyncMock())
+
+        with patch("app.core.cache.get_cache", new=AsyncMock(return_value=cache)):
+            await scheduler._resync(due - 20)
+
+        assert cache.get_deadlines.await_args.args == ("closing_recovery", due - 20 + 2 * scheduler.resync_interval_seconds)
+        assert scheduler._wheel.get(("closing_recovery", "u2:g2")) == due
+
+    @pytest.mark.asyncio
+    async def test_deadlines_without_handler_stay_persisted(self):
+        cache = _cache()
+        scheduler = DeadlineScheduler()
+
+        with patch("app.core.cache.get_cache", new=AsyncMock(return_value=cache)):
+            await scheduler.schedule("risk_timer", {"u1:g1": datetime.utcnow()})
+            now = to_timestamp(datetime.utcnow()) + 5
+            await scheduler._dispatch(scheduler._wheel.advance(now), now)
+
+        cache.remove_due_deadlines.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_handler_keeps_deadlines_persisted(self):
+        cache = _cache()
+        scheduler = DeadlineScheduler()
+        scheduler.register("risk_timer", AsyncMock(side_effect=RuntimeError("db down")))
+
+        with patch("app.core.cache.get_cache", new=AsyncMock(return_value=cache)):
+            await scheduler.schedule("risk_timer", {"u1:g1": datetime.utcnow()})
+            now = to_timestamp(datetime.utcnow()) + 5
+            await scheduler._dispatch(scheduler._wheel.advance(now), now)
+
+        cache.remove_due_deadlines.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_only_owned_members_are_loaded_and_fired(self):
+        due = to_timestamp(datetime.utcnow()) + 20
+        cache = _cache({"mine:g1": due, "theirs:g2": due})
+        scheduler = DeadlineScheduler()
+        handler = AsyncMock()
+        owned = {"mine:g1"}
+        scheduler.register("risk_timer", handler, owns=lambda member: member in owned)
+
+        with patch("app.core.cache.get_cache", new=AsyncMock(return_value=cache)):
+            await scheduler._resync(due - 20)
+            assert ("risk_timer", "theirs:g2") not in scheduler._wheel
+            # The shard moved to another worker after loading
+            owned.clear()
+            await scheduler._dispatch(scheduler._wheel.advance(due + 1), due + 1)
+
+        handler.assert_not_awaited()
+        cache.remove_due_deadlines.assert_not_awaited()
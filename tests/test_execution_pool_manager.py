@@ -1,104 +1,195 @@
 
-import pytest
-from decimal import Decimal
+import asyncio
 import uuid
 from unittest.mock import AsyncMock, MagicMock
-from sqlalchemy.ext.asyncio import AsyncSession
+
+import pytest
 
 from app.services.execution_pool_manager import ExecutionPoolManager
 from app.repositories.position_group import PositionGroupRepository
-from app.models.position_group import PositionGroup, PositionGroupStatus
 
 # --- Fixtures ---
 
 @pytest.fixture
-def mock_position_group_repository_class():
+def user_id():
+    return uuid.uuid4()
+
+@pytest.fixture
+def live_groups(user_id):
+    """Live position group count per user, as the database would report it."""
+    return {user_id: 0}
+
+@pytest.fixture
+def mock_position_group_repository_class(live_groups):
+    async def count_active_by_user(user_id=None):
+        if user_id is not None:
+            return {user_id: live_groups[user_id]} if live_groups.get(user_id) else {}
+        return {uid: count for uid, count in live_groups.items() if count}
+
     mock_instance = MagicMock(spec=PositionGroupRepository)
-    mock_instance.count_by_status.return_value = AsyncMock(return_value=0) # Mock count_by_status
-    mock_class = MagicMock(spec=PositionGroupRepository, return_value=mock_instance)
-    return mock_class
+    mock_instance.count_active_by_user = AsyncMock(side_effect=count_active_by_user)
+    return MagicMock(spec=PositionGroupRepository, return_value=mock_instance)
 
 @pytest.fixture
 def mock_session_factory():
-    async def factory():
-        mock_session_obj = AsyncMock()
-        yield mock_session_obj
-        await mock_session_obj.close()
-    return factory
+    class SessionContext:
+        async def __aenter__(self):
+            return AsyncMock()
+
+        async def __aexit__(self, *args):
+            pass
+
+    return SessionContext
 
 @pytest.fixture
-def execution_pool_manager_service(
-    mock_session_factory,
-    mock_position_group_repository_class
-):
+def execution_pool_manager_service(mock_session_factory, mock_position_group_repository_class, pool_cache):
     return ExecutionPoolManager(
         session_factory=mock_session_factory,
         position_group_repository_class=mock_position_group_repository_class,
-        max_open_groups=3 # Set a max limit for testing
+        max_open_groups=3, # Set a max limit for testing
+        cache=pool_cache
     )
 
 # --- Tests ---
 
 @pytest.mark.asyncio
-async def test_request_slot_available(execution_pool_manager_service, mock_position_group_repository_class):
+async def test_request_slot_available(execution_pool_manager_service, user_id, live_groups):
     """
     Test that a slot is granted when the number of active groups is below the max limit.
     """
-    execution_pool_manager_service.get_current_pool_size = AsyncMock(return_value=0)
-
-    slot_granted = await execution_pool_manager_service.request_slot()
+    live_groups[user_id] = 2
 
-    assert slot_granted is True
-    execution_pool_manager_service.get_current_pool_size.assert_called_once_with(for_update=True)
+    slot = await execution_pool_manager_service.request_slot(user_id)
 
-    # CRITICAL: Verify the pool state was checked before granting slot
-    current_size = await execution_pool_manager_service.get_current_pool_size()
-    max_limit = execution_pool_manager_service.max_open_groups
-    assert current_size < max_limit, \
-        f"Slot should only be granted when current size ({current_size}) < max ({max_limit})"
+    assert slot is not None
+    assert slot.user_id == str(user_id)
+    assert slot.lease_id is not None
 
 
 @pytest.mark.asyncio
-async def test_request_slot_not_available(execution_pool_manager_service, mock_position_group_repository_class):
+async def test_request_slot_not_available(execution_pool_manager_service, user_id, live_groups, pool_cache):
     """
     Test that a slot is NOT granted when the number of active groups is at or above the max limit.
     """
-    execution_pool_manager_service.get_current_pool_size = AsyncMock(return_value=3)  # Pool is full
+    live_groups[user_id] = 3
 
-    slot_granted = await execution_pool_manager_service.request_slot()
+    slot = await execution_pool_manager_service.request_slot(user_id)
 
-    assert slot_granted is False
-    execution_pool_manager_service.get_current_pool_size.assert_called_once_with(for_update=True)
-
-    # CRITICAL: Verify the pool state was checked and slot was correctly denied
-    current_size = await execution_pool_manager_service.get_current_pool_size()
-    max_limit = execution_pool_manager_service.max_open_groups
-    assert current_size >= max_limit, \
-        f"Slot should be denied when current size ({current_size}) >= max ({max_limit})"
-
-    # CRITICAL: Verify internal state was not modified (no slot was taken)
-    # The pool manager should not increment any counter when denying a slot
+    assert slot is None
+    # The denied request must not hold a lease
+    assert (await pool_cache.get_pool_state(str(user_id)))["leases"] == 0
+    assert execution_pool_manager_service.get_metrics()["denied"] == 1
 
 
 @pytest.mark.asyncio
-async def test_request_slot_with_override(execution_pool_manager_service, mock_position_group_repository_class):
+async def test_request_slot_with_override(execution_pool_manager_service, user_id, live_groups):
     """
     Test that max_open_groups_override parameter works correctly.
 
     Note: Pyramid continuation bypass is handled at the signal routing level
     via the same_pair_timeframe priority rule configuration, not here.
     """
-    # Pool has 2 active groups
-    execution_pool_manager_service.get_current_pool_size = AsyncMock(return_value=2)
-
-    # With default limit of 3, should grant slot
-    slot_granted = await execution_pool_manager_service.request_slot()
-    assert slot_granted is True
+    live_groups[user_id] = 2
 
     # With override limit of 2, should deny slot (2 >= 2)
-    slot_granted = await execution_pool_manager_service.request_slot(max_open_groups_override=2)
-    assert slot_granted is False
+    assert await execution_pool_manager_service.request_slot(user_id, max_open_groups_override=2) is None
 
     # With override limit of 3, should grant slot (2 < 3)
-    slot_granted = await execution_pool_manager_service.request_slot(max_open_groups_override=3)
-    assert slot_granted is True
+    assert await execution_pool_manager_service.request_slot(user_id, max_open_groups_override=3) is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_never_over_admit(execution_pool_manager_service, user_id, live_groups):
+    """A webhook burst gets exactly the free slots, not one per request that saw a stale count."""
+    live_groups[user_id] = 1
+
+    slots = await asyncio.gather(*[execution_pool_manager_service.request_slot(user_id) for _ in range(10)])
+
+    assert sum(1 for slot in slots if slot is not None) == 2
+
+
+@pytest.mark.asyncio
+async def test_pools_are_per_user(execution_pool_manager_service, user_id, live_groups):
+    other_user = uuid.uuid4()
+    live_groups[user_id] = 3
+    live_groups[other_user] = 0
+
+    assert await execution_pool_manager_service.request_slot(user_id) is None
+    assert await execution_pool_manager_service.request_slot(other_user) is not None
+
+
+@pytest.mark.asyncio
+async def test_occupied_release_keeps_slot_and_plain_release_frees_it(execution_pool_manager_service, user_id, pool_cache):
+    manager = execution_pool_manager_service
+    first = await manager.request_slot(user_id, max_open_groups_override=1)
+    assert await manager.request_slot(user_id, max_open_groups_override=1) is None
+
+    # Abandoned admission (e.g. pyramid onto an existing group) frees the slot
+    await manager.release_slot(first)
+    second = await manager.request_slot(user_id, max_open_groups_override=1)
+    assert second is not None
+
+    # An admission that created a group keeps the slot
+    await manager.release_slot(second, occupied=True)
+    state = await pool_cache.get_pool_state(str(user_id))
+    assert (state["occupied"], state["leases"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_denied_request_recounts_closed_groups(execution_pool_manager_service, user_id, live_groups):
+    manager = execution_pool_manager_service
+    for _ in range(3):
+        await manager.release_slot(await manager.request_slot(user_id), occupied=True)
+    live_groups[user_id] = 3
+    assert await manager.request_slot(user_id) is None
+
+    # A group closes elsewhere; the next request sees it without waiting for reconciliation
+    live_groups[user_id] = 2
+    assert await manager.request_slot(user_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_reconcile_does_not_overwrite_concurrent_admission(execution_pool_manager_service, user_id, live_groups, pool_cache, mock_position_group_repository_class):
+    manager = execution_pool_manager_service
+    await manager.request_slot(user_id)
+    repo = mock_position_group_repository_class.return_value
+    count = repo.count_active_by_user.side_effect
+    calls = []
+
+    async def count_with_concurrent_admission(uid=None):
+        result = await count(uid)
+        calls.append(uid)
+        if len(calls) == 2:
+            # A group is created and its lease released after the versions were read
+            live_groups[user_id] = 1
+            await pool_cache.release_pool_slot(str(user_id), "other-lease", occupied=True)
+        return result
+
+    repo.count_active_by_user.side_effect = count_with_concurrent_admission
+    await manager.reconcile()
+
+    state = await pool_cache.get_pool_state(str(user_id))
+    assert state["occupied"] == 1
+    assert manager.get_metrics()["reconcile_conflicts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_database_count_without_redis(mock_session_factory, mock_position_group_repository_class, user_id, live_groups):
+    cache = AsyncMock()
+    cache.acquire_pool_slot.return_value = None
+    manager = ExecutionPoolManager(
+        session_factory=mock_session_factory,
+        position_group_repository_class=mock_position_group_repository_class,
+        max_open_groups=3,
+        cache=cache
+    )
+
+    live_groups[user_id] = 2
+    slot = await manager.request_slot(user_id)
+    assert slot is not None and slot.lease_id is None
+    await manager.release_slot(slot, occupied=True)
+    cache.release_pool_slot.assert_not_awaited()
+
+    live_groups[user_id] = 3
+    assert await manager.request_slot(user_id) is None
+    assert manager.get_metrics()["fallbacks"] == 2
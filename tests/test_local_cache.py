@@ -0,0 +1,130 @@
+"""
+Tests for the in-process L1 cache and its use by CacheService: bounded LRU,
+TTL expiry, invalidation (local and pushed) and read-through to Redis.
+"""
+import json
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.cache import CacheService
+from app.core.local_cache import LocalCache
+
+
+class TestLocalCache:
+    def test_lru_evicts_least_recently_used(self):
+        local = LocalCache(max_entries=2)
+        local.set("ns", "a", 1, ttl=60)
+        local.set("ns", "b", 2, ttl=60)
+        local.get("ns", "a")
+        local.set("ns", "c", 3, ttl=60)
+
+        assert local.get("ns", "a") == (True, 1)
+        assert local.get("ns", "b") == (False, None)
+        assert local.evictions == 1
+
+    def test_expired_entry_is_a_miss(self):
+        local = LocalCache()
+        with patch("app.core.local_cache.time.monotonic", return_value=100.0):
+            local.set("ns", "a", 1, ttl=5)
+        with patch("app.core.local_cache.time.monotonic", return_value=106.0):
+            assert local.get("ns", "a") == (False, None)
+
+    def test_invalidate_by_prefix(self):
+        local = LocalCache()
+        local.set("dca_config", "dca_config:u1:binance", 1, ttl=60)
+        local.set("dca_config", "dca_config:u2:binance", 2, ttl=60)
+
+        assert local.invalidate("dca_config", "dca_config:u1:") == 1
+        assert local.get("dca_config", "dca_config:u1:binance") == (False, None)
+        assert local.get("dca_config", "dca_config:u2:binance") == (True, 2)
+
+    def test_fill_racing_with_invalidation_is_dropped(self):
+        local = LocalCache()
+        version = local.version("ns")
+        local.invalidate("ns", "a")
+
+        # A value read from Redis before the invalidation must not be cached
+        local.set("ns", "a", "stale", ttl=60, version=version)
+        assert local.get("ns", "a") == (False, None)
+
+    def test_metrics_per_namespace(self):
+        local = LocalCache()
+        local.set("precision", "k", 1, ttl=60)
+        local.get("precision", "k")
+        local.get("precision", "missing")
+
+        stats = local.get_metrics()["namespaces"]["precision"]
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def _cache(redis_value=None):
+    cache = CacheService()
+    cache._connected = True
+    cache._redis = AsyncMock()
+    cache._redis.get.return_value = redis_value
+    return cache
+
+
+class TestTieredCacheService:
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit_redis_once(self):
+        rules = {"BTCUSDT": {"tick_size": "0.01", "min_qty": "0.001"}}
+        cache = _cache(json.dumps(rules))
+
+        first = await cache.get_precision_rules("binance")
+        second = await cache.get_precision_rules("binance")
+
+        assert first["BTCUSDT"]["tick_size"] == 0.01
+        assert second is first
+        cache._redis.get.assert_awaited_once()
+        stats = cache.get_local_cache_metrics()["namespaces"]["precision"]
+        assert (stats["hits"], stats["redis_hits"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_set_serves_the_decoded_value_locally(self):
+        cache = _cache()
+        await cache.set_dca_config("u1", "BTC/USDT", "60", "binance", {"weight": Decimal("0.5")})
+
+        # Same shape a worker reading from Redis would get, not the caller's object
+        assert await cache.get_dca_config("u1", "BTC/USDT", "60", "binance") == {"weight": 0.5}
+        cache._redis.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_misses_are_not_cached(self):
+        cache = _cache()
+        cache._redis.hmget.return_value = [None, None]
+        assert await cache.get_tickers("binance", ["BTC/USDT"]) is None
+        assert await cache.get_tickers("binance", ["BTC/USDT"]) is None
+        assert cache._redis.hmget.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_is_local_and_published(self):
+        cache = _cache()
+        cache._redis.scan_iter = lambda match: _empty()
+        await cache.set_dca_config("u1", "BTC/USDT", "60", "binance", {"a": 1})
+
+        await cache.invalidate_user_dca_configs("u1")
+
+        found, _ = cache._local.get("dca_config", "dca_config:u1:binance:BTC/USDT:60")
+        assert not found
+        channel, payload = cache._redis.publish.await_args.args
+        assert channel == "channel:cache_invalidation"
+        assert json.loads(payload)["prefix"] == "dca_config:u1:"
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_is_applied_and_own_is_ignored(self):
+        cache = _cache()
+        await cache.set_balance("u1", "binance", {"USDT": 10})
+
+        cache.handle_invalidation({"origin": cache._instance_id, "namespace": "balance", "prefix": "balance:u1:"})
+        assert cache._local.get("balance", "balance:u1:binance")[0]
+
+        cache.handle_invalidation({"origin": "other-worker", "namespace": "balance", "prefix": "balance:u1:"})
+        assert not cache._local.get("balance", "balance:u1:binance")[0]
+
+
+async def _empty():
+    return
+    yield
@@ -0,0 +1,173 @@
+"""Tests for the shared MarketDataService ticker table."""
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.market_data import MarketDataService, feed_key, get_symbol_tickers
+
+
+def _connector(tickers):
+    connector = MagicMock()
+    connector.get_all_tickers = AsyncMock(return_value=tickers)
+    return connector
+
+
+@pytest.fixture
+def market_data():
+    return MarketDataService(publish_to_cache=False)
+
+
+class TestFeedKey:
+    """Tests for feed_key."""
+
+    def test_mainnet_feed(self):
+        connector = MagicMock()
+        connector.testnet = False
+        assert feed_key("Binance", connector) == "binance"
+
+    def test_testnet_feeds_are_separate(self):
+        binance = MagicMock()
+        binance.testnet = True
+        bybit = MagicMock(spec=["testnet_mode"])
+        bybit.testnet_mode = True
+
+        assert feed_key("binance", binance) == "binance_testnet"
+        assert feed_key("bybit", bybit) == "bybit_testnet"
+
+    def test_testnet_flag_without_connector(self):
+        assert feed_key("Binance", testnet=True) == "binance_testnet"
+        assert feed_key("Binance", testnet=False) == "binance"
+
+
+class TestTable:
+    """Tests for update_tickers and lookup."""
+
+    def test_lookup_both_symbol_forms(self, market_data):
+        market_data.update_tickers("binance", {"BTC/USDT": {"last": 50000.5}})
+
+        assert market_data.lookup("binance", "BTC/USDT") == Decimal("50000.5")
+        assert market_data.lookup("binance", "BTCUSDT") == Decimal("50000.5")
+
+    def test_stale_entries_are_not_returned(self, market_data):
+        with patch("app.services.market_data.time.monotonic", return_value=100.0):
+            market_data.update_tickers("binance", {"BTCUSDT": {"last": 1}})
+        with patch("app.services.market_data.time.monotonic", return_value=103.0):
+            assert market_data.lookup("binance", "BTCUSDT", max_age_seconds=5) == Decimal("1")
+            assert market_data.lookup("binance", "BTCUSDT", max_age_seconds=2) is None
+
+    def test_ignores_malformed_tickers(self, market_data):
+        parsed = market_data.update_tickers("binance", {"A": {"last": None}, "B": {"last": "x"}, "C": {"last": 2}})
+        assert parsed == {"C": Decimal("2")}
+        assert market_data.update_tickers("binance", MagicMock()) == {}
+
+
+class TestGetPrices:
+    """Tests for the pull-through consumer API."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_table_served_without_exchange_call(self, market_data):
+        connector = _connector({"BTC/USDT": {"last": 100}, "ETH/USDT": {"last": 10}})
+
+        first = await market_data.get_prices("binance", ["BTC/USDT"], connector, max_age_seconds=10)
+        second = await market_data.get_prices("binance", ["BTC/USDT", "ETH/USDT"], connector, max_age_seconds=10)
+
+        assert first == {"BTC/USDT": Decimal("100")}
+        assert second == {"BTC/USDT": Decimal("100"), "ETH/USDT": Decimal("10")}
+        connector.get_all_tickers.assert_awaited_once()
+        assert market_data.get_metrics()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_consumers_share_one_refresh(self, market_data):
+        async def slow_tickers():
+            await asyncio.sleep(0.01)
+            return {"BTCUSDT": {"last": 1}}
+
+        connector = MagicMock()
+        connector.get_all_tickers = AsyncMock(side_effect=slow_tickers)
+
+        results = await asyncio.gather(*[
+            market_data.get_prices("binance", ["BTCUSDT"], connector, max_age_seconds=10)
+            for _ in range(5)
+        ])
+
+        assert all(r == {"BTCUSDT": Decimal("1")} for r in results)
+        connector.get_all_tickers.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_symbol_omitted(self, market_data):
+        connector = _connector({"BTCUSDT": {"last": 1}})
+
+        price = await market_data.get_price("binance", "NOPEUSDT", connector)
+
+        assert price is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_returns_empty(self, market_data):
+        connector = MagicMock()
+        connector.get_all_tickers = AsyncMock(side_effect=Exception("API down"))
+
+        prices = await market_data.get_prices("binance", ["BTCUSDT"], connector)
+
+        assert prices == {}
+        assert market_data.get_metrics()["refresh_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_listeners_receive_refreshed_prices(self, market_data):
+        listener = AsyncMock()
+        market_data.add_listener(listener)
+        connector = _connector({"BTCUSDT": {"last": 1}})
+
+        await market_data.get_prices("binance", ["BTCUSDT"], connector)
+
+        listener.assert_awaited_once_with("binance", {"BTCUSDT": Decimal("1")})
+
+    @pytest.mark.asyncio
+    async def test_publishes_to_redis_ticker_cache(self):
+        market_data = MarketDataService(publish_to_cache=True)
+        connector = _connector({"BTCUSDT": {"last": 1}})
+        mock_cache = MagicMock()
+        mock_cache.set_tickers = AsyncMock()
+
+        with patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            await market_data.get_prices("binance", ["BTCUSDT"], connector)
+
+        mock_cache.set_tickers.assert_awaited_once_with("binance", {"BTCUSDT": {"last": 1}})
+
+
+class TestSymbolTickers:
+    """Tests for get_symbol_tickers (API reads of the Redis ticker table)."""
+
+    @pytest.mark.asyncio
+    async def test_cached_symbols_do_not_touch_the_exchange(self):
+        cache = MagicMock()
+        cache.get_tickers = AsyncMock(return_value={"BTC/USDT": {"last": 1}})
+        connector = _connector({})
+
+        tickers = await get_symbol_tickers(cache, "binance", ["BTC/USDT", "BTC/USDT"], connector)
+
+        assert tickers == {"BTC/USDT": {"last": 1}}
+        cache.get_tickers.assert_awaited_once_with("binance", ["BTC/USDT"])
+        connector.get_all_tickers.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_miss_fetches_all_tickers_once_and_picks_requested(self):
+        cache = MagicMock()
+        cache.get_tickers = AsyncMock(return_value=None)
+        cache.set_tickers = AsyncMock()
+        all_tickers = {"BTC/USDT": {"last": 1}, "ETH/USDT": {"last": 2}}
+        connector = _connector(all_tickers)
+
+        tickers = await get_symbol_tickers(cache, "binance", ["BTCUSDT", "DOGE/USDT"], connector)
+
+        assert tickers == {"BTCUSDT": {"last": 1}}
+        cache.set_tickers.assert_awaited_once_with("binance", all_tickers)
+
+    @pytest.mark.asyncio
+    async def test_no_symbols_reads_nothing(self):
+        cache = MagicMock()
+        cache.get_tickers = AsyncMock()
+
+        assert await get_symbol_tickers(cache, "binance", [], _connector({})) == {}
+        cache.get_tickers.assert_not_awaited()
@@ -278,7 +278,11 @@ class TestCheckPyramidAggregateTPForIdlePositions:
         with patch("app.services.order_fill_monitor.get_exchange_connector", return_value=mock_connector):
             await mock_monitor_service._check_pyramid_aggregate_tp_for_idle_positions(session, user)
 
-        mock_connector.close.assert_called_once()
+        # Connector is returned to the pool and kept warm for the next cycle
+        mock_connector.close.assert_not_called()
+        metrics = mock_monitor_service.connector_pool.get_metrics()
+        assert metrics["open_sessions"] == 1
+        assert metrics["borrowed"] == 0
 
     @pytest.mark.asyncio
     async def test_skips_exchange_without_keys(self, mock_monitor_service):
@@ -0,0 +1,167 @@
+"""
+Tests for per-group units of work in the fill monitor and per-order sessions
+for risk offset close orders.
+"""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.dca_order import DCAOrder, OrderStatus
+from app.schemas.grid_config import RiskEngineConfig
+from app.services.order_fill_monitor import OrderFillMonitorService
+from app.services.risk_engine import RiskEngineService
+
+
+class SessionRecorder:
+    """session_factory that hands out a fresh mock session per call."""
+
+    def __init__(self):
+        self.sessions = []
+        self.fail_commit_at = None
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = AsyncMock()
+        session.add = MagicMock()
+        if len(self.sessions) == self.fail_commit_at:
+            session.commit.side_effect = Exception("deadlock detected")
+        self.sessions.append(session)
+        yield session
+
+
+def _order(group, status=OrderStatus.OPEN.value):
+    order = DCAOrder(id=uuid.uuid4(), group_id=group.id, status=status, symbol="BTCUSDT")
+    order.group = group
+    order.pyramid = None
+    return order
+
+
+def _group():
+    group = MagicMock()
+    group.id = uuid.uuid4()
+    group.exchange = "binance"
+    group.status = "active"
+    return group
+
+
+@pytest.fixture
+def sessions():
+    return SessionRecorder()
+
+
+@pytest.fixture
+def monitor(sessions):
+    service = OrderFillMonitorService(
+        session_factory=sessions,
+        dca_order_repository_class=MagicMock(),
+        position_group_repository_class=MagicMock(),
+        order_service_class=MagicMock(),
+        position_manager_service_class=MagicMock(),
+        connector_pool=MagicMock(acquire=AsyncMock(return_value=MagicMock()), release=AsyncMock()),
+        market_data=MagicMock(),
+        exchange_concurrency={"binance": 1}
+    )
+    service.encryption_service = MagicMock()
+    service.encryption_service.decrypt_keys.return_value = ("key", "secret")
+    service._fetch_all_prices = AsyncMock(return_value={})
+    service._check_idle_positions = AsyncMock()
+    return service
+
+
+class TestGroupUnitsOfWork:
+    """Tests for OrderFillMonitorService._check_orders units of work."""
+
+    async def _run(self, monitor, orders):
+        user = MagicMock(id=uuid.uuid4(), encrypted_api_keys={"binance": {"encrypted_data": "x"}})
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_all_open_orders_for_all_users = AsyncMock(return_value={str(user.id): orders})
+
+        with patch("app.services.order_fill_monitor.UserRepository") as user_repo_cls:
+            user_repo_cls.return_value.get_all_active_users = AsyncMock(return_value=[user])
+            await monitor._check_orders()
+
+    @pytest.mark.asyncio
+    async def test_each_group_gets_its_own_session(self, monitor, sessions):
+        group_a, group_b = _group(), _group()
+        orders = [_order(group_a), _order(group_a), _order(group_b)]
+        seen = {}
+
+        async def process(order, session, **kwargs):
+            seen.setdefault(order.group_id, set()).add(id(session))
+
+        monitor._process_single_order = AsyncMock(side_effect=process)
+        await self._run(monitor, orders)
+
+        # Discovery session plus one unit of work per group
+        assert len(sessions.sessions) == 3
+        assert all(len(ids) == 1 for ids in seen.values())
+        assert seen[group_a.id] != seen[group_b.id]
+        for unit in sessions.sessions[1:]:
+            unit.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_group_does_not_roll_back_others(self, monitor, sessions):
+        orders = [_order(_group()), _order(_group())]
+        monitor._process_single_order = AsyncMock()
+        # Sessions: discovery, first group, second group
+        sessions.fail_commit_at = 1
+
+        await self._run(monitor, orders)
+
+        first_unit, second_unit = sessions.sessions[1], sessions.sessions[2]
+        first_unit.rollback.assert_awaited_once()
+        second_unit.commit.assert_awaited_once()
+        second_unit.rollback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_exchange_concurrency_limits_parallel_groups(self, monitor):
+        running = 0
+        peak = 0
+
+        async def process(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        monitor._process_single_order = AsyncMock(side_effect=process)
+        await self._run(monitor, [_order(_group()) for _ in range(4)])
+
+        assert monitor._process_single_order.await_count == 4
+        assert peak == 1
+
+
+class TestCloseOrderSessions:
+    """Tests for RiskEngineService._execute_close_orders."""
+
+    @pytest.mark.asyncio
+    async def test_close_orders_run_in_separate_sessions(self, sessions):
+        order_service_cls = MagicMock()
+        order_service_cls.return_value.place_market_order = AsyncMock(
+            side_effect=[{"id": "1"}, Exception("insufficient balance")]
+        )
+        service = RiskEngineService(
+            session_factory=sessions,
+            position_group_repository_class=MagicMock(),
+            risk_action_repository_class=MagicMock(),
+            dca_order_repository_class=MagicMock(),
+            order_service_class=order_service_cls,
+            risk_engine_config=RiskEngineConfig(),
+            market_data=MagicMock()
+        )
+
+        results = await service._execute_close_orders(
+            MagicMock(), MagicMock(), [dict(symbol="BTCUSDT", quantity=Decimal("1")), dict(symbol="ETHUSDT", quantity=Decimal("2"))]
+        )
+
+        assert results[0] == {"id": "1"}
+        assert isinstance(results[1], Exception)
+        assert len(sessions.sessions) == 2
+        assert {call.kwargs["session"] for call in order_service_cls.call_args_list} == set(sessions.sessions)
+        assert sum(s.commit.await_count for s in sessions.sessions) == 1
+        assert sum(s.rollback.await_count for s in sessions.sessions) == 1
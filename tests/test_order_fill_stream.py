@@ -0,0 +1,277 @@
+"""
+Tests for event-driven fill detection: OrderFillStreamService, the fill monitor's
+process_order_update entry point and its REST reconciliation gating.
+"""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.dca_order import OrderStatus
+from app.services.exchange_abstraction.mock_connector import MockConnector
+from app.services.order_fill_monitor import OrderFillMonitorService
+from app.services.order_fill_stream import OrderFillStreamService
+
+
+def _session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+    return factory
+
+
+@pytest.fixture
+def mock_session():
+    session = AsyncMock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    session.flush = AsyncMock()
+    return session
+
+
+@pytest.fixture
+def monitor(mock_session):
+    return OrderFillMonitorService(
+        session_factory=_session_factory(mock_session),
+        dca_order_repository_class=MagicMock(),
+        position_group_repository_class=MagicMock(),
+        order_service_class=MagicMock(),
+        position_manager_service_class=MagicMock(),
+        polling_interval_seconds=1,
+        reconciliation_interval_seconds=30
+    )
+
+
+@pytest.fixture
+def user():
+    u = MagicMock()
+    u.id = uuid.uuid4()
+    u.encrypted_api_keys = {"binance": {"encrypted_data": "x"}}
+    return u
+
+
+class TestReconciliationGating:
+    """Tests for _should_reconcile."""
+
+    def test_reconciles_without_stream(self, monitor):
+        """Every cycle checks REST when no stream service is attached."""
+        assert monitor._should_reconcile("u1", "binance") is True
+        assert monitor._should_reconcile("u1", "binance") is True
+
+    def test_reconciles_when_stream_down(self, monitor):
+        """Every cycle checks REST while the account's stream is not live."""
+        monitor.fill_stream = MagicMock()
+        monitor.fill_stream.is_stream_live.return_value = False
+        assert monitor._should_reconcile("u1", "binance") is True
+        assert monitor._should_reconcile("u1", "binance") is True
+
+    def test_live_stream_reconciles_once_per_interval(self, monitor):
+        """A live stream limits REST checks to one per reconciliation interval."""
+        monitor.fill_stream = MagicMock()
+        monitor.fill_stream.is_stream_live.return_value = True
+
+        with patch("app.services.order_fill_monitor.time.monotonic", side_effect=[100.0, 110.0, 131.0]):
+            assert monitor._should_reconcile("u1", "binance") is True
+            assert monitor._should_reconcile("u1", "binance") is False
+            assert monitor._should_reconcile("u1", "binance") is True
+
+
+class TestProcessOrderUpdate:
+    """Tests for OrderFillMonitorService.process_order_update."""
+
+    def _order(self, status=OrderStatus.OPEN.value, group_status="live"):
+        order = MagicMock()
+        order.id = uuid.uuid4()
+        order.exchange_order_id = "111"
+        order.tp_order_id = "222"
+        order.tp_hit = False
+        order.status = status
+        order.group = MagicMock()
+        order.group.status = group_status
+        return order
+
+    @pytest.mark.asyncio
+    async def test_unknown_order_ignored(self, monitor, user, mock_session):
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_by_exchange_order_id_for_user = AsyncMock(return_value=None)
+
+        handled = await monitor.process_order_update(user, "binance", MagicMock(), {"id": "999"})
+
+        assert handled is False
+        mock_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_entry_fill_applies_update_and_handlers(self, monitor, user, mock_session):
+        order = self._order()
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_by_exchange_order_id_for_user = AsyncMock(return_value=order)
+
+        order_service = monitor.order_service_class.return_value
+        order_service.apply_order_update = AsyncMock(return_value=order)
+        monitor._handle_order_status_update = AsyncMock()
+
+        data = {"id": "111", "status": "closed", "filled": 1.0, "average": 100.0}
+        handled = await monitor.process_order_update(user, "binance", MagicMock(), data)
+
+        assert handled is True
+        order_service.apply_order_update.assert_awaited_once_with(order, data)
+        monitor._handle_order_status_update.assert_awaited_once()
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_tp_fill_runs_tp_handler(self, monitor, user, mock_session):
+        order = self._order(status=OrderStatus.FILLED.value)
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_by_exchange_order_id_for_user = AsyncMock(return_value=order)
+
+        def mark_hit(o, data):
+            o.tp_hit = True
+            return o
+
+        order_service = monitor.order_service_class.return_value
+        order_service.apply_tp_order_update = AsyncMock(side_effect=mark_hit)
+        monitor._handle_tp_hit = AsyncMock()
+
+        handled = await monitor.process_order_update(user, "binance", MagicMock(), {"id": "222", "status": "closed"})
+
+        assert handled is True
+        monitor._handle_tp_hit.assert_awaited_once()
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_closed_group_skipped(self, monitor, user, mock_session):
+        order = self._order(group_status="closed")
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_by_exchange_order_id_for_user = AsyncMock(return_value=order)
+
+        handled = await monitor.process_order_update(user, "binance", MagicMock(), {"id": "111"})
+
+        assert handled is True
+        monitor.order_service_class.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_error_rolls_back(self, monitor, user, mock_session):
+        order = self._order()
+        repo = monitor.dca_order_repository_class.return_value
+        repo.get_by_exchange_order_id_for_user = AsyncMock(return_value=order)
+        monitor.order_service_class.return_value.apply_order_update = AsyncMock(side_effect=Exception("boom"))
+
+        handled = await monitor.process_order_update(user, "binance", MagicMock(), {"id": "111"})
+
+        assert handled is False
+        mock_session.rollback.assert_awaited_once()
+
+
+class TestOrderFillStreamService:
+    """Tests for stream supervision."""
+
+    def _service(self, mock_session, pairs, users):
+        pg_repo_cls = MagicMock()
+        pg_repo_cls.return_value.get_active_user_exchanges = AsyncMock(return_value=pairs)
+        service = OrderFillStreamService(
+            session_factory=_session_factory(mock_session),
+            order_fill_monitor=MagicMock(),
+            position_group_repository_class=pg_repo_cls
+        )
+        self._users = users
+        return service
+
+    @pytest.mark.asyncio
+    async def test_refresh_starts_and_stops_streams(self, mock_session, user):
+        service = self._service(mock_session, [(user.id, "binance")], [user])
+        service._running = True
+        service._stream_loop = AsyncMock()
+
+        with patch("app.services.order_fill_stream.UserRepository") as user_repo_cls:
+            user_repo_cls.return_value.get_all_active_users = AsyncMock(return_value=[user])
+            await service._refresh_streams()
+            assert (str(user.id), "binance") in service._streams
+
+            service.position_group_repository_class.return_value.get_active_user_exchanges = AsyncMock(return_value=[])
+            await service._refresh_streams()
+            assert service._streams == {}
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_accounts_without_keys(self, mock_session, user):
+        user.encrypted_api_keys = {}
+        service = self._service(mock_session, [(user.id, "bybit")], [user])
+        service._running = True
+        service._stream_loop = AsyncMock()
+
+        with patch("app.services.order_fill_stream.UserRepository") as user_repo_cls:
+            user_repo_cls.return_value.get_all_active_users = AsyncMock(return_value=[user])
+            await service._refresh_streams()
+
+        assert service._streams == {}
+
+    @pytest.mark.asyncio
+    async def test_stream_loop_forwards_updates(self, mock_session, user):
+        service = self._service(mock_session, [], [user])
+        service._running = True
+        key = (str(user.id), "binance")
+        service._users[str(user.id)] = user
+
+        connector = MagicMock()
+        connector.supports_order_stream.return_value = True
+        connector.close = AsyncMock()
+        update = {"id": "111", "status": "closed"}
+
+        async def watch_orders():
+            if connector.watch_count:
+                service._running = False
+                raise asyncio.CancelledError()
+            connector.watch_count += 1
+            assert service.is_stream_live(str(user.id), "binance")
+            return [update]
+
+        connector.watch_count = 0
+        connector.watch_orders = watch_orders
+        service.order_fill_monitor.process_order_update = AsyncMock(return_value=True)
+
+        with patch("app.services.order_fill_stream.get_exchange_connector", return_value=connector):
+            with pytest.raises(asyncio.CancelledError):
+                await service._stream_loop(key)
+
+        service.order_fill_monitor.process_order_update.assert_awaited_once_with(user, "binance", connector, update)
+        assert service._events_processed == 1
+        assert not service.is_stream_live(str(user.id), "binance")
+        connector.close.assert_awaited()
+
+    @pytest.mark.asyncio
+    async def test_stream_loop_marks_unsupported(self, mock_session, user):
+        service = self._service(mock_session, [], [user])
+        service._running = True
+        key = (str(user.id), "binance")
+        service._users[str(user.id)] = user
+
+        connector = MagicMock()
+        connector.supports_order_stream.return_value = False
+        connector.close = AsyncMock()
+
+        with patch("app.services.order_fill_stream.get_exchange_connector", return_value=connector):
+            await service._stream_loop(key)
+
+        assert key in service._unsupported
+        assert not service.is_stream_live(str(user.id), "binance")
+
+
+class TestMockConnectorOrderEvents:
+    """Tests for MockConnector parsing of mock exchange ORDER_TRADE_UPDATE events."""
+
+    def test_parse_order_event(self):
+        event = {
+            "e": "ORDER_TRADE_UPDATE",
+            "o": {
+                "s": "BTCUSDT", "i": 12345, "X": "FILLED", "q": "0.01", "z": "0.01",
+                "p": "95000.0", "ap": "94990.0", "n": "0.38", "N": "USDT"
+            }
+        }
+
+        order = MockConnector._parse_order_event(event)
+
+        assert order["id"] == "12345"
+        assert order["status"] == "filled"
+        assert order["filled"] == 0.01
+        assert order["average"] == 94990.0
@@ -7,12 +7,12 @@ import asyncio
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.order_management import OrderService
+from app.services.order_management import OrderService, trigger_client_order_id
 from app.services.exchange_abstraction.interface import ExchangeInterface
 from app.repositories.dca_order import DCAOrderRepository
 from app.models.dca_order import DCAOrder, OrderStatus, OrderType
 from app.models.user import User 
-from app.exceptions import APIError, ExchangeConnectionError
+from app.exceptions import APIError, ExchangeConnectionError, OrderValidationError
 
 @pytest.fixture
 async def user_id_fixture(db_session: AsyncMock):
@@ -380,6 +380,172 @@ async def test_submit_order_max_retries_exceeded(order_service, mock_exchange_co
         mock_dca_order_repository.update.assert_awaited_once()
         assert mock_dca_order.status == OrderStatus.FAILED.value
 
+def _grid_leg(leg_index, price):
+    return DCAOrder(
+        id=uuid.uuid4(),
+        group_id=uuid.uuid4(),
+        pyramid_id=uuid.uuid4(),
+        leg_index=leg_index,
+        symbol="BTC/USDT",
+        side="buy",
+        order_type="limit",
+        price=Decimal(price),
+        quantity=Decimal("0.001"),
+        gap_percent=Decimal("0"),
+        weight_percent=Decimal("20"),
+        tp_percent=Decimal("1"),
+        tp_price=Decimal("60600"),
+        status=OrderStatus.PENDING,
+    )
+
+@pytest.mark.asyncio
+async def test_submit_orders_places_grid_in_one_call(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that a grid is placed through place_orders and recorded with one flush.
+    """
+    legs = [_grid_leg(i, price) for i, price in enumerate(["60000", "59000", "58000"])]
+    mock_exchange_connector.place_orders.return_value = [{"id": f"ex_{i}"} for i in range(3)]
+
+    await order_service.submit_orders(legs)
+
+    requests = mock_exchange_connector.place_orders.await_args.args[0]
+    assert [r["price"] for r in requests] == [Decimal("60000"), Decimal("59000"), Decimal("58000")]
+    assert requests[0]["order_type"] == "LIMIT" and requests[0]["amount_type"] == "base"
+    mock_exchange_connector.place_order.assert_not_awaited()
+    mock_dca_order_repository.update_all.assert_awaited_once_with(legs)
+    mock_dca_order_repository.update.assert_not_awaited()
+    assert [leg.exchange_order_id for leg in legs] == ["ex_0", "ex_1", "ex_2"]
+    assert all(leg.status == OrderStatus.OPEN.value for leg in legs)
+
+@pytest.mark.asyncio
+async def test_submit_orders_withdraws_placed_legs_before_raising(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that a rejected leg is marked FAILED, a leg that failed to connect is
+    retried alone, and the legs that were placed are cancelled before the
+    rejection is raised.
+    """
+    legs = [_grid_leg(i, price) for i, price in enumerate(["60000", "59000", "58000"])]
+    rejection = APIError("Order rejected")
+    mock_exchange_connector.place_orders.return_value = [
+        {"id": "ex_0"}, rejection, ExchangeConnectionError("Connection reset")
+    ]
+    mock_exchange_connector.place_order.return_value = {"id": "ex_2"}
+    mock_exchange_connector.get_order_status.return_value = {"status": "canceled"}
+
+    with patch("app.services.order_management.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(APIError) as exc_info:
+            await order_service.submit_orders(legs)
+
+    assert exc_info.value is rejection
+    assert [leg.status for leg in legs] == [OrderStatus.CANCELLED.value, OrderStatus.FAILED.value, OrderStatus.CANCELLED.value]
+    assert legs[2].exchange_order_id == "ex_2"
+    mock_exchange_connector.place_order.assert_awaited_once()
+    mock_exchange_connector.cancel_order.assert_any_await(order_id="ex_0", symbol="BTC/USDT")
+    mock_exchange_connector.cancel_order.assert_any_await(order_id="ex_2", symbol="BTC/USDT")
+    mock_dca_order_repository.update_all.assert_any_await(legs)
+    mock_dca_order_repository.update_all.assert_awaited_with([legs[0], legs[2]])
+
+@pytest.mark.asyncio
+async def test_submit_orders_keeps_legs_that_filled_before_withdrawal(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that a placed leg that filled before it could be cancelled stays OPEN
+    for the fill monitor.
+    """
+    legs = [_grid_leg(i, price) for i, price in enumerate(["60000", "59000"])]
+    mock_exchange_connector.place_orders.return_value = [{"id": "ex_0"}, APIError("Order rejected")]
+    mock_exchange_connector.get_order_status.return_value = {"status": "closed"}
+
+    with patch("app.services.order_management.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(APIError):
+            await order_service.submit_orders(legs)
+
+    assert [leg.status for leg in legs] == [OrderStatus.OPEN.value, OrderStatus.FAILED.value]
+    assert legs[0].cancelled_at is None
+
+@pytest.mark.asyncio
+async def test_submit_trigger_orders_rests_legs_on_the_exchange(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that trigger legs are placed as native conditional orders and become OPEN,
+    while a rejected leg stays TRIGGER_PENDING for engine-side triggering.
+    """
+    legs = [_grid_leg(i, price) for i, price in enumerate(["59000", "58000"])]
+    for leg in legs:
+        leg.status = OrderStatus.TRIGGER_PENDING.value
+    mock_exchange_connector.supports_trigger_orders = MagicMock(return_value=True)
+    mock_exchange_connector.place_trigger_order.side_effect = [
+        {"id": "ex_0"}, OrderValidationError("Order would immediately trigger.")
+    ]
+
+    placed = await order_service.submit_trigger_orders(legs)
+
+    assert placed == [legs[0]]
+    mock_exchange_connector.place_trigger_order.assert_any_await(
+        symbol="BTC/USDT", side="BUY", quantity=Decimal("0.001"), trigger_price=Decimal("59000"),
+        clientOrderId=trigger_client_order_id(legs[0])
+    )
+    # A rejection is definite; nothing to look up
+    mock_exchange_connector.get_order_by_client_id.assert_not_awaited()
+    assert legs[0].status == OrderStatus.OPEN.value and legs[0].exchange_order_id == "ex_0"
+    assert legs[1].status == OrderStatus.TRIGGER_PENDING.value
+    mock_dca_order_repository.update_all.assert_awaited_once_with([legs[0]])
+
+@pytest.mark.asyncio
+async def test_submit_trigger_orders_looks_up_unanswered_placements(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that a placement lost to a connection error is settled by its client order ID:
+    a leg whose order rested becomes OPEN, a leg without one falls back.
+    """
+    legs = [_grid_leg(i, price) for i, price in enumerate(["59000", "58000"])]
+    for leg in legs:
+        leg.status = OrderStatus.TRIGGER_PENDING.value
+    mock_exchange_connector.supports_trigger_orders = MagicMock(return_value=True)
+    mock_exchange_connector.place_trigger_order.side_effect = [
+        ExchangeConnectionError("Read timed out"), ExchangeConnectionError("Read timed out")
+    ]
+    mock_exchange_connector.get_order_by_client_id = AsyncMock(side_effect=[{"id": "ex_0"}, None])
+
+    placed = await order_service.submit_trigger_orders(legs)
+
+    assert placed == [legs[0]]
+    assert legs[0].status == OrderStatus.OPEN.value and legs[0].exchange_order_id == "ex_0"
+    assert legs[1].status == OrderStatus.TRIGGER_PENDING.value
+    mock_exchange_connector.get_order_by_client_id.assert_any_await("BTC/USDT", trigger_client_order_id(legs[1]))
+
+@pytest.mark.asyncio
+async def test_adopt_trigger_order_before_engine_side_trigger(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that a leg is not triggered engine-side while its native order may exist.
+    """
+    leg = _grid_leg(0, "59000")
+    leg.status = OrderStatus.TRIGGER_PENDING.value
+    mock_exchange_connector.supports_trigger_orders = MagicMock(return_value=True)
+
+    mock_exchange_connector.get_order_by_client_id = AsyncMock(return_value=None)
+    assert await order_service.adopt_trigger_order(leg) is False
+
+    mock_exchange_connector.get_order_by_client_id = AsyncMock(side_effect=ExchangeConnectionError("down"))
+    with patch("app.services.order_management.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(APIError):
+            await order_service.adopt_trigger_order(leg)
+    assert leg.status == OrderStatus.TRIGGER_PENDING.value
+
+    mock_exchange_connector.get_order_by_client_id = AsyncMock(return_value={"id": "ex_9"})
+    assert await order_service.adopt_trigger_order(leg) is True
+    assert leg.status == OrderStatus.OPEN.value and leg.exchange_order_id == "ex_9"
+    mock_dca_order_repository.update.assert_awaited_with(leg)
+
+@pytest.mark.asyncio
+async def test_submit_trigger_orders_without_connector_support(order_service, mock_exchange_connector, mock_dca_order_repository):
+    """
+    Test that nothing is placed when the connector has no trigger orders.
+    """
+    legs = [_grid_leg(0, "59000")]
+    mock_exchange_connector.supports_trigger_orders = MagicMock(return_value=False)
+
+    assert await order_service.submit_trigger_orders(legs) == []
+    mock_exchange_connector.place_trigger_order.assert_not_awaited()
+    mock_dca_order_repository.update_all.assert_not_awaited()
+
 @pytest.mark.asyncio
 async def test_check_order_status_api_error(order_service, mock_exchange_connector, mock_dca_order_repository):
     """
@@ -0,0 +1,167 @@
+"""
+Tests for bulk order reconciliation: snapshots built from open orders and recent
+trades, the connector calls they cost, and how the fill monitor and OrderService
+use them.
+"""
+import uuid
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.dca_order import DCAOrder, OrderStatus
+from app.services.exchange_abstraction.binance_connector import BinanceConnector
+from app.services.exchange_abstraction.order_reconciliation import build_order_snapshots, is_conclusive
+from app.services.exchange_abstraction.request_scheduler import reset_request_schedulers
+from app.services.order_fill_monitor import OrderFillMonitorService
+from app.services.order_management import OrderService
+
+
+OPEN_ORDER = {"id": "1", "status": "open", "filled": 0.5, "average": 100.0, "info": {}}
+TRADES = [
+    {"order": "2", "amount": 1.0, "price": 100.0, "cost": 100.0, "fee": {"cost": 0.1, "currency": "USDT"}},
+    {"order": "2", "amount": 1.0, "price": 110.0, "cost": 110.0, "fee": {"cost": 0.11, "currency": "USDT"}},
+    {"order": "99", "amount": 5.0, "price": 1.0, "cost": 5.0},
+]
+
+
+class TestBuildSnapshots:
+    """Tests for build_order_snapshots and is_conclusive."""
+
+    def test_open_orders_and_trades_are_combined(self):
+        snapshots = build_order_snapshots(["1", "2", "3"], [OPEN_ORDER], TRADES, "BTC/USDT")
+
+        assert set(snapshots) == {"1", "2"}
+        assert snapshots["1"]["status"] == "open"
+        assert snapshots["2"]["status"] == "closed"
+        assert snapshots["2"]["filled"] == 2.0
+        assert snapshots["2"]["average"] == pytest.approx(105.0)
+        assert snapshots["2"]["fee"] == {"cost": pytest.approx(0.21), "currency": "USDT"}
+
+    def test_matches_native_order_id(self):
+        trade = {"order": None, "amount": 1.0, "price": 1.0, "info": {"orderId": "abc"}}
+        assert "abc" in build_order_snapshots(["abc"], [], [trade])
+
+    def test_trades_must_cover_quantity(self):
+        snapshots = build_order_snapshots(["1", "2"], [OPEN_ORDER], TRADES)
+
+        assert is_conclusive(snapshots["1"])
+        assert is_conclusive(snapshots["2"], Decimal("2"))
+        assert not is_conclusive(snapshots["2"], Decimal("3"))
+        assert not is_conclusive(snapshots["2"])
+
+
+class TestConnectorReconcile:
+    """Tests for BinanceConnector.reconcile_orders."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_schedulers(self):
+        reset_request_schedulers()
+        yield
+        reset_request_schedulers()
+
+    def _connector(self, open_orders, trades):
+        exchange = MagicMock()
+        exchange.fetch_open_orders = AsyncMock(return_value=open_orders)
+        exchange.fetch_my_trades = AsyncMock(return_value=trades)
+        with patch('ccxt.async_support.binance', return_value=exchange):
+            return BinanceConnector(api_key="key", secret_key="secret"), exchange
+
+    @pytest.mark.asyncio
+    async def test_one_call_each_per_symbol(self):
+        connector, exchange = self._connector([OPEN_ORDER], TRADES)
+
+        snapshots = await connector.reconcile_orders("BTC/USDT", ["1", "2"])
+
+        assert set(snapshots) == {"1", "2"}
+        exchange.fetch_open_orders.assert_awaited_once_with("BTC/USDT")
+        exchange.fetch_my_trades.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_trades_skipped_when_all_orders_open(self):
+        connector, exchange = self._connector([OPEN_ORDER], TRADES)
+
+        await connector.reconcile_orders("BTC/USDT", ["1"])
+
+        exchange.fetch_my_trades.assert_not_awaited()
+
+
+def _order(**kwargs):
+    defaults = dict(
+        id=uuid.uuid4(), group_id=uuid.uuid4(), symbol="BTC/USDT", side="buy",
+        status=OrderStatus.OPEN.value, exchange_order_id="2", quantity=Decimal("2"),
+        filled_quantity=Decimal("0"), price=Decimal("100")
+    )
+    defaults.update(kwargs)
+    return DCAOrder(**defaults)
+
+
+class TestOrderServiceSnapshots:
+    """Tests for OrderService.check_order_status with a bulk snapshot."""
+
+    def _service(self):
+        connector = MagicMock()
+        connector.get_order_status = AsyncMock(return_value={"id": "2", "status": "open", "filled": 1.0})
+        service = OrderService(session=MagicMock(), user=MagicMock(), exchange_connector=connector)
+        service.apply_order_update = AsyncMock(side_effect=lambda order, data: order)
+        return service, connector
+
+    @pytest.mark.asyncio
+    async def test_conclusive_snapshot_skips_fetch(self):
+        service, connector = self._service()
+        snapshot = build_order_snapshots(["2"], [], TRADES)["2"]
+
+        await service.check_order_status(_order(), snapshot=snapshot)
+
+        connector.get_order_status.assert_not_awaited()
+        service.apply_order_update.assert_awaited_once()
+        assert service.apply_order_update.await_args.args[1] is snapshot
+
+    @pytest.mark.asyncio
+    async def test_partial_trades_are_verified(self):
+        service, connector = self._service()
+        snapshot = build_order_snapshots(["2"], [], TRADES)["2"]
+
+        await service.check_order_status(_order(quantity=Decimal("3")), snapshot=snapshot)
+
+        connector.get_order_status.assert_awaited_once_with(order_id="2", symbol="BTC/USDT")
+
+
+class TestFillMonitorReconcile:
+    """Tests for OrderFillMonitorService._reconcile_orders."""
+
+    def _monitor(self):
+        return OrderFillMonitorService(
+            session_factory=MagicMock(),
+            dca_order_repository_class=MagicMock(),
+            position_group_repository_class=MagicMock(),
+            order_service_class=MagicMock(),
+            position_manager_service_class=MagicMock(),
+            market_data=MagicMock()
+        )
+
+    @pytest.mark.asyncio
+    async def test_one_reconcile_call_per_symbol(self):
+        connector = MagicMock()
+        connector.reconcile_orders = AsyncMock(side_effect=lambda symbol, ids: {i: {"id": i} for i in ids})
+        orders = [
+            _order(exchange_order_id="a"),
+            _order(exchange_order_id="b"),
+            _order(status=OrderStatus.FILLED.value, exchange_order_id="c", tp_order_id="tp", tp_hit=False),
+            _order(symbol="ETH/USDT", exchange_order_id="d"),
+            _order(status=OrderStatus.TRIGGER_PENDING.value, exchange_order_id=None),
+        ]
+
+        snapshots = await self._monitor()._reconcile_orders(connector, orders)
+
+        assert set(snapshots) == {"a", "b", "tp", "d"}
+        assert connector.reconcile_orders.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_symbol_falls_back_to_single_checks(self):
+        connector = MagicMock()
+        connector.reconcile_orders = AsyncMock(side_effect=Exception("429"))
+
+        snapshots = await self._monitor()._reconcile_orders(connector, [_order()])
+
+        assert snapshots == {}
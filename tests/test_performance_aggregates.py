@@ -0,0 +1,173 @@
+"""
+Tests for the incrementally maintained performance aggregates: incremental
+updates match a full replay, state round-trips through the stored rows, and the
+store folds in pending closes exactly once.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.performance_aggregates import PerformanceAggregate, PerformanceStore
+
+
+def _group(pnl, closed_at, symbol="BTCUSDT", timeframe=60):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        symbol=symbol,
+        timeframe=timeframe,
+        realized_pnl_usd=Decimal(str(pnl)),
+        closed_at=closed_at,
+    )
+
+
+@pytest.fixture
+def history():
+    now = datetime.utcnow()
+    pnls = [120, -40, 0, 75, -150, 30, -20, 60]
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    return [
+        _group(pnl, now - timedelta(days=len(pnls) - i, hours=i), symbol=symbols[i % 2], timeframe=15 * (1 + i % 2))
+        for i, pnl in enumerate(pnls)
+    ]
+
+
+def _daily_rows(aggregate):
+    return [
+        SimpleNamespace(
+            day=day,
+            trades=totals.trades,
+            wins=totals.wins,
+            losses=totals.losses,
+            realized_pnl_usd=Decimal(str(totals.realized_pnl)),
+            closing_equity_usd=Decimal(str(totals.closing_equity)),
+        )
+        for day, totals in aggregate.daily.items()
+    ]
+
+
+class TestPerformanceAggregate:
+    def test_totals(self, history):
+        aggregate = PerformanceAggregate.from_positions(history)
+
+        assert aggregate.total_trades == 8
+        assert (aggregate.wins, aggregate.losses, aggregate.breakeven) == (4, 3, 1)
+        assert aggregate.realized_pnl == 75.0
+        assert aggregate.pnl_by_pair == {"BTCUSDT": -50.0, "ETHUSDT": 125.0}
+        assert aggregate.pnl_by_timeframe == {"15": -50.0, "30": 125.0}
+        assert aggregate.best_trades[0] == ["BTCUSDT", 120.0]
+        assert aggregate.worst_trades[0] == ["BTCUSDT", -150.0]
+
+    def test_drawdown_follows_close_order(self, history):
+        aggregate = PerformanceAggregate.from_positions(reversed(history))
+
+        # Equity peaks at 155 after the 4th close and drops to 5 after the 5th
+        assert aggregate.peak_equity == 155.0
+        assert aggregate.max_drawdown == 150.0
+        assert aggregate.current_drawdown == 80.0
+
+    def test_resumed_state_matches_full_replay(self, history):
+        first = PerformanceAggregate.from_positions(history[:5])
+        resumed = PerformanceAggregate.from_state(first.to_state(), _daily_rows(first))
+        for group in history[5:]:
+            resumed.apply_position(group)
+
+        replay = PerformanceAggregate.from_positions(history)
+        assert resumed.to_state() == replay.to_state()
+        assert resumed.equity_curve() == replay.equity_curve()
+        assert resumed.daily_returns() == replay.daily_returns()
+
+    def test_sharpe_sortino_match_per_trade_formula(self, history):
+        aggregate = PerformanceAggregate.from_positions(history)
+        returns = [float(g.realized_pnl_usd) for g in history]
+        avg = sum(returns) / len(returns)
+        std = (sum((r - avg) ** 2 for r in returns) / len(returns)) ** 0.5
+        negatives = [r for r in returns if r < 0]
+        downside = (sum((r - avg) ** 2 for r in negatives) / len(negatives)) ** 0.5
+
+        sharpe, sortino = aggregate.sharpe_sortino()
+        assert sharpe == pytest.approx(avg / std)
+        assert sortino == pytest.approx(avg / downside)
+
+    def test_time_windows_use_daily_rollups(self):
+        now = datetime(2026, 5, 20, 12, 0)
+        aggregate = PerformanceAggregate.from_positions([
+            _group(10, now - timedelta(hours=1)),
+            _group(20, now - timedelta(days=3)),
+            _group(40, now - timedelta(days=20)),
+            _group(80, now - timedelta(days=45)),
+        ])
+
+        assert aggregate.pnl_today(now) == 10.0
+        assert aggregate.pnl_last_days(7, now) == 30.0
+        assert aggregate.pnl_last_days(30, now) == 70.0
+        assert [point["equity"] for point in aggregate.equity_curve()] == [80.0, 120.0, 140.0, 150.0]
+
+
+class TestPerformanceStore:
+    def _store(self, pending_batches, summary=None):
+        store = PerformanceStore(AsyncMock())
+        store.summary_repo = AsyncMock()
+        store.summary_repo.get_for_user.return_value = summary
+        store.daily_repo = AsyncMock()
+        store.daily_repo.get_for_user.return_value = []
+        store.daily_repo.get_days.return_value = []
+        store.position_repo = AsyncMock()
+        store.position_repo.get_closed_pending_analytics.side_effect = pending_batches
+        store.session.add = MagicMock()
+        return store
+
+    @pytest.mark.asyncio
+    async def test_load_applies_pending_closes_without_writing(self, history):
+        stored = PerformanceAggregate.from_positions(history[:5])
+        store = self._store([history[5:]], summary=SimpleNamespace(state=stored.to_state()))
+
+        aggregate = await store.load(uuid.uuid4())
+
+        assert aggregate.total_trades == len(history)
+        assert aggregate.realized_pnl == PerformanceAggregate.from_positions(history).realized_pnl
+        assert store.summary_repo.get_for_user.await_args.kwargs.get("for_update", False) is False
+        store.position_repo.mark_analytics_applied.assert_not_awaited()
+        store.session.add.assert_not_called()
+        store.session.flush.assert_not_awaited()
+        store.session.commit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_catch_up_applies_pending_closes_and_marks_them(self, history):
+        store = self._store([history])
+
+        aggregate = await store.catch_up(uuid.uuid4())
+
+        assert aggregate.total_trades == len(history)
+        store.position_repo.mark_analytics_applied.assert_awaited_once_with([g.id for g in history])
+        added = [call.args[0] for call in store.session.add.call_args_list]
+        summary = next(obj for obj in added if hasattr(obj, "state"))
+        assert summary.state["total_trades"] == len(history)
+        assert len([obj for obj in added if hasattr(obj, "day")]) == len(aggregate.daily)
+
+    @pytest.mark.asyncio
+    async def test_catch_up_without_pending_closes_does_not_write(self, history):
+        stored = PerformanceAggregate.from_positions(history)
+        summary = SimpleNamespace(state=stored.to_state())
+        store = self._store([[]], summary=summary)
+
+        aggregate = await store.catch_up(uuid.uuid4())
+
+        assert aggregate.realized_pnl == stored.realized_pnl
+        store.session.add.assert_not_called()
+        store.session.flush.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_fold_pending_catches_up_owned_users(self, history):
+        owned, other = uuid.uuid4(), uuid.uuid4()
+        store = self._store([history])
+        store.position_repo.get_user_ids_pending_analytics.return_value = [owned, other]
+
+        folded = await store.fold_pending(owns=lambda user_id: user_id == owned)
+
+        assert folded == 1
+        store.summary_repo.get_for_user.assert_awaited_once_with(owned, for_update=True)
+        store.session.commit.assert_awaited_once()
@@ -175,6 +175,7 @@ class TestCreatePositionGroupFromSignal:
 
         mock_order_service = AsyncMock()
         mock_order_service.submit_order = AsyncMock()
+        mock_order_service.submit_orders = AsyncMock()
         mock_order_service_class = MagicMock(return_value=mock_order_service)
 
         mock_pg_repo = AsyncMock()
@@ -276,12 +277,42 @@ class TestCreatePositionGroupFromSignal:
         # Both orders have gap_percent >= 0, so both should be submitted immediately
         # gap=0: at entry price -> submit
         # gap=2 (positive): price already better than target -> submit
-        assert mock_dependencies["order_service"].submit_order.call_count == 2
+        mock_dependencies["order_service"].submit_orders.assert_awaited_once()
+        assert len(mock_dependencies["order_service"].submit_orders.await_args.args[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_trigger_legs_placed_natively_when_enabled(self, mock_dependencies):
+        """Test TRIGGER_PENDING legs go to submit_trigger_orders with NATIVE_TRIGGER_ORDERS on."""
+        mock_dependencies["dca_config"].entry_order_type = "market"
+
+        with patch("app.services.position.position_creator.get_exchange_connector",
+                   return_value=mock_dependencies["connector"]), \
+             patch("app.services.position.position_creator.settings.NATIVE_TRIGGER_ORDERS", True):
+            with patch("app.services.position.position_creator.broadcast_entry_signal", new_callable=AsyncMock):
+                await create_position_group_from_signal(
+                    session=mock_dependencies["session"],
+                    user_id=mock_dependencies["user"].id,
+                    signal=mock_dependencies["signal"],
+                    risk_config=mock_dependencies["risk_config"],
+                    dca_grid_config=mock_dependencies["dca_config"],
+                    total_capital_usd=Decimal("1000"),
+                    position_group_repository_class=mock_dependencies["pg_repo_class"],
+                    grid_calculator_service=mock_dependencies["grid_calc"],
+                    order_service_class=mock_dependencies["order_service_class"],
+                    update_risk_timer_func=mock_dependencies["update_timer"],
+                    update_position_stats_func=mock_dependencies["update_stats"],
+                )
+
+        submitted = mock_dependencies["order_service"].submit_orders.await_args.args[0]
+        triggered = mock_dependencies["order_service"].submit_trigger_orders.await_args.args[0]
+        assert [o.gap_percent for o in submitted] == [Decimal("0")]
+        assert [o.gap_percent for o in triggered] == [Decimal("-2")]
+        assert triggered[0].status == OrderStatus.TRIGGER_PENDING
 
     @pytest.mark.asyncio
     async def test_handles_order_submission_failure(self, mock_dependencies):
         """Test handles order submission failure and broadcasts failure."""
-        mock_dependencies["order_service"].submit_order = AsyncMock(
+        mock_dependencies["order_service"].submit_orders = AsyncMock(
             side_effect=Exception("Order rejected")
         )
 
@@ -308,6 +339,36 @@ class TestCreatePositionGroupFromSignal:
                     # Position status should be FAILED
                     assert result.status == PositionGroupStatus.FAILED
 
+    @pytest.mark.asyncio
+    async def test_keeps_group_with_a_leg_that_could_not_be_withdrawn(self, mock_dependencies):
+        """Test a failed grid whose placed leg is still OPEN is not marked FAILED."""
+        async def fail_after_placing(orders):
+            orders[0].status = OrderStatus.OPEN.value
+            raise Exception("Order rejected")
+
+        mock_dependencies["order_service"].submit_orders = AsyncMock(side_effect=fail_after_placing)
+
+        with patch("app.services.position.position_creator.get_exchange_connector",
+                   return_value=mock_dependencies["connector"]):
+            with patch("app.services.position.position_creator.broadcast_failure", new_callable=AsyncMock) as mock_broadcast:
+                with patch("app.services.position.position_creator.broadcast_entry_signal", new_callable=AsyncMock):
+                    result = await create_position_group_from_signal(
+                        session=mock_dependencies["session"],
+                        user_id=mock_dependencies["user"].id,
+                        signal=mock_dependencies["signal"],
+                        risk_config=mock_dependencies["risk_config"],
+                        dca_grid_config=mock_dependencies["dca_config"],
+                        total_capital_usd=Decimal("1000"),
+                        position_group_repository_class=mock_dependencies["pg_repo_class"],
+                        grid_calculator_service=mock_dependencies["grid_calc"],
+                        order_service_class=mock_dependencies["order_service_class"],
+                        update_risk_timer_func=mock_dependencies["update_timer"],
+                        update_position_stats_func=mock_dependencies["update_stats"],
+                    )
+
+                    mock_broadcast.assert_called_once()
+                    assert result.status == PositionGroupStatus.LIVE
+
     @pytest.mark.asyncio
     async def test_handles_limit_entry_order_type(self, mock_dependencies):
         """Test handles limit entry order type."""
@@ -391,6 +452,7 @@ class TestHandlePyramidContinuation:
 
         mock_order_service = AsyncMock()
         mock_order_service.submit_order = AsyncMock()
+        mock_order_service.submit_orders = AsyncMock()
         mock_order_service_class = MagicMock(return_value=mock_order_service)
 
         mock_pg_repo = AsyncMock()
@@ -471,7 +533,7 @@ class TestHandlePyramidContinuation:
     @pytest.mark.asyncio
     async def test_handles_order_submission_failure(self, mock_pyramid_dependencies):
         """Test raises exception on order submission failure."""
-        mock_pyramid_dependencies["order_service"].submit_order = AsyncMock(
+        mock_pyramid_dependencies["order_service"].submit_orders = AsyncMock(
             side_effect=Exception("Order rejected")
         )
 
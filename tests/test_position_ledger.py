@@ -0,0 +1,240 @@
+"""
+Tests for incremental position accounting: the ledger deltas must give the same
+result as the full replay, and update_position_stats must only read new fills
+once a ledger exists.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.dca_order import DCAOrder, OrderStatus
+from app.models.position_group import PositionGroup, PositionGroupStatus
+from app.services.position.position_ledger import PositionLedger, mark_applied, verify_ledger
+from app.services.position.position_manager import PositionManagerService
+
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _order(side, qty, price, minutes, leg_index=0, pyramid_id=None, fee="0", fee_currency="USDT", tp_hit=False):
+    return DCAOrder(
+        id=uuid.uuid4(),
+        group_id=uuid.uuid4(),
+        pyramid_id=pyramid_id,
+        leg_index=leg_index,
+        side=side,
+        price=Decimal(price),
+        quantity=Decimal(qty),
+        filled_quantity=Decimal(qty),
+        avg_fill_price=Decimal(price),
+        fee=Decimal(fee),
+        fee_currency=fee_currency,
+        status=OrderStatus.FILLED,
+        filled_at=T0 + timedelta(minutes=minutes),
+        tp_hit=tp_hit
+    )
+
+
+@pytest.fixture
+def history():
+    pyramid_id = uuid.uuid4()
+    return [
+        _order("buy", "0.01", "50000", 0, leg_index=0, pyramid_id=pyramid_id, fee="0.5"),
+        _order("buy", "0.02", "48000", 5, leg_index=1, pyramid_id=pyramid_id, fee="0.00001", fee_currency="BTC"),
+        _order("sell", "0.01", "51000", 10, leg_index=999, fee="0.51"),
+        _order("buy", "0.015", "47000", 15, leg_index=2, pyramid_id=pyramid_id, fee="0.7"),
+    ]
+
+
+class TestReplay:
+    """Tests for the full replay."""
+
+    def test_long_position_with_partial_exit(self, history):
+        ledger = PositionLedger.replay(history)
+
+        assert ledger.quantity == Decimal("0.035")
+        assert ledger.filled_orders == 4
+        assert ledger.filled_entry_legs == 3
+        assert ledger.entry_fees_usd == Decimal("0.5") + Decimal("0.00001") * Decimal("48000") + Decimal("0.7")
+        assert ledger.exit_fees_usd == Decimal("0.51")
+        # Realized PnL uses the cost basis at the time of the sell
+        avg_before_sell = (Decimal("500.5") + Decimal("960")) / Decimal("0.03")
+        assert ledger.realized_pnl_usd == (Decimal("51000") - avg_before_sell) * Decimal("0.01") - Decimal("0.51")
+
+    def test_replay_order_independent_of_input_order(self, history):
+        assert PositionLedger.replay(history).diff(PositionLedger.replay(list(reversed(history)))) == []
+
+
+class TestIncremental:
+    """Incremental deltas must match the replay."""
+
+    def test_fill_by_fill_matches_replay(self, history):
+        ledger = PositionLedger()
+        for order in history:
+            assert ledger.accepts(order)
+            ledger.apply_fill(order)
+
+        assert ledger.diff(PositionLedger.replay(history)) == []
+
+    def test_tp_hit_delta_matches_replay(self, history):
+        ledger = PositionLedger.replay(history)
+        history[0].tp_hit = True
+        ledger.apply_tp_hit(history[0])
+
+        replayed = PositionLedger.replay(history)
+        assert ledger.diff(replayed) == []
+        avg, invested = replayed.position_averages("hybrid")
+        expected_avg = (Decimal("0.02") * Decimal("48000") + Decimal("0.015") * Decimal("47000")) / Decimal("0.035")
+        assert avg == expected_avg
+        assert invested == Decimal("0.035") * expected_avg
+
+    def test_late_fill_is_not_accepted(self, history):
+        ledger = PositionLedger.replay(history[1:])
+        assert ledger.accepts(history[0]) is False
+
+    def test_aggregate_mode_uses_cost_basis(self, history):
+        ledger = PositionLedger.replay(history)
+        assert ledger.position_averages("aggregate") == (ledger.avg_entry, ledger.invested_usd)
+
+    def test_diff_reports_divergence(self, history):
+        ledger = PositionLedger.replay(history)
+        ledger.realized_pnl_usd += Decimal("1")
+        assert ledger.diff(PositionLedger.replay(history)) == ["realized_pnl_usd"]
+
+
+class TestPersistence:
+    """Tests for ledger_state serialization."""
+
+    def test_round_trip(self, history):
+        ledger = PositionLedger.replay(history)
+        assert PositionLedger.from_dict(ledger.to_dict()) == ledger
+
+    def test_unknown_version_is_rebuilt(self, history):
+        data = PositionLedger.replay(history).to_dict()
+        data["version"] = 0
+        assert PositionLedger.from_dict(data) is None
+        assert PositionLedger.from_dict(None) is None
+
+
+def _execute_returning(*order_lists):
+    results = []
+    for orders in order_lists:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = orders
+        results.append(result)
+    return AsyncMock(side_effect=results)
+
+
+class TestApplyFillsToLedger:
+    """Tests for PositionManagerService._apply_fills_to_ledger."""
+
+    def _service(self):
+        return PositionManagerService(
+            session_factory=MagicMock(),
+            user=MagicMock(),
+            position_group_repository_class=MagicMock(),
+            grid_calculator_service=MagicMock(),
+            order_service_class=MagicMock()
+        )
+
+    def _group(self, ledger_state=None):
+        group = PositionGroup(
+            id=uuid.uuid4(), user_id=uuid.uuid4(), exchange="binance", symbol="BTCUSDT", timeframe=60,
+            side="long", status=PositionGroupStatus.ACTIVE, total_dca_legs=3, base_entry_price=Decimal("50000"),
+            weighted_avg_entry=Decimal("0"), tp_mode="aggregate", ledger_state=ledger_state
+        )
+        group.pyramids = []
+        return group
+
+    @pytest.mark.asyncio
+    async def test_without_ledger_replays_full_history(self, history):
+        group = self._group()
+        session = MagicMock()
+        session.execute = _execute_returning(history)
+
+        ledger, filled_orders, status_orders = await self._service()._apply_fills_to_ledger(session, group)
+
+        assert filled_orders == history
+        assert status_orders == history
+        assert ledger.diff(PositionLedger.replay(history)) == []
+        assert all(o.ledger_applied for o in history)
+        assert group.ledger_state == ledger.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_with_ledger_applies_only_new_fills(self, history):
+        applied, new = history[:3], history[3]
+        mark_applied(applied)
+        group = self._group(PositionLedger.replay(applied).to_dict())
+        session = MagicMock()
+        # First query: unapplied fills; second: orders of the group's unfilled pyramids
+        session.execute = _execute_returning([new], [history[0], history[1], new])
+
+        with patch("app.services.position.position_manager.settings") as mock_settings:
+            mock_settings.POSITION_LEDGER_SHADOW_VERIFY = False
+            ledger, filled_orders, status_orders = await self._service()._apply_fills_to_ledger(session, group)
+
+        assert filled_orders is None
+        assert len(status_orders) == 3
+        assert new.ledger_applied is True
+        assert ledger.diff(PositionLedger.replay(history)) == []
+
+    @pytest.mark.asyncio
+    async def test_without_new_fills_still_checks_unfilled_pyramids(self, history):
+        """A leg that went OPEN without filling must still move its pyramid to SUBMITTED."""
+        mark_applied(history)
+        group = self._group(PositionLedger.replay(history).to_dict())
+        opened = _order("buy", "0.01", "46000", 20, leg_index=3, pyramid_id=uuid.uuid4())
+        opened.status = OrderStatus.OPEN
+        session = MagicMock()
+        session.execute = _execute_returning([], [opened])
+
+        with patch("app.services.position.position_manager.settings") as mock_settings:
+            mock_settings.POSITION_LEDGER_SHADOW_VERIFY = False
+            ledger, filled_orders, status_orders = await self._service()._apply_fills_to_ledger(session, group)
+
+        assert filled_orders is None
+        assert status_orders == [opened]
+        assert session.execute.await_count == 2
+        assert ledger.diff(PositionLedger.replay(history)) == []
+
+    @pytest.mark.asyncio
+    async def test_late_fill_triggers_rebuild(self, history):
+        late = history[0]
+        mark_applied(history[1:])
+        group = self._group(PositionLedger.replay(history[1:]).to_dict())
+        session = MagicMock()
+        session.execute = _execute_returning([late], history)
+
+        ledger, filled_orders, _ = await self._service()._apply_fills_to_ledger(session, group)
+
+        assert filled_orders == history
+        assert ledger.diff(PositionLedger.replay(history)) == []
+
+
+class TestVerifyLedger:
+    """Tests for the on-demand replay verifier."""
+
+    @pytest.mark.asyncio
+    async def test_repairs_diverged_ledger(self, history):
+        stale = PositionLedger.replay(history[:2])
+        group = MagicMock()
+        group.ledger_state = stale.to_dict()
+        session = MagicMock()
+        session.execute = _execute_returning(history)
+
+        mismatches = await verify_ledger(session, group, repair=True)
+
+        assert "quantity" in mismatches
+        assert PositionLedger.from_dict(group.ledger_state).diff(PositionLedger.replay(history)) == []
+
+    @pytest.mark.asyncio
+    async def test_consistent_ledger_has_no_mismatches(self, history):
+        group = MagicMock()
+        group.ledger_state = PositionLedger.replay(history).to_dict()
+        session = MagicMock()
+        session.execute = _execute_returning(history)
+
+        assert await verify_ledger(session, group) == []
@@ -75,6 +75,7 @@ def mock_order_service_class():
     mock_instance.cancel_open_orders_for_group = AsyncMock()
     mock_instance.close_position_market = AsyncMock()
     mock_instance.submit_order = AsyncMock() # Ensure submit_order is mocked
+    mock_instance.submit_orders = AsyncMock()
     mock_class = MagicMock(spec=OrderService, return_value=mock_instance)
     return mock_class
 
@@ -347,11 +348,12 @@ async def test_create_position_group_submits_orders(
     
     # Assert
     mock_order_service_instance = mock_order_service_class.return_value
-    assert mock_order_service_instance.submit_order.call_count == 2
+    mock_order_service_instance.submit_orders.assert_awaited_once()
+    submitted = mock_order_service_instance.submit_orders.await_args.args[0]
+    assert len(submitted) == 2
 
-    # Check the details of the first call
-    first_call_args = mock_order_service_instance.submit_order.call_args_list[0].args
-    dca_order_arg = first_call_args[0]
+    # Check the details of the first order
+    dca_order_arg = submitted[0]
 
     assert isinstance(dca_order_arg, DCAOrder)
     assert dca_order_arg.price == dca_levels[0]['price']
@@ -359,15 +361,11 @@ async def test_create_position_group_submits_orders(
     assert dca_order_arg.status == OrderStatus.PENDING
 
     # CRITICAL: Verify all orders have correct leg_index
-    for i, call_args in enumerate(mock_order_service_instance.submit_order.call_args_list):
-        order = call_args.args[0]
+    for i, order in enumerate(submitted):
         assert order.leg_index == i, f"Order {i} should have leg_index={i}"
 
     # Verify total quantity matches expected DCA allocation
-    total_qty = sum(
-        call_args.args[0].quantity
-        for call_args in mock_order_service_instance.submit_order.call_args_list
-    )
+    total_qty = sum(order.quantity for order in submitted)
     assert total_qty > 0, "Total DCA quantity must be positive"
 
 @pytest.mark.asyncio
@@ -888,7 +886,7 @@ async def test_create_position_group_market_entry_order(
     # Level 1: gap_percent=0.0 -> submitted (gap >= 0)
     # Level 2: gap_percent=-0.5 -> TRIGGER_PENDING (gap < 0, waits for price)
     mock_order_service_instance = mock_order_service_class.return_value
-    assert mock_order_service_instance.submit_order.call_count == 1
+    assert len(mock_order_service_instance.submit_orders.await_args.args[0]) == 1
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,203 @@
+"""
+Tests for the symbol-level precision index: compiled tables, single-flight
+market loads, stale-while-revalidate refresh and invalidation.
+"""
+import asyncio
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.cache import CacheService
+from app.services.exchange_abstraction.precision_index import (
+    PrecisionIndex,
+    PrecisionTable,
+    normalize_symbol,
+)
+
+BTC_RULE = {"tick_size": 0.01, "step_size": 0.00001, "min_qty": 0.00001, "min_notional": 5.0}
+ETH_RULE = {"tick_size": 0.01, "step_size": 0.0001, "min_qty": 0.0001, "min_notional": 5.0}
+
+
+class FakeRedisHashes:
+    """The Redis hash commands CacheService uses; fields are stored exactly as written."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def delete(self, key):
+        self.commands.append(lambda: self.redis.hashes.pop(key, None))
+
+    def hset(self, key, mapping):
+        self.commands.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakeIndexCache(CacheService):
+    """CacheService over an in-memory Redis, so field names are matched as Redis would."""
+
+    def __init__(self):
+        super().__init__()
+        self._redis = FakeRedisHashes()
+        self._connected = True
+        self.symbol_reads = 0
+
+    async def get_symbol_precision(self, exchange, symbol):
+        self.symbol_reads += 1
+        return await super().get_symbol_precision(exchange, symbol)
+
+    async def age_index(self, exchange, seconds):
+        key = self._make_key(self.PREFIX_PRECISION_INDEX, exchange)
+        loaded_at = float(await self._redis.hget(key, self.PRECISION_INDEX_LOADED_AT))
+        await self._redis.hset(key, self.PRECISION_INDEX_LOADED_AT, str(loaded_at - seconds))
+
+    def clear(self):
+        self._redis.hashes.clear()
+
+    def invalidate(self, key_prefix):
+        self._drop_local("precision", key_prefix)
+
+
+@pytest.fixture
+def cache():
+    cache = FakeIndexCache()
+    with patch("app.services.exchange_abstraction.precision_index.get_cache", AsyncMock(return_value=cache)):
+        yield cache
+
+
+@pytest.fixture
+def loader():
+    return AsyncMock(return_value={"BTCUSDT": BTC_RULE, "ETHUSDT": ETH_RULE})
+
+
+async def _drain(index):
+    while index._loads:
+        await asyncio.gather(*index._loads.values(), return_exceptions=True)
+
+
+def test_table_lookups_accept_any_symbol_spelling():
+    table = PrecisionTable({"BTCUSDT": BTC_RULE})
+
+    assert normalize_symbol("BTC/USDT:USDT") == "BTCUSDT"
+    assert table["BTC/USDT"] is table.get("BTCUSDT")
+    assert "btc/usdt" in table
+    assert table.get("DOGE/USDT") is None
+    # Float rule for existing consumers, Decimals compiled once
+    assert table["BTCUSDT"] == BTC_RULE
+    assert table["BTCUSDT"].tick_size == Decimal("0.01")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_requests_load_markets_once(cache, loader):
+    index = PrecisionIndex()
+
+    tables = await asyncio.gather(*[index.get_table("binance", loader) for _ in range(5)])
+
+    loader.assert_awaited_once()
+    assert all(table is tables[0] for table in tables)
+    assert set((await cache.get_precision_index("binance"))["rules"]) == {"BTCUSDT", "ETHUSDT"}
+
+
+@pytest.mark.asyncio
+async def test_adopts_index_written_by_another_worker(cache, loader):
+    await cache.set_precision_index("binance", {"BTCUSDT": BTC_RULE})
+    index = PrecisionIndex()
+
+    table = await index.get_table("binance", loader)
+
+    loader.assert_not_awaited()
+    assert table["BTC/USDT"] == BTC_RULE
+    assert index.get_metrics()["redis_loads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cold_symbol_lookup_reads_one_field_and_warms_table(cache, loader):
+    await cache.set_precision_index("binance", {"BTCUSDT": BTC_RULE, "ETHUSDT": ETH_RULE})
+    index = PrecisionIndex()
+
+    rule = await index.get_symbol("binance", "BTC/USDT", loader)
+    assert rule == BTC_RULE
+    assert cache.symbol_reads == 1
+    # Served from the field, not from a table load after a miss
+    assert index.get_metrics()["symbol_reads"] == 1
+
+    await _drain(index)
+    assert await index.get_symbol("binance", "ETHUSDT", loader) == ETH_RULE
+    assert cache.symbol_reads == 1
+    loader.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_table_is_served_while_refreshing(cache, loader):
+    index = PrecisionIndex(refresh_interval_seconds=60)
+    stale = await index.get_table("binance", loader)
+    stale.loaded_at -= 120
+    await cache.age_index("binance", 120)
+
+    assert await index.get_table("binance", loader) is stale
+    await _drain(index)
+
+    assert loader.await_count == 2
+    assert await index.get_table("binance", loader) is not stale
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_old_table(cache, loader):
+    index = PrecisionIndex(refresh_interval_seconds=60)
+    stale = await index.get_table("binance", loader)
+    stale.loaded_at -= 120
+    await cache.age_index("binance", 120)
+    loader.side_effect = Exception("exchange down")
+
+    assert await index.get_table("binance", loader) is stale
+    await _drain(index)
+
+    assert await index.get_table("binance", loader) is stale
+    assert index.get_metrics()["load_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_table_and_racing_load(cache, loader):
+    index = PrecisionIndex()
+    await index.get_table("bybit_testnet", loader)
+
+    cache.invalidate("precision:bybit")
+    assert "bybit_testnet" not in index.get_metrics()["exchanges"]
+
+    # A load that started before the invalidation must not install its table
+    cache.clear()
+    loading = index._start_load("bybit_testnet", loader)
+    cache.invalidate("precision:bybit")
+    await loading
+    assert "bybit_testnet" not in index.get_metrics()["exchanges"]
@@ -1413,6 +1413,56 @@ async def test_promote_highest_priority_signal_short_position_pnl():
     assert mock_signal.current_loss_percent == Decimal("10.0")
 
 
+@pytest.mark.asyncio
+async def test_promote_highest_priority_signal_writes_only_changed_loss():
+    """
+    Test that signals whose stored loss is unchanged are not written back.
+    """
+    user_id = uuid.uuid4()
+    now = datetime.utcnow()
+
+    unchanged_signal = MockQueuedSignal(queued_at=now, user_id=user_id, symbol="BTCUSDT",
+                                        entry_price=Decimal("50000"), current_loss_percent=Decimal("-2.0000"))
+    moved_signal = MockQueuedSignal(queued_at=now, user_id=user_id, symbol="BTCUSDT",
+                                    entry_price=Decimal("49500"), current_loss_percent=Decimal("-0.5000"))
+
+    mock_session = AsyncMock(spec=AsyncSession)
+    user_mock = MagicMock(spec=User)
+    user_mock.id = user_id
+    user_mock.username = "testuser"
+    user_mock.encrypted_api_keys = {"binance": {"encrypted_data": "mock"}}
+    user_mock.risk_config = RiskEngineConfig().model_dump()
+    mock_session.get = AsyncMock(return_value=user_mock)
+
+    mock_queue_repo = MagicMock(spec=QueuedSignalRepository)
+    mock_queue_repo.get_all_queued_signals = AsyncMock(return_value=[unchanged_signal, moved_signal])
+    mock_queue_repo.update = AsyncMock()
+
+    mock_pos_group_repo = MagicMock(spec=PositionGroupRepository)
+    mock_pos_group_repo.get_active_position_groups_for_user = AsyncMock(return_value=[])
+
+    mock_exchange = AsyncMock()
+    mock_exchange.get_current_price = AsyncMock(return_value=Decimal("49000"))
+
+    service = QueueManagerService(
+        session_factory=MagicMock(),
+        queued_signal_repository_class=lambda s: mock_queue_repo,
+        position_group_repository_class=lambda s: mock_pos_group_repo,
+        exchange_connector=mock_exchange,
+        execution_pool_manager=None
+    )
+
+    await service.promote_highest_priority_signal(session=mock_session)
+    mock_queue_repo.update.assert_awaited_once_with(moved_signal)
+
+    # Nothing moved since the last cycle: no writes, no commit
+    mock_queue_repo.update.reset_mock()
+    mock_session.commit.reset_mock()
+    await service.promote_highest_priority_signal(session=mock_session)
+    mock_queue_repo.update.assert_not_awaited()
+    mock_session.commit.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_promote_highest_priority_signal_no_execution_pool_manager():
     """
@@ -44,6 +44,7 @@ def mock_deps():
         mock_dca_config.custom_capital_usd = None
         mock_dca_config.pyramid_custom_capitals = {}
         MockDCAConfigRepo.return_value.get_specific_config = AsyncMock(return_value=mock_dca_config)
+        MockPool.return_value.release_slot = AsyncMock()
 
         yield {
             "queue_repo": MockQueueRepo,
@@ -0,0 +1,88 @@
+"""
+Tests for the incremental queue priority index: ordering parity with
+calculate_queue_priority, incremental re-ranking and lazy removal.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.schemas.grid_config import PriorityRulesConfig
+from app.services.queue_priority import calculate_queue_priority
+from app.services.queue_priority_index import QueuePriorityIndex, active_keys
+
+USER_ID = uuid.uuid4()
+
+
+def _signal(symbol, age_seconds, loss=None, replacements=0, timeframe=15):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        user_id=USER_ID,
+        symbol=symbol,
+        exchange="binance",
+        timeframe=timeframe,
+        side="long",
+        queued_at=datetime.utcnow() - timedelta(seconds=age_seconds),
+        current_loss_percent=Decimal(str(loss)) if loss is not None else None,
+        replacement_count=replacements,
+    )
+
+
+def _group(symbol, timeframe=15):
+    return SimpleNamespace(user_id=USER_ID, symbol=symbol, exchange="binance", timeframe=timeframe, side="long")
+
+
+def test_order_matches_calculate_queue_priority():
+    groups = [_group("SOLUSDT")]
+    signals = [
+        _signal("BTCUSDT", 600),
+        _signal("ETHUSDT", 30, loss=-2.5),
+        _signal("XRPUSDT", 60, loss=-0.4, replacements=2),
+        _signal("ADAUSDT", 900, replacements=1),
+        _signal("SOLUSDT", 5, loss=1.0),
+        _signal("DOTUSDT", 300, loss=0.5),
+    ]
+    for config in (
+        PriorityRulesConfig(),
+        PriorityRulesConfig(priority_order=["fifo_fallback", "highest_replacement", "deepest_loss_percent", "same_pair_timeframe"]),
+        PriorityRulesConfig(priority_rules_enabled={"same_pair_timeframe": False, "deepest_loss_percent": True,
+                                                    "highest_replacement": False, "fifo_fallback": True}),
+    ):
+        index = QueuePriorityIndex(config)
+        index.sync(signals, active_keys(groups))
+
+        expected = sorted(signals, key=lambda s: calculate_queue_priority(s, groups, config), reverse=True)
+        assert index.top(len(signals)) == expected
+        assert index.best() is expected[0]
+
+
+def test_only_changed_signals_are_reranked():
+    index = QueuePriorityIndex(PriorityRulesConfig())
+    first, second = _signal("BTCUSDT", 600), _signal("ETHUSDT", 30)
+
+    assert index.sync([first, second], set()) == 2
+    assert index.best() is first
+    assert index.sync([first, second], set()) == 0
+
+    second.current_loss_percent = Decimal("-1.5")
+    assert index.sync([first, second], set()) == 1
+    assert index.best() is second
+
+    # A new active group turns the other signal into a pyramid continuation
+    assert index.sync([first, second], active_keys([_group("BTCUSDT")])) == 1
+    assert index.best() is first
+    assert index.is_pyramid(first) and not index.is_pyramid(second)
+
+
+def test_signals_that_left_the_queue_are_dropped():
+    index = QueuePriorityIndex(PriorityRulesConfig())
+    signals = [_signal(f"SYM{i}USDT", 100 - i) for i in range(50)]
+    index.sync(signals, set())
+
+    index.sync(signals[1:], set())
+    assert len(index) == 49
+    assert index.best() is signals[1]
+
+    index.sync([], set())
+    assert index.best() is None and index.top(3) == []
+    assert index._heap == []
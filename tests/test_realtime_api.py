@@ -0,0 +1,116 @@
+"""
+Tests for the realtime WebSocket handshake: origin check, cookie and ticket
+authentication, and single-use tickets.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import status
+
+from app.api import realtime
+from app.core.cache import CacheService
+
+
+class HandshakeSocket:
+    """The parts of a WebSocket the handshake reads, recording how it was closed."""
+
+    def __init__(self, origin=None, cookie=None, ticket=None):
+        self.headers = {"origin": origin} if origin else {}
+        self.cookies = {"access_token": f"Bearer {cookie}"} if cookie else {}
+        self.query_params = {"ticket": ticket} if ticket else {}
+        self.closed_with = None
+        self.accepted = False
+
+    async def close(self, code):
+        self.closed_with = code
+
+    async def accept(self):
+        self.accepted = True
+
+
+@pytest.fixture
+def user():
+    return SimpleNamespace(id=uuid.uuid4(), is_active=True)
+
+
+@pytest.fixture(autouse=True)
+def session():
+    db = MagicMock()
+    db.__aenter__ = AsyncMock(return_value=db)
+    db.__aexit__ = AsyncMock(return_value=False)
+    with patch("app.api.realtime.AsyncSessionLocal", return_value=db):
+        yield db
+
+
+def test_origin_must_be_a_cors_origin():
+    with patch("app.api.realtime.settings.CORS_ORIGINS", ["https://app.example.com"]):
+        assert realtime.is_allowed_origin("https://app.example.com")
+        assert not realtime.is_allowed_origin("https://evil.example.com")
+        # Not a browser; still has to authenticate
+        assert realtime.is_allowed_origin(None)
+
+
+@pytest.mark.asyncio
+async def test_socket_from_foreign_origin_is_closed_before_auth():
+    socket = HandshakeSocket(origin="https://evil.example.com", cookie="jwt")
+
+    with patch("app.api.realtime.settings.CORS_ORIGINS", ["https://app.example.com"]), \
+         patch("app.api.realtime.get_realtime_hub", return_value=MagicMock()), \
+         patch("app.api.realtime.get_user_from_token", new=AsyncMock()) as get_user:
+        await realtime.realtime_updates(socket)
+
+    assert socket.closed_with == status.WS_1008_POLICY_VIOLATION
+    assert not socket.accepted
+    get_user.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cookie_authenticates_the_socket(user):
+    socket = HandshakeSocket(cookie="jwt")
+
+    with patch("app.api.realtime.get_user_from_token", new=AsyncMock(return_value=user)) as get_user:
+        assert await realtime.authenticate_socket(socket) is user
+
+    assert get_user.await_args.args[0] == "jwt"
+
+
+@pytest.mark.asyncio
+async def test_ticket_authenticates_the_socket_once(user):
+    cache = CacheService()
+    cache._connected = True
+    cache._redis = AsyncMock()
+    cache._redis.getdel.side_effect = [str(user.id), None]
+    socket = HandshakeSocket(ticket="t1")
+
+    with patch("app.api.realtime.get_cache", new=AsyncMock(return_value=cache)), \
+         patch("app.api.realtime.UserRepository") as repo:
+        repo.return_value.get_by_id = AsyncMock(return_value=user)
+        assert await realtime.authenticate_socket(socket) is user
+        assert await realtime.authenticate_socket(socket) is None
+
+    cache._redis.getdel.assert_awaited_with("ws_ticket:t1")
+
+
+@pytest.mark.asyncio
+async def test_jwt_in_query_is_not_accepted():
+    socket = HandshakeSocket()
+    socket.query_params = {"token": "jwt"}
+
+    with patch("app.api.realtime.get_user_from_token", new=AsyncMock()) as get_user:
+        assert await realtime.authenticate_socket(socket) is None
+
+    get_user.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ticket_is_stored_for_the_user(user):
+    cache = AsyncMock()
+    cache.set_ws_ticket.return_value = True
+
+    with patch("app.api.realtime.get_cache", new=AsyncMock(return_value=cache)):
+        response = await realtime.create_ticket(current_user=user)
+
+    cache.set_ws_ticket.assert_awaited_once_with(response["ticket"], str(user.id))
+    assert response["expires_in"] == CacheService.TTL_WS_TICKET
@@ -0,0 +1,156 @@
+"""
+Tests for the realtime dashboard push: initial snapshots, per-user coalescing,
+unchanged-snapshot suppression and the local fallback without Redis.
+"""
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import realtime_updates
+from app.services.realtime_updates import (
+    RealtimeHub,
+    TOPIC_POSITIONS,
+    TOPIC_QUEUE,
+    publish_user_update,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(json.loads(text))
+
+
+class SnapshotLoader:
+    """Returns configurable snapshots and counts loads per topic."""
+
+    def __init__(self):
+        self.data = {TOPIC_POSITIONS: [{"id": "p1", "pnl": 1}], TOPIC_QUEUE: []}
+        self.loads = {TOPIC_POSITIONS: 0, TOPIC_QUEUE: 0}
+
+    async def __call__(self, user_id, topic):
+        self.loads[topic] += 1
+        return self.data[topic]
+
+
+def _hub(loader, **kwargs):
+    kwargs.setdefault("min_push_interval_seconds", 0.05)
+    kwargs.setdefault("price_push_interval_seconds", 0.2)
+    return RealtimeHub(snapshot_loader=loader, **kwargs)
+
+
+async def _drain(hub):
+    while hub._flush_tasks:
+        await asyncio.gather(*list(hub._flush_tasks.values()), return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_connect_sends_both_snapshots():
+    hub = _hub(SnapshotLoader())
+    ws = FakeWebSocket()
+
+    await hub.connect("u1", ws)
+
+    assert [m["type"] for m in ws.sent] == ["position_groups_update", "queued_signals_update"]
+    assert ws.sent[0]["payload"] == [{"id": "p1", "pnl": 1}]
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_into_one_load_per_topic():
+    loader = SnapshotLoader()
+    hub = _hub(loader)
+    tabs = [FakeWebSocket(), FakeWebSocket()]
+    for ws in tabs:
+        await hub.connect("u1", ws)
+    loader.loads[TOPIC_POSITIONS] = 0
+
+    loader.data[TOPIC_POSITIONS] = [{"id": "p1", "pnl": 2}]
+    for _ in range(10):
+        hub.handle_event({"user_id": "u1", "topics": [TOPIC_POSITIONS]})
+    await _drain(hub)
+
+    assert loader.loads[TOPIC_POSITIONS] == 1
+    for ws in tabs:
+        assert ws.sent[-1]["payload"] == [{"id": "p1", "pnl": 2}]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_snapshot_is_not_resent():
+    hub = _hub(SnapshotLoader())
+    ws = FakeWebSocket()
+    await hub.connect("u1", ws)
+    sent_before = len(ws.sent)
+
+    hub.handle_event({"user_id": "u1", "topics": [TOPIC_POSITIONS, TOPIC_QUEUE]})
+    await _drain(hub)
+
+    assert len(ws.sent) == sent_before
+    assert hub.get_metrics()["skipped_unchanged"] == 2
+
+
+@pytest.mark.asyncio
+async def test_events_for_other_users_are_ignored():
+    loader = SnapshotLoader()
+    hub = _hub(loader)
+    await hub.connect("u1", FakeWebSocket())
+
+    hub.handle_event({"user_id": "u2", "topics": [TOPIC_POSITIONS]})
+
+    assert "u2" not in hub._flush_tasks
+    assert "u2" not in hub._pending
+
+
+@pytest.mark.asyncio
+async def test_price_refresh_uses_slower_interval():
+    hub = _hub(SnapshotLoader(), price_push_interval_seconds=60)
+    await hub.connect("u1", FakeWebSocket())
+    hub._last_push["u1"] = time.monotonic()
+
+    hub.handle_event({"feed": "binance", "topics": [TOPIC_POSITIONS]})
+    await asyncio.sleep(0.1)
+
+    # Still waiting for the price interval
+    assert hub._pending["u1"] == {TOPIC_POSITIONS: True}
+
+    # A real change upgrades the pending refresh to the fast interval
+    hub.handle_event({"user_id": "u1", "topics": [TOPIC_POSITIONS]})
+    assert hub._pending["u1"] == {TOPIC_POSITIONS: False}
+    await _drain(hub)
+    assert "u1" not in hub._pending
+
+
+@pytest.mark.asyncio
+async def test_failed_socket_is_dropped():
+    loader = SnapshotLoader()
+    hub = _hub(loader)
+    await hub.connect("u1", FakeWebSocket(fail=True))
+
+    assert "u1" not in hub._connections
+    assert not any(user_id == "u1" for user_id, _ in hub._last_sent)
+
+
+@pytest.mark.asyncio
+async def test_publish_falls_back_to_local_hub_without_redis():
+    hub = _hub(SnapshotLoader())
+    hub.handle_event = lambda event: received.append(event)
+    received = []
+    cache = AsyncMock()
+    cache.publish.return_value = False
+
+    with patch("app.services.realtime_updates.get_cache", AsyncMock(return_value=cache)):
+        realtime_updates.set_realtime_hub(hub)
+        try:
+            published = await publish_user_update("u1", TOPIC_QUEUE)
+        finally:
+            realtime_updates.set_realtime_hub(None)
+
+    assert published is False
+    assert received == [{"user_id": "u1", "topics": [TOPIC_QUEUE]}]
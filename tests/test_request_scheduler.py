@@ -0,0 +1,182 @@
+"""
+Tests for the shared exchange request scheduler: weight budgets, priority
+classes, load shedding and feedback from the exchange.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import ccxt
+import pytest
+
+from app.exceptions import RateLimitError
+from app.services.exchange_abstraction.binance_connector import BinanceConnector
+from app.services.exchange_abstraction.request_scheduler import (
+    EXCHANGE_PROFILES,
+    RateLimitProfile,
+    RequestPriority,
+    RequestScheduler,
+    get_request_scheduler,
+    request_priority,
+    reset_request_schedulers,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_schedulers():
+    reset_request_schedulers()
+    yield
+    reset_request_schedulers()
+
+
+def _scheduler(weight_limit=10, window_seconds=60, order_limit=100, **kwargs):
+    profile = RateLimitProfile(
+        weight_limit=weight_limit,
+        window_seconds=window_seconds,
+        order_limit=order_limit,
+        order_window_seconds=10,
+        **kwargs
+    )
+    return RequestScheduler("test", profile)
+
+
+class TestBudget:
+    """Tests for weight accounting and shedding."""
+
+    @pytest.mark.asyncio
+    async def test_binance_weights_follow_endpoints(self):
+        scheduler = get_request_scheduler("binance")
+        await scheduler.acquire("get_all_tickers", RequestPriority.STATUS)
+        await scheduler.acquire("get_order_status", RequestPriority.STATUS)
+
+        assert scheduler.get_metrics()["used_weight"] == 84
+        assert get_request_scheduler("binance") is scheduler
+        assert get_request_scheduler("binance", testnet=True) is not scheduler
+
+    @pytest.mark.asyncio
+    async def test_reads_are_shed_before_orders(self):
+        scheduler = _scheduler(weight_limit=10)
+        for _ in range(7):
+            await scheduler.acquire("fetch", RequestPriority.READ)
+
+        # Reads may only fill 70% of the budget
+        with pytest.raises(RateLimitError):
+            await scheduler.acquire("fetch", RequestPriority.READ)
+        await scheduler.acquire("place_order", RequestPriority.ORDER)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["shed"] == 1
+        assert metrics["used_weight"] == 8
+
+    @pytest.mark.asyncio
+    async def test_order_rate_is_limited_per_account(self):
+        scheduler = _scheduler(weight_limit=100, order_limit=1)
+        await scheduler.acquire("place_order", RequestPriority.ORDER, account="a")
+        await scheduler.acquire("place_order", RequestPriority.ORDER, account="b")
+
+        with patch.dict(
+            "app.services.exchange_abstraction.request_scheduler.PRIORITY_POLICIES",
+            {RequestPriority.ORDER: MagicMock(budget_share=1.0, max_wait_seconds=1)}
+        ):
+            with pytest.raises(RateLimitError):
+                await scheduler.acquire("place_order", RequestPriority.ORDER, account="a")
+
+
+class TestPriority:
+    """Tests for the order in which queued calls are admitted."""
+
+    @pytest.mark.asyncio
+    async def test_orders_overtake_queued_status_polls(self):
+        scheduler = _scheduler(weight_limit=2, window_seconds=0.2)
+        await scheduler.acquire("fetch", RequestPriority.ORDER)
+        await scheduler.acquire("fetch", RequestPriority.ORDER)
+        admitted = []
+
+        async def call(name, priority):
+            await scheduler.acquire("fetch", priority)
+            admitted.append(name)
+
+        status = asyncio.create_task(call("status", RequestPriority.STATUS))
+        await asyncio.sleep(0)
+        order = asyncio.create_task(call("order", RequestPriority.ORDER))
+        await asyncio.gather(status, order)
+
+        assert admitted == ["order", "status"]
+
+    @pytest.mark.asyncio
+    async def test_request_priority_only_demotes(self):
+        scheduler = _scheduler(weight_limit=10)
+        for _ in range(7):
+            await scheduler.acquire("fetch", RequestPriority.STATUS)
+
+        slot = scheduler.slot("fetch", RequestPriority.STATUS)
+        with request_priority(RequestPriority.READ):
+            with pytest.raises(RateLimitError):
+                async with slot:
+                    pass
+
+        with request_priority(RequestPriority.READ):
+            async with scheduler.slot("place_order", RequestPriority.ORDER):
+                pass
+        assert scheduler.get_metrics()["admitted"] == 8
+
+
+class TestExchangeFeedback:
+    """Tests for reported weight and throttling responses."""
+
+    @pytest.mark.asyncio
+    async def test_reported_weight_counts_against_budget(self):
+        scheduler = _scheduler(weight_limit=100, used_weight_header="x-mbx-used-weight-1m")
+        exchange = MagicMock(last_response_headers={"X-MBX-USED-WEIGHT-1M": "95"})
+
+        async with scheduler.slot("fetch", RequestPriority.STATUS, exchange=exchange):
+            pass
+
+        # Another process spent most of the budget: reads are shed, orders still fit
+        with pytest.raises(RateLimitError):
+            await scheduler.acquire("fetch", RequestPriority.READ)
+        await scheduler.acquire("place_order", RequestPriority.ORDER)
+
+    @pytest.mark.asyncio
+    async def test_throttling_pauses_the_host(self):
+        scheduler = _scheduler(weight_limit=100)
+        exchange = MagicMock(last_response_headers={"Retry-After": "120"})
+
+        with pytest.raises(ccxt.RateLimitExceeded):
+            async with scheduler.slot("fetch", RequestPriority.STATUS, exchange=exchange):
+                raise ccxt.RateLimitExceeded("429 Too Many Requests")
+
+        assert scheduler.get_metrics()["paused_seconds"] > 100
+        with pytest.raises(RateLimitError):
+            await scheduler.acquire("place_order", RequestPriority.ORDER)
+
+
+class TestConnectorIntegration:
+    """Tests for the scheduler wiring of the connectors."""
+
+    @pytest.mark.asyncio
+    async def test_connectors_share_one_budget(self):
+        exchange = MagicMock()
+        exchange.fetch_tickers = AsyncMock(return_value={})
+        with patch('ccxt.async_support.binance', return_value=exchange):
+            first = BinanceConnector(api_key="key_one", secret_key="secret")
+            second = BinanceConnector(api_key="key_two", secret_key="secret")
+
+        await first.get_all_tickers()
+        await second.get_all_tickers()
+
+        assert first.request_scheduler is second.request_scheduler
+        assert first.account_key != second.account_key
+        weight = EXCHANGE_PROFILES["binance"].weights["get_all_tickers"]
+        assert first.request_scheduler.get_metrics()["used_weight"] == 2 * weight
+
+    @pytest.mark.asyncio
+    async def test_shed_call_surfaces_as_rate_limit_error(self):
+        exchange = MagicMock()
+        exchange.fetch_ticker = AsyncMock(return_value={'last': 1.0})
+        with patch('ccxt.async_support.binance', return_value=exchange):
+            connector = BinanceConnector(api_key="key", secret_key="secret")
+        connector.request_scheduler.pause(60)
+
+        with pytest.raises(RateLimitError):
+            await connector.get_current_price("BTC/USDT")
+        exchange.fetch_ticker.assert_not_awaited()
@@ -0,0 +1,115 @@
+"""
+Tests for the batch risk evaluation: columnar PnL refresh, timer transitions
+matching update_risk_timers, and offset candidate detection.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.position_group import PositionGroup, PositionGroupStatus
+from app.schemas.grid_config import RiskEngineConfig
+from app.services.risk.risk_batch import (
+    PositionSnapshot,
+    apply_prices,
+    offset_candidates,
+    plan_timer_transitions,
+)
+from app.services.risk.risk_timer import update_risk_timers
+
+CONFIG = RiskEngineConfig(loss_threshold_percent=Decimal("-5"), required_pyramids_for_timer=2,
+                          post_pyramids_wait_minutes=15, max_winners_to_combine=3)
+
+
+def _group(user_id, symbol="BTCUSDT", pnl_percent="0", pnl_usd="0", pyramids=2, filled=3, total=3,
+           timer_start=None, timer_expires=None, eligible=False, status=PositionGroupStatus.ACTIVE.value):
+    return PositionGroup(
+        id=uuid.uuid4(), user_id=user_id, exchange="Binance", symbol=symbol, side="long", status=status,
+        pyramid_count=pyramids, filled_dca_legs=filled, total_dca_legs=total,
+        weighted_avg_entry=Decimal("100"), total_filled_quantity=Decimal("2"),
+        unrealized_pnl_percent=Decimal(pnl_percent), unrealized_pnl_usd=Decimal(pnl_usd),
+        risk_timer_start=timer_start, risk_timer_expires=timer_expires, risk_eligible=eligible,
+        risk_blocked=False, risk_skip_once=False, created_at=datetime.utcnow() - timedelta(hours=1)
+    )
+
+
+def test_apply_prices_reports_only_moved_rows():
+    user_id = uuid.uuid4()
+    unchanged = _group(user_id, "BTCUSDT", pnl_percent="-10.0000", pnl_usd="-20")
+    moved = _group(user_id, "ETHUSDT", pnl_percent="1", pnl_usd="2")
+    unpriced = _group(user_id, "SOLUSDT")
+    snapshot = PositionSnapshot([unchanged, moved, unpriced])
+
+    changed = apply_prices(snapshot, {"binance": {"BTCUSDT": Decimal("90"), "ETHUSDT": Decimal("95")}})
+
+    assert changed == {1}
+    assert (snapshot.pnl_usd[1], snapshot.pnl_percent[1]) == (Decimal("-10"), Decimal("-5"))
+    # Columns are computed, ORM objects untouched until write_back
+    assert moved.unrealized_pnl_usd == Decimal("2")
+    snapshot.write_back(changed)
+    assert moved.unrealized_pnl_usd == Decimal("-10")
+
+
+def test_apply_prices_reads_each_row_from_its_feed():
+    mainnet, testnet = uuid.uuid4(), uuid.uuid4()
+    snapshot = PositionSnapshot([_group(mainnet, "BTCUSDT"), _group(testnet, "BTCUSDT")])
+    snapshot.feeds[1] = "binance_testnet"
+
+    apply_prices(snapshot, {"binance": {"BTCUSDT": Decimal("90")}, "binance_testnet": {"BTCUSDT": Decimal("110")}})
+
+    assert snapshot.pnl_usd == [Decimal("-20"), Decimal("20")]
+
+
+@pytest.mark.asyncio
+async def test_timer_transitions_match_update_risk_timers():
+    user_id = uuid.uuid4()
+    now = datetime.utcnow()
+
+    def scenarios():
+        return [
+            _group(user_id, pnl_percent="-6"),                                      # starts
+            _group(user_id, pnl_percent="-6", pyramids=1),                          # pyramids incomplete
+            _group(user_id, pnl_percent="-1", timer_start=now - timedelta(minutes=5),
+                   timer_expires=now + timedelta(minutes=10)),                      # keeps running
+            _group(user_id, pnl_percent="-1", timer_start=now - timedelta(minutes=20),
+                   timer_expires=now - timedelta(minutes=5)),                       # expires
+            _group(user_id, pnl_percent="2", timer_start=now - timedelta(minutes=5),
+                   timer_expires=now + timedelta(minutes=10)),                      # resets
+            _group(user_id, pnl_percent="-6", status=PositionGroupStatus.LIVE.value),
+        ]
+
+    groups, expected = scenarios(), scenarios()
+    with patch("app.services.risk.risk_timer.datetime") as mock_datetime, \
+            patch("app.services.risk.risk_timer.broadcast_risk_event", new_callable=AsyncMock):
+        mock_datetime.utcnow.return_value = now
+        await update_risk_timers(expected, CONFIG, AsyncMock())
+
+    snapshot = PositionSnapshot(groups)
+    transitions = plan_timer_transitions(snapshot, {user_id: CONFIG}, now)
+    snapshot.write_back({row for row, _, _ in transitions})
+
+    assert [(row, event) for row, event, _ in transitions] == [
+        (0, "timer_started"), (3, "timer_expired"), (4, "timer_reset")
+    ]
+    for group, reference in zip(groups, expected):
+        assert (group.risk_timer_start, group.risk_timer_expires, group.risk_eligible) == \
+               (reference.risk_timer_start, reference.risk_timer_expires, reference.risk_eligible)
+
+
+def test_offset_candidates_need_expired_loser_and_a_winner():
+    now = datetime.utcnow()
+    expired = dict(timer_start=now - timedelta(minutes=30), timer_expires=now - timedelta(minutes=15), eligible=True)
+    with_winner, without_winner, waiting = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    snapshot = PositionSnapshot([
+        _group(with_winner, "BTCUSDT", pnl_percent="-8", pnl_usd="-16", **expired),
+        _group(with_winner, "ETHUSDT", pnl_percent="10", pnl_usd="20", status=PositionGroupStatus.LIVE.value),
+        _group(without_winner, "BTCUSDT", pnl_percent="-8", pnl_usd="-16", **expired),
+        _group(waiting, "BTCUSDT", pnl_percent="-8", pnl_usd="-16",
+               timer_start=now, timer_expires=now + timedelta(minutes=15)),
+        _group(waiting, "ETHUSDT", pnl_percent="10", pnl_usd="20"),
+    ])
+    configs = {user_id: CONFIG for user_id in (with_winner, without_winner, waiting)}
+
+    assert offset_candidates(snapshot, configs, now) == [with_winner]
@@ -14,6 +14,7 @@ from app.services.risk_engine import (
 from app.models.queued_signal import QueuedSignal
 from app.models.position_group import PositionGroup, PositionGroupStatus
 from app.schemas.grid_config import RiskEngineConfig
+from app.services.exchange_abstraction.connector_pool import get_connector_pool
 
 
 @pytest.fixture
@@ -63,6 +64,11 @@ def default_risk_config():
     )
 
 
+def test_short_lived_services_share_the_process_wide_connector_pool(mock_risk_engine_service):
+    """Per-fill and per-request instances must not open connector sessions of their own."""
+    assert mock_risk_engine_service.connector_pool is get_connector_pool()
+
+
 # --- Tests for _check_pyramids_complete ---
 
 def test_check_pyramids_complete_true():
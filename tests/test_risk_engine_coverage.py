@@ -937,16 +937,36 @@ def test_get_exchange_connector_for_user_invalid_format(mock_config):
             service._get_exchange_connector_for_user(user, "binance")
 
 
+def _batch_group(user_id, symbol, pnl_percent, pnl_usd, timer_expired=False):
+    now = datetime.utcnow()
+    return PositionGroup(
+        id=uuid.uuid4(), user_id=user_id, symbol=symbol, exchange="binance", side="long",
+        status=PositionGroupStatus.ACTIVE.value, pyramid_count=1, filled_dca_legs=1, total_dca_legs=1,
+        weighted_avg_entry=Decimal("100"), total_filled_quantity=Decimal("1"),
+        unrealized_pnl_percent=Decimal(pnl_percent), unrealized_pnl_usd=Decimal(pnl_usd),
+        risk_timer_start=now - timedelta(minutes=30) if timer_expired else None,
+        risk_timer_expires=now - timedelta(minutes=15) if timer_expired else None,
+        risk_eligible=timer_expired, risk_blocked=False, risk_skip_once=False,
+        created_at=now - timedelta(hours=1)
+    )
+
+
 @pytest.mark.asyncio
-async def test_evaluate_positions_iterates_users(mock_config):
-    """Test _evaluate_positions iterates through all active users."""
-    user1 = MagicMock()
-    user1.id = uuid.uuid4()
-    user2 = MagicMock()
-    user2.id = uuid.uuid4()
+async def test_evaluate_positions_batches_users(mock_config):
+    """Test _evaluate_positions loads all users' positions at once and offsets only candidates."""
+    user1 = MagicMock(id=uuid.uuid4(), risk_config=None)
+    user2 = MagicMock(id=uuid.uuid4(), risk_config=None)
+    user1_groups = [
+        _batch_group(user1.id, "BTCUSDT", "-10", "-10", timer_expired=True),
+        _batch_group(user1.id, "ETHUSDT", "20", "20"),
+    ]
+    user2_groups = [_batch_group(user2.id, "SOLUSDT", "20", "20")]
 
     mock_user_repo = MagicMock()
     mock_user_repo.get_all_active_users = AsyncMock(return_value=[user1, user2])
+    mock_pos_repo = MagicMock()
+    mock_pos_repo.get_closing_for_users = AsyncMock(return_value=[])
+    mock_pos_repo.get_all_active_for_users = AsyncMock(return_value=user1_groups + user2_groups)
 
     mock_session = AsyncMock()
 
@@ -957,16 +977,30 @@ async def test_evaluate_positions_iterates_users(mock_config):
         with patch("app.services.risk.risk_engine.UserRepository", return_value=mock_user_repo):
             service = RiskEngineService(
                 session_factory=mock_session_factory,
-                position_group_repository_class=MagicMock(),
+                position_group_repository_class=MagicMock(return_value=mock_pos_repo),
                 risk_action_repository_class=MagicMock(),
                 dca_order_repository_class=MagicMock(),
                 order_service_class=MagicMock(),
                 risk_engine_config=mock_config
             )
 
-            with patch.object(service, '_evaluate_user_positions', new=AsyncMock()) as mock_eval:
+            with (
+                patch.object(service, '_fetch_exchange_prices', new=AsyncMock(return_value={})),
+                patch.object(service, '_evaluate_user_positions', new=AsyncMock()) as mock_eval,
+            ):
                 await service._evaluate_positions()
-                assert mock_eval.call_count == 2
+
+    mock_pos_repo.get_all_active_for_users.assert_awaited_once_with([user1.id, user2.id])
+    mock_eval.assert_awaited_once_with(mock_session, user1, prepared_positions=user1_groups)
+    # Nothing changed: no write-back commit
+    mock_session.commit.assert_not_awaited()
+
+    # The batch indexed each position's levels; only a crossing wakes the loop for its user
+    await service._on_price_update("binance", {"SOL/USDT": Decimal("101")})
+    assert not service._trigger_event.is_set()
+    await service._on_price_update("binance", {"SOL/USDT": Decimal("99")})
+    assert service._triggered_users == {user2.id}
+    assert service._trigger_event.is_set()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,77 @@
+"""
+Tests for the Risk Engine trigger index: threshold levels per position,
+crossing detection on price updates and re-indexing.
+"""
+import uuid
+from decimal import Decimal
+
+from app.models.position_group import PositionGroup, PositionGroupStatus
+from app.schemas.grid_config import RiskEngineConfig
+from app.services.risk.risk_batch import PositionSnapshot
+from app.services.risk.risk_triggers import RiskTriggerIndex
+
+CONFIG = RiskEngineConfig(loss_threshold_percent=Decimal("-5"))
+
+
+def _group(user_id, symbol="BTCUSDT", entry="100", status=PositionGroupStatus.ACTIVE.value):
+    return PositionGroup(
+        id=uuid.uuid4(), user_id=user_id, exchange="Binance", symbol=symbol, side="long", status=status,
+        pyramid_count=2, filled_dca_legs=3, total_dca_legs=3,
+        weighted_avg_entry=Decimal(entry), total_filled_quantity=Decimal("1"),
+        unrealized_pnl_percent=Decimal("0"), unrealized_pnl_usd=Decimal("0"),
+        risk_timer_start=None, risk_timer_expires=None, risk_eligible=False,
+        risk_blocked=False, risk_skip_once=False
+    )
+
+
+def _index(groups):
+    snapshot = PositionSnapshot(groups)
+    index = RiskTriggerIndex()
+    index.replace_users(set(snapshot.rows_by_user), snapshot, {u: CONFIG for u in snapshot.rows_by_user})
+    return index
+
+
+def test_price_crossing_a_level_triggers_its_user_only():
+    near, far, winner = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = _index([
+        _group(near, entry="100"),                                       # levels 95 and 100
+        _group(far, entry="200"),                                        # levels 190 and 200
+        _group(winner, entry="97", status=PositionGroupStatus.LIVE.value),  # entry only
+    ])
+    index.record_prices("binance", {"BTC/USDT": Decimal("101")})
+
+    assert index.check_prices("binance", {"BTC/USDT": Decimal("100.5")}) == set()
+    assert index.check_prices("binance", {"BTC/USDT": Decimal("94")}) == {near, winner}
+    assert index.check_prices("binance", {"BTC/USDT": Decimal("94")}) == set()
+    # Other feeds and symbols are not indexed for these positions
+    assert index.check_prices("binance_testnet", {"BTCUSDT": Decimal("300")}) == set()
+    assert index.check_prices("binance", {"BTCUSDT": Decimal("195")}) == {near, far, winner}
+
+
+def test_replacing_a_user_drops_its_old_levels():
+    user_id = uuid.uuid4()
+    index = _index([_group(user_id, entry="100")])
+    index.record_prices("binance", {"BTCUSDT": Decimal("101")})
+
+    snapshot = PositionSnapshot([_group(user_id, entry="50")])
+    index.replace_users({user_id}, snapshot, {user_id: CONFIG})
+    assert len(index) == 2
+    assert index.check_prices("binance", {"BTCUSDT": Decimal("90")}) == set()
+
+    index.replace_users({user_id}, PositionSnapshot([]), {})
+    assert len(index) == 0
+    assert index.check_prices("binance", {"BTCUSDT": Decimal("10")}) == set()
+
+
+
+def test_testnet_rows_are_indexed_under_the_testnet_feed():
+    mainnet, testnet = uuid.uuid4(), uuid.uuid4()
+    snapshot = PositionSnapshot([_group(mainnet, entry="100"), _group(testnet, entry="100")])
+    snapshot.feeds[1] = "binance_testnet"
+    index = RiskTriggerIndex()
+    index.replace_users({mainnet, testnet}, snapshot, {mainnet: CONFIG, testnet: CONFIG})
+    index.record_prices("binance", {"BTCUSDT": Decimal("101")})
+    index.record_prices("binance_testnet", {"BTCUSDT": Decimal("101")})
+
+    assert index.check_prices("binance", {"BTCUSDT": Decimal("99")}) == {mainnet}
+    assert index.check_prices("binance_testnet", {"BTCUSDT": Decimal("99")}) == {testnet}
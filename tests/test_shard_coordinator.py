@@ -0,0 +1,161 @@
+"""
+Tests for sharding background work across workers: slot assignment, lease
+handover on rebalance and the per-service user filters.
+"""
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.queue_manager import QueueManagerService
+from app.services.shard_coordinator import ShardCoordinator, assign_slots, slot_for
+
+
+class FakeCache:
+    """Membership and lock primitives of CacheService kept in memory."""
+
+    def __init__(self):
+        self.members = set()
+        self.locks = {}
+
+    async def register_shard_member(self, worker_id, ttl_seconds=30):
+        self.members.add(worker_id)
+        return True
+
+    async def remove_shard_member(self, worker_id):
+        self.members.discard(worker_id)
+        return True
+
+    async def get_shard_members(self):
+        return sorted(self.members)
+
+    async def acquire_lock(self, resource, lock_id, ttl_seconds=30):
+        if resource in self.locks:
+            return False
+        self.locks[resource] = lock_id
+        return True
+
+    async def extend_lock(self, resource, lock_id, ttl_seconds=30):
+        return self.locks.get(resource) == lock_id
+
+    async def release_lock(self, resource, lock_id):
+        if self.locks.get(resource) == lock_id:
+            del self.locks[resource]
+            return True
+        return False
+
+
+def _coordinator(worker_id, cache):
+    return ShardCoordinator(worker_id, slot_count=16, cache=cache)
+
+
+class TestAssignment:
+    """Tests for the rendezvous slot assignment."""
+
+    def test_every_slot_has_one_owner(self):
+        assignment = assign_slots(["a", "b", "c"], slot_count=16)
+        assert sorted(assignment) == list(range(16))
+        assert set(assignment.values()) <= {"a", "b", "c"}
+
+    def test_joining_member_only_takes_slots(self):
+        before = assign_slots(["a", "b"], slot_count=64)
+        after = assign_slots(["a", "b", "c"], slot_count=64)
+
+        moved = [slot for slot in before if before[slot] != after[slot]]
+        assert moved
+        assert all(after[slot] == "c" for slot in moved)
+
+    def test_slot_is_stable(self):
+        user_id = uuid.uuid4()
+        assert slot_for(user_id) == slot_for(str(user_id))
+
+
+class TestCoordinator:
+    """Tests for membership and lease handling."""
+
+    @pytest.mark.asyncio
+    async def test_workers_split_all_users(self):
+        cache = FakeCache()
+        a, b = _coordinator("a", cache), _coordinator("b", cache)
+
+        await a.refresh()
+        await b.refresh()
+        await a.refresh()  # a hands b's slots back
+        await b.refresh()  # b takes them
+
+        users = [uuid.uuid4() for _ in range(200)]
+        assert all(a.owns(u) != b.owns(u) for u in users)
+        assert a.get_metrics()["owned_slots"] + b.get_metrics()["owned_slots"] == 16
+
+    @pytest.mark.asyncio
+    async def test_new_worker_waits_for_lease_release(self):
+        """A user is never owned by two workers while a rebalance is in progress."""
+        cache = FakeCache()
+        a, b = _coordinator("a", cache), _coordinator("b", cache)
+        await a.refresh()
+        assert a.get_metrics()["owned_slots"] == 16
+
+        await b.refresh()
+        assert b.get_metrics()["owned_slots"] == 0
+        assert b.get_metrics()["lease_waits"] > 0
+
+        users = [uuid.uuid4() for _ in range(200)]
+        await a.refresh()
+        await b.refresh()
+        assert not any(a.owns(u) and b.owns(u) for u in users)
+        assert b.get_metrics()["owned_slots"] > 0
+
+    @pytest.mark.asyncio
+    async def test_stopped_worker_hands_over_immediately(self):
+        cache = FakeCache()
+        a, b = _coordinator("a", cache), _coordinator("b", cache)
+        for coordinator in (a, b, a, b):
+            await coordinator.refresh()
+
+        await b.stop()
+        await a.refresh()
+
+        assert a.get_metrics()["owned_slots"] == 16
+        assert cache.members == {"a"}
+
+    @pytest.mark.asyncio
+    async def test_without_redis_worker_owns_everything(self):
+        cache = MagicMock()
+        cache.register_shard_member = AsyncMock(return_value=False)
+        cache.get_shard_members = AsyncMock(return_value=None)
+        cache.acquire_lock = AsyncMock(return_value=True)  # CacheService falls back to allowing
+        coordinator = _coordinator("a", cache)
+
+        await coordinator.refresh()
+
+        assert coordinator.owns(uuid.uuid4())
+        assert coordinator.get_metrics()["owned_slots"] == 16
+
+
+class TestShardedServices:
+    """Tests for the user filters of the background services."""
+
+    @pytest.mark.asyncio
+    async def test_queue_promotion_skips_users_of_other_workers(self):
+        mine, theirs = uuid.uuid4(), uuid.uuid4()
+        coordinator = MagicMock()
+        coordinator.filter_owned = lambda items, user_id_of: [i for i in items if user_id_of(i) == mine]
+
+        queue_repo = MagicMock()
+        queue_repo.get_all_queued_signals = AsyncMock(return_value=[
+            MagicMock(user_id=theirs, exchange="binance")
+        ])
+        session = MagicMock()
+        session.get = AsyncMock()
+
+        service = QueueManagerService(
+            session_factory=MagicMock(),
+            queued_signal_repository_class=MagicMock(return_value=queue_repo),
+            position_group_repository_class=MagicMock(),
+            market_data=MagicMock(),
+            shard_coordinator=coordinator
+        )
+        result = await service.promote_highest_priority_signal(session)
+
+        assert result is None
+        session.get.assert_not_called()
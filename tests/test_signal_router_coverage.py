@@ -43,16 +43,15 @@ def mock_deps():
         # Configure async methods on the *instance* returned by the mocked class
         mock_pool_instance = MockPool.return_value
         mock_pool_instance.request_slot = AsyncMock(return_value=True)
+        mock_pool_instance.release_slot = AsyncMock()
 
         # Create mock connector instance
         mock_connector_instance = AsyncMock()
-        mock_connector_instance.get_precision_rules = AsyncMock(return_value={
-            "BTCUSDT": {
-                "tick_size": Decimal("0.01"),
-                "step_size": Decimal("0.001"),
-                "min_notional": Decimal("10.0"),
-                "min_qty": Decimal("0.00001")
-            }
+        mock_connector_instance.get_symbol_precision = AsyncMock(return_value={
+            "tick_size": Decimal("0.01"),
+            "step_size": Decimal("0.001"),
+            "min_notional": Decimal("10.0"),
+            "min_qty": Decimal("0.00001")
         })
         mock_connector_instance.close = AsyncMock()
         mock_connector_instance.fetch_balance = AsyncMock(return_value={'total': {'USDT': 1000}})
@@ -190,13 +189,11 @@ async def test_route_decryption_failure(sample_user, sample_signal, mock_async_s
 async def test_route_fetch_balance_failure(sample_user, sample_signal, mock_async_session, mock_deps):
     # Setup: Exchange connector mock - configure the connector from fixture
     mock_deps["connector"].fetch_balance.side_effect = Exception("API Error")
-    mock_deps["connector"].get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_deps["connector"].get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
 
     # Setup: Mock repository to return empty list (New Position)
@@ -253,13 +250,11 @@ async def test_route_pyramid_continuation(sample_user, sample_signal, mock_async
 
     # Configure mock connector from fixture
     mock_deps["connector"].fetch_balance.return_value = {'total': {'USDT': 5000}}
-    mock_deps["connector"].get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_deps["connector"].get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
 
     pos_manager_mock = mock_deps["pos_manager"]  # The Mock class
@@ -308,13 +303,11 @@ async def test_route_max_pyramids_reached(sample_user, sample_signal, mock_async
     repo_instance.get_active_position_group_for_signal = AsyncMock(return_value=existing_group)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -361,13 +354,11 @@ async def test_route_pyramid_exception(sample_user, sample_signal, mock_async_se
     repo_instance.get_active_position_group_for_signal = AsyncMock(return_value=existing_group)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -402,13 +393,11 @@ async def test_route_new_position_exception(sample_user, sample_signal, mock_asy
     mock_deps["pool"].return_value.request_slot = AsyncMock(return_value=True)
     
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -456,13 +445,11 @@ async def test_route_exit_signal_success(sample_user, sample_signal, mock_async_
     repo_instance.get_active_position_group_for_exit = AsyncMock(return_value=existing_group)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -500,13 +487,11 @@ async def test_route_exit_signal_no_position_found(sample_user, sample_signal, m
     repo_instance.get_active_position_group_for_exit = AsyncMock(return_value=None)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -548,7 +533,7 @@ async def test_route_no_dca_config(sample_user, sample_signal, mock_async_sessio
 async def test_route_precision_validation_failure_with_blocking(sample_user, sample_signal, mock_async_session, mock_deps):
     """Test precision validation failure when block_on_missing is True."""
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {}  # No rules for symbol
+    mock_exchange.get_symbol_precision.return_value = None  # Symbol not listed
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
     sample_user.risk_config = {
@@ -574,7 +559,7 @@ async def test_route_precision_validation_failure_with_blocking(sample_user, sam
 async def test_route_precision_fetch_exception_with_fallback(sample_user, sample_signal, mock_async_session, mock_deps):
     """Test precision fetch exception with fallback enabled."""
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.side_effect = Exception("Network error")
+    mock_exchange.get_symbol_precision.side_effect = Exception("Network error")
     mock_exchange.fetch_balance = AsyncMock(return_value={'total': {'USDT': 1000}})
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -622,13 +607,11 @@ async def test_route_pool_full_queues_signal(sample_user, sample_signal, mock_as
     mock_pool_instance.request_slot = AsyncMock(return_value=False)  # Pool full
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -684,13 +667,11 @@ async def test_route_pyramid_bypass_rule_disabled(sample_user, sample_signal, mo
     mock_pool_instance.request_slot = AsyncMock(return_value=False)  # Pool full
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -715,13 +696,11 @@ async def test_route_risk_config_as_list_uses_default(sample_user, sample_signal
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_exchange.fetch_balance = AsyncMock(return_value={'total': {'USDT': 1000}})
     mock_deps["config_service"].get_connector.return_value = mock_exchange
@@ -754,13 +733,11 @@ async def test_route_new_position_failed_status(sample_user, sample_signal, mock
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -790,13 +767,11 @@ async def test_route_duplicate_position_exception(sample_user, sample_signal, mo
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -825,13 +800,11 @@ async def test_route_capital_cap_at_max_exposure(sample_user, sample_signal, moc
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_exchange.fetch_balance = AsyncMock(return_value={'total': {'USDT': 10000}})  # Large balance
     mock_deps["config_service"].get_connector.return_value = mock_exchange
@@ -865,13 +838,11 @@ async def test_route_sell_action_rejected_in_spot(sample_user, sample_signal, mo
     sample_signal.execution_intent.type = "signal"  # Not an exit
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -898,13 +869,11 @@ async def test_route_legacy_string_api_keys(sample_user, sample_signal, mock_asy
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
@@ -937,13 +906,11 @@ async def test_route_risk_config_as_string(sample_user, sample_signal, mock_asyn
     mock_pool_instance.request_slot = AsyncMock(return_value=True)
 
     mock_exchange = AsyncMock()
-    mock_exchange.get_precision_rules.return_value = {
-        "BTCUSDT": {
-            "tick_size": Decimal("0.01"),
-            "step_size": Decimal("0.001"),
-            "min_notional": Decimal("10.0"),
-            "min_qty": Decimal("0.00001")
-        }
+    mock_exchange.get_symbol_precision.return_value = {
+        "tick_size": Decimal("0.01"),
+        "step_size": Decimal("0.001"),
+        "min_notional": Decimal("10.0"),
+        "min_qty": Decimal("0.00001")
     }
     mock_deps["config_service"].get_connector.return_value = mock_exchange
 
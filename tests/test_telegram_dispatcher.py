@@ -0,0 +1,166 @@
+"""
+Tests for the background Telegram dispatcher: coalescing, bounded queueing,
+rate-limit retries and the broadcaster's dispatcher path.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.schemas.telegram_config import TelegramConfig
+from app.services.telegram_broadcaster import TelegramBroadcaster
+from app.services.telegram_dispatcher import TelegramDelivery, TelegramDispatcher
+
+
+def _response(status, body):
+    response = MagicMock()
+    response.status = status
+    response.json = AsyncMock(return_value=body)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=None)
+    return context
+
+
+def _http_session(*responses):
+    session = MagicMock()
+    session.post = MagicMock(side_effect=list(responses))
+    return session
+
+
+@pytest.fixture
+def dispatcher():
+    return TelegramDispatcher(per_chat_interval_seconds=0, per_bot_interval_seconds=0, base_backoff_seconds=0)
+
+
+class TestEnqueue:
+    """Tests for queueing and coalescing."""
+
+    def test_edits_of_same_message_coalesce(self, dispatcher):
+        dispatcher.enqueue_edit("token", "@chan", 42, "first")
+        dispatcher.enqueue_edit("token", "@chan", 42, "second")
+        dispatcher.enqueue_edit("token", "@chan", 43, "other")
+
+        assert dispatcher._queue.qsize() == 2
+        assert dispatcher._queue.get_nowait().text == "second"
+        assert dispatcher.get_metrics()["coalesced"] == 1
+
+    def test_sends_with_same_key_coalesce(self, dispatcher):
+        dispatcher.enqueue_send("token", "@chan", "1/3 filled", coalesce_key="pg-1")
+        dispatcher.enqueue_send("token", "@chan", "2/3 filled", coalesce_key="pg-1")
+        dispatcher.enqueue_send("token", "@chan", "exit")
+        dispatcher.enqueue_send("token", "@chan", "exit")
+
+        assert dispatcher._queue.qsize() == 3
+        assert dispatcher._queue.get_nowait().text == "2/3 filled"
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        dispatcher = TelegramDispatcher(max_queue_size=1)
+
+        assert dispatcher.enqueue_send("token", "@chan", "a") is True
+        assert dispatcher.enqueue_send("token", "@chan", "b") is False
+        assert dispatcher.get_metrics()["dropped"] == 1
+
+
+class TestDelivery:
+    """Tests for the delivery workers."""
+
+    @pytest.mark.asyncio
+    async def test_send_reports_message_id(self, dispatcher):
+        callback = AsyncMock()
+        dispatcher._get_session = MagicMock(return_value=_http_session(
+            _response(200, {"ok": True, "result": {"message_id": 7}})
+        ))
+
+        await dispatcher._process(TelegramDelivery("token", "@chan", "hello", on_message_id=callback))
+
+        callback.assert_awaited_once_with(7)
+        assert dispatcher.get_metrics()["sent"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_is_retried_after_retry_after(self, dispatcher):
+        session = _http_session(
+            _response(429, {"ok": False, "parameters": {"retry_after": 3}}),
+            _response(200, {"ok": True, "result": {"message_id": 8}})
+        )
+        dispatcher._get_session = MagicMock(return_value=session)
+
+        with patch("app.services.telegram_dispatcher.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            message_id = await dispatcher._deliver(TelegramDelivery("token", "@chan", "hello"))
+
+        assert message_id == 8
+        assert session.post.call_count == 2
+        assert any(call.args[0] >= 2.9 for call in mock_sleep.await_args_list)
+        assert dispatcher.get_metrics()["retried"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_not_retried(self, dispatcher):
+        session = _http_session(_response(400, {"ok": False, "description": "chat not found"}))
+        dispatcher._get_session = MagicMock(return_value=session)
+
+        message_id = await dispatcher._deliver(TelegramDelivery("token", "@chan", "hello"))
+
+        assert message_id is None
+        assert session.post.call_count == 1
+        assert dispatcher.get_metrics()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unmodified_edit_counts_as_delivered(self, dispatcher):
+        dispatcher._get_session = MagicMock(return_value=_http_session(
+            _response(400, {"ok": False, "description": "Bad Request: message is not modified"})
+        ))
+
+        message_id = await dispatcher._deliver(TelegramDelivery("token", "@chan", "same", message_id=5))
+
+        assert message_id == 5
+        assert dispatcher.get_metrics()["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_update_during_send_becomes_edit(self, dispatcher):
+        """A position update arriving while its first message is in flight edits that message."""
+        delivery = TelegramDelivery("token", "@chan", "1/3 filled", coalesce_key=("send", "token", "@chan", "pg-1"))
+
+        async def deliver(d):
+            dispatcher.enqueue_send("token", "@chan", "2/3 filled", coalesce_key="pg-1")
+            return 9
+
+        dispatcher._deliver = deliver
+        await dispatcher._process(delivery)
+
+        followup = dispatcher._queue.get_nowait()
+        assert followup.message_id == 9
+        assert followup.text == "2/3 filled"
+
+
+class TestBroadcasterDispatch:
+    """Tests for TelegramBroadcaster with a dispatcher."""
+
+    def _config(self):
+        return TelegramConfig(enabled=True, bot_token="token", channel_id="@chan", test_mode=False)
+
+    @pytest.mark.asyncio
+    async def test_send_is_queued_not_awaited(self):
+        dispatcher = MagicMock()
+        broadcaster = TelegramBroadcaster(self._config(), dispatcher=dispatcher)
+
+        with patch("app.services.telegram_broadcaster.aiohttp.ClientSession") as session_cls:
+            result = await broadcaster._send_message("hello")
+
+        assert result is None
+        session_cls.assert_not_called()
+        dispatcher.enqueue_send.assert_called_once_with(
+            "token", "@chan", "hello", on_message_id=None, coalesce_key=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_update_is_queued_as_edit(self):
+        dispatcher = MagicMock()
+        broadcaster = TelegramBroadcaster(self._config(), dispatcher=dispatcher)
+
+        result = await broadcaster._update_message(42, "updated")
+
+        assert result == 42
+        dispatcher.enqueue_edit.assert_called_once_with("token", "@chan", 42, "updated")
+
+    def test_deliver_inline_bypasses_dispatcher(self):
+        broadcaster = TelegramBroadcaster(self._config(), dispatcher=MagicMock(), deliver_inline=True)
+        assert broadcaster.dispatcher is None
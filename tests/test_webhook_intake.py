@@ -0,0 +1,436 @@
+"""
+Tests for asynchronous webhook intake: persistence, deduplication,
+ordered dispatch to router workers and the intake path of the webhook endpoint.
+"""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.webhooks import tradingview_webhook
+from app.models.webhook_intake import WebhookIntake, WebhookIntakeStatus
+from app.schemas.webhook_payloads import WebhookPayload
+from app.services.webhook_intake import (
+    WebhookIntakeService,
+    build_idempotency_key,
+    build_ordering_key,
+)
+
+
+def _payload_dict(symbol="BTCUSDT", timeframe=60, trade_id="t1", action="buy", intent="signal"):
+    return {
+        "user_id": str(uuid.uuid4()),
+        "secret": "test_secret",
+        "source": "tradingview",
+        "timestamp": "2025-01-01T00:00:00",
+        "tv": {
+            "exchange": "mock",
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "action": action,
+            "market_position": "long",
+            "market_position_size": 100,
+            "prev_market_position": "flat",
+            "prev_market_position_size": 0,
+            "entry_price": 50000,
+            "close_price": 50000,
+            "order_size": 100
+        },
+        "strategy_info": {"trade_id": trade_id, "alert_name": "Test", "alert_message": "Test"},
+        "execution_intent": {"type": intent, "side": action, "position_size_type": "quote"},
+        "risk": {"max_slippage_percent": 1.0}
+    }
+
+
+def _session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+    return factory
+
+
+def _intake(ordering_key, received_at=None):
+    return WebhookIntake(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        ordering_key=ordering_key,
+        idempotency_key="k",
+        payload=_payload_dict(),
+        status=WebhookIntakeStatus.PROCESSING.value,
+        attempts=1,
+        received_at=received_at or datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def mock_user():
+    user = MagicMock()
+    user.id = uuid.uuid4()
+    user.is_active = True
+    return user
+
+
+@pytest.fixture
+def mock_cache():
+    cache = AsyncMock()
+    cache.acquire_lock = AsyncMock(return_value=True)
+    cache.release_lock = AsyncMock(return_value=True)
+    return cache
+
+
+class TestKeys:
+    """Tests for ordering and idempotency keys."""
+
+    def test_ordering_key_per_symbol_timeframe(self):
+        user_id = uuid.uuid4()
+        a = WebhookPayload(**_payload_dict(symbol="BTCUSDT", timeframe=60))
+        b = WebhookPayload(**_payload_dict(symbol="BTCUSDT", timeframe=15))
+        assert build_ordering_key(user_id, a) == f"{user_id}:BTCUSDT:60"
+        assert build_ordering_key(user_id, a) != build_ordering_key(user_id, b)
+
+    def test_idempotency_key_distinguishes_entry_and_exit(self):
+        entry = WebhookPayload(**_payload_dict(trade_id="t1", action="buy", intent="signal"))
+        exit_ = WebhookPayload(**_payload_dict(trade_id="t1", action="sell", intent="exit"))
+        assert build_idempotency_key(entry) == "t1:buy:signal"
+        assert build_idempotency_key(entry) != build_idempotency_key(exit_)
+
+
+class TestSubmit:
+    """Tests for WebhookIntakeService.submit."""
+
+    @pytest.mark.asyncio
+    async def test_persists_pending_intake(self, mock_user, mock_cache):
+        repo = MagicMock()
+        repo.find_recent_duplicate = AsyncMock(return_value=None)
+        repo.create = AsyncMock(side_effect=lambda intake: intake)
+        service = WebhookIntakeService(session_factory=MagicMock(), intake_repository_class=MagicMock(return_value=repo))
+        db = AsyncMock()
+        raw = _payload_dict()
+
+        with patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            intake, duplicate = await service.submit(db, mock_user, WebhookPayload(**raw), raw)
+
+        assert duplicate is False
+        assert intake.status == WebhookIntakeStatus.PENDING.value
+        assert intake.payload == raw
+        assert intake.idempotency_key == "t1:buy:signal"
+        db.commit.assert_awaited_once()
+        assert service.get_metrics()["accepted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_not_persisted(self, mock_user, mock_cache):
+        earlier = MagicMock()
+        repo = MagicMock()
+        repo.find_recent_duplicate = AsyncMock(return_value=earlier)
+        repo.create = AsyncMock()
+        service = WebhookIntakeService(session_factory=MagicMock(), intake_repository_class=MagicMock(return_value=repo))
+        raw = _payload_dict()
+
+        with patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            intake, duplicate = await service.submit(AsyncMock(), mock_user, WebhookPayload(**raw), raw)
+
+        assert duplicate is True
+        assert intake is earlier
+        repo.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dedup_claim_held_elsewhere_is_duplicate(self, mock_user, mock_cache):
+        """Another worker holding the Redis dedup key means this delivery is a duplicate."""
+        mock_cache.acquire_lock = AsyncMock(return_value=False)
+        repo = MagicMock()
+        repo.find_recent_duplicate = AsyncMock(return_value=None)
+        repo.create = AsyncMock()
+        service = WebhookIntakeService(session_factory=MagicMock(), intake_repository_class=MagicMock(return_value=repo))
+        raw = _payload_dict()
+
+        with patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            intake, duplicate = await service.submit(AsyncMock(), mock_user, WebhookPayload(**raw), raw)
+
+        assert duplicate is True
+        assert intake is None
+        repo.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_releases_dedup_claim(self, mock_user, mock_cache):
+        """A delivery that was not persisted must not turn its retry into a duplicate."""
+        repo = MagicMock()
+        repo.find_recent_duplicate = AsyncMock(return_value=None)
+        repo.create = AsyncMock(side_effect=lambda intake: intake)
+        service = WebhookIntakeService(session_factory=MagicMock(), intake_repository_class=MagicMock(return_value=repo))
+        db = AsyncMock()
+        db.commit.side_effect = Exception("connection reset")
+        raw = _payload_dict()
+
+        with patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            with pytest.raises(Exception, match="connection reset"):
+                await service.submit(db, mock_user, WebhookPayload(**raw), raw)
+
+        resource, token = mock_cache.acquire_lock.call_args.args[:2]
+        mock_cache.release_lock.assert_awaited_once_with(resource, token)
+        assert service.get_metrics()["accepted"] == 0
+
+
+class TestDispatch:
+    """Tests for ordered dispatch and routing."""
+
+    @pytest.mark.asyncio
+    async def test_same_ordering_key_same_shard_in_order(self):
+        session = AsyncMock()
+        intakes = [_intake("u:BTCUSDT:60") for _ in range(3)] + [_intake("u:ETHUSDT:60")]
+        repo = MagicMock()
+        repo.claim_pending = AsyncMock(return_value=intakes)
+
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            worker_count=4,
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+        service._queues = [asyncio.Queue() for _ in range(4)]
+
+        dispatched = await service._dispatch_pending()
+
+        assert dispatched == 4
+        repo.claim_pending.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        shard = service._queues[service._shard_for("u:BTCUSDT:60")]
+        btc_ids = [i.id for i in intakes[:3]]
+        queued = [shard.get_nowait() for _ in range(shard.qsize())]
+        assert [q for q in queued if q in btc_ids] == btc_ids
+
+    @pytest.mark.asyncio
+    async def test_process_routes_and_marks_done(self, mock_user):
+        session = AsyncMock()
+        intake = _intake("u:BTCUSDT:60")
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        router = MagicMock()
+        router.route = AsyncMock(return_value="Position created")
+        router_cls = MagicMock(return_value=router)
+
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            signal_router_class=router_cls,
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        with patch("app.services.webhook_intake.UserRepository") as user_repo_cls:
+            user_repo_cls.return_value.get_by_id = AsyncMock(return_value=mock_user)
+            await service._process(intake.id)
+
+        router_cls.assert_called_once_with(user=mock_user)
+        assert intake.status == WebhookIntakeStatus.DONE.value
+        assert intake.result == "Position created"
+        assert intake.finished_at is not None
+        session.commit.assert_awaited()
+        assert service.get_metrics()["processed"] == 1
+        assert service.get_metrics()["latency_avg_seconds"] is not None
+
+    @pytest.mark.asyncio
+    async def test_process_failure_marks_failed_and_releases_dedup(self, mock_user, mock_cache):
+        session = AsyncMock()
+        intake = _intake("u:BTCUSDT:60")
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        router = MagicMock()
+        router.route = AsyncMock(side_effect=Exception("exchange down"))
+
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            signal_router_class=MagicMock(return_value=router),
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        with patch("app.services.webhook_intake.UserRepository") as user_repo_cls, \
+             patch("app.core.cache.get_cache", AsyncMock(return_value=mock_cache)):
+            user_repo_cls.return_value.get_by_id = AsyncMock(return_value=mock_user)
+            await service._process(intake.id)
+
+        session.rollback.assert_awaited_once()
+        assert intake.status == WebhookIntakeStatus.FAILED.value
+        assert "exchange down" in intake.error
+        mock_cache.release_lock.assert_awaited_once()
+        assert service.get_metrics()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_process_skips_non_processing_intake(self):
+        session = AsyncMock()
+        intake = _intake("u:BTCUSDT:60")
+        intake.status = WebhookIntakeStatus.DONE.value
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        router_cls = MagicMock()
+
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            signal_router_class=router_cls,
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+        await service._process(intake.id)
+
+        router_cls.assert_not_called()
+
+
+class TestStopAndRequeue:
+    """Tests for draining on stop and lease-based requeueing."""
+
+    @pytest.mark.asyncio
+    async def test_stop_lets_in_flight_intake_finish(self, mock_user):
+        session = AsyncMock()
+        intake = _intake("u:BTCUSDT:60")
+        queued_id = uuid.uuid4()
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        repo.claim_pending = AsyncMock(return_value=[])
+        repo.requeue_processing = AsyncMock(return_value=0)
+        repo.requeue = AsyncMock(return_value=1)
+        routing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_route(payload, db):
+            routing.set()
+            await release.wait()
+            return "Position created"
+
+        router = MagicMock()
+        router.route = slow_route
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            worker_count=1,
+            signal_router_class=MagicMock(return_value=router),
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        with patch("app.services.webhook_intake.UserRepository") as user_repo_cls, \
+             patch.object(service, "_report_health", AsyncMock()):
+            user_repo_cls.return_value.get_by_id = AsyncMock(return_value=mock_user)
+            await service.start_processing_task()
+            service._queues[0].put_nowait(intake.id)
+            service._queues[0].put_nowait(queued_id)
+            await routing.wait()
+
+            stopping = asyncio.create_task(service.stop_processing_task())
+            await asyncio.sleep(0.01)
+            assert not stopping.done()
+            release.set()
+            await stopping
+
+        assert intake.status == WebhookIntakeStatus.DONE.value
+        assert intake.finished_at is not None
+        # The intake queued behind it was not started, so it goes back to PENDING
+        repo.requeue.assert_awaited_once_with([queued_id])
+        assert service._workers == []
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_workers_past_drain_timeout(self, mock_user):
+        session = AsyncMock()
+        intake = _intake("u:BTCUSDT:60")
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        repo.claim_pending = AsyncMock(return_value=[])
+        repo.requeue_processing = AsyncMock(return_value=0)
+        routing = asyncio.Event()
+
+        async def stuck_route(payload, db):
+            routing.set()
+            await asyncio.Event().wait()
+
+        router = MagicMock()
+        router.route = stuck_route
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            worker_count=1,
+            drain_timeout_seconds=0.01,
+            signal_router_class=MagicMock(return_value=router),
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        with patch("app.services.webhook_intake.UserRepository") as user_repo_cls, \
+             patch.object(service, "_report_health", AsyncMock()):
+            user_repo_cls.return_value.get_by_id = AsyncMock(return_value=mock_user)
+            await service.start_processing_task()
+            service._queues[0].put_nowait(intake.id)
+            await routing.wait()
+            await service.stop_processing_task()
+
+        # Left in PROCESSING; the next leader requeues it once the lease expires
+        assert intake.status == WebhookIntakeStatus.PROCESSING.value
+        assert service._workers == []
+
+    @pytest.mark.asyncio
+    async def test_requeue_interrupted_only_past_lease(self):
+        session = AsyncMock()
+        repo = MagicMock()
+        repo.requeue_processing = AsyncMock(return_value=2)
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            processing_lease_seconds=600,
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        before = datetime.utcnow()
+        await service._requeue_interrupted()
+
+        started_before = repo.requeue_processing.await_args.args[0]
+        assert started_before <= before - timedelta(seconds=600) + timedelta(seconds=1)
+        assert started_before >= before - timedelta(seconds=601)
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_process_restarts_lease_when_routing_begins(self, mock_user):
+        session = AsyncMock()
+        claimed_at = datetime.utcnow() - timedelta(seconds=300)
+        intake = _intake("u:BTCUSDT:60")
+        intake.started_at = claimed_at
+        repo = MagicMock()
+        repo.get = AsyncMock(return_value=intake)
+        router = MagicMock()
+        router.route = AsyncMock(return_value="ok")
+
+        service = WebhookIntakeService(
+            session_factory=_session_factory(session),
+            signal_router_class=MagicMock(return_value=router),
+            intake_repository_class=MagicMock(return_value=repo)
+        )
+
+        with patch("app.services.webhook_intake.UserRepository") as user_repo_cls:
+            user_repo_cls.return_value.get_by_id = AsyncMock(return_value=mock_user)
+            await service._process(intake.id)
+
+        assert intake.started_at > claimed_at
+
+
+class TestWebhookEndpointIntake:
+    """Tests for the endpoint when intake is configured."""
+
+    @pytest.mark.asyncio
+    async def test_accepts_without_routing_inline(self, mock_user):
+        request = MagicMock()
+        request.json = AsyncMock(return_value=_payload_dict())
+        intake = MagicMock()
+        intake.id = uuid.uuid4()
+        intake_service = MagicMock()
+        intake_service.submit = AsyncMock(return_value=(intake, False))
+
+        with patch("app.api.webhooks.get_webhook_intake", return_value=intake_service), \
+             patch("app.api.webhooks.SignalRouterService") as router_cls:
+            result = await tradingview_webhook(request, AsyncMock(), mock_user)
+
+        assert result["status"] == "accepted"
+        assert result["intake_id"] == str(intake.id)
+        router_cls.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reports_duplicates(self, mock_user):
+        request = MagicMock()
+        request.json = AsyncMock(return_value=_payload_dict())
+        intake_service = MagicMock()
+        intake_service.submit = AsyncMock(return_value=(None, True))
+
+        with patch("app.api.webhooks.get_webhook_intake", return_value=intake_service):
+            result = await tradingview_webhook(request, AsyncMock(), mock_user)
+
+        assert result["status"] == "duplicate"
+        assert result["intake_id"] is None